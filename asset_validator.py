@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Szybka weryfikacja plików tekstur dla Earth Simulator Enhanced
+Autor: Adrian Lesniak
+
+Zamiast dekodować cały obraz (sekundy dla map 5400x2700) sprawdzany jest
+tylko nagłówek - znacznik SOF w JPEG albo blok IHDR w PNG (format i wymiary)
+- oraz koniec pliku (EOI / IEND), którego brak oznacza plik ucięty, np.
+przerwane pobieranie. Skrót SHA-256 liczony jest porcjami i porównywany z
+manifestem map (maps_manifest.json).
+
+Wyniki trafiają do pamięci podręcznej (JSON w katalogu konfiguracyjnym)
+z kluczem (ścieżka, rozmiar, mtime): kolejne uruchomienie wykonuje tylko
+os.stat i odczyt słownika, a każdy zmieniony plik jest sprawdzany od nowa.
+Pliki zmodyfikowane przed chwilą nie są zapamiętywane - zmiana w obrębie
+tego samego znacznika czasu mogłaby zostać niezauważona.
+"""
+
+import json
+import logging
+import os
+import struct
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from download_manager import file_sha256, load_manifest
+
+logger = logging.getLogger(__name__)
+
+# Pliki młodsze niż tyle sekund nie trafiają do pamięci podręcznej
+RACY_WINDOW = 2.0
+# Tolerancja proporcji mapy (równoodległościowa 2:1)
+ASPECT_TOLERANCE = 0.01
+CACHE_VERSION = 1
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+PNG_IEND = b'IEND\xaeB`\x82'
+JPEG_EOI = b'\xff\xd9'
+# Znaczniki SOF0-SOF15 poza DHT (C4), JPG (C8) i DAC (CC)
+JPEG_SOF = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7,
+            0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+# Znaczniki bez pola długości
+JPEG_STANDALONE = {0x01} | set(range(0xD0, 0xD8))
+# Koniec pliku JPEG szukany jest w ostatnich bajtach (dopuszczalne dopełnienie)
+JPEG_TAIL = 4096
+
+
+class AssetError(ValueError):
+    """Plik nie jest poprawnym obrazem (nagłówek, wymiary lub koniec pliku)"""
+
+
+@dataclass(frozen=True)
+class ImageHeader:
+    """Format i wymiary odczytane z nagłówka"""
+    format: str
+    width: int
+    height: int
+
+
+@dataclass
+class AssetReport:
+    """Wynik weryfikacji pliku; error - plik nie nadaje się do użycia"""
+    path: str
+    size: int = 0
+    header: Optional[ImageHeader] = None
+    sha256: Optional[str] = None
+    error: Optional[str] = None
+    warnings: List[str] = field(default_factory=list)
+    cached: bool = False
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def _read_exact(f, count: int) -> bytes:
+    data = f.read(count)
+    if len(data) != count:
+        raise AssetError("nieoczekiwany koniec pliku w nagłówku")
+    return data
+
+
+def _jpeg_header(f) -> ImageHeader:
+    """Przechodzi po segmentach JPEG do pierwszego znacznika SOF"""
+    while True:
+        if _read_exact(f, 1) != b'\xff':
+            raise AssetError("uszkodzona struktura segmentów JPEG")
+        marker = _read_exact(f, 1)[0]
+        while marker == 0xFF:              # bajty wypełnienia
+            marker = _read_exact(f, 1)[0]
+        if marker in JPEG_STANDALONE:
+            continue
+        if marker in (0xD9, 0xDA):
+            raise AssetError("brak znacznika SOF przed danymi obrazu")
+        length = struct.unpack('>H', _read_exact(f, 2))[0]
+        if length < 2:
+            raise AssetError("niepoprawna długość segmentu JPEG")
+        if marker in JPEG_SOF:
+            _, height, width = struct.unpack('>BHH', _read_exact(f, 5))
+            return ImageHeader('JPEG', width, height)
+        f.seek(length - 2, os.SEEK_CUR)
+
+
+def read_image_header(path: str) -> ImageHeader:
+    """Odczytuje format i wymiary obrazu oraz sprawdza koniec pliku
+
+    Czyta tylko nagłówek i końcówkę pliku; zgłasza AssetError dla
+    nieobsługiwanego formatu, zerowych wymiarów albo pliku uciętego.
+    """
+    size = os.path.getsize(path)
+    with open(path, 'rb') as f:
+        start = f.read(8)
+        if start == PNG_SIGNATURE:
+            length, chunk = struct.unpack('>I4s', _read_exact(f, 8))
+            if chunk != b'IHDR' or length != 13:
+                raise AssetError("brak bloku IHDR w PNG")
+            width, height = struct.unpack('>II', _read_exact(f, 8))
+            header = ImageHeader('PNG', width, height)
+            f.seek(max(0, size - len(PNG_IEND)))
+            complete = f.read() == PNG_IEND
+        elif start[:2] == b'\xff\xd8':
+            f.seek(2)
+            header = _jpeg_header(f)
+            f.seek(max(0, size - JPEG_TAIL))
+            complete = JPEG_EOI in f.read()
+        else:
+            raise AssetError("nieobsługiwany format (oczekiwano JPEG lub PNG)")
+    if header.width <= 0 or header.height <= 0:
+        raise AssetError(f"niepoprawne wymiary {header.width}x{header.height}")
+    if not complete:
+        raise AssetError(f"plik {header.format} jest ucięty (brak znacznika końca)")
+    return header
+
+
+def load_expected_hashes(manifest_path: str) -> Dict[str, str]:
+    """Skróty SHA-256 z manifestu map (pliki bez skrótu są pomijane)"""
+    try:
+        items = load_manifest(manifest_path)
+    except (OSError, ValueError, KeyError) as e:
+        logger.warning(f"Nie udało się wczytać manifestu {manifest_path}: {e}")
+        return {}
+    return {item.filename: item.sha256.lower() for item in items if item.sha256}
+
+
+class AssetValidator:
+    """Weryfikacja plików z pamięcią podręczną wyników (ścieżka, rozmiar, mtime)"""
+
+    def __init__(self, cache_path: Optional[str] = None,
+                 expected_hashes: Optional[Dict[str, str]] = None, hash_content: bool = True):
+        self.cache_path = cache_path
+        self.expected_hashes = expected_hashes or {}
+        self.hash_content = hash_content
+        self.cache: Dict[str, Dict] = self._load_cache()
+        self.dirty = False
+
+    def _load_cache(self) -> Dict[str, Dict]:
+        if not self.cache_path or not os.path.exists(self.cache_path):
+            return {}
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get("version") == CACHE_VERSION:
+                return data["files"]
+        except (OSError, ValueError, KeyError, AttributeError) as e:
+            logger.warning(f"Uszkodzona pamięć podręczna weryfikacji {self.cache_path}: {e}")
+        return {}
+
+    def save(self):
+        """Zapisuje pamięć podręczną (atomowo), jeśli coś się zmieniło"""
+        if not self.cache_path or not self.dirty:
+            return
+        temp_path = self.cache_path + ".tmp"
+        try:
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump({"version": CACHE_VERSION, "files": self.cache}, f, indent=1)
+            os.replace(temp_path, self.cache_path)
+            self.dirty = False
+        except OSError as e:
+            logger.warning(f"Nie udało się zapisać pamięci podręcznej weryfikacji: {e}")
+
+    def validate(self, path: str, aspect: Optional[float] = None) -> AssetReport:
+        """Sprawdza plik; aspect - oczekiwane proporcje szerokość/wysokość"""
+        key = os.path.abspath(path)
+        report = AssetReport(path)
+        try:
+            stat = os.stat(key)
+        except OSError as e:
+            report.error = f"brak pliku ({e.strerror})"
+            return report
+        report.size = stat.st_size
+
+        entry = self.cache.get(key)
+        if (entry is not None and entry.get("size") == stat.st_size
+                and entry.get("mtime_ns") == stat.st_mtime_ns
+                and (entry.get("sha256") or entry.get("error") or not self.hash_content)):
+            report.cached = True
+        else:
+            entry = self._check(key, stat)
+            if time.time() - stat.st_mtime > RACY_WINDOW:
+                self.cache[key] = entry
+                self.dirty = True
+            else:
+                self.cache.pop(key, None)
+
+        if entry["header"] is not None:
+            report.header = ImageHeader(*entry["header"])
+        report.sha256 = entry["sha256"]
+        report.error = entry["error"]
+        if report.ok:
+            self._apply_policy(report, aspect)
+        return report
+
+    def _check(self, path: str, stat: os.stat_result) -> Dict:
+        """Pełne sprawdzenie pliku (nagłówek, koniec pliku, skrót)"""
+        entry = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns,
+                 "header": None, "sha256": None, "error": None}
+        try:
+            header = read_image_header(path)
+            entry["header"] = [header.format, header.width, header.height]
+            if self.hash_content:
+                entry["sha256"] = file_sha256(path)
+        except AssetError as e:
+            entry["error"] = str(e)
+        except OSError as e:
+            entry["error"] = f"błąd odczytu ({e.strerror})"
+        return entry
+
+    def _apply_policy(self, report: AssetReport, aspect: Optional[float]):
+        """Ostrzeżenia zależne od oczekiwań (nie są zapamiętywane)"""
+        header = report.header
+        if aspect and abs(header.width / header.height - aspect) > aspect * ASPECT_TOLERANCE:
+            report.warnings.append(f"proporcje {header.width}x{header.height} "
+                                   f"zamiast {aspect:g}:1 - mapa będzie zniekształcona")
+        expected = self.expected_hashes.get(os.path.basename(report.path))
+        if expected and report.sha256 and report.sha256 != expected:
+            report.warnings.append("skrót SHA-256 różni się od manifestu "
+                                   "(zmodyfikowana lub uszkodzona mapa)")
+
+    def validate_all(self, paths: List[str], aspect: Optional[float] = None) -> List[AssetReport]:
+        """Sprawdza listę plików i zapisuje pamięć podręczną"""
+        reports = [self.validate(path, aspect) for path in paths]
+        self.save()
+        return reports
@@ -0,0 +1,407 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Rozpraszanie atmosferyczne (powłoka atmosfery) dla Earth Simulator Enhanced
+Autor: Adrian Lesniak
+
+Model pojedynczego rozpraszania Rayleigha i Mie w stylu Bruneton/O'Neil:
+  - tablica transmitancji T(r, mu) - przepuszczalność od punktu na wysokości r
+    w kierunku mu do granicy atmosfery (zero, gdy promień trafia w planetę),
+  - tablice rozpraszania S(mu, mu_s, nu) dla promieni wchodzących w atmosferę
+    z kosmosu: mu - kąt promienia do pionu w punkcie wejścia, mu_s - kąt Słońca
+    do pionu, nu - kąt między promieniem a Słońcem.
+
+Tablice liczone są raz w NumPy (w wątku tła) i zapisywane na dysku; shader
+tylko je próbkuje i dokłada funkcje fazowe, więc przebieg nie ma kosztu CPU
+na klatkę. Grubość atmosfery jest przesadzona (top_radius), a współczynniki
+rozpraszania przeskalowane tak, by głębokość optyczna odpowiadała ziemskiej.
+"""
+
+import hashlib
+import logging
+import os
+import threading
+from dataclasses import astuple, dataclass
+from typing import Optional, Tuple
+
+import numpy as np
+from OpenGL.GL import *
+
+from shaders import MeshBuffer, ShaderManager, ShaderProgram
+
+logger = logging.getLogger(__name__)
+
+# Zmiana algorytmu tablic unieważnia pamięć podręczną na dysku
+TABLE_VERSION = 1
+
+TRANSMITTANCE_SIZE = (32, 128)        # (r, mu)
+SCATTERING_SIZE = (64, 32, 16)        # (mu, mu_s, nu)
+
+
+@dataclass(frozen=True)
+class AtmosphereParameters:
+    """Parametry atmosfery (wartości ziemskie w km; promień planety = 1)"""
+    top_radius: float = 1.06          # granica atmosfery w promieniach planety
+    planet_radius_km: float = 6360.0
+    thickness_km: float = 60.0        # rzeczywista grubość modelowanej atmosfery
+    rayleigh_scattering: Tuple[float, float, float] = (5.802e-3, 13.558e-3, 33.1e-3)
+    rayleigh_scale_height_km: float = 8.0
+    mie_scattering: float = 3.996e-3
+    mie_extinction: float = 4.44e-3
+    mie_scale_height_km: float = 1.2
+    mie_g: float = 0.8
+
+    @property
+    def exaggeration(self) -> float:
+        return (self.top_radius - 1.0) * self.planet_radius_km / self.thickness_km
+
+    def scale_heights(self) -> Tuple[float, float]:
+        """Wysokości skali (Rayleigh, Mie) w promieniach planety"""
+        factor = self.exaggeration / self.planet_radius_km
+        return self.rayleigh_scale_height_km * factor, self.mie_scale_height_km * factor
+
+    def coefficients(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Współczynniki (rozpraszanie Rayleigha, rozpraszanie Mie, ekstynkcja Mie) na promień planety"""
+        factor = self.planet_radius_km / self.exaggeration
+        return (np.array(self.rayleigh_scattering) * factor,
+                np.full(3, self.mie_scattering * factor),
+                np.full(3, self.mie_extinction * factor))
+
+    def cache_key(self) -> str:
+        text = repr((TABLE_VERSION, astuple(self), TRANSMITTANCE_SIZE, SCATTERING_SIZE))
+        return hashlib.sha1(text.encode('utf-8')).hexdigest()[:12]
+
+
+@dataclass
+class AtmosphereTables:
+    """Tablice gotowe do przesłania jako tekstury"""
+    transmittance: np.ndarray   # (r, mu, 3)
+    rayleigh: np.ndarray        # (mu, mu_s, nu, 4) - alfa: transmitancja promienia
+    mie: np.ndarray             # (mu, mu_s, nu, 3)
+
+    def save(self, path: str):
+        np.savez_compressed(path, transmittance=self.transmittance,
+                            rayleigh=self.rayleigh, mie=self.mie)
+
+    @classmethod
+    def load(cls, path: str) -> "AtmosphereTables":
+        with np.load(path) as data:
+            return cls(data["transmittance"], data["rayleigh"], data["mie"])
+
+
+def mu_from_coordinate(u: np.ndarray) -> np.ndarray:
+    """Współrzędna tekstury -> mu promienia wchodzącego (gęściej przy horyzoncie)"""
+    return -(1.0 - u) ** 2
+
+
+def distance_to_top(r: np.ndarray, mu: np.ndarray, top: float) -> np.ndarray:
+    discriminant = np.maximum(r * r * (mu * mu - 1.0) + top * top, 0.0)
+    return np.maximum(-r * mu + np.sqrt(discriminant), 0.0)
+
+
+def hits_ground(r: np.ndarray, mu: np.ndarray) -> np.ndarray:
+    return (mu < 0.0) & (r * r * (mu * mu - 1.0) + 1.0 >= 0.0)
+
+
+def _densities(r: np.ndarray, params: AtmosphereParameters) -> Tuple[np.ndarray, np.ndarray]:
+    height = np.maximum(r - 1.0, 0.0)
+    rayleigh_height, mie_height = params.scale_heights()
+    return np.exp(-height / rayleigh_height), np.exp(-height / mie_height)
+
+
+def _extinction(r: np.ndarray, params: AtmosphereParameters) -> np.ndarray:
+    """Współczynnik ekstynkcji w punkcie (..., 3)"""
+    rayleigh, _, mie_extinction = params.coefficients()
+    rayleigh_density, mie_density = _densities(r, params)
+    return rayleigh_density[..., None] * rayleigh + mie_density[..., None] * mie_extinction
+
+
+def build_transmittance(params: AtmosphereParameters,
+                        size: Tuple[int, int] = TRANSMITTANCE_SIZE,
+                        steps: int = 64) -> np.ndarray:
+    """Tablica T(r, mu); r od 1 do top_radius, mu od -1 do 1 (liniowo)"""
+    r = np.linspace(1.0, params.top_radius, size[0])[:, None]
+    mu = np.linspace(-1.0, 1.0, size[1])[None, :]
+    length = distance_to_top(r, mu, params.top_radius)
+
+    t = np.linspace(0.0, 1.0, steps)[None, None, :] * length[..., None]
+    radius = np.sqrt(r[..., None] ** 2 + t * t + 2.0 * r[..., None] * mu[..., None] * t)
+    depth = np.trapz(_extinction(radius, params), t[..., None], axis=2)
+
+    transmittance = np.exp(-depth)
+    transmittance[np.broadcast_to(hits_ground(r, mu), transmittance.shape[:2])] = 0.0
+    return transmittance.astype(np.float32)
+
+
+def lookup_transmittance(table: np.ndarray, r: np.ndarray, mu: np.ndarray,
+                         params: AtmosphereParameters) -> np.ndarray:
+    """Interpolacja dwuliniowa tablicy T(r, mu) (zero dla kierunków w planetę)"""
+    rows, cols = table.shape[:2]
+    x = np.clip((r - 1.0) / (params.top_radius - 1.0), 0.0, 1.0) * (rows - 1)
+    y = np.clip((mu + 1.0) * 0.5, 0.0, 1.0) * (cols - 1)
+    x0 = np.minimum(np.floor(x).astype(np.int64), rows - 2)
+    y0 = np.minimum(np.floor(y).astype(np.int64), cols - 2)
+    fx = (x - x0)[..., None]
+    fy = (y - y0)[..., None]
+    value = (table[x0, y0] * (1 - fx) * (1 - fy) + table[x0 + 1, y0] * fx * (1 - fy) +
+             table[x0, y0 + 1] * (1 - fx) * fy + table[x0 + 1, y0 + 1] * fx * fy)
+    return np.where(hits_ground(r, mu)[..., None], 0.0, value)
+
+
+def build_tables(params: AtmosphereParameters = AtmosphereParameters(),
+                 size: Tuple[int, int, int] = SCATTERING_SIZE,
+                 steps: int = 48) -> AtmosphereTables:
+    """Liczy tablice transmitancji i pojedynczego rozpraszania"""
+    transmittance = build_transmittance(params)
+    rayleigh_scattering, mie_scattering, _ = params.coefficients()
+    top = params.top_radius
+
+    mu_size, mu_s_size, nu_size = size
+    mu_s = np.linspace(-1.0, 1.0, mu_s_size)[:, None, None]
+    nu = np.linspace(-1.0, 1.0, nu_size)[None, :, None]
+    rayleigh = np.zeros((mu_size, mu_s_size, nu_size, 4), dtype=np.float32)
+    mie = np.zeros((mu_size, mu_s_size, nu_size, 3), dtype=np.float32)
+
+    for index, mu in enumerate(mu_from_coordinate(np.linspace(0.0, 1.0, mu_size))):
+        mu = min(mu, -1e-4)
+        sin_mu = max(np.sqrt(1.0 - mu * mu), 1e-4)
+        ground = top * top * (mu * mu - 1.0) + 1.0
+        length = -top * mu - np.sqrt(ground) if ground >= 0.0 else -2.0 * top * mu
+
+        # Punkt wejścia (0, 0, top), kierunek promienia (sin_mu, 0, mu)
+        t = np.linspace(0.0, length, steps)
+        x = t * sin_mu
+        z = top + t * mu
+        radius = np.sqrt(x * x + z * z)
+
+        # Transmitancja od punktu wejścia wzdłuż promienia
+        extinction = _extinction(radius, params)
+        segment = 0.5 * (extinction[1:] + extinction[:-1]) * np.diff(t)[:, None]
+        view = np.exp(-np.concatenate([np.zeros((1, 3)), np.cumsum(segment, axis=0)]))
+
+        # Kierunek Słońca o zadanych mu_s (do pionu w punkcie wejścia) i nu (do promienia)
+        sun_x = np.clip((nu - mu * mu_s) / sin_mu, -1.0, 1.0)
+        sun_x = np.clip(sun_x, -np.sqrt(1.0 - mu_s ** 2), np.sqrt(1.0 - mu_s ** 2))
+        sun_mu = (x * sun_x + z * mu_s) / radius
+        sun = lookup_transmittance(transmittance, np.broadcast_to(radius, sun_mu.shape),
+                                   sun_mu, params)
+
+        rayleigh_density, mie_density = _densities(radius, params)
+        light = view * sun
+        rayleigh[index, ..., :3] = np.trapz(light * rayleigh_density[:, None], t, axis=2) \
+            * rayleigh_scattering
+        mie[index] = np.trapz(light * mie_density[:, None], t, axis=2) * mie_scattering
+        rayleigh[index, ..., 3] = view[-1].mean()
+
+    return AtmosphereTables(transmittance, rayleigh, mie)
+
+
+def load_or_build_tables(params: AtmosphereParameters, cache_dir: Optional[str]) -> AtmosphereTables:
+    """Wczytuje tablice z pamięci podręcznej albo liczy je i zapisuje"""
+    path = (os.path.join(cache_dir, f"atmosphere_{params.cache_key()}.npz")
+            if cache_dir else None)
+    if path and os.path.exists(path):
+        try:
+            return AtmosphereTables.load(path)
+        except Exception as e:
+            logger.warning(f"Uszkodzona pamięć podręczna atmosfery {path}: {e}")
+
+    tables = build_tables(params)
+    if path:
+        try:
+            tables.save(path)
+            logger.info(f"Tablice rozpraszania zapisane do {path}")
+        except OSError as e:
+            logger.warning(f"Nie udało się zapisać tablic atmosfery: {e}")
+    return tables
+
+
+VERTEX_SHADER = """
+#version 120
+attribute vec3 a_position;      // siatka globu (sfera o środku w zerze)
+uniform mat4 u_mvp;
+uniform float u_shell_radius;   // promień powłoki w jednostkach modelu
+uniform float u_globe_radius;
+varying vec3 v_position;        // pozycja w promieniach planety
+
+void main() {
+    vec3 position = normalize(a_position) * u_shell_radius;
+    v_position = position / u_globe_radius;
+    gl_Position = u_mvp * vec4(position, 1.0);
+}
+"""
+
+FRAGMENT_SHADER = """
+#version 120
+uniform sampler3D u_rayleigh;
+uniform sampler3D u_mie;
+uniform vec3 u_camera;          // kamera w układzie modelu [promienie planety]
+uniform vec3 u_sun;             // jednostkowy kierunek do Słońca
+uniform float u_exposure;
+uniform float u_fade;
+uniform float u_mie_g;
+uniform vec3 u_table_size;      // (nu, mu_s, mu)
+varying vec3 v_position;
+
+const float PI = 3.14159265;
+
+float texel(float x, float size) {
+    return (x * (size - 1.0) + 0.5) / size;
+}
+
+void main() {
+    vec3 view = normalize(v_position - u_camera);
+    vec3 up = normalize(v_position);
+    float mu = dot(view, up);
+    if (mu >= 0.0) discard;     // promień wychodzący - tylna ściana powłoki
+
+    float mu_s = dot(u_sun, up);
+    float nu = dot(view, u_sun);
+    vec3 coords = vec3(texel(nu * 0.5 + 0.5, u_table_size.x),
+                       texel(mu_s * 0.5 + 0.5, u_table_size.y),
+                       texel(1.0 - sqrt(-mu), u_table_size.z));
+    vec4 rayleigh = texture3D(u_rayleigh, coords);
+    vec3 mie = texture3D(u_mie, coords).rgb;
+
+    float g = u_mie_g;
+    float rayleigh_phase = 3.0 / (16.0 * PI) * (1.0 + nu * nu);
+    float mie_phase = 3.0 / (8.0 * PI) * (1.0 - g * g) * (1.0 + nu * nu) /
+                      ((2.0 + g * g) * pow(1.0 + g * g - 2.0 * g * nu, 1.5));
+    vec3 light = rayleigh.rgb * rayleigh_phase + mie * mie_phase;
+
+    // Mieszanie (GL_ONE, GL_SRC_ALPHA): tło * transmitancja + światło rozproszone
+    vec3 color = (vec3(1.0) - exp(-u_exposure * light)) * u_fade;
+    float transmittance = mix(1.0, rayleigh.a, u_fade);
+    gl_FragColor = vec4(color, transmittance);
+}
+"""
+
+
+class AtmosphereShell:
+    """Przebieg rysujący powłokę atmosfery z tablic rozpraszania
+
+    Tablice liczone są (lub wczytywane) w wątku tła po pierwszym użyciu;
+    do tego czasu ready zwraca False, a draw nic nie rysuje.
+    """
+
+    def __init__(self, shaders: ShaderManager,
+                 params: AtmosphereParameters = AtmosphereParameters(),
+                 cache_dir: Optional[str] = None, exposure: float = 12.0):
+        self.shaders = shaders
+        self.params = params
+        self.cache_dir = cache_dir
+        self.exposure = exposure
+        self.program: Optional[ShaderProgram] = None
+        self.textures = []
+        self.nbytes = 0                   # pamięć GPU tablic (profil pamięci)
+        self.failed = False
+        self._tables: Optional[AtmosphereTables] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def ready(self) -> bool:
+        return self.program is not None
+
+    def prepare(self) -> bool:
+        """Uruchamia liczenie tablic i tworzy zasoby GPU, gdy są gotowe (wątek główny)"""
+        if self.ready or self.failed:
+            return self.ready
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._load_tables, name="atmosphere-tables",
+                                            daemon=True)
+            self._thread.start()
+            return False
+        if self._thread.is_alive():
+            return False
+        if self._tables is None:
+            self.failed = True
+            return False
+
+        try:
+            self.shaders.register("atmosphere", VERTEX_SHADER, FRAGMENT_SHADER)
+            self.program = self.shaders.program("atmosphere")
+            self.textures = [self._upload_3d(self._tables.rayleigh, GL_RGBA),
+                             self._upload_3d(self._tables.mie, GL_RGB)]
+            # Tekstury zmiennoprzecinkowe 16-bitowe - 2 B na kanał
+            self.nbytes = 2 * (self._tables.rayleigh.size + self._tables.mie.size)
+        except Exception as e:
+            logger.error(f"Nie udało się przygotować atmosfery: {e}")
+            self.release()
+            self.failed = True
+            return False
+        self._tables = None
+        return True
+
+    def _load_tables(self):
+        try:
+            self._tables = load_or_build_tables(self.params, self.cache_dir)
+        except Exception as e:
+            logger.error(f"Błąd liczenia tablic atmosfery: {e}")
+
+    @staticmethod
+    def _upload_3d(table: np.ndarray, pixel_format) -> int:
+        depth, height, width = table.shape[:3]
+        internal = GL_RGBA16F if pixel_format == GL_RGBA else GL_RGB16F
+        texture = glGenTextures(1)
+        glBindTexture(GL_TEXTURE_3D, texture)
+        glTexParameteri(GL_TEXTURE_3D, GL_TEXTURE_MIN_FILTER, GL_LINEAR)
+        glTexParameteri(GL_TEXTURE_3D, GL_TEXTURE_MAG_FILTER, GL_LINEAR)
+        for wrap in (GL_TEXTURE_WRAP_S, GL_TEXTURE_WRAP_T, GL_TEXTURE_WRAP_R):
+            glTexParameteri(GL_TEXTURE_3D, wrap, GL_CLAMP_TO_EDGE)
+        glTexImage3D(GL_TEXTURE_3D, 0, internal, width, height, depth, 0,
+                     pixel_format, GL_FLOAT, np.ascontiguousarray(table, dtype=np.float32))
+        glBindTexture(GL_TEXTURE_3D, 0)
+        return texture
+
+    def fade_for(self, camera_radius: float) -> float:
+        """Wygaszenie przy kamerze wewnątrz powłoki (model zakłada obserwatora w kosmosie)"""
+        top = self.params.top_radius
+        return float(np.clip((camera_radius - top) / (0.5 * (top - 1.0) + 1e-6), 0.0, 1.0))
+
+    def draw(self, mesh: MeshBuffer, mvp: np.ndarray, globe_radius: float,
+             camera: np.ndarray, sun: np.ndarray):
+        """Rysuje powłokę z podłączonej siatki globu (MeshBuffer.bind)
+
+        camera i sun w układzie modelu globu (kamera w jednostkach modelu).
+        """
+        fade = self.fade_for(float(np.linalg.norm(camera)) / globe_radius)
+        if not self.ready or fade <= 0.0:
+            return
+
+        program = self.shaders.use(self.program)
+        program.set_matrix("u_mvp", mvp)
+        program.set_float("u_shell_radius", globe_radius * self.params.top_radius)
+        program.set_float("u_globe_radius", globe_radius)
+        program.set_float("u_camera", *(camera / globe_radius))
+        program.set_float("u_sun", *sun)
+        program.set_float("u_exposure", self.exposure)
+        program.set_float("u_fade", fade)
+        program.set_float("u_mie_g", self.params.mie_g)
+        mu_size, mu_s_size, nu_size = SCATTERING_SIZE
+        program.set_float("u_table_size", nu_size, mu_s_size, mu_size)
+        program.set_int("u_rayleigh", 0)
+        program.set_int("u_mie", 1)
+
+        state = self.shaders.state
+        state.bind_texture(self.textures[1], 1, GL_TEXTURE_3D)
+        state.bind_texture(self.textures[0], 0, GL_TEXTURE_3D)
+        state.enable(GL_CULL_FACE)
+        state.cull_face(GL_BACK)
+        state.enable(GL_BLEND)
+        state.blend_func(GL_ONE, GL_SRC_ALPHA)
+        # Powłoka leży przed globem - test głębi bez zapisu
+        state.depth_mask(False)
+        state.polygon_mode(GL_FILL)
+        mesh.draw()
+
+    def release(self):
+        """Zwalnia zasoby GPU"""
+        try:
+            if self.textures:
+                glDeleteTextures(self.textures)
+        except Exception as e:
+            logger.warning(f"Błąd zwalniania tekstur atmosfery: {e}")
+        self.textures = []
+        self.nbytes = 0
+        # Program należy do menedżera shaderów (ShaderManager.release)
+        self.program = None
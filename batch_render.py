@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Wsadowe renderowanie widoków globu w puli procesów dla Earth Simulator Enhanced
+Autor: Adrian Lesniak
+
+Lista widoków (CSV z nagłówkiem lub lista JSON) rozdzielana jest między
+procesy robocze. Każdy proces tworzy raz własny kontekst headless (EGL) z
+symulatorem i wczytanymi teksturami - tekstury i siatki zostają w pamięci GPU
+między zadaniami, a zadanie to tylko ustawienie kamery, rysowanie do bufora
+poza ekranem, odczyt i zapis pliku. Obrazy zapisywane są przez procesy
+robocze od razu po wyrenderowaniu; proces główny dopisuje wiersz do
+manifest.jsonl dla każdego ukończonego widoku i raportuje postęp (widoki/s).
+
+Procesy są niezależne (osobne konteksty, brak wspólnej blokady GIL), więc
+przepustowość rośnie z liczbą rdzeni, dopóki nie ogranicza jej GPU/sterownik.
+
+Format widoku (CSV - kolumny, JSON - klucze):
+  name, latitude, longitude [, zoom=1.0] [, layer=Default]
+
+Użycie:
+  python batch_render.py views.csv --output-dir renders --size 512x512
+  python batch_render.py views.json --workers 4 --format webp
+"""
+
+import argparse
+import csv
+import json
+import logging
+import multiprocessing
+import os
+import signal
+import sys
+import time
+from dataclasses import asdict, dataclass
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from utils import parse_size
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_OUTPUT_DIR = "renders"
+DEFAULT_SIZE = (512, 512)
+MANIFEST = "manifest.jsonl"
+
+# Odległość kamery dla zoom = 1 i zakres jak w symulatorze (setup_variables)
+DEFAULT_DISTANCE = -5.0
+MIN_DISTANCE = -15.0
+MAX_DISTANCE = -2.0
+
+
+@dataclass(frozen=True)
+class View:
+    """Widok do wyrenderowania: punkt w środku kadru, przybliżenie i warstwa"""
+    name: str
+    latitude: float
+    longitude: float
+    zoom: float = 1.0
+    layer: str = "Default"
+
+    @property
+    def distance(self) -> float:
+        """Odległość kamery (zoom 2 = dwa razy bliżej), w zakresie symulatora"""
+        return max(MIN_DISTANCE, min(MAX_DISTANCE, DEFAULT_DISTANCE / self.zoom))
+
+    @classmethod
+    def from_dict(cls, data: Dict, index: int) -> "View":
+        """Widok z wiersza CSV lub obiektu JSON (index - do nazwy domyślnej i błędów)"""
+        try:
+            latitude = float(data["latitude"])
+            longitude = float(data["longitude"])
+            zoom = float(data.get("zoom") or 1.0)
+        except (KeyError, TypeError, ValueError) as e:
+            raise ValueError(f"Widok {index + 1}: nieprawidłowe dane ({e})") from e
+        if not -90.0 <= latitude <= 90.0 or zoom <= 0.0:
+            raise ValueError(f"Widok {index + 1}: szerokość poza [-90, 90] lub zoom <= 0")
+        name = str(data.get("name") or f"view_{index:05d}")
+        if os.path.basename(name) != name or name in (".", ".."):
+            raise ValueError(f"Widok {index + 1}: nazwa nie może zawierać ścieżki: {name}")
+        if not -180.0 <= longitude <= 180.0:
+            longitude = (longitude + 180.0) % 360.0 - 180.0
+        return cls(name, latitude, longitude, zoom, str(data.get("layer") or "Default"))
+
+
+def load_views(path: str) -> List[View]:
+    """Wczytuje widoki z pliku .json (lista lub {"views": [...]}) albo CSV z nagłówkiem"""
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        if path.lower().endswith(".json"):
+            data = json.load(f)
+            rows = data.get("views", []) if isinstance(data, dict) else data
+        else:
+            rows = list(csv.DictReader(f))
+    views = [View.from_dict(row, index) for index, row in enumerate(rows)]
+    names = [view.name for view in views]
+    if len(set(names)) != len(names):
+        raise ValueError("Nazwy widoków muszą być unikalne (nazwa = plik wyjściowy)")
+    return views
+
+
+class ViewRenderer:
+    """Symulator headless z teksturami w pamięci GPU i buforem na miniatury
+
+    Tworzony raz na proces roboczy; render() może być wywoływane wielokrotnie.
+    """
+
+    def __init__(self, size: Tuple[int, int]):
+        # Import dopiero w procesie roboczym - po wyborze platformy EGL
+        from benchmark import create_simulator
+        from render_target import RenderTarget
+
+        self.width, self.height = size
+        self.simulator = create_simulator()
+        self.target = RenderTarget(self.width, self.height)
+        self.simulator.aspect = self.width / self.height
+        self.simulator.update_perspective()
+        self.layers = {name.lower(): name for name in self.simulator.texture_files}
+
+    def render(self, view: View) -> bytes:
+        """Rysuje widok do bufora poza ekranem i zwraca piksele RGBA (wiersze od dołu)"""
+        from OpenGL.GL import (glClear, glPixelStorei, glReadPixels, GL_COLOR_BUFFER_BIT,
+                               GL_DEPTH_BUFFER_BIT, GL_PACK_ALIGNMENT, GL_RGBA,
+                               GL_UNSIGNED_BYTE)
+        from picking import camera_centered_on
+
+        layer = self.layers.get(view.layer.lower())
+        if layer is None:
+            raise ValueError(f"Nieznana warstwa: {view.layer} "
+                             f"(dostępne: {', '.join(self.layers.values())})")
+        simulator = self.simulator
+        simulator.current_texture = layer
+        simulator.update_view_matrix(camera_centered_on(view.latitude, view.longitude,
+                                                        view.distance))
+        self.target.bind()
+        simulator.gl_state.begin_frame()
+        glClear(int(GL_COLOR_BUFFER_BIT) | int(GL_DEPTH_BUFFER_BIT))
+        simulator.draw_earth()
+        simulator.gl_state.end_frame()
+        glPixelStorei(GL_PACK_ALIGNMENT, 1)
+        return bytes(glReadPixels(0, 0, self.width, self.height, GL_RGBA, GL_UNSIGNED_BYTE))
+
+
+# Stan procesu roboczego (ustawiany przez _init_worker)
+_renderer: Optional[ViewRenderer] = None
+_init_error: Optional[str] = None
+_output_dir = ""
+_extension = ".png"
+
+
+def _init_worker(size: Tuple[int, int], output_dir: str, extension: str):
+    """Inicjalizacja procesu roboczego: platforma EGL, tryb PyOpenGL, symulator
+
+    Błąd nie jest zgłaszany wyjątkiem (pula restartowałaby proces w nieskończoność)
+    - zadania tego procesu zwracają go jako wynik.
+    """
+    global _renderer, _init_error, _output_dir, _extension
+    import gl_config
+    import headless
+    from log_pipeline import LOG_FILE_ENV
+    # Przed importem symulatora: wspólny plik logów rotowany przez kilka
+    # procesów naraz ulega uszkodzeniu - procesy robocze logują na konsolę
+    os.environ[LOG_FILE_ENV] = ""
+    headless.configure_headless_platform()
+    gl_config.configure_pyopengl()
+    _output_dir, _extension = output_dir, extension
+    try:
+        _renderer = ViewRenderer(size)
+    except Exception as e:
+        logger.error(f"Nie udało się utworzyć renderera: {e}")
+        _init_error = f"inicjalizacja procesu: {e}"
+    # SDL przechwytuje SIGTERM (zamienia na zdarzenie QUIT) - bez tego
+    # pool.terminate() nie zakończyłby procesu
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+
+
+def _render_job(view: View) -> Dict:
+    """Zadanie puli: renderuje widok i zapisuje obraz, zwraca wiersz manifestu"""
+    from screenshot import encode_image
+
+    result = dict(asdict(view), path=None, worker=os.getpid(), error=_init_error)
+    if _renderer is None:
+        return result
+    try:
+        start = time.perf_counter()
+        pixels = _renderer.render(view)
+        rendered = time.perf_counter()
+        path = os.path.join(_output_dir, view.name + _extension)
+        encode_image(path, _renderer.width, _renderer.height, pixels)
+        result.update(path=path, render_ms=round((rendered - start) * 1000.0, 2),
+                      encode_ms=round((time.perf_counter() - rendered) * 1000.0, 2))
+    except Exception as e:
+        result["error"] = str(e)
+    return result
+
+
+def render_views(views: List[View], output_dir: str, size: Tuple[int, int] = DEFAULT_SIZE,
+                 workers: Optional[int] = None, extension: str = ".png") -> Iterator[Dict]:
+    """Renderuje widoki w puli procesów; zwraca wyniki w kolejności ukończenia
+
+    Procesy startują metodą "spawn" - każdy ma czysty interpreter i własny
+    kontekst GL (fork skopiowałby stan EGL procesu nadrzędnego).
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    workers = max(1, min(workers or os.cpu_count() or 1, len(views) or 1))
+    context = multiprocessing.get_context("spawn")
+    pool = context.Pool(workers, initializer=_init_worker,
+                        initargs=(size, output_dir, extension))
+    try:
+        yield from pool.imap_unordered(_render_job, views)
+    except BaseException:
+        pool.terminate()              # przerwanie (Ctrl+C, porzucony generator)
+        raise
+    else:
+        pool.close()
+    finally:
+        pool.join()
+
+
+def run_batch(views: List[View], output_dir: str, size: Tuple[int, int] = DEFAULT_SIZE,
+              workers: Optional[int] = None, extension: str = ".png",
+              progress_interval: float = 1.0) -> Dict:
+    """Renderuje widoki, dopisuje wyniki do manifestu na bieżąco i raportuje postęp"""
+    os.makedirs(output_dir, exist_ok=True)
+    total = len(views)
+    done = failed = 0
+    start = last_report = time.perf_counter()
+    with open(os.path.join(output_dir, MANIFEST), 'w', encoding='utf-8') as manifest:
+        for result in render_views(views, output_dir, size, workers, extension):
+            done += 1
+            if result["error"]:
+                failed += 1
+                logger.error(f"Widok {result['name']}: {result['error']}")
+            manifest.write(json.dumps(result, ensure_ascii=False) + "\n")
+            manifest.flush()
+            now = time.perf_counter()
+            if now - last_report >= progress_interval or done == total:
+                last_report = now
+                print(f"  [{done}/{total}] {done / (now - start):.1f} widoków/s"
+                      f"{f', błędy: {failed}' if failed else ''}", flush=True)
+    elapsed = time.perf_counter() - start
+    return {
+        "views": total,
+        "rendered": done - failed,
+        "failed": failed,
+        "seconds": round(elapsed, 2),
+        "views_per_second": round(done / elapsed, 2) if elapsed > 0 else 0.0,
+    }
+
+
+def parse_arguments(argv=None) -> argparse.Namespace:
+    """Parsuje argumenty wiersza poleceń"""
+    parser = argparse.ArgumentParser(description="Wsadowe renderowanie widoków globu")
+    parser.add_argument('views', metavar='PLIK',
+                        help="lista widoków: CSV z nagłówkiem lub JSON")
+    parser.add_argument('--output-dir', default=DEFAULT_OUTPUT_DIR, metavar='KATALOG',
+                        help="katalog obrazów i manifestu")
+    parser.add_argument('--size', type=parse_size, default=DEFAULT_SIZE, metavar='SZERxWYS',
+                        help="rozmiar obrazów, np. 512x512")
+    parser.add_argument('--workers', type=int, default=None, metavar='N',
+                        help="liczba procesów (domyślnie liczba rdzeni)")
+    parser.add_argument('--format', choices=['png', 'webp'], default='png',
+                        help="format obrazów")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    """Uruchamia renderowanie wsadowe; zwraca kod wyjścia (1 = błędy widoków)"""
+    args = parse_arguments(argv)
+    try:
+        views = load_views(args.views)
+    except (OSError, ValueError) as e:
+        print(f"❌ Nie można wczytać widoków: {e}")
+        return 2
+    if not views:
+        print("⚠️ Brak widoków do renderowania")
+        return 0
+
+    workers = args.workers or os.cpu_count() or 1
+    print(f"🖼️ Renderowanie {len(views)} widoków {args.size[0]}x{args.size[1]} "
+          f"({min(workers, len(views))} procesów) -> {args.output_dir}")
+    summary = run_batch(views, args.output_dir, args.size, workers, f".{args.format}")
+    print(f"✅ Gotowe: {summary['rendered']}/{summary['views']} w {summary['seconds']} s "
+          f"({summary['views_per_second']} widoków/s)")
+    return 1 if summary["failed"] else 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.WARNING, format='%(levelname)s %(name)s: %(message)s')
+    sys.exit(main())
@@ -0,0 +1,579 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Zestaw benchmarków renderowania dla Earth Simulator Enhanced
+Autor: Adrian Lesniak
+
+Benchmark uruchamia symulator bez okna (EGL) i mierzy:
+  - czas budowy siatki sfery dla kilku gęstości,
+  - dekodowanie i przesyłanie tekstur do GPU (osobno),
+  - FPS renderowania globu dla kombinacji gęstości siatki i rozdzielczości,
+  - koszt nakładek interfejsu (nagłówek, menu, statystyki),
+  - koszt warstwy chmur (generowanie w tle, przesył PBO, przejście rysowania),
+  - koszt powłoki atmosfery (liczenie tablic rozpraszania, przebieg shadera),
+  - koszt zrzutu ekranu w wątku renderowania (odczyt PBO) i kodowania PNG w tle,
+  - szybkość nagrywania wideo Y4M (klatki/s razem z odczytem i kodowaniem),
+  - narzut PyOpenGL w trybie szybkim i debug (osobne procesy - flagi ustawiane
+    są przed importem OpenGL.GL),
+  - czas zimnego startu programu (osobny proces, --headless --frames 1).
+
+Wyniki zapisywane są jako JSON i porównywane z linią bazową
+(benchmark_baseline.json). Pogorszenie ponad tolerancję kończy program
+kodem 1, więc benchmark może pilnować wydajności w CI. Linia bazowa zależy
+od maszyny i sterownika GL, więc nie jest dołączona do repozytorium - w CI
+należy ją wygenerować na docelowej maszynie (--update-baseline) i uruchamiać
+z --require-baseline, żeby jej brak nie przechodził po cichu.
+
+Użycie:
+  python benchmark.py                    # pomiar i porównanie z linią bazową
+  python benchmark.py --update-baseline  # zapisz wyniki jako nową linię bazową
+  python benchmark.py --quick            # mniejszy zestaw pomiarów
+  python benchmark.py --require-baseline # brak linii bazowej = kod wyjścia 1 (CI)
+"""
+
+# Platforma EGL i tryb PyOpenGL muszą zostać wybrane przed pierwszym importem
+# OpenGL.GL (przy imporcie jako moduł robi to wywołujący)
+if __name__ == "__main__":
+    import sys
+    import gl_config
+    import headless
+    headless.configure_headless_platform()
+    gl_config.configure_pyopengl(debug='--debug' in sys.argv)
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+from OpenGL.GL import (glClear, glDeleteTextures, glDisable, glEnable, glFinish, glGetString,
+                       glReadPixels, GL_COLOR_BUFFER_BIT, GL_DEPTH_BUFFER_BIT, GL_RENDERER,
+                       GL_RGBA, GL_SCISSOR_TEST, GL_UNSIGNED_BYTE, GL_VERSION)
+
+from atmosphere import AtmosphereShell
+from clouds import CloudField
+from render_target import RenderTarget
+from screenshot import ScreenshotCapture, encode_image
+from video_recorder import VideoRecorder, Y4MWriter
+from streaming_texture import StreamingTexture
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_BASELINE = os.path.join(SCRIPT_DIR, "benchmark_baseline.json")
+DEFAULT_OUTPUT = "benchmark_results.json"
+DEFAULT_TOLERANCE = 0.25
+
+SPHERE_SEGMENTS = [16, 32, 48, 96, 192]
+RENDER_SEGMENTS = [16, 48, 96]
+RESOLUTIONS = [(640, 360), (1280, 720), (1920, 1080)]
+
+QUICK_SPHERE_SEGMENTS = [16, 48]
+QUICK_RENDER_SEGMENTS = [48]
+QUICK_RESOLUTIONS = [(1280, 720)]
+
+
+def metric(value: float, unit: str, higher_is_better: bool = False) -> Dict:
+    """Tworzy wpis wyniku pomiaru"""
+    return {"value": round(value, 4), "unit": unit, "higher_is_better": higher_is_better}
+
+
+def median_ms(func: Callable[[], None], repeat: int) -> float:
+    """Mediana czasu wykonania funkcji [ms] - odporna na pojedyncze zakłócenia"""
+    samples = []
+    for _ in range(max(1, repeat)):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000.0)
+    return statistics.median(samples)
+
+
+def create_simulator():
+    """Tworzy symulator headless z domyślną konfiguracją i stałą jakością"""
+    from earth_simulator_enhanced import DataManager, EnhancedEarthSimulator
+
+    config = json.loads(json.dumps(DataManager().default_config))
+    config["quality"].update({"adaptive": False, "level": "High", "msaa_samples": 0})
+    config["sound_enabled"] = False
+    simulator = EnhancedEarthSimulator(headless=True, config=config, read_only=True)
+    simulator.quality.adaptive = False
+    # Dekodowanie w tle zakłócałoby pomiary - czekamy na komplet tekstur
+    simulator.finish_texture_loading()
+    return simulator
+
+
+def bench_sphere(simulator, segments_list: List[int], repeat: int) -> Dict[str, Dict]:
+    """Czas budowy siatki sfery (bez pamięci podręcznej)"""
+    results = {}
+    for segments in segments_list:
+        ms = median_ms(lambda: simulator.create_sphere(2, segments), repeat)
+        results[f"sphere_build_{segments}_ms"] = metric(ms, "ms")
+    return results
+
+
+def bench_textures(simulator, repeat: int) -> Dict[str, Dict]:
+    """Czas dekodowania (CPU) i przesyłania (GPU, z mipmapami) każdej tekstury"""
+    results = {}
+    for name, filename in simulator.texture_files.items():
+        key = name.lower()
+        decoded: List[Tuple[int, int, bytes]] = []
+
+        def decode():
+            decoded[:] = [simulator.decode_texture(filename)]
+
+        def upload():
+            texture_id = simulator.upload_texture(*decoded[0], filename)
+            glFinish()
+            glDeleteTextures([texture_id])
+
+        results[f"texture_decode_{key}_ms"] = metric(median_ms(decode, repeat), "ms")
+        results[f"texture_upload_{key}_ms"] = metric(median_ms(upload, repeat), "ms")
+    return results
+
+
+def bench_render(simulator, segments_list: List[int], resolutions: List[Tuple[int, int]],
+                 frames: int) -> Dict[str, Dict]:
+    """FPS renderowania globu do bufora o danej rozdzielczości"""
+    results = {}
+    for width, height in resolutions:
+        target = RenderTarget(width, height)
+        try:
+            target.bind()
+            for segments in segments_list:
+                simulator.get_sphere_mesh(segments)  # budowa siatki poza pomiarem
+
+                def render_frame():
+                    simulator.gl_state.begin_frame()
+                    glClear(int(GL_COLOR_BUFFER_BIT) | int(GL_DEPTH_BUFFER_BIT))
+                    simulator.draw_earth(segments)
+
+                render_frame()
+                glFinish()
+                start = time.perf_counter()
+                for _ in range(frames):
+                    render_frame()
+                glFinish()
+                elapsed = time.perf_counter() - start
+                results[f"render_{segments}seg_{width}x{height}_fps"] = metric(
+                    frames / elapsed, "fps", higher_is_better=True)
+        finally:
+            RenderTarget.unbind(simulator.display)
+            target.release()
+    return results
+
+
+def bench_overlay(simulator, frames: int) -> Dict[str, Dict]:
+    """Koszt rysowania interfejsu 2D na klatkę"""
+    simulator.show_menu = True
+    simulator.stats_enabled = True
+
+    def draw_overlay():
+        simulator.setup_2d_mode()
+        simulator.draw_chrome()
+        simulator.draw_menu()
+        simulator.draw_stats()
+        simulator.setup_3d_mode()
+        glFinish()
+
+    draw_overlay()
+    ms = median_ms(draw_overlay, frames)
+    simulator.show_menu = False
+    return {"overlay_ms": metric(ms, "ms")}
+
+
+def layer_cost_ms(simulator, flag: str, segments: int, frames: int) -> float:
+    """Różnica czasu klatki 1280x720 z warstwą i bez niej (flag - atrybut symulatora)"""
+    target = RenderTarget(1280, 720)
+    try:
+        target.bind()
+        simulator.get_sphere_mesh(segments)
+
+        def render_frame():
+            simulator.gl_state.begin_frame()
+            glClear(int(GL_COLOR_BUFFER_BIT) | int(GL_DEPTH_BUFFER_BIT))
+            simulator.draw_earth(segments)
+            glFinish()
+
+        timings = []
+        for enabled in (False, True):
+            setattr(simulator, flag, enabled)
+            render_frame()
+            timings.append(median_ms(render_frame, frames))
+    finally:
+        setattr(simulator, flag, False)
+        RenderTarget.unbind(simulator.display)
+        target.release()
+    return max(0.0, timings[1] - timings[0])
+
+
+def bench_clouds(simulator, segments: int, frames: int) -> Dict[str, Dict]:
+    """Koszt warstwy chmur: klatka pola (wątek tła), przesył przez PBO i rysowanie
+
+    Koszt rysowania to różnica czasu klatki z chmurami i bez nich.
+    """
+    settings = simulator.cloud_settings
+    field = CloudField(settings)
+    pixels = field.render(0.0)
+    texture = StreamingTexture(settings.width, settings.height)
+
+    def stream():
+        texture.update(pixels)
+        glFinish()
+
+    results = {
+        "clouds_generate_ms": metric(median_ms(lambda: field.render(0.0), max(3, frames // 10)),
+                                     "ms"),
+    }
+    stream()
+    results["clouds_stream_ms"] = metric(median_ms(stream, frames), "ms")
+
+    simulator.cloud_texture = texture
+    try:
+        draw_ms = layer_cost_ms(simulator, "clouds_enabled", segments, frames)
+    finally:
+        simulator.cloud_texture = None
+        texture.release()
+    results["clouds_draw_ms"] = metric(draw_ms, "ms")
+    return results
+
+
+def bench_atmosphere(simulator, segments: int, frames: int) -> Dict[str, Dict]:
+    """Koszt przebiegu atmosfery (tablice rozpraszania liczone przed pomiarem)"""
+    shell = AtmosphereShell(simulator.shaders)  # bez pamięci podręcznej - mierzy też liczenie tablic
+    start = time.perf_counter()
+    while not shell.prepare():
+        if shell.failed:
+            raise RuntimeError("Nie udało się przygotować przebiegu atmosfery")
+        time.sleep(0.01)
+    results = {"atmosphere_tables_ms": metric((time.perf_counter() - start) * 1000.0, "ms")}
+
+    simulator.atmosphere_shell = shell
+    try:
+        results["atmosphere_draw_ms"] = metric(
+            layer_cost_ms(simulator, "atmosphere_enabled", segments, frames), "ms")
+    finally:
+        simulator.atmosphere_shell = None
+        shell.release()
+    return results
+
+
+def bench_screenshot(simulator, repeat: int) -> Dict[str, Dict]:
+    """Koszt zrzutu ekranu w wątku renderowania (zlecenie odczytu + odbiór bufora)
+    oraz czas kodowania PNG, który wykonuje pula w tle"""
+    width, height = simulator.display
+    capture = ScreenshotCapture(latency=1)
+    render_thread_ms = []
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            for index in range(max(1, repeat)):
+                simulator.draw()
+                path = os.path.join(directory, f"shot_{index}.png")
+                capture.request(path)
+                start = time.perf_counter()
+                capture.capture(width, height)        # zlecenie odczytu
+                elapsed = time.perf_counter() - start
+                simulator.draw()
+                start = time.perf_counter()
+                capture.capture(width, height)        # odbiór bufora i przekazanie do puli
+                render_thread_ms.append((elapsed + time.perf_counter() - start) * 1000.0)
+                capture.finish()
+
+            # Kodowanie prawdziwej klatki (pusty obraz kompresuje się nierealnie szybko)
+            simulator.draw()
+            pixels = bytes(glReadPixels(0, 0, width, height, GL_RGBA, GL_UNSIGNED_BYTE))
+            path = os.path.join(directory, "encode.png")
+            encode = median_ms(lambda: encode_image(path, width, height, pixels), max(1, repeat))
+    finally:
+        capture.release()
+    return {
+        "screenshot_render_thread_ms": metric(statistics.median(render_thread_ms), "ms"),
+        "screenshot_encode_ms": metric(encode, "ms"),
+    }
+
+
+def bench_video(simulator, frames: int) -> Dict[str, Dict]:
+    """Klatki/s nagrywania Y4M (renderowanie + odczyt + kodowanie w tle)
+
+    Powyżej fps nagrania (30) - nagrywanie bez okna szybsze niż czas rzeczywisty.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        simulator.video = VideoRecorder(Y4MWriter(os.path.join(directory, "bench.y4m"), 30))
+        try:
+            start = time.perf_counter()
+            for _ in range(frames):
+                simulator.draw()
+            summary = simulator.video.close()
+            elapsed = time.perf_counter() - start
+        finally:
+            simulator.video = None
+    return {"video_record_fps": metric(summary["frames_written"] / elapsed, "fps",
+                                       higher_is_better=True)}
+
+
+def bench_cold_start(repeat: int) -> Dict[str, Dict]:
+    """Czas od uruchomienia procesu do wyświetlenia pierwszej klatki i wyjścia"""
+    command = [sys.executable, os.path.join(SCRIPT_DIR, "earth_simulator_enhanced.py"),
+               "--headless", "--frames", "1"]
+
+    def start():
+        result = subprocess.run(command, cwd=SCRIPT_DIR, capture_output=True, text=True,
+                                timeout=120)
+        if result.returncode != 0:
+            raise RuntimeError(f"Zimny start zakończony kodem {result.returncode}: "
+                               f"{result.stderr.strip()[-500:]}")
+
+    return {"cold_start_ms": metric(median_ms(start, repeat), "ms")}
+
+
+def probe_pyopengl(frames: int) -> Dict[str, float]:
+    """Narzut PyOpenGL w bieżącym procesie (tryb ustawiony przed importem OpenGL.GL)
+
+    Mierzy pojedyncze wywołanie bez pracy sterownika (glEnable/glDisable) oraz
+    zlecenie klatki globu do małego bufora - rasteryzacja jest pomijalna, więc
+    wynik to głównie koszt wywołań GL po stronie Pythona.
+    """
+    simulator = create_simulator()
+    calls = 20000
+    start = time.perf_counter()
+    for _ in range(calls // 2):
+        glEnable(GL_SCISSOR_TEST)
+        glDisable(GL_SCISSOR_TEST)
+    call_us = (time.perf_counter() - start) / calls * 1e6
+
+    segments = QUICK_RENDER_SEGMENTS[-1]
+    simulator.get_sphere_mesh(segments)
+    target = RenderTarget(64, 64)
+    try:
+        target.bind()
+
+        def submit():
+            simulator.gl_state.begin_frame()
+            glClear(int(GL_COLOR_BUFFER_BIT) | int(GL_DEPTH_BUFFER_BIT))
+            simulator.draw_earth(segments)
+
+        submit()
+        glFinish()
+        start = time.perf_counter()
+        for _ in range(frames):
+            submit()
+        glFinish()
+        submit_ms = (time.perf_counter() - start) / frames * 1000.0
+    finally:
+        RenderTarget.unbind(simulator.display)
+        target.release()
+    simulator.gl_context.release()
+    return {"call_us": call_us, "frame_submit_ms": submit_ms}
+
+
+def bench_pyopengl_modes(repeat: int, frames: int) -> Dict[str, Dict]:
+    """Narzut PyOpenGL w trybie szybkim i debug (każdy w osobnym procesie)"""
+    results = {}
+    for mode, flags in (("fast", []), ("debug", ["--debug"])):
+        command = [sys.executable, os.path.abspath(__file__), "--pyopengl-probe",
+                   "--frames", str(frames)] + flags
+        samples = []
+        for _ in range(max(1, repeat)):
+            result = subprocess.run(command, cwd=SCRIPT_DIR, capture_output=True, text=True,
+                                    timeout=300)
+            if result.returncode != 0:
+                raise RuntimeError(f"Pomiar PyOpenGL ({mode}) zakończony kodem "
+                                   f"{result.returncode}: {result.stderr.strip()[-500:]}")
+            samples.append(json.loads(result.stdout.strip().splitlines()[-1]))
+        results[f"pyopengl_call_{mode}_us"] = metric(
+            statistics.median(s["call_us"] for s in samples), "us")
+        results[f"frame_submit_{mode}_ms"] = metric(
+            statistics.median(s["frame_submit_ms"] for s in samples), "ms")
+    return results
+
+
+def environment_info() -> Dict[str, str]:
+    """Opis środowiska - wyniki z różnych maszyn nie są porównywalne"""
+    def gl_string(name) -> str:
+        value = glGetString(name)
+        return value.decode('utf-8', errors='replace') if value else "?"
+
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "gl_renderer": gl_string(GL_RENDERER),
+        "gl_version": gl_string(GL_VERSION),
+    }
+
+
+def run_benchmarks(quick: bool = False, repeat: int = 5, frames: int = 60,
+                   cold_start: bool = True) -> Dict:
+    """Wykonuje wszystkie pomiary i zwraca raport"""
+    sphere_segments = QUICK_SPHERE_SEGMENTS if quick else SPHERE_SEGMENTS
+    render_segments = QUICK_RENDER_SEGMENTS if quick else RENDER_SEGMENTS
+    resolutions = QUICK_RESOLUTIONS if quick else RESOLUTIONS
+
+    metrics: Dict[str, Dict] = {}
+    simulator = create_simulator()
+    environment = environment_info()
+
+    print("🔺 Budowa siatki sfery...")
+    metrics.update(bench_sphere(simulator, sphere_segments, repeat))
+    print("🖼️ Dekodowanie i przesyłanie tekstur...")
+    metrics.update(bench_textures(simulator, max(1, repeat // 2)))
+    print("🌍 Renderowanie globu...")
+    metrics.update(bench_render(simulator, render_segments, resolutions, frames))
+    print("📋 Nakładki interfejsu...")
+    metrics.update(bench_overlay(simulator, frames))
+    print("☁️ Warstwa chmur...")
+    metrics.update(bench_clouds(simulator, render_segments[-1], frames))
+    print("🌅 Atmosfera...")
+    metrics.update(bench_atmosphere(simulator, render_segments[-1], frames))
+    print("📸 Zrzut ekranu...")
+    metrics.update(bench_screenshot(simulator, repeat))
+    print("🎬 Nagrywanie wideo...")
+    metrics.update(bench_video(simulator, frames))
+    simulator.gl_context.release()
+
+    print("🐍 Narzut PyOpenGL (tryb szybki i debug)...")
+    metrics.update(bench_pyopengl_modes(1 if quick else 3, frames))
+
+    if cold_start:
+        print("🚀 Zimny start...")
+        metrics.update(bench_cold_start(1 if quick else 3))
+
+    return {
+        "timestamp": datetime.now().isoformat(timespec='seconds'),
+        "environment": environment,
+        "metrics": metrics,
+    }
+
+
+def compare_with_baseline(report: Dict, baseline: Dict,
+                          tolerance: Optional[float] = None) -> List[str]:
+    """Zwraca listę regresji względem linii bazowej
+
+    Tolerancja to względne dopuszczalne pogorszenie (0.25 = 25%). Linia bazowa
+    może nadpisać ją globalnie ("tolerance") lub dla pojedynczych metryk
+    ("tolerances"); argument tolerance ma pierwszeństwo przed wartością globalną.
+    """
+    default = tolerance if tolerance is not None else baseline.get("tolerance", DEFAULT_TOLERANCE)
+    per_metric = baseline.get("tolerances", {})
+    regressions = []
+
+    for name, base in baseline.get("metrics", {}).items():
+        current = report["metrics"].get(name)
+        if current is None:
+            continue
+        allowed = per_metric.get(name, default)
+        base_value, value = base["value"], current["value"]
+        if base.get("higher_is_better"):
+            limit = base_value * (1.0 - allowed)
+            failed = value < limit
+        else:
+            limit = base_value * (1.0 + allowed)
+            failed = value > limit
+        if failed:
+            change = (value - base_value) / base_value * 100.0 if base_value else 0.0
+            regressions.append(f"{name}: {value:.2f}{current['unit']} "
+                               f"(linia bazowa {base_value:.2f}, {change:+.1f}%, "
+                               f"tolerancja {allowed * 100:.0f}%)")
+    return regressions
+
+
+def print_report(report: Dict, baseline: Optional[Dict]):
+    """Wypisuje tabelę wyników wraz ze zmianą względem linii bazowej"""
+    base_metrics = (baseline or {}).get("metrics", {})
+    print("\n📊 Wyniki:")
+    for name, entry in report["metrics"].items():
+        line = f"  {name:<40} {entry['value']:>10.2f} {entry['unit']}"
+        base = base_metrics.get(name)
+        if base and base["value"]:
+            change = (entry["value"] - base["value"]) / base["value"] * 100.0
+            line += f"  ({change:+.1f}%)"
+        print(line)
+
+
+def parse_arguments(argv=None) -> argparse.Namespace:
+    """Parsuje argumenty wiersza poleceń"""
+    parser = argparse.ArgumentParser(description="Benchmark renderowania Earth Simulator Enhanced")
+    parser.add_argument('--output', default=DEFAULT_OUTPUT, metavar='PLIK',
+                        help="plik JSON z wynikami")
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, metavar='PLIK',
+                        help="plik linii bazowej")
+    parser.add_argument('--update-baseline', action='store_true',
+                        help="zapisz wyniki jako nową linię bazową")
+    parser.add_argument('--require-baseline', action='store_true',
+                        help="zakończ kodem 1, jeśli brak linii bazowej (CI)")
+    parser.add_argument('--tolerance', type=float, default=None,
+                        help="dopuszczalne względne pogorszenie (np. 0.25 = 25%%)")
+    parser.add_argument('--repeat', type=int, default=5,
+                        help="liczba powtórzeń pomiarów czasu")
+    parser.add_argument('--frames', type=int, default=60,
+                        help="liczba klatek na pomiar renderowania")
+    parser.add_argument('--quick', action='store_true',
+                        help="mniejszy zestaw pomiarów")
+    parser.add_argument('--no-cold-start', action='store_true',
+                        help="pomiń pomiar zimnego startu")
+    parser.add_argument('--debug', action='store_true',
+                        help="pełne sprawdzanie błędów PyOpenGL (wolniej)")
+    parser.add_argument('--pyopengl-probe', action='store_true', help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    """Uruchamia benchmark; zwraca kod wyjścia (1 = regresja lub brak wymaganej linii bazowej)"""
+    args = parse_arguments(argv)
+    if args.pyopengl_probe:
+        # Proces pomocniczy bench_pyopengl_modes - wynik jako ostatnia linia JSON
+        print(json.dumps(probe_pyopengl(args.frames)))
+        return 0
+    print("⏱️ Earth Simulator Enhanced - benchmark")
+    print("=" * 50)
+    if args.require_baseline and not args.update_baseline and not os.path.exists(args.baseline):
+        # Bez pomiarów - brak linii bazowej to błąd konfiguracji CI
+        print(f"❌ Brak linii bazowej ({args.baseline}) - wygeneruj ją: "
+              f"python benchmark.py --update-baseline")
+        return 1
+
+    report = run_benchmarks(quick=args.quick, repeat=args.repeat, frames=args.frames,
+                            cold_start=not args.no_cold_start)
+
+    baseline = None
+    if os.path.exists(args.baseline):
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+
+    print_report(report, baseline)
+
+    if args.update_baseline:
+        # Zachowaj ręcznie ustawione tolerancje z poprzedniej linii bazowej
+        new_baseline = dict(report)
+        new_baseline["tolerance"] = (baseline or {}).get("tolerance", DEFAULT_TOLERANCE)
+        new_baseline["tolerances"] = (baseline or {}).get("tolerances", {"cold_start_ms": 0.5})
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(new_baseline, f, indent=2, ensure_ascii=False)
+        print(f"\n💾 Linia bazowa zapisana do {args.baseline}")
+        report["regressions"] = []
+    elif baseline is None:
+        print(f"\n⚠️ Brak linii bazowej ({args.baseline}) - uruchom z --update-baseline")
+        report["regressions"] = []
+    else:
+        if baseline.get("environment", {}).get("gl_renderer") != report["environment"]["gl_renderer"]:
+            print("⚠️ Linia bazowa pochodzi z innego sterownika GL - porównanie orientacyjne")
+        report["regressions"] = compare_with_baseline(report, baseline, args.tolerance)
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"💾 Wyniki zapisane do {args.output}")
+
+    if report["regressions"]:
+        print("\n❌ Wykryto regresje wydajności:")
+        for line in report["regressions"]:
+            print(f"  - {line}")
+        return 1
+
+    print("\n✅ Brak regresji wydajności")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
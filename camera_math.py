@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Macierze kamery liczone po stronie CPU dla Earth Simulator Enhanced
+Autor: Adrian Lesniak
+
+Macierze zwracane są w układzie wierszowym (numpy, wektor kolumnowy mnożony
+z prawej: M @ v). Przed przekazaniem jako uniform mat4 (glUniformMatrix4fv
+z transpose=GL_FALSE) trzeba je przepisać do układu kolumnowego przez to_gl.
+Stan kamery nie jest odczytywany z GPU.
+"""
+
+import math
+
+import numpy as np
+
+
+def rotation_x_matrix(degrees: float) -> np.ndarray:
+    """Macierz obrotu wokół osi X (jak glRotatef(kąt, 1, 0, 0))"""
+    a = math.radians(degrees)
+    c, s = math.cos(a), math.sin(a)
+    return np.array([[1, 0, 0, 0],
+                     [0, c, -s, 0],
+                     [0, s, c, 0],
+                     [0, 0, 0, 1]], dtype=np.float64)
+
+
+def rotation_y_matrix(degrees: float) -> np.ndarray:
+    """Macierz obrotu wokół osi Y (jak glRotatef(kąt, 0, 1, 0))"""
+    a = math.radians(degrees)
+    c, s = math.cos(a), math.sin(a)
+    return np.array([[c, 0, s, 0],
+                     [0, 1, 0, 0],
+                     [-s, 0, c, 0],
+                     [0, 0, 0, 1]], dtype=np.float64)
+
+
+def translation_matrix(x: float, y: float, z: float) -> np.ndarray:
+    """Macierz przesunięcia (jak glTranslatef)"""
+    m = np.identity(4, dtype=np.float64)
+    m[:3, 3] = (x, y, z)
+    return m
+
+
+def view_matrix(distance: float, rotation_x: float, rotation_y: float) -> np.ndarray:
+    """Macierz widoku T(0, 0, distance) * Rx * Ry (układ wierszowy)"""
+    return (translation_matrix(0.0, 0.0, distance) @
+            rotation_x_matrix(rotation_x) @ rotation_y_matrix(rotation_y))
+
+
+def perspective_matrix(fov: float, aspect: float, near: float, far: float) -> np.ndarray:
+    """Macierz perspektywy (jak gluPerspective, układ wierszowy)"""
+    f = 1.0 / math.tan(math.radians(fov) / 2.0)
+    return np.array([[f / aspect, 0, 0, 0],
+                     [0, f, 0, 0],
+                     [0, 0, (far + near) / (near - far), 2 * far * near / (near - far)],
+                     [0, 0, -1, 0]], dtype=np.float64)
+
+
+def frustum_matrix(left: float, right: float, bottom: float, top: float,
+                   near: float, far: float) -> np.ndarray:
+    """Macierz perspektywy dla dowolnego (także niesymetrycznego) ostrosłupa
+
+    Jak glFrustum, układ wierszowy; granice podawane są na płaszczyźnie near.
+    """
+    return np.array([[2 * near / (right - left), 0, (right + left) / (right - left), 0],
+                     [0, 2 * near / (top - bottom), (top + bottom) / (top - bottom), 0],
+                     [0, 0, (far + near) / (near - far), 2 * far * near / (near - far)],
+                     [0, 0, -1, 0]], dtype=np.float64)
+
+
+def orthographic_matrix(left: float, right: float, bottom: float, top: float,
+                        near: float, far: float) -> np.ndarray:
+    """Macierz rzutu równoległego (jak glOrtho, układ wierszowy)"""
+    return np.array([[2 / (right - left), 0, 0, -(right + left) / (right - left)],
+                     [0, 2 / (top - bottom), 0, -(top + bottom) / (top - bottom)],
+                     [0, 0, -2 / (far - near), -(far + near) / (far - near)],
+                     [0, 0, 0, 1]], dtype=np.float64)
+
+
+def to_gl(matrix: np.ndarray) -> np.ndarray:
+    """Konwertuje macierz wierszową do ciągłej tablicy kolumnowej float32 dla OpenGL"""
+    return np.ascontiguousarray(matrix.T, dtype=np.float32)
@@ -0,0 +1,315 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Ścieżki kamery (klatki kluczowe + splajny) dla Earth Simulator Enhanced
+Autor: Adrian Lesniak
+
+Format pliku JSON:
+{
+  "duration": 40.0,              # czas trwania całej ścieżki [s]
+  "loop": true,                  # zapętlenie
+  "interpolation": "catmull_rom", # lub "slerp" (orientacja przez kwaterniony)
+  "constant_speed": true,        # reparametryzacja długością łuku
+  "sample_rate": 120,            # próbki tablicy na sekundę
+  "keyframes": [
+    {"rotation_x": 0, "rotation_y": 180, "distance": -5, "fov": 45, "layer": "Default"},
+    ...
+  ]
+}
+Pole "time" klatki jest opcjonalne - bez niego klatki rozkładane są równomiernie
+(przy constant_speed: proporcjonalnie do długości łuku między klatkami z czasem,
+ze stałą prędkością w każdym odcinku).
+"""
+
+import json
+import math
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+import numpy as np
+
+# Kolejność kanałów w tablicy próbek
+CHANNELS = ("rotation_x", "rotation_y", "distance", "fov")
+
+# Gęstość próbkowania krzywej przy liczeniu długości łuku (na segment)
+ARC_SAMPLES_PER_SEGMENT = 64
+
+
+@dataclass
+class CameraKeyframe:
+    """Klatka kluczowa kamery"""
+    rotation_x: float = 0.0
+    rotation_y: float = 180.0
+    distance: float = -5.0
+    fov: float = 45.0
+    layer: Optional[str] = None
+    time: Optional[float] = None
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "CameraKeyframe":
+        return cls(
+            rotation_x=float(data.get("rotation_x", 0.0)),
+            rotation_y=float(data.get("rotation_y", 180.0)),
+            distance=float(data.get("distance", -5.0)),
+            fov=float(data.get("fov", 45.0)),
+            layer=data.get("layer"),
+            time=None if data.get("time") is None else float(data["time"]),
+        )
+
+
+@dataclass(frozen=True)
+class CameraSample:
+    """Stan kamery odczytany ze ścieżki"""
+    rotation_x: float
+    rotation_y: float
+    distance: float
+    fov: float
+    layer: Optional[str]
+
+
+def catmull_rom(points: np.ndarray, u: np.ndarray, loop: bool = False,
+                period_offset: Optional[np.ndarray] = None) -> np.ndarray:
+    """Wektorowo oblicza jednorodny splajn Catmulla-Roma.
+
+    points: tablica (n, k) punktów kontrolnych
+    u: parametry w zakresie [0, n-1] (lub [0, n] dla pętli)
+    period_offset: przesunięcie dodawane przy każdym okrążeniu pętli
+                   (np. +360 stopni rotacji Y)
+    """
+    n = len(points)
+    segments = n if loop else n - 1
+    u = np.clip(u, 0.0, segments)
+    seg = np.minimum(np.floor(u).astype(np.int64), segments - 1)
+    t = (u - seg)[:, None]
+
+    index = seg[:, None] + np.arange(-1, 3)
+    if loop:
+        control = points[index % n]
+        if period_offset is not None:
+            control = control + np.floor_divide(index, n)[..., None] * period_offset
+    else:
+        control = points[np.clip(index, 0, n - 1)]
+
+    p0, p1, p2, p3 = control[:, 0], control[:, 1], control[:, 2], control[:, 3]
+    t2 = t * t
+    t3 = t2 * t
+    return 0.5 * ((2.0 * p1) +
+                  (-p0 + p2) * t +
+                  (2.0 * p0 - 5.0 * p1 + 4.0 * p2 - p3) * t2 +
+                  (-p0 + 3.0 * p1 - 3.0 * p2 + p3) * t3)
+
+
+def euler_to_quaternion(rotation_x: np.ndarray, rotation_y: np.ndarray) -> np.ndarray:
+    """Zamienia obroty glRotatef(x) * glRotatef(y) [stopnie] na kwaterniony (w, x, y, z)"""
+    ax = np.radians(rotation_x) * 0.5
+    ay = np.radians(rotation_y) * 0.5
+    cx, sx = np.cos(ax), np.sin(ax)
+    cy, sy = np.cos(ay), np.sin(ay)
+    # q = qx * qy
+    return np.stack([cx * cy, sx * cy, cx * sy, sx * sy], axis=-1)
+
+
+def quaternion_to_euler(q: np.ndarray):
+    """Rzutuje kwaterniony z powrotem na parę obrotów (x, y) w stopniach"""
+    w, x, y, z = q[:, 0], q[:, 1], q[:, 2], q[:, 3]
+    m00 = 1.0 - 2.0 * (y * y + z * z)
+    m02 = 2.0 * (x * z + w * y)
+    m11 = 1.0 - 2.0 * (x * x + z * z)
+    m21 = 2.0 * (y * z + w * x)
+    rotation_x = np.degrees(np.arctan2(m21, m11))
+    rotation_y = np.degrees(np.arctan2(m02, m00))
+    return rotation_x, rotation_y
+
+
+def slerp(q0: np.ndarray, q1: np.ndarray, t: np.ndarray) -> np.ndarray:
+    """Wektorowy SLERP między parami kwaternionów"""
+    dot = np.sum(q0 * q1, axis=-1)
+    # Najkrótsza droga
+    q1 = np.where(dot[:, None] < 0.0, -q1, q1)
+    dot = np.abs(dot)
+
+    linear = dot > 0.9995
+    theta = np.arccos(np.clip(dot, -1.0, 1.0))
+    sin_theta = np.where(linear, 1.0, np.sin(theta))
+    w0 = np.where(linear, 1.0 - t, np.sin((1.0 - t) * theta) / sin_theta)
+    w1 = np.where(linear, t, np.sin(t * theta) / sin_theta)
+    q = w0[:, None] * q0 + w1[:, None] * q1
+    return q / np.linalg.norm(q, axis=-1, keepdims=True)
+
+
+def camera_positions(values: np.ndarray) -> np.ndarray:
+    """Pozycje kamery w układzie globu dla tablicy kanałów (n, 4)"""
+    rx = np.radians(values[:, 0])
+    ry = np.radians(values[:, 1])
+    d = -values[:, 2]
+    # Oko = Ry^-1 * Rx^-1 * (0, 0, d)
+    y = -np.sin(-rx) * d
+    z0 = np.cos(-rx) * d
+    x = np.sin(-ry) * z0
+    z = np.cos(-ry) * z0
+    return np.stack([x, y, z], axis=-1)
+
+
+class CameraPath:
+    """Ścieżka kamery z tablicą próbek - odczyt O(1) na klatkę"""
+
+    def __init__(self, keyframes: List[CameraKeyframe], duration: Optional[float] = None,
+                 loop: bool = False, interpolation: str = "catmull_rom",
+                 constant_speed: bool = True, sample_rate: int = 120):
+        if len(keyframes) < 2:
+            raise ValueError("Ścieżka kamery wymaga co najmniej dwóch klatek kluczowych")
+        if interpolation not in ("catmull_rom", "slerp"):
+            raise ValueError(f"Nieznana interpolacja: {interpolation}")
+
+        self.keyframes = keyframes
+        self.loop = loop
+        self.interpolation = interpolation
+        self.constant_speed = constant_speed
+        self.sample_rate = max(1, int(sample_rate))
+
+        explicit_times = [k.time for k in keyframes if k.time is not None]
+        if duration is None:
+            duration = max(explicit_times) if explicit_times else float(len(keyframes) - 1)
+        self.duration = float(duration)
+        if self.duration <= 0:
+            raise ValueError("Czas trwania ścieżki musi być dodatni")
+
+        self.points = np.array([[getattr(k, c) for c in CHANNELS] for k in keyframes],
+                               dtype=np.float64)
+        self.segments = len(keyframes) if loop else len(keyframes) - 1
+
+        # Pętla kontynuuje obrót Y zamiast cofać się do pierwszej klatki
+        self.period_offset = np.zeros(len(CHANNELS))
+        if loop:
+            turns = round((self.points[-1, 1] - self.points[0, 1]) / 360.0)
+            self.period_offset[1] = 360.0 * turns
+
+        self._build_lookup_table()
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "CameraPath":
+        keyframes = [CameraKeyframe.from_dict(k) for k in data.get("keyframes", [])]
+        return cls(keyframes,
+                   duration=data.get("duration"),
+                   loop=bool(data.get("loop", False)),
+                   interpolation=data.get("interpolation", "catmull_rom"),
+                   constant_speed=bool(data.get("constant_speed", True)),
+                   sample_rate=int(data.get("sample_rate", 120)))
+
+    @classmethod
+    def load(cls, filename: str) -> "CameraPath":
+        """Wczytuje ścieżkę kamery z pliku JSON"""
+        with open(filename, 'r', encoding='utf-8') as f:
+            return cls.from_dict(json.load(f))
+
+    def evaluate(self, u: np.ndarray) -> np.ndarray:
+        """Oblicza kanały kamery dla parametrów krzywej `u` (bez tablicy)"""
+        u = np.asarray(u, dtype=np.float64)
+        values = catmull_rom(self.points, u, self.loop, self.period_offset)
+
+        if self.interpolation == "slerp":
+            n = len(self.points)
+            u = np.clip(u, 0.0, self.segments)
+            seg = np.minimum(np.floor(u).astype(np.int64), self.segments - 1)
+            t = u - seg
+            quats = euler_to_quaternion(self.points[:, 0], self.points[:, 1])
+            q = slerp(quats[seg % n], quats[(seg + 1) % n], t)
+            rotation_x, rotation_y = quaternion_to_euler(q)
+            # Zachowaj ciągłość rotacji Y względem klatek kluczowych
+            reference = values[:, 1]
+            rotation_y = rotation_y + 360.0 * np.round((reference - rotation_y) / 360.0)
+            values[:, 0] = rotation_x
+            values[:, 1] = rotation_y
+
+        return values
+
+    def _keyframe_times_uniform(self) -> np.ndarray:
+        """Czasy klatek kluczowych (jawne lub rozłożone równomiernie)"""
+        count = self.segments + 1
+        times = np.linspace(0.0, self.duration, count)
+        for i, keyframe in enumerate(self.keyframes):
+            if keyframe.time is not None:
+                times[i] = keyframe.time
+        return np.maximum.accumulate(times)
+
+    def _keyframe_times_by_arc(self, knot_arc: np.ndarray) -> np.ndarray:
+        """Czasy klatek przy stałej prędkości - jawne czasy są zachowane
+        
+        Klatki bez czasu dostają czas proporcjonalny do długości łuku między
+        najbliższymi klatkami z czasem (początek i koniec ścieżki: 0 i duration).
+        """
+        count = self.segments + 1
+        pinned = {0: 0.0, count - 1: self.duration}
+        for i, keyframe in enumerate(self.keyframes):
+            if keyframe.time is not None:
+                pinned[i] = float(keyframe.time)
+        indices = sorted(pinned)
+        times = np.interp(np.arange(count), indices, [pinned[i] for i in indices])
+        for start, end in zip(indices, indices[1:]):
+            length = knot_arc[end] - knot_arc[start]
+            if end - start > 1 and length > 1e-9:
+                fraction = (knot_arc[start + 1:end] - knot_arc[start]) / length
+                times[start + 1:end] = pinned[start] + fraction * (pinned[end] - pinned[start])
+        return np.maximum.accumulate(times)
+
+    def _build_lookup_table(self):
+        """Prekomputuje próbki ścieżki w równych odstępach czasu"""
+        sample_count = int(math.ceil(self.duration * self.sample_rate)) + 1
+        sample_times = np.arange(sample_count, dtype=np.float64) / self.sample_rate
+        sample_times = np.minimum(sample_times, self.duration)
+        knots_u = np.arange(self.segments + 1, dtype=np.float64)
+
+        dense_u = np.linspace(0.0, self.segments, self.segments * ARC_SAMPLES_PER_SEGMENT + 1)
+        arc = None
+        if self.constant_speed:
+            positions = camera_positions(self.evaluate(dense_u))
+            steps = np.linalg.norm(np.diff(positions, axis=0), axis=1)
+            arc = np.concatenate([[0.0], np.cumsum(steps)])
+
+        if arc is not None and arc[-1] > 1e-9:
+            # Reparametryzacja długością łuku: stała prędkość między klatkami z czasem
+            knot_arc = np.interp(knots_u, dense_u, arc)
+            knot_times = self._keyframe_times_by_arc(knot_arc)
+            target = np.interp(sample_times, knot_times, knot_arc)
+            sample_u = np.interp(target, arc, dense_u)
+        else:
+            knot_times = self._keyframe_times_uniform()
+            sample_u = np.interp(sample_times, knot_times, knots_u)
+
+        self.knot_times = knot_times
+        self.samples = self.evaluate(sample_u)
+
+        # Warstwa: ostatnia zdefiniowana przed danym czasem
+        layers = []
+        current = None
+        for keyframe in self.keyframes:
+            if keyframe.layer is not None:
+                current = keyframe.layer
+            layers.append(current)
+        self.layers = layers
+        self.layer_index = np.clip(
+            np.searchsorted(knot_times[:len(layers)], sample_times, side='right') - 1,
+            0, len(layers) - 1)
+
+    def sample(self, t: float) -> CameraSample:
+        """Zwraca stan kamery dla czasu `t` [s] - stały koszt"""
+        laps = 0
+        if self.loop:
+            laps = math.floor(t / self.duration)
+            t = t - laps * self.duration
+        else:
+            t = min(max(t, 0.0), self.duration)
+
+        position = t * self.sample_rate
+        index = min(int(position), len(self.samples) - 1)
+        next_index = min(index + 1, len(self.samples) - 1)
+        frac = position - index
+
+        row = self.samples[index]
+        values = row + (self.samples[next_index] - row) * frac + laps * self.period_offset
+        return CameraSample(float(values[0]), float(values[1]), float(values[2]),
+                            float(values[3]), self.layers[self.layer_index[index]])
+
+    def is_finished(self, t: float) -> bool:
+        """Sprawdza czy niezapętlona ścieżka dobiegła końca"""
+        return not self.loop and t >= self.duration
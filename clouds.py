@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Proceduralna, animowana warstwa chmur dla Earth Simulator Enhanced
+Autor: Adrian Lesniak
+
+Pole chmur to fraktalny szum wartości (value noise) liczony w całości w NumPy,
+zawijany w długości geograficznej (tekstura równoprostokątna nie ma szwu).
+Każda oktawa dryfuje na wschód z własną prędkością i płynnie przechodzi
+między dwiema siatkami losowymi, więc chmury jednocześnie przesuwają się
+i zmieniają kształt.
+
+Klatki pola generowane są w wątku tła pasami wierszy - między pasami wątek
+oddaje GIL, dzięki czemu pętla renderowania nie jest blokowana na czas
+całej klatki. Wątek główny odbiera tylko gotowe bufory RGBA (poll).
+"""
+
+import math
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+import numpy as np
+
+
+@dataclass(frozen=True)
+class CloudSettings:
+    """Parametry warstwy chmur (sekcja "clouds" konfiguracji)"""
+    width: int = 512
+    height: int = 256
+    octaves: int = 5
+    coverage: float = 0.5     # 0 = bezchmurnie, 1 = pełne zachmurzenie
+    opacity: float = 0.85
+    speed: float = 1.0        # mnożnik prędkości dryfu i przemian
+    update_hz: float = 4.0    # nowe klatki pola na sekundę (czasu rzeczywistego)
+    band_rows: int = 32       # wiersze liczone między oddaniem GIL
+    seed: int = 1
+
+    @classmethod
+    def from_config(cls, config: Dict) -> "CloudSettings":
+        """Tworzy ustawienia z sekcji "clouds" ("resolution": [szer., wys.])"""
+        width, height = config.get("resolution", (cls.width, cls.height))
+        return cls(width=max(16, int(width)), height=max(8, int(height)),
+                   octaves=max(1, int(config.get("octaves", cls.octaves))),
+                   coverage=float(config.get("coverage", cls.coverage)),
+                   opacity=float(config.get("opacity", cls.opacity)),
+                   speed=float(config.get("speed", cls.speed)),
+                   update_hz=max(0.1, float(config.get("update_hz", cls.update_hz))),
+                   seed=int(config.get("seed", cls.seed)))
+
+    def to_config(self) -> Dict:
+        return {"resolution": [self.width, self.height], "octaves": self.octaves,
+                "coverage": self.coverage, "opacity": self.opacity, "speed": self.speed,
+                "update_hz": self.update_hz, "seed": self.seed}
+
+
+class CloudField:
+    """Fraktalny szum wartości zawijany w osi x, animowany w czasie"""
+
+    # Siatka najniższej oktawy: komórek w poziomie (pionowo połowa - proporcje 2:1)
+    BASE_CELLS = 16
+    # Okres przemiany kształtów najniższej oktawy [s]
+    MORPH_PERIOD = 90.0
+    # Dryf najniższej oktawy [komórek/s]
+    DRIFT = 0.01
+
+    def __init__(self, settings: CloudSettings = CloudSettings()):
+        self.settings = settings
+        rng = np.random.default_rng(settings.seed)
+        self.octaves = []
+        for octave in range(settings.octaves):
+            cells_x = self.BASE_CELLS * 2 ** octave
+            cells_y = max(1, cells_x // 2)
+            # Dwie siatki na oktawę; wiersz cells_y domyka biegun
+            grids = rng.random((2, cells_y + 1, cells_x), dtype=np.float32)
+            self.octaves.append((cells_x, cells_y, grids, 0.5 ** octave))
+        self.amplitude_sum = sum(amplitude for _, _, _, amplitude in self.octaves)
+
+        x = np.arange(settings.width, dtype=np.float64) / settings.width
+        y = np.arange(settings.height, dtype=np.float64) / max(1, settings.height - 1)
+        self.x = x
+        self.y = y
+
+    @staticmethod
+    def _fade(t: np.ndarray) -> np.ndarray:
+        return t * t * (3.0 - 2.0 * t)
+
+    def density(self, t: float, row_start: int = 0,
+                row_end: Optional[int] = None) -> np.ndarray:
+        """Gęstość chmur w [0, 1] dla wierszy [row_start, row_end) w chwili t [s]"""
+        y = self.y[row_start:row_end]
+        speed = self.settings.speed
+        total = np.zeros((y.size, self.x.size), dtype=np.float32)
+
+        for octave, (cells_x, cells_y, grids, amplitude) in enumerate(self.octaves):
+            # Wyższe oktawy dryfują i zmieniają się szybciej (drobne chmury)
+            drift = self.DRIFT * t * speed * (1.0 + 0.5 * octave) * cells_x / self.BASE_CELLS
+            u = self.x * cells_x + drift
+            v = y * cells_y
+
+            iu = np.floor(u)
+            fu = self._fade((u - iu).astype(np.float32))
+            i0 = iu.astype(np.int64) % cells_x
+            i1 = (i0 + 1) % cells_x
+
+            jv = np.minimum(np.floor(v), cells_y - 1)
+            fv = self._fade((v - jv).astype(np.float32))[:, None]
+            j0 = jv.astype(np.int64)[:, None]
+            j1 = j0 + 1
+
+            phase = 2.0 * math.pi * t * speed * (1.0 + octave) / self.MORPH_PERIOD
+            blend = np.float32(0.5 - 0.5 * math.cos(phase))
+            grid = grids[0] + (grids[1] - grids[0]) * blend
+
+            top = grid[j0, i0] + (grid[j0, i1] - grid[j0, i0]) * fu
+            bottom = grid[j1, i0] + (grid[j1, i1] - grid[j1, i0]) * fu
+            total += (top + (bottom - top) * fv) * np.float32(amplitude)
+
+        return total / np.float32(self.amplitude_sum)
+
+    def render_rows(self, t: float, out: np.ndarray, row_start: int, row_end: int):
+        """Zapisuje wiersze RGBA (uint8) pola chmur do out[row_start:row_end]"""
+        settings = self.settings
+        density = self.density(t, row_start, row_end)
+        # Suma oktaw skupia się wokół 0.5 - próg przesuwany pokryciem
+        threshold = 1.0 - settings.coverage
+        cover = np.clip((density - (threshold - 0.08)) / 0.16, 0.0, 1.0)
+        cover = cover * cover * (3.0 - 2.0 * cover)
+
+        rows = out[row_start:row_end]
+        # Gęstsze chmury lekko szarzeją od spodu
+        rows[..., :3] = (255.0 - 60.0 * cover * density)[..., None]
+        rows[..., 3] = cover * (255.0 * settings.opacity)
+
+    def render(self, t: float) -> np.ndarray:
+        """Cała klatka RGBA (height x width x 4, uint8)"""
+        out = np.empty((self.settings.height, self.settings.width, 4), dtype=np.uint8)
+        self.render_rows(t, out, 0, self.settings.height)
+        return out
+
+
+class CloudGenerator:
+    """Wątek tła generujący klatki pola chmur z zadaną częstotliwością
+
+    Wątek główny przekazuje czas symulacji (set_time) i odbiera gotowe klatki
+    (poll). Niedobrane klatki są zastępowane nowszymi - liczy się tylko ostatnia.
+    """
+
+    def __init__(self, field: CloudField, clock=time.monotonic):
+        self.field = field
+        self.clock = clock
+        self.sim_time = 0.0
+        self.frames_generated = 0
+        self.last_generation_ms = 0.0
+        self._ready: Optional[np.ndarray] = None
+        self._lock = threading.Lock()
+        self._active = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._active.is_set()
+
+    def set_time(self, sim_time: float):
+        """Czas symulacji, dla którego liczona będzie następna klatka"""
+        self.sim_time = sim_time
+
+    def start(self):
+        """Uruchamia (lub wznawia) generowanie"""
+        self._active.set()
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._worker, name="cloud-generator",
+                                            daemon=True)
+            self._thread.start()
+
+    def pause(self):
+        """Wstrzymuje generowanie (wątek czeka na start)"""
+        self._active.clear()
+
+    def stop(self):
+        """Zatrzymuje wątek"""
+        self._stop.set()
+        self._active.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
+            self._thread = None
+
+    def poll(self) -> Optional[np.ndarray]:
+        """Zwraca nową klatkę RGBA (None = brak nowej od ostatniego wywołania)"""
+        with self._lock:
+            frame, self._ready = self._ready, None
+        return frame
+
+    def generate(self) -> np.ndarray:
+        """Liczy jedną klatkę pasami wierszy (wywoływane w wątku tła)"""
+        field = self.field
+        height = field.settings.height
+        band = max(1, field.settings.band_rows)
+        t = self.sim_time
+        start = time.perf_counter()
+
+        frame = np.empty((height, field.settings.width, 4), dtype=np.uint8)
+        for row in range(0, height, band):
+            field.render_rows(t, frame, row, min(height, row + band))
+            # Oddanie GIL wątkowi renderowania między pasami
+            time.sleep(0)
+
+        self.last_generation_ms = (time.perf_counter() - start) * 1000.0
+        self.frames_generated += 1
+        return frame
+
+    def _worker(self):
+        interval = 1.0 / self.field.settings.update_hz
+        while not self._stop.is_set():
+            self._active.wait()
+            if self._stop.is_set():
+                return
+            started = self.clock()
+            frame = self.generate()
+            with self._lock:
+                self._ready = frame
+            self._stop.wait(max(0.0, interval - (self.clock() - started)))
@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Pobieranie plików (tekstur) z weryfikacją i wznawianiem dla Earth Simulator Enhanced
+Autor: Adrian Lesniak
+
+Pliki pobierane są równolegle w puli wątków. Każdy strumieniowany jest
+porcjami do pliku tymczasowego <nazwa>.part, a po sprawdzeniu rozmiaru i
+skrótu SHA-256 z manifestu zamieniany atomowo (os.replace) na plik docelowy
+- przerwane pobieranie nigdy nie zostawia uszkodzonej tekstury.
+
+Przerwany plik .part jest wznawiany nagłówkiem Range; serwer bez obsługi
+zakresów (odpowiedź 200) powoduje pobranie od początku. Błędy sieci, limity
+czasu oraz odpowiedzi 429/5xx ponawiane są z wykładniczym odstępem;
+pozostałe błędy HTTP i niezgodność skrótu kończą pobieranie pliku od razu.
+
+Manifest (JSON):
+  {"files": {"earth_texture.jpg": {"url": "...", "sha256": "...", "size": 123}}}
+sha256 i size są opcjonalne (null - plik nie jest weryfikowany).
+"""
+
+import hashlib
+import json
+import logging
+import os
+import socket
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 1 << 16
+USER_AGENT = ('Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 '
+              '(KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36')
+# Kody HTTP, po których warto ponowić żądanie
+RETRY_STATUS = {408, 429, 500, 502, 503, 504}
+
+
+class IntegrityError(Exception):
+    """Pobrany plik ma inny rozmiar lub skrót niż w manifeście"""
+
+
+@dataclass(frozen=True)
+class DownloadItem:
+    """Plik do pobrania (sha256/size = None - bez weryfikacji)"""
+    filename: str
+    url: str
+    sha256: Optional[str] = None
+    size: Optional[int] = None
+
+
+@dataclass
+class DownloadResult:
+    """Wynik pobierania pliku; status: downloaded, skipped lub failed"""
+    filename: str
+    status: str
+    bytes_received: int = 0
+    attempts: int = 0
+    resumed: bool = False
+    error: Optional[str] = None
+
+
+def load_manifest(path: str) -> List[DownloadItem]:
+    """Wczytuje listę plików z manifestu JSON"""
+    with open(path, 'r', encoding='utf-8') as f:
+        files = json.load(f)["files"]
+    return [DownloadItem(name, entry["url"], entry.get("sha256"), entry.get("size"))
+            for name, entry in files.items()]
+
+
+def file_sha256(path: str, chunk_size: int = 1 << 20) -> str:
+    """Skrót SHA-256 pliku (czytanego porcjami)"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def verify_file(path: str, item: DownloadItem):
+    """Zgłasza IntegrityError, jeśli plik nie zgadza się z manifestem"""
+    if item.size is not None and os.path.getsize(path) != item.size:
+        raise IntegrityError(f"{item.filename}: rozmiar {os.path.getsize(path)} B, "
+                             f"oczekiwano {item.size} B")
+    if item.sha256 is not None:
+        actual = file_sha256(path)
+        if actual != item.sha256.lower():
+            raise IntegrityError(f"{item.filename}: SHA-256 {actual}, "
+                                 f"oczekiwano {item.sha256}")
+
+
+class ProgressReporter:
+    """Łączny postęp pobierania wielu plików (wywoływany z wątków puli)
+
+    callback(otrzymane_bajty, łączny_rozmiar_lub_None, bajty_na_sekundę)
+    wywoływany jest najwyżej co interval sekund.
+    """
+
+    def __init__(self, callback: Callable[[int, Optional[int], float], None],
+                 interval: float = 0.5):
+        self.callback = callback
+        self.interval = interval
+        self.lock = threading.Lock()
+        self.received: Dict[str, int] = {}
+        self.totals: Dict[str, Optional[int]] = {}
+        self.start = time.perf_counter()
+        self.last_report = 0.0
+        self.fresh_bytes = 0              # bez części wznowionych (do prędkości)
+
+    def update(self, filename: str, received: int, total: Optional[int], fresh: int = 0):
+        with self.lock:
+            self.received[filename] = received
+            self.totals[filename] = total
+            self.fresh_bytes += fresh
+            now = time.perf_counter()
+            if now - self.last_report < self.interval:
+                return
+            self.last_report = now
+            self._report(now)
+
+    def finish(self):
+        with self.lock:
+            self._report(time.perf_counter())
+
+    def _report(self, now: float):
+        totals = list(self.totals.values())
+        total = None if any(t is None for t in totals) else sum(totals)
+        speed = self.fresh_bytes / max(1e-9, now - self.start)
+        self.callback(sum(self.received.values()), total, speed)
+
+
+class DownloadManager:
+    """Równoległe pobieranie z wznawianiem, ponawianiem i weryfikacją SHA-256"""
+
+    def __init__(self, directory: str = ".", workers: int = 4, chunk_size: int = CHUNK_SIZE,
+                 timeout: float = 30.0, retries: int = 4, backoff: float = 1.0,
+                 progress: Optional[ProgressReporter] = None, verify_existing: bool = False,
+                 sleep: Callable[[float], None] = time.sleep):
+        self.directory = directory
+        self.workers = max(1, int(workers))
+        self.chunk_size = chunk_size
+        self.timeout = timeout
+        self.retries = max(0, int(retries))
+        self.backoff = backoff
+        self.progress = progress
+        self.verify_existing = verify_existing
+        self.sleep = sleep
+
+    def download_all(self, items: List[DownloadItem]) -> List[DownloadResult]:
+        """Pobiera pliki równolegle; wyniki w kolejności listy"""
+        os.makedirs(self.directory, exist_ok=True)
+        with ThreadPoolExecutor(max_workers=min(self.workers, max(1, len(items))),
+                                thread_name_prefix="download") as executor:
+            results = list(executor.map(self.download, items))
+        if self.progress is not None:
+            self.progress.finish()
+        return results
+
+    def download(self, item: DownloadItem) -> DownloadResult:
+        """Pobiera jeden plik
+
+        Istniejący plik jest pomijany; z verify_existing jest najpierw
+        sprawdzany i pobierany ponownie, jeśli nie zgadza się z manifestem.
+        """
+        path = os.path.join(self.directory, item.filename)
+        if os.path.exists(path):
+            try:
+                if self.verify_existing:
+                    verify_file(path, item)
+                return DownloadResult(item.filename, "skipped")
+            except IntegrityError as e:
+                logger.warning(f"Istniejący plik niezgodny z manifestem - pobieranie: {e}")
+
+        result = DownloadResult(item.filename, "failed")
+        for attempt in range(self.retries + 1):
+            result.attempts = attempt + 1
+            try:
+                self._fetch(item, path, result)
+                result.status, result.error = "downloaded", None
+                return result
+            except IntegrityError as e:
+                result.error = str(e)
+                if result.resumed and attempt < self.retries:
+                    # Początek pliku mógł pochodzić z innej wersji - raz od zera
+                    logger.warning(f"Błąd weryfikacji wznowionego pliku, pobieranie od nowa: {e}")
+                    result.resumed = False
+                    continue
+                logger.error(f"Błąd weryfikacji: {e}")
+                return result
+            except urllib.error.HTTPError as e:
+                result.error = f"HTTP {e.code}: {e.reason}"
+                if e.code not in RETRY_STATUS:
+                    break
+            except (urllib.error.URLError, socket.timeout, ConnectionError, OSError) as e:
+                result.error = str(getattr(e, 'reason', e))
+            if attempt < self.retries:
+                delay = self.backoff * (2 ** attempt)
+                logger.warning(f"Pobieranie {item.filename} nieudane ({result.error}), "
+                               f"ponowienie za {delay:.1f}s")
+                self.sleep(delay)
+        logger.error(f"Nie udało się pobrać {item.filename}: {result.error}")
+        return result
+
+    def _fetch(self, item: DownloadItem, path: str, result: DownloadResult):
+        """Jedna próba: wznowienie/pobranie do .part, weryfikacja, atomowa zamiana"""
+        part_path = path + ".part"
+        offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+        if item.size is not None and offset > item.size:
+            offset = 0                     # plik tymczasowy z innej wersji
+
+        headers = {'User-Agent': USER_AGENT}
+        if offset:
+            headers['Range'] = f"bytes={offset}-"
+        request = urllib.request.Request(item.url, headers=headers)
+        try:
+            response = urllib.request.urlopen(request, timeout=self.timeout)
+        except urllib.error.HTTPError as e:
+            if e.code != 416 or not offset:
+                raise
+            # Zakres poza plikiem - .part jest kompletny albo nieaktualny
+            e.close()
+            self._complete(item, part_path, path, result)
+            return
+
+        with response:
+            resumed = offset > 0 and response.status == 206
+            if not resumed:
+                offset = 0
+            length = response.headers.get('Content-Length')
+            total = offset + int(length) if length is not None else item.size
+            result.resumed = result.resumed or resumed
+            received = offset
+            with open(part_path, 'ab' if resumed else 'wb') as f:
+                while True:
+                    chunk = response.read(self.chunk_size)
+                    if not chunk:
+                        break
+                    f.write(chunk)
+                    received += len(chunk)
+                    result.bytes_received += len(chunk)
+                    if self.progress is not None:
+                        self.progress.update(item.filename, received, total, len(chunk))
+                f.flush()
+                os.fsync(f.fileno())
+            if total is not None and received < total:
+                raise ConnectionError(f"połączenie przerwane po {received} z {total} B")
+        self._complete(item, part_path, path, result)
+
+    @staticmethod
+    def _complete(item: DownloadItem, part_path: str, path: str, result: DownloadResult):
+        try:
+            verify_file(part_path, item)
+        except IntegrityError:
+            os.remove(part_path)           # uszkodzony - następna próba od zera
+            raise
+        os.replace(part_path, path)
+        logger.info(f"Pobrano {item.filename} ({os.path.getsize(path)} B"
+                    f"{', wznowione' if result.resumed else ''})")
@@ -1,33 +1,56 @@
-import urllib.request
+import argparse
 import os
+import sys
 
-def download_maps():
-    maps = {
-        'earth_texture.jpg': 'https://eoimages.gsfc.nasa.gov/images/imagerecords/73000/73909/world.topo.bathy.200412.3x5400x2700.jpg',
-        'earth_political.jpg': 'https://eoimages.gsfc.nasa.gov/images/imagerecords/57000/57752/land_shallow_topo_2048.jpg',
-        'earth_detailed.jpg': 'https://eoimages.gsfc.nasa.gov/images/imagerecords/57000/57730/land_ocean_ice_2048.jpg'
-    }
-
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-    }
-
-    for filename, url in maps.items():
-        if os.path.exists(filename):
-            print(f"Map {filename} already exists")
-            continue
-            
-        print(f"Downloading {filename}...")
-        try:
-            request = urllib.request.Request(url, headers=headers)
-            with urllib.request.urlopen(request) as response:
-                with open(filename, 'wb') as f:
-                    f.write(response.read())
-            print(f"Successfully downloaded {filename}")
-        except Exception as e:
-            print(f"Error downloading {filename}: {e}")
+from download_manager import DownloadManager, ProgressReporter, load_manifest
+
+MANIFEST = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'maps_manifest.json')
+
+
+def print_progress(received, total, speed):
+    done = f"{received / 1e6:.1f}" + (f"/{total / 1e6:.1f}" if total else "")
+    print(f"\r  {done} MB  {speed / 1e6:.2f} MB/s   ", end="", flush=True)
+
+
+def download_maps(directory=".", names=None, workers=4, retries=4, timeout=30.0,
+                  verify=False, manifest=MANIFEST):
+    """Downloads missing maps listed in the manifest; returns True when all are present"""
+    items = [item for item in load_manifest(manifest) if not names or item.filename in names]
+    manager = DownloadManager(directory, workers=workers, retries=retries, timeout=timeout,
+                              progress=ProgressReporter(print_progress), verify_existing=verify)
+    results = manager.download_all(items)
+    print()
+
+    urls = {item.filename: item.url for item in items}
+    for result in results:
+        if result.status == "skipped":
+            print(f"Map {result.filename} already exists")
+        elif result.status == "downloaded":
+            resumed = ", resumed" if result.resumed else ""
+            print(f"Successfully downloaded {result.filename} "
+                  f"({result.attempts} attempt(s){resumed})")
+        else:
+            print(f"Error downloading {result.filename}: {result.error}")
             print("You can manually download and save the file from:")
-            print(url)
+            print(urls[result.filename])
+    return all(result.status != "failed" for result in results)
+
+
+def parse_arguments(argv=None):
+    parser = argparse.ArgumentParser(description="Download Earth texture maps")
+    parser.add_argument('names', nargs='*', help="files to download (default: all)")
+    parser.add_argument('--dir', default=".", help="target directory")
+    parser.add_argument('--manifest', default=MANIFEST, help="manifest with URLs and SHA-256")
+    parser.add_argument('--workers', type=int, default=4, help="parallel downloads")
+    parser.add_argument('--retries', type=int, default=4, help="retries per file")
+    parser.add_argument('--timeout', type=float, default=30.0, help="socket timeout [s]")
+    parser.add_argument('--verify', action='store_true',
+                        help="check existing files against the manifest, re-download on mismatch")
+    return parser.parse_args(argv)
+
 
 if __name__ == "__main__":
-    download_maps()
+    args = parse_arguments()
+    ok = download_maps(args.dir, args.names, args.workers, args.retries, args.timeout,
+                       args.verify, args.manifest)
+    sys.exit(0 if ok else 1)
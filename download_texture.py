@@ -1,20 +1,8 @@
-import urllib.request
-import os
+from download_maps import download_maps
+
 
 def download_earth_texture():
-    url = "https://eoimages.gsfc.nasa.gov/images/imagerecords/73000/73909/world.topo.bathy.200412.3x5400x2700.jpg"
-    output_file = "earth_texture.jpg"
-    
-    if os.path.exists(output_file):
-        print(f"Texture file already exists at: {output_file}")
-        return
-        
-    print("Downloading Earth texture...")
-    try:
-        urllib.request.urlretrieve(url, output_file)
-        print(f"Successfully downloaded texture to: {output_file}")
-    except Exception as e:
-        print(f"Error downloading texture: {e}")
+    download_maps(names=["earth_texture.jpg"])
 
 if __name__ == "__main__":
     download_earth_texture()
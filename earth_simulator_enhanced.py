@@ -7,9 +7,13 @@ Opis: Zaawansowany symulator 3D Ziemi z interaktywnym interfejsem
 Funkcje: Rotacja globu, zmiana tekstur, menu interaktywne, system zapisu/odczytu
 """
 
+# Pomiar startu - punkt zerowy przed wszystkimi pozostałymi importami
+from startup_profiler import startup
+
 # Import naprawy kompatybilności na początku
 try:
-    import compatibility_fix
+    with startup.importing("compatibility_fix"):
+        import compatibility_fix
 except ImportError:
     print("Ostrzeżenie: Nie znaleziono pliku compatibility_fix.py")
 
@@ -20,28 +24,71 @@ import logging
 import platform
 import time
 import math
+import argparse
+import atexit
+import importlib.util
 from datetime import datetime
 from typing import Dict, List, Tuple, Optional
 from dataclasses import dataclass
 from enum import Enum
 
+# Tryb bez okna musi wybrać platformę PyOpenGL przed importem OpenGL.GL
+if '--headless' in sys.argv:
+    import headless
+    headless.configure_headless_platform()
+
+# Flagi PyOpenGL (sprawdzanie błędów) również muszą być ustawione przed importem OpenGL.GL
+import gl_config
+gl_config.configure_pyopengl(debug='--debug' in sys.argv)
+
 # Import Pygame i OpenGL po sprawdzeniu zależności
-import pygame
-from pygame.locals import DOUBLEBUF, OPENGL
-from OpenGL.GL import *
-from OpenGL.GLU import *
-import numpy as np
-from PIL import Image
+with startup.importing("pygame"):
+    import pygame
+    from pygame.locals import DOUBLEBUF, OPENGL
+with startup.importing("OpenGL"):
+    from OpenGL.GL import *
+    from OpenGL.GLU import *
+with startup.importing("numpy"):
+    import numpy as np
+
+with startup.importing("moduły symulatora"):
+    from simulation_clock import SimulationClock, CameraState
+    from simulation_thread import SimulationThread
+    from remote_control import RemoteControlServer, DEFAULT_PORT as REMOTE_PORT
+    from camera_path import CameraPath, CameraSample
+    from quality_controller import QualityController, QualityLevel
+    from render_target import RenderTarget
+    from input_batcher import InputBatcher, FrameInput
+    from camera_math import perspective_matrix, orthographic_matrix, to_gl
+    from picking import GeoPoint, GLOBE_RADIUS, globe_model_matrix, pick, camera_keeping_point
+    from solar import SolarShading, SolarClock, sun_direction, subsolar_point
+    from clouds import CloudSettings, CloudField, CloudGenerator
+    from streaming_texture import StreamingTexture
+    from screenshot import ScreenshotCapture
+    from video_recorder import VideoRecorder, create_writer
+    from poster import PosterResult, render_tiled, DEFAULT_TILE_SIZE
+    from memory_profiler import MemoryProfiler
+    from metrics import metrics, MetricsExporter, FORMATS as METRICS_FORMATS
+    from atmosphere import AtmosphereShell
+    from shaders import ShaderManager, MeshBuffer, ScreenQuad, OverlayTexture
+    from gl_state import GLState
+    from globe_shaders import PROGRAMS
+    from utils import create_config_directory, get_config_path, parse_size, parse_address
+    from input_recorder import (LiveEventSource, RecordingEventSource, ReplayEventSource,
+                                FixedStepEventSource, EventRecorder, FrameStats, PolledFrame,
+                                read_recording)
+    from texture_loader import TextureLoader, DecodedTexture, decode_image, PREVIEW_SIZE
+    from log_pipeline import setup_logging
 
-# Konfiguracja logowania
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('earth_simulator.log', encoding='utf-8'),
-        logging.StreamHandler()
-    ]
-)
+# Promień powłoki chmur względem globu
+CLOUD_SHELL_SCALE = 1.015
+
+# Plakat (Shift+T): wielokrotność rozdzielczości okna i gęstość siatki sfery
+POSTER_SCALE = 4
+POSTER_SEGMENTS = 192
+
+# Konfiguracja logowania - zapis w wątku tła, rotacja pliku, limit powtórzeń
+log_pipeline = setup_logging('earth_simulator.log')
 logger = logging.getLogger(__name__)
 
 class TextureType(Enum):
@@ -63,6 +110,7 @@ class AnimationType(Enum):
     ORBIT = "Orbit"
     ZOOM = "Zoom"
     FLYBY = "Flyby"
+    PATH = "Path"
 
 @dataclass
 class SimulationConfig:
@@ -242,6 +290,33 @@ class EnhancedButton:
             
         return False
 
+# Tekstura świateł miast dla trybu nocnego (opcjonalna, patrz download_maps.py)
+NIGHT_LIGHTS = 'NightLights'
+NIGHT_LIGHTS_FILE = 'earth_night.jpg'
+
+# Metryki (metrics.py) - zapis w pętli głównej to jedno deque.append
+FRAME_TIME = metrics.histogram("earth_frame_time_ms", "Czas pracy klatki bez oczekiwania [ms]")
+FRAMES = metrics.counter("earth_frames_total", "Wyrenderowane klatki")
+FPS = metrics.gauge("earth_fps", "Klatki na sekundę (ostatnia pełna sekunda)")
+QUALITY_CHANGES = metrics.counter("earth_quality_changes_total", "Zmiany poziomu jakości")
+TEXTURE_UPLOAD = metrics.histogram("earth_texture_upload_ms",
+                                   "Przesłanie tekstury do GPU z mipmapami [ms]")
+CONFIG_LOAD = metrics.histogram("earth_config_io_ms", "Zapis/odczyt konfiguracji [ms]",
+                                labels={"operation": "load"})
+CONFIG_SAVE = metrics.histogram("earth_config_io_ms", "Zapis/odczyt konfiguracji [ms]",
+                                labels={"operation": "save"})
+CONFIG_ERRORS = metrics.counter("earth_config_errors_total", "Błędy zapisu/odczytu konfiguracji")
+INPUT_DEFERRED = metrics.counter("earth_input_deferred_total",
+                                 "Klatki z wejściem odłożonym (trwał krok wątku symulacji)")
+
+# Po tylu klatkach odkładania wejście czeka na blokadę wątku symulacji
+MAX_DEFERRED_FRAMES = 3
+
+# Nakładki interfejsu: wysokość paska (nagłówek, pasek menu, przyciski z podpowiedziami)
+# i odstęp odświeżania panelu statystyk [s]
+CHROME_HEIGHT = 96
+STATS_REFRESH_INTERVAL = 0.25
+
 class DataManager:
     """Menedżer danych - zapis/odczyt konfiguracji"""
     
@@ -257,17 +332,34 @@ class DataManager:
             "view_mode": "Normal",
             "animation_enabled": False,
             "sound_enabled": True,
-            "effects_enabled": True
+            "effects_enabled": True,
+            "time_scale": 1.0,
+            "max_fps": 60,
+            "screenshot_format": "png",
+            "camera_path": "camera_tour.json",
+            "solar": {
+                "time": None,
+                "speed": 1.0
+            },
+            "clouds": CloudSettings().to_config(),
+            "quality": {
+                "adaptive": True,
+                "frame_budget_ms": 16.7,
+                "level": "High",
+                "msaa_samples": 4
+            }
         }
     
     def save_config(self, config: Dict) -> bool:
         """Zapisuje konfigurację do pliku"""
         try:
-            with open(self.config_file, 'w', encoding='utf-8') as f:
-                json.dump(config, f, indent=2, ensure_ascii=False)
+            with CONFIG_SAVE.time():
+                with open(self.config_file, 'w', encoding='utf-8') as f:
+                    json.dump(config, f, indent=2, ensure_ascii=False)
             logger.info(f"Konfiguracja zapisana do {self.config_file}")
             return True
         except Exception as e:
+            CONFIG_ERRORS.inc()
             logger.error(f"Błąd zapisu konfiguracji: {e}")
             return False
     
@@ -275,38 +367,70 @@ class DataManager:
         """Wczytuje konfigurację z pliku"""
         try:
             if os.path.exists(self.config_file):
-                with open(self.config_file, 'r', encoding='utf-8') as f:
-                    config = json.load(f)
+                with CONFIG_LOAD.time():
+                    with open(self.config_file, 'r', encoding='utf-8') as f:
+                        config = json.load(f)
                 logger.info(f"Konfiguracja wczytana z {self.config_file}")
                 return config
             else:
                 logger.info("Brak pliku konfiguracyjnego, używam domyślnych ustawień")
                 return self.default_config.copy()
         except Exception as e:
+            CONFIG_ERRORS.inc()
             logger.error(f"Błąd odczytu konfiguracji: {e}")
             return self.default_config.copy()
 
 class EnhancedEarthSimulator:
     """Ulepszony symulator Ziemi z zaawansowanymi funkcjami"""
     
-    def __init__(self):
-        """Inicjalizacja symulatora"""
-        self.setup_pygame()
-        self.setup_opengl()
-        self.setup_variables()
-        self.setup_ui()
-        self.setup_textures()
-        self.setup_new_features()
+    def __init__(self, headless: bool = False, config: Optional[Dict] = None,
+                 read_only: bool = False, debug: bool = False):
+        """Inicjalizacja symulatora
+        
+        headless: renderowanie bez okna (kontekst EGL, patrz headless.py)
+        config: konfiguracja startowa zamiast pliku (np. z nagrania sesji)
+        read_only: nie zapisuj stanu do pliku (odtwarzanie, benchmarki)
+        debug: liczniki diagnostyczne (np. pominięte wywołania GL w statystykach)
+        """
+        self.headless = headless
+        self.read_only = read_only
+        self.debug = debug
         self.data_manager = DataManager()
-        self.load_saved_config()
+        if config is None:
+            config = self.data_manager.load_config()
+        self.startup_config = config
+        
+        # Źródło zdarzeń: kolejka pygame, nagrywanie lub odtwarzanie sesji
+        self.event_source = LiveEventSource()
+        self.event_time_ms = 0.0
+        self.running = False
+        self.frame_stats = FrameStats()
+        self.frame_limit = 0  # 0 = bez limitu klatek
+        self.startup_report = False  # wypisz rozkład czasu startu po pierwszej klatce
+        
+        with startup.phase("pygame + okno"):
+            self.setup_pygame(config)
+        with startup.phase("OpenGL"):
+            self.setup_opengl()
+        with startup.phase("zmienne i interfejs"):
+            self.setup_variables()
+            self.setup_ui()
+            self.setup_new_features()
+        with startup.phase("konfiguracja"):
+            self.load_saved_config(config)
+        # Po konfiguracji - ładujemy najpierw zapisaną warstwę
+        with startup.phase("tekstury (podgląd)"):
+            self.setup_textures()
+        self.setup_memory_accounting()
         
         logger.info("Symulator Ziemi zainicjalizowany pomyślnie")
     
-    def setup_pygame(self):
+    def setup_pygame(self, config: Optional[Dict] = None):
         """Konfiguracja Pygame"""
         try:
-            pygame.init()
-            pygame.mixer.init()
+            # Tylko moduły potrzebne do pierwszej klatki - mikser przy pierwszym użyciu
+            pygame.display.init()
+            pygame.font.init()
             
             # Sprawdzenie kompatybilności platformy
             try:
@@ -316,6 +440,13 @@ class EnhancedEarthSimulator:
                 logger.warning(f"Nie udało się ustawić SDL_VIDEODRIVER: {e}")
             
             self.display = (1280, 720)
+            
+            if self.headless:
+                from headless import HeadlessContext
+                self.gl_context = HeadlessContext(*self.display)
+                self.screen = pygame.Surface(self.display)
+                return
+            
             pygame.display.set_caption('Earth Simulator Enhanced v2.0 - Adrian Lesniak')
             
             # Ustawienie ikony (jeśli istnieje)
@@ -325,24 +456,64 @@ class EnhancedEarthSimulator:
             except:
                 pass
                 
-            self.screen = pygame.display.set_mode(self.display, DOUBLEBUF | OPENGL)
+            # Bufor wielopróbkowy - poziom jakości włącza/wyłącza MSAA w locie
+            msaa_samples = int((config or {}).get('quality', {}).get('msaa_samples', 4))
+            if msaa_samples > 0:
+                pygame.display.gl_set_attribute(pygame.GL_MULTISAMPLEBUFFERS, 1)
+                pygame.display.gl_set_attribute(pygame.GL_MULTISAMPLESAMPLES, msaa_samples)
+            try:
+                self.screen = pygame.display.set_mode(self.display, DOUBLEBUF | OPENGL)
+            except pygame.error as e:
+                if msaa_samples <= 0:
+                    raise
+                logger.warning(f"MSAA niedostępne ({e}), tworzę okno bez wielopróbkowania")
+                pygame.display.gl_set_attribute(pygame.GL_MULTISAMPLEBUFFERS, 0)
+                pygame.display.gl_set_attribute(pygame.GL_MULTISAMPLESAMPLES, 0)
+                self.screen = pygame.display.set_mode(self.display, DOUBLEBUF | OPENGL)
             
         except Exception as e:
             logger.error(f"Błąd inicjalizacji Pygame: {e}")
             raise
     
+    def ensure_mixer(self) -> bool:
+        """Inicjalizuje mikser dźwięku przy pierwszym użyciu"""
+        if pygame.mixer.get_init():
+            return True
+        try:
+            pygame.mixer.init()
+            return True
+        except pygame.error as e:
+            logger.warning(f"Dźwięk niedostępny: {e}")
+            return False
+    
     def setup_opengl(self):
         """Konfiguracja OpenGL"""
         try:
-            glEnable(GL_DEPTH_TEST)
-            glEnable(GL_BLEND)
-            glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
+            # Stan GL zmieniany wyłącznie przez GLState (bez zbędnych wywołań)
+            self.gl_state = GLState(debug=self.debug)
+            self.gl_state.enable(GL_DEPTH_TEST)
+            self.gl_state.blend_func(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
             
             self.fov = 45
             self.aspect = self.display[0] / self.display[1]
             self.near = 0.1
             self.far = 50.0
             
+            self.msaa_available = int(glGetIntegerv(GL_SAMPLE_BUFFERS)) > 0
+            logger.info(f"PyOpenGL: {gl_config.active_mode().describe()}")
+            
+            # Wszystkie warstwy rysowane są programami GLSL (warianty kompilowane leniwie)
+            self.shaders = ShaderManager(PROGRAMS, self.gl_state)
+            self.screen_quad = ScreenQuad()
+            # Nakładki interfejsu - powierzchnie pygame przesyłane jako tekstury po zmianie
+            self.menu_overlay = OverlayTexture()
+            self.menu_dirty = True
+            self.chrome_overlay = OverlayTexture()
+            self.chrome_key = None
+            self.stats_overlay = OverlayTexture()
+            self.stats_text = None
+            self.stats_refreshed = 0.0
+            
             self.update_perspective()
             
         except Exception as e:
@@ -363,9 +534,19 @@ class EnhancedEarthSimulator:
         self.rotation_momentum = 0.92
         self.min_zoom = -15
         self.max_zoom = -2
-        self.last_click_time = 0
+        self.last_click_time = float('-inf')
         self.double_click_delay = 300
         
+        # Stan kamery dla interpolacji między krokami symulacji
+        self.previous_camera = self.get_camera_state()
+        self.render_camera = self.previous_camera
+        
+        # Wejście zbierane raz na klatkę
+        self.input_batcher = InputBatcher()
+        self.last_drag_delta = (0.0, 0.0)
+        self.drag_released = False
+        self.picked_location = None  # ostatnie zapytanie prawym przyciskiem
+        
         # Stan menu
         self.show_menu = False
         self.current_section = None
@@ -394,8 +575,8 @@ class EnhancedEarthSimulator:
         self.atmosphere_enabled = False
         self.stats_enabled = False
         
-        # Zapisz początkową macierz widoku
-        self.modelview_matrix = glGetFloatv(GL_MODELVIEW_MATRIX)
+        # Początkowa macierz modelu-widoku globu (liczona na CPU)
+        self.globe_matrix = globe_model_matrix(self.render_camera)
     
     def setup_ui(self):
         """Konfiguracja interfejsu użytkownika"""
@@ -461,6 +642,8 @@ class EnhancedEarthSimulator:
                 "• L - zmień warstwę",
                 "• ESC - wyjście",
                 "• R - reset widoku",
+                "• [ / ] - wolniej/szybciej (skala czasu)",
+                "• P - pauza symulacji",
                 "",
                 "📋 Pasek menu:",
                 "• Widok - zmień tryb wyświetlania",
@@ -492,11 +675,73 @@ class EnhancedEarthSimulator:
             ]
         }
         
-        self.create_menu_surface()
+        # Powierzchnia menu tworzona przy pierwszym otwarciu (draw_menu)
+        self.menu_surface = None
     
     def setup_textures(self):
-        """Konfiguracja tekstur"""
-        self.load_all_textures()
+        """Konfiguracja tekstur
+        
+        Pierwsza klatka dostaje podgląd bieżącej warstwy; pełne tekstury
+        dekodowane są w tle dopiero po jej wyświetleniu (start_texture_loading).
+        """
+        name = self.current_texture
+        if name not in self.texture_files:
+            name = self.current_texture = 'Default'
+        try:
+            width, height, image_data = self.decode_texture(self.texture_files[name],
+                                                            max_size=PREVIEW_SIZE)
+            self.textures[name] = self.upload_texture(width, height, image_data,
+                                                      self.texture_files[name], mipmaps=False)
+            logger.info(f"Podgląd tekstury {name} załadowany ({width}x{height})")
+        except Exception as e:
+            logger.error(f"Błąd ładowania podglądu tekstury {name}: {e}")
+    
+    def start_texture_loading(self):
+        """Zleca dekodowanie w tle pełnych tekstur (najpierw bieżącej warstwy)"""
+        order = [self.current_texture] + [n for n in self.texture_files if n != self.current_texture]
+        for name in order:
+            if name not in self.full_textures:
+                self.texture_loader.request(name, self.texture_files[name])
+    
+    def setup_memory_accounting(self):
+        """Rejestruje podsystemy w profilu pamięci (odczyt w wątku głównym)"""
+        memory = self.memory
+        memory.register("tekstury", lambda: (
+            sum(self.texture_bytes.values())
+            + (self.cloud_texture.nbytes if self.cloud_texture is not None else 0)
+            + (self.atmosphere_shell.nbytes if self.atmosphere_shell is not None else 0)))
+        memory.register("siatki", lambda: sum(mesh.nbytes for mesh in self.sphere_meshes.values()))
+        memory.register("bufory renderowania", lambda: (
+            self.scene_target.nbytes if self.scene_target is not None else 0))
+        memory.register("nakładki", lambda: sum(
+            overlay.nbytes for overlay in (self.menu_overlay, self.chrome_overlay,
+                                           self.stats_overlay)))
+        memory.register("odczyt klatek", lambda: (
+            (self.screenshots.ring.nbytes if self.screenshots is not None else 0)
+            + (self.video.ring.nbytes if self.video is not None else 0)))
+        # Pamięć procesu: powierzchnie interfejsu i tekstury czekające na przesłanie
+        # (okno OpenGL nie ma własnej powierzchni pikseli - liczona tylko bez okna)
+        memory.register("powierzchnie", lambda: sum(
+            surface.get_bytesize() * surface.get_width() * surface.get_height()
+            for surface in (self.menu_surface, self.screen if self.headless else None)
+            if surface is not None), gpu=False)
+        memory.register("kolejka tekstur", lambda: self.texture_loader.queued_bytes, gpu=False)
+        # Eksport metryk czyta ostatnie próbki (bez wywołań w wątku eksportu)
+        metrics.gauge("earth_memory_rss_bytes", "RSS procesu (próbkowany w tle)",
+                      function=lambda: (self.memory.sampler.latest or (0, 0, 0))[1] or 0)
+        metrics.gauge("earth_memory_gpu_bytes", "Szacowana pamięć GPU z rozliczenia podsystemów",
+                      function=lambda: self.memory.accounting.gpu_bytes)
+    
+    def finish_memory_profile(self):
+        """Zatrzymuje próbkowanie pamięci i zapisuje profil (--memory-json)"""
+        if self.memory_json:
+            try:
+                self.memory.export_json(self.memory_json)
+                print(f"💾 Profil pamięci zapisany do {self.memory_json}")
+            except OSError as e:
+                logger.error(f"Nie udało się zapisać profilu pamięci: {e}")
+            self.memory_json = None
+        self.memory.stop()
     
     def setup_new_features(self):
         """Konfiguracja nowych funkcji"""
@@ -504,30 +749,79 @@ class EnhancedEarthSimulator:
         self.animation_type = AnimationType.ROTATION
         self.animation_speed = 1.0
         self.animation_time = 0
+        self.camera_path = None
+        self.camera_path_file = None
+        self.projection_dirty = False
+        
+        # Tekstury pełnej rozdzielczości dekodowane w tle (setup_textures)
+        self.full_textures = set()
+        self.texture_bytes = {}  # identyfikator tekstury -> bajty w GPU (profil pamięci)
+        self.texture_loader = TextureLoader(self.decode_texture)
+        
+        # Adaptacyjna jakość renderowania
+        self.quality = QualityController()
+        self.quality_config = {}
+        self.swap_ms = 0.0  # oczekiwanie na vsync w ostatnim present()
+        self.sphere_meshes = {}
+        self.scene_target = None
         
         # Efekty
         self.wireframe_mode = False
         self.points_mode = False
         self.night_mode = False
         
+        # Tryb nocny - Słońce liczone z czasu symulacji
+        self.solar_config = {}
+        self.solar_clock = SolarClock()
+        self.solar_shading = SolarShading()
+        self.night_lights_requested = False
+        
+        # Zegar symulacji ze stałym krokiem (niezależny od FPS)
+        self.sim_clock = SimulationClock(step=1.0 / 60.0)
+        self.max_fps = 60  # 0 = renderowanie bez limitu (benchmark)
+        self.paused_time_scale = 1.0
+        # --sim-thread: kroki w osobnym wątku, renderowanie z migawek
+        self.sim_thread = None
+        self.pending_events = []
+        self.deferred_frames = 0
+        self.requested_layer = None  # zmiana tekstury z wątku symulacji (GL tylko w głównym)
+        
         # Statystyki
         self.fps_counter = 0
         self.frame_count = 0
         self.start_time = time.time()
         
-        # Screenshot
+        # Screenshot - bufory odczytu tworzone przy pierwszym zrzucie
         self.screenshot_counter = 0
+        self.screenshot_format = "png"
+        self.screenshots = None
+        # Nagrywanie wideo (--video)
+        self.video = None
+        
+        # Zdalne sterowanie (--remote) - polecenia stosowane na granicy klatki
+        self.remote = None
+        
+        # Profil pamięci (wątek próbkujący startuje z pętlą główną)
+        self.memory = MemoryProfiler()
+        self.memory_json = None  # --memory-json: zapis profilu przy wyjściu
         
         # Dźwięk
         self.sound_volume = 0.5
         
-        # Atmosfera
+        # Atmosfera - warstwa chmur tworzona przy pierwszym włączeniu
         self.atmosphere_density = 0.1
         self.clouds_enabled = False
-    
-    def load_saved_config(self):
+        self.cloud_settings = CloudSettings()
+        self.cloud_generator = None
+        self.cloud_texture = None
+        self.cloud_upload_ms = 0.0
+        # Powłoka rozpraszania - tablice liczone w tle przy pierwszym włączeniu
+        self.atmosphere_shell = None
+    
+    def load_saved_config(self, config: Optional[Dict] = None):
         """Wczytuje zapisaną konfigurację"""
-        config = self.data_manager.load_config()
+        if config is None:
+            config = self.data_manager.load_config()
         
         # Zastosuj zapisane ustawienia
         if 'last_position' in config:
@@ -555,192 +849,455 @@ class EnhancedEarthSimulator:
             self.sound_enabled = config['sound_enabled']
         if 'atmosphere_enabled' in config:
             self.atmosphere_enabled = config['atmosphere_enabled']
+            self.clouds_enabled = self.atmosphere_enabled
+        if config.get('clouds'):
+            self.cloud_settings = CloudSettings.from_config(config['clouds'])
+        if 'time_scale' in config:
+            self.sim_clock.set_time_scale(config['time_scale'])
+        if 'max_fps' in config:
+            self.max_fps = max(0, int(config['max_fps']))
+        if config.get('screenshot_format') in ("png", "webp"):
+            self.screenshot_format = config['screenshot_format']
+        if config.get('camera_path'):
+            self.load_camera_path(config['camera_path'])
+        if 'quality' in config:
+            self.quality_config = dict(config['quality'])
+            self.quality = QualityController.from_config(self.quality_config)
+        if config.get('solar'):
+            self.solar_config = dict(config['solar'])
+            try:
+                self.solar_clock = SolarClock.from_config(self.solar_config)
+            except ValueError as e:
+                logger.error(f"Błędny czas Słońca w konfiguracji: {e}")
         
+        self.apply_view_mode()
+        
+        self.apply_quality_level(self.quality.level)
         self.update_view_matrix()
     
+    def load_camera_path(self, filename: str) -> bool:
+        """Wczytuje ścieżkę kamery z JSON i ustawia animację typu PATH"""
+        try:
+            script_dir = os.path.dirname(os.path.abspath(__file__))
+            path_file = os.path.join(script_dir, filename)
+            self.camera_path = CameraPath.load(path_file)
+            self.camera_path_file = filename
+            self.animation_type = AnimationType.PATH
+            logger.info(f"Ścieżka kamery wczytana: {filename} "
+                        f"({self.camera_path.duration:.1f}s, {len(self.camera_path.samples)} próbek)")
+            return True
+        except Exception as e:
+            logger.error(f"Błąd wczytywania ścieżki kamery {filename}: {e}")
+            return False
+    
+    def apply_quality_level(self, level: QualityLevel):
+        """Stosuje ustawienia poziomu jakości"""
+        # Przesunięcie poziomu mipmap (tekstury bardziej rozmyte = tańsze próbkowanie)
+        for texture_id in self.textures.values():
+            glBindTexture(GL_TEXTURE_2D, texture_id)
+            glTexParameterf(GL_TEXTURE_2D, GL_TEXTURE_LOD_BIAS, level.mip_bias)
+        glBindTexture(GL_TEXTURE_2D, 0)
+        
+        # MSAA - bufor wielopróbkowy tworzony jest raz przy starcie okna
+        if self.msaa_available:
+            self.gl_state.set_enabled(GL_MULTISAMPLE, level.msaa_samples > 0)
+        
+        # Wewnętrzna rozdzielczość renderowania
+        if level.render_scale < 1.0:
+            size = (int(self.display[0] * level.render_scale),
+                    int(self.display[1] * level.render_scale))
+            try:
+                if self.scene_target is None:
+                    self.scene_target = RenderTarget(*size)
+                else:
+                    self.scene_target.resize(*size)
+            except Exception as e:
+                logger.warning(f"Skalowanie rozdzielczości niedostępne: {e}")
+                self.scene_target = None
+        elif self.scene_target is not None:
+            self.scene_target.release()
+            self.scene_target = None
+        
+        logger.info(f"Poziom jakości: {level.name} (siatka {level.sphere_segments}, "
+                    f"skala {level.render_scale:.2f}, MSAA {level.msaa_samples})")
+    
+    def get_sphere_mesh(self, segments: int) -> MeshBuffer:
+        """Zwraca (z pamięci podręcznej) siatkę sfery o danej gęstości w buforach GPU"""
+        mesh = self.sphere_meshes.get(segments)
+        if mesh is None:
+            mesh = MeshBuffer(*self.create_sphere(GLOBE_RADIUS, segments))
+            self.sphere_meshes[segments] = mesh
+        return mesh
+    
     def update_perspective(self):
-        """Aktualizuje perspektywę OpenGL"""
-        glMatrixMode(GL_PROJECTION)
-        glLoadIdentity()
-        gluPerspective(self.fov, self.aspect, self.near, self.far)
-        glMatrixMode(GL_MODELVIEW)
-    
-    def update_view_matrix(self):
-        """Aktualizuje macierz widoku"""
-        glLoadIdentity()
-        glTranslatef(0.0, 0.0, self.distance)
-        glRotatef(self.rotation_x, 1, 0, 0)
-        glRotatef(self.rotation_y, 0, 1, 0)
-        self.modelview_matrix = glGetFloatv(GL_MODELVIEW_MATRIX)
+        """Aktualizuje macierze rzutowania (przekazywane shaderom jako uniformy)"""
+        # Ta sama macierz służy do wskazywania punktów kursorem (picking.py)
+        self.projection_matrix = perspective_matrix(self.fov, self.aspect, self.near, self.far)
+        # Interfejs: piksele ekranu, początek w lewym górnym rogu
+        self.overlay_projection = to_gl(orthographic_matrix(0, self.display[0], self.display[1],
+                                                            0, -1, 1))
+    
+    def get_camera_state(self) -> CameraState:
+        """Zwraca bieżący stan kamery symulacji"""
+        return CameraState(self.rotation_x, self.rotation_y, self.distance)
+    
+    def update_view_matrix(self, state: Optional[CameraState] = None):
+        """Aktualizuje macierz widoku
+        
+        Bez argumentu używa bieżącego stanu kamery i pomija interpolację
+        (bezpośrednia zmiana: mysz, reset, wczytanie stanu).
+        """
+        if state is None:
+            state = self.get_camera_state()
+            self.previous_camera = state
+        self.render_camera = state
+        
+        # Macierz liczona w NumPy - bez wywołań GL i odczytu glGetFloatv
+        self.globe_matrix = globe_model_matrix(state)
     
     def load_all_textures(self):
-        """Ładuje wszystkie tekstury"""
+        """Ładuje synchronicznie wszystkie brakujące pełne tekstury"""
         for name, file in self.texture_files.items():
+            if name in self.full_textures:
+                continue
             try:
-                self.textures[name] = self.load_texture(file)
+                self.replace_texture(name, self.load_texture(file))
                 logger.info(f"Tekstura {name} załadowana pomyślnie")
             except Exception as e:
                 logger.error(f"Błąd ładowania tekstury {file}: {e}")
     
+    def replace_texture(self, name: str, texture_id: int):
+        """Podmienia teksturę warstwy (np. podgląd na pełną rozdzielczość)"""
+        old = self.textures.get(name)
+        self.textures[name] = texture_id
+        self.full_textures.add(name)
+        if old is not None and old != texture_id:
+            glDeleteTextures([old])
+            self.texture_bytes.pop(old, None)
+    
+    def process_texture_uploads(self):
+        """Przesyła do GPU co najwyżej jedną teksturę zdekodowaną w tle"""
+        decoded = self.texture_loader.poll()
+        if decoded is not None:
+            self.upload_decoded(decoded)
+    
+    def upload_decoded(self, decoded: DecodedTexture):
+        """Przesyła teksturę z wątku tła, jeśli nie została już załadowana"""
+        if decoded.name in self.full_textures:
+            return
+        try:
+            with TEXTURE_UPLOAD.time():
+                texture_id = self.upload_texture(decoded.width, decoded.height, decoded.data,
+                                                 decoded.filename)
+            self.replace_texture(decoded.name, texture_id)
+            logger.info(f"Tekstura {decoded.name} załadowana w tle "
+                        f"({decoded.width}x{decoded.height})")
+        except Exception as e:
+            logger.error(f"Błąd ładowania tekstury {decoded.filename}: {e}")
+    
+    def finish_texture_loading(self, timeout: float = 30.0):
+        """Czeka na wszystkie tekstury z tła (benchmarki, zrzuty w trybie headless)"""
+        self.start_texture_loading()
+        deadline = time.perf_counter() + timeout
+        while self.texture_loader.busy and time.perf_counter() < deadline:
+            decoded = self.texture_loader.poll(timeout=0.1)
+            if decoded is not None:
+                self.upload_decoded(decoded)
+    
     def load_texture(self, filename: str):
         """Ładuje pojedynczą teksturę"""
         try:
-            script_dir = os.path.dirname(os.path.abspath(__file__))
-            image_path = os.path.join(script_dir, filename)
-            
-            if not os.path.exists(image_path):
-                raise FileNotFoundError(f"Plik tekstury nie istnieje: {image_path}")
-            
-            image = Image.open(image_path)
-            if image.mode != 'RGBA':
-                image = image.convert('RGBA')
-            
-            image_data = image.tobytes("raw", "RGBA", 0, -1)
+            width, height, image_data = self.decode_texture(filename)
+            return self.upload_texture(width, height, image_data, filename)
             
+        except Exception as e:
+            logger.error(f"Błąd ładowania tekstury {filename}: {e}")
+            raise
+    
+    @staticmethod
+    def decode_texture(filename: str, max_size: Optional[int] = None) -> Tuple[int, int, bytes]:
+        """Dekoduje plik tekstury do surowych danych RGBA (bez wywołań GL)"""
+        script_dir = os.path.dirname(os.path.abspath(__file__))
+        return decode_image(os.path.join(script_dir, filename), max_size)
+    
+    def upload_texture(self, width: int, height: int, image_data: bytes, 
+                       filename: str = "", mipmaps: bool = True) -> int:
+        """Przesyła zdekodowane dane RGBA do GPU i tworzy mipmapy"""
+        try:
             texture_id = glGenTextures(1)
             glBindTexture(GL_TEXTURE_2D, texture_id)
             
-            glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_LINEAR)
+            glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_LINEAR_MIPMAP_LINEAR)
             glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_LINEAR)
             glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_S, GL_CLAMP)
             glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_T, GL_CLAMP)
             
-            glTexImage2D(GL_TEXTURE_2D, 0, GL_RGBA, image.width, image.height,
+            glTexImage2D(GL_TEXTURE_2D, 0, GL_RGBA, width, height,
                         0, GL_RGBA, GL_UNSIGNED_BYTE, image_data)
+            glTexParameterf(GL_TEXTURE_2D, GL_TEXTURE_LOD_BIAS, self.quality.level.mip_bias)
+            self.texture_bytes[texture_id] = width * height * 4
+            
+            # Mipmapy - potrzebne do sterowania przesunięciem poziomu (mip bias).
+            # Podgląd startowy ich nie tworzy: pierwsze generowanie mipmap
+            # kosztuje dodatkowo kompilację w sterowniku.
+            if not mipmaps:
+                glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_LINEAR)
+                return texture_id
+            try:
+                glGenerateMipmap(GL_TEXTURE_2D)
+                # Pełny łańcuch mipmap to dodatkowa 1/3 poziomu bazowego
+                self.texture_bytes[texture_id] = width * height * 4 * 4 // 3
+            except Exception as e:
+                logger.warning(f"Brak mipmap dla {filename}: {e}")
+                glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_LINEAR)
             
             return texture_id
             
         except Exception as e:
-            logger.error(f"Błąd ładowania tekstury {filename}: {e}")
+            logger.error(f"Błąd przesyłania tekstury {filename}: {e}")
             raise
     
-    def create_sphere(self, radius: float, segments: int) -> Tuple[List, List, List]:
-        """Tworzy sferę z teksturami"""
-        vertices = []
-        texture_coords = []
-        indices = []
-        
-        for i in range(segments + 1):
-            lat = np.pi * (-0.5 + float(i) / segments)
-            for j in range(segments + 1):
-                lon = 2 * np.pi * float(j) / segments
-                x = np.cos(lat) * np.cos(lon)
-                y = np.sin(lat)
-                z = np.cos(lat) * np.sin(lon)
-                
-                vertices.append([x * radius, y * radius, z * radius])
-                texture_coords.append([1.0 - float(j) / segments, float(i) / segments])
-                
-        for i in range(segments):
-            for j in range(segments):
-                indices.append([i * (segments + 1) + j,
-                              (i + 1) * (segments + 1) + j,
-                              (i + 1) * (segments + 1) + j + 1])
-                indices.append([i * (segments + 1) + j,
-                              (i + 1) * (segments + 1) + j + 1,
-                              i * (segments + 1) + j + 1])
-                
-        return vertices, texture_coords, indices
+    def create_sphere(self, radius: float, segments: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Tworzy sferę z teksturami (tablice gotowe dla glDrawElements)"""
+        steps = np.arange(segments + 1, dtype=np.float64) / segments
+        lat = np.pi * (-0.5 + steps)[:, None]
+        lon = 2 * np.pi * steps[None, :]
+        
+        x = np.cos(lat) * np.cos(lon)
+        y = np.broadcast_to(np.sin(lat), x.shape)
+        z = np.cos(lat) * np.sin(lon)
+        vertices = (np.stack([x, y, z], axis=-1).reshape(-1, 3) * radius).astype(np.float32)
+        
+        u, v = np.broadcast_arrays((1.0 - steps)[None, :], steps[:, None])
+        texture_coords = np.stack([u, v], axis=-1).reshape(-1, 2).astype(np.float32)
+        
+        row = np.arange(segments)[:, None] * (segments + 1)
+        col = np.arange(segments)[None, :]
+        a = (row + col).ravel()
+        b = a + segments + 1
+        indices = np.stack([a, b, b + 1, a, b + 1, a + 1], axis=-1).reshape(-1, 3)
+        
+        return vertices, texture_coords, indices.astype(np.uint32)
     
-    def draw_header(self):
+    def draw_header(self, surface):
         """Rysuje nagłówek z informacjami o programie"""
         # Tło nagłówka
         header_rect = pygame.Rect(0, 0, self.display[0], 70)
-        pygame.draw.rect(self.screen, self.colors.MENU_HEADER, header_rect)
+        pygame.draw.rect(surface, self.colors.MENU_HEADER, header_rect)
         
         # Linia oddzielająca
-        pygame.draw.line(self.screen, self.colors.BUTTON_BORDER, 
+        pygame.draw.line(surface, self.colors.BUTTON_BORDER, 
                         (0, 70), (self.display[0], 70), 3)
         
         # Tytuł programu
         title_text = self.title_font.render("🌟 Earth Simulator Enhanced v2.0", 
                                           True, self.colors.TEXT_ACCENT)
         title_rect = title_text.get_rect(midleft=(20, 35))
-        self.screen.blit(title_text, title_rect)
+        surface.blit(title_text, title_rect)
         
         # Autor
         author_text = self.text_font.render("👨‍💻 Autor: Adrian Lesniak", 
                                           True, self.colors.TEXT_ACCENT)
         author_rect = author_text.get_rect(midright=(self.display[0] - 20, 35))
-        self.screen.blit(author_text, author_rect)
+        surface.blit(author_text, author_rect)
         
-        # Gwiazdki dekoracyjne
+        # Gwiazdki dekoracyjne (pomijane przy obniżonej jakości)
+        if self.quality.level.overlay_detail < 2:
+            return
         for i in range(5):
             star_x = 400 + i * 80
             star_text = self.small_font.render("⭐", True, self.colors.TEXT_ACCENT)
             star_rect = star_text.get_rect(center=(star_x, 35))
-            self.screen.blit(star_text, star_rect)
+            surface.blit(star_text, star_rect)
     
     def draw(self):
         """Główna funkcja rysowania"""
+        self.gl_state.begin_frame()
         glClear(int(GL_COLOR_BUFFER_BIT) | int(GL_DEPTH_BUFFER_BIT))
         
-        # Przywróć zapisaną macierz widoku
-        glLoadMatrixf(self.modelview_matrix)
+        # Obniżona wewnętrzna rozdzielczość renderowania (poziom jakości)
+        target = self.scene_target
+        if target is not None:
+            target.bind()
+            glClear(int(GL_COLOR_BUFFER_BIT) | int(GL_DEPTH_BUFFER_BIT))
         
         # Rysuj Ziemię
         self.draw_earth()
         
+        if target is not None:
+            RenderTarget.unbind(self.display)
+        
         # Przełącz na 2D dla interfejsu
         self.setup_2d_mode()
         
-        # Rysuj interfejs
-        self.draw_header()
-        self.draw_menu_button()
-        self.top_menu.draw(self.screen, self.colors)
+        if target is not None:
+            self.draw_opaque_overlay(target.color_texture, 0, 0, self.display[0], self.display[1])
+        
+        # Rysuj interfejs (nakładki z teksturami, przesyłane tylko po zmianie)
+        self.draw_chrome()
         
         if self.show_menu:
             self.draw_menu()
         
+        self.draw_stats()
+        
         # Przywróć 3D
         self.setup_3d_mode()
-        
-        pygame.display.flip()
+        self.gl_state.end_frame()
+        
+        if self.screenshots is not None:
+            self.process_screenshots()
+        if self.video is not None:
+            self.video.capture(*self.display)
+        self.present()
+    
+    def present(self):
+        """Wyświetla klatkę (w trybie headless czeka na zakończenie renderowania)
+        
+        Przy adaptacyjnej jakości praca GPU kończona jest przed flip - czas
+        flip to wtedy samo oczekiwanie na vsync (swap_ms), pomijane w pomiarze.
+        """
+        if self.headless or self.quality.adaptive:
+            glFinish()
+        if self.headless:
+            self.swap_ms = 0.0
+        else:
+            swap_start = time.perf_counter()
+            pygame.display.flip()
+            self.swap_ms = (time.perf_counter() - swap_start) * 1000.0
+    
+    def draw_earth(self, segments: Optional[int] = None):
+        """Rysuje model Ziemi (segments nadpisuje gęstość siatki z poziomu jakości)
+        
+        Glob, chmury i atmosfera rysowane są z tej samej siatki w VBO,
+        podłączonej raz na klatkę; macierz MVP, pozycja kamery i kierunek
+        Słońca liczone są raz i przekazywane wszystkim warstwom.
+        """
+        mesh = self.get_sphere_mesh(segments or self.quality.level.sphere_segments)
+        mvp = to_gl(self.projection_matrix @ self.globe_matrix)
+        # Kamera w układzie modelu globu
+        camera = np.linalg.inv(self.globe_matrix)[:3, 3]
+        sun = self.current_sun_direction() if self.view_mode == ViewMode.NIGHT else None
+        
+        mesh.bind()
+        self.draw_globe(mesh, mvp, camera, sun)
+        if self.clouds_enabled and self.cloud_texture is not None:
+            self.draw_clouds(mesh, mvp, sun)
+        if self.atmosphere_enabled:
+            self.draw_atmosphere(mesh, mvp, camera, sun)
+        mesh.unbind()
+        # glClear bufora głębi wymaga włączonego zapisu (przebiegi przezroczyste go wyłączają)
+        self.gl_state.depth_mask(True)
     
-    def draw_earth(self):
-        """Rysuje model Ziemi"""
-        vertices, texture_coords, indices = self.create_sphere(2, 32)
-        glEnable(GL_TEXTURE_2D)
-        
-        current_tex = self.textures.get(self.current_texture)
-        if current_tex:
-            glBindTexture(GL_TEXTURE_2D, current_tex)
-        
-        glPushMatrix()
-        glRotatef(self.rotation_x, 1, 0, 0)
-        glRotatef(self.rotation_y, 0, 1, 0)
-        
-        glBegin(GL_TRIANGLES)
-        for triangle in indices:
-            for vertex_id in triangle:
-                glTexCoord2fv(texture_coords[vertex_id])
-                glVertex3fv(vertices[vertex_id])
-        glEnd()
-        
-        glPopMatrix()
-        glDisable(GL_TEXTURE_2D)
+    def polygon_mode(self):
+        """Tryb wielokątów powierzchni i chmur dla bieżącego trybu widoku"""
+        if self.view_mode == ViewMode.WIREFRAME:
+            return GL_LINE
+        if self.view_mode == ViewMode.POINTS:
+            return GL_POINT
+        return GL_FILL
+    
+    def current_sun_direction(self) -> np.ndarray:
+        """Kierunek Słońca dla bieżącego czasu symulacji"""
+        return sun_direction(self.solar_clock.time_at(self.sim_clock.sim_time))
+    
+    def view_defines(self) -> Tuple[str, ...]:
+        """#define wariantu programu dla bieżącego trybu widoku"""
+        return (f"VIEW_{self.view_mode.name}",)
+    
+    def set_solar_uniforms(self, program, sun: np.ndarray):
+        """Uniformy oświetlenia dzień/noc (parametry z SolarShading)"""
+        shading = self.solar_shading
+        program.set_float("u_sun", *sun)
+        program.set_float("u_twilight", shading.twilight)
+        program.set_float("u_ambient", shading.ambient)
+    
+    def draw_globe(self, mesh: MeshBuffer, mvp: np.ndarray, camera: np.ndarray,
+                   sun: Optional[np.ndarray]):
+        """Powierzchnia globu - wariant programu "globe" dla trybu widoku
+        
+        W trybie nocnym jeden przebieg łączy teksturę dzienną oświetloną
+        Słońcem ze światłami miast po stronie nocnej.
+        """
+        state = self.gl_state
+        state.disable(GL_BLEND)
+        state.disable(GL_CULL_FACE)
+        state.depth_mask(True)
+        state.polygon_mode(self.polygon_mode())
+        
+        program = self.shaders.use(self.shaders.program("globe", self.view_defines()))
+        program.set_matrix("u_mvp", mvp)
+        program.set_float("u_scale", 1.0)
+        program.set_int("u_texture", 0)
+        state.bind_texture(self.textures.get(self.current_texture))
+        
+        if sun is not None:
+            self.set_solar_uniforms(program, sun)
+            night_texture = self.textures.get(NIGHT_LIGHTS)
+            program.set_int("u_night_lights", 1)
+            program.set_float("u_night_strength", 1.0 if night_texture else 0.0)
+            state.bind_texture(night_texture, 1)
+        elif self.view_mode in (ViewMode.WIREFRAME, ViewMode.POINTS):
+            program.set_float("u_eye", *(camera / np.linalg.norm(camera)))
+        
+        mesh.draw()
     
     def setup_2d_mode(self):
-        """Przełącza na tryb 2D dla interfejsu"""
-        glMatrixMode(GL_PROJECTION)
-        glPushMatrix()
-        glLoadIdentity()
-        glOrtho(0, self.display[0], self.display[1], 0, -1, 1)
-        
-        glMatrixMode(GL_MODELVIEW)
-        glPushMatrix()
-        glLoadIdentity()
-        
-        glEnable(GL_BLEND)
-        glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
+        """Przełącza na tryb 2D dla interfejsu (program "overlay", bez testu głębi)
+        
+        Przezroczystość interfejsu zależy od przełącznika efektów wizualnych.
+        """
+        state = self.gl_state
+        state.disable(GL_DEPTH_TEST)
+        # Oś y w dół odwraca kolejność wierzchołków prostokątów
+        state.disable(GL_CULL_FACE)
+        state.set_enabled(GL_BLEND, self.effects_enabled)
+        state.blend_func(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
+        state.polygon_mode(GL_FILL)
+        
+        program = self.shaders.use(self.shaders.program("overlay"))
+        program.set_matrix("u_projection", self.overlay_projection)
+        program.set_int("u_texture", 0)
+    
+    def draw_opaque_overlay(self, texture: int, x: int, y: int, width: int, height: int):
+        """Nieprzezroczysty prostokąt z teksturą (tryb 2D) - bez kosztu mieszania"""
+        self.gl_state.disable(GL_BLEND)
+        self.gl_state.bind_texture(texture)
+        self.screen_quad.draw(self.shaders.current, x, y, width, height)
+        self.gl_state.set_enabled(GL_BLEND, self.effects_enabled)
+    
+    def draw_overlay(self, overlay: OverlayTexture, x: int, y: int):
+        """Nakładka z przezroczystością (tryb 2D) - mieszanie także przy wyłączonych efektach
+        
+        Przezroczyste piksele wokół tekstu i przycisków bez mieszania zasłoniłyby glob.
+        """
+        self.gl_state.enable(GL_BLEND)
+        overlay.draw(self.shaders.current, self.screen_quad, self.gl_state, x, y)
+        self.gl_state.set_enabled(GL_BLEND, self.effects_enabled)
+    
+    def draw_chrome(self):
+        """Rysuje nagłówek, pasek menu i przyciski górne (jedna nakładka)
+        
+        Powierzchnia rysowana i przesyłana ponownie tylko po zmianie
+        podświetlenia, animacji przycisków lub poziomu szczegółów nakładek.
+        """
+        key = (self.display, self.top_menu.handle_click(pygame.mouse.get_pos()),
+               self.menu_btn.hovered, self.menu_btn.animation_time,
+               self.layer_btn.hovered, self.layer_btn.animation_time,
+               self.quality.level.overlay_detail)
+        if key != self.chrome_key or self.chrome_overlay.texture is None:
+            self.chrome_key = key
+            surface = pygame.Surface((self.display[0], CHROME_HEIGHT), pygame.SRCALPHA)
+            self.draw_header(surface)
+            self.draw_menu_button(surface)
+            self.top_menu.draw(surface, self.colors)
+            self.chrome_overlay.upload(self.gl_state, pygame.image.tostring(surface, 'RGBA', True),
+                                       *surface.get_size())
+        self.draw_overlay(self.chrome_overlay, 0, 0)
     
     def setup_3d_mode(self):
         """Przełącza z powrotem na tryb 3D"""
-        glDisable(GL_BLEND)
-        glMatrixMode(GL_PROJECTION)
-        glPopMatrix()
-        glMatrixMode(GL_MODELVIEW)
-        glPopMatrix()
+        self.gl_state.enable(GL_DEPTH_TEST)
     
     def create_menu_surface(self):
         """Tworzy powierzchnię menu"""
@@ -750,6 +1307,11 @@ class EnhancedEarthSimulator:
     
     def update_menu_surface(self):
         """Aktualizuje powierzchnię menu"""
+        if self.menu_surface is None:
+            return  # menu nie było jeszcze otwierane
+        # Tekstura menu przesyłana ponownie dopiero przy następnym rysowaniu
+        self.menu_dirty = True
+        
         # Tło menu
         self.menu_surface.fill(self.colors.MENU_BG)
         
@@ -783,30 +1345,36 @@ class EnhancedEarthSimulator:
             for button in self.buttons['main']:
                 button.draw(self.menu_surface, self.menu_font, self.colors)
     
-    def draw_menu_button(self):
+    def draw_menu_button(self, surface):
         """Rysuje przyciski górne"""
-        self.menu_btn.draw(self.screen, self.menu_font, self.colors)
-        self.layer_btn.draw(self.screen, self.menu_font, self.colors)
+        self.menu_btn.draw(surface, self.menu_font, self.colors)
+        self.layer_btn.draw(surface, self.menu_font, self.colors)
     
     def draw_menu(self):
         """Rysuje menu"""
         if not self.show_menu:
             return
+        if self.menu_surface is None:
+            self.create_menu_surface()
         
         # Animacja menu
         target = self.display[0] - self.menu_width if self.show_menu else self.display[0]
         self.menu_position += (target - self.menu_position) * 0.3
         
         if abs(self.menu_position - self.display[0]) > 1 or self.show_menu:
-            # Konwertuj powierzchnię na dane OpenGL
-            text_data = pygame.image.tostring(self.menu_surface, 'RGBA', True)
-            glWindowPos2d(int(self.menu_position), self.display[1] - self.menu_height - self.menu_y)
-            glDrawPixels(self.menu_width, self.menu_height, GL_RGBA, GL_UNSIGNED_BYTE, text_data)
+            # Tekstura menu przesyłana tylko po zmianie powierzchni
+            if self.menu_dirty:
+                self.menu_overlay.upload(self.gl_state,
+                                         pygame.image.tostring(self.menu_surface, 'RGBA', True),
+                                         self.menu_width, self.menu_height)
+                self.menu_dirty = False
+            self.draw_opaque_overlay(self.menu_overlay.texture, int(self.menu_position),
+                                     self.menu_y, self.menu_width, self.menu_height)
     
     def handle_menu(self, event) -> bool:
         """Obsługuje zdarzenia menu"""
         if event.type == pygame.MOUSEBUTTONDOWN:
-            mouse_pos = pygame.mouse.get_pos()
+            mouse_pos = event.pos
             menu_x = int(self.menu_position)
             
             # Sprawdź przycisk warstwy
@@ -858,17 +1426,28 @@ class EnhancedEarthSimulator:
     
     def cycle_texture(self):
         """Zmienia teksturę Ziemi"""
-        textures = list(self.textures.keys())
+        textures = list(self.texture_files.keys())
         if textures:
             current_idx = textures.index(self.current_texture)
             next_idx = (current_idx + 1) % len(textures)
-            self.current_texture = textures[next_idx]
-            
-            # Aktualizuj menu
-            self.menu_sections['⚙️ Ustawienia'][2] = f"• Warstwa: {self.current_texture}"
-            self.update_menu_surface()
-            
-            logger.info(f"Zmieniono teksturę na: {self.current_texture}")
+            self.set_texture(textures[next_idx])
+    
+    def set_texture(self, name: str):
+        """Ustawia wskazaną teksturę Ziemi"""
+        if name not in self.textures:
+            # Warstwa jeszcze nie zdekodowana w tle - ładujemy od razu
+            try:
+                self.replace_texture(name, self.load_texture(self.texture_files[name]))
+            except Exception as e:
+                logger.error(f"Nie można przełączyć na teksturę {name}: {e}")
+                return
+        self.current_texture = name
+        
+        # Aktualizuj menu
+        self.menu_sections['⚙️ Ustawienia'][2] = f"• Warstwa: {self.current_texture}"
+        self.update_menu_surface()
+        
+        logger.info(f"Zmieniono teksturę na: {self.current_texture}")
     
     def show_about(self):
         """Pokazuje informacje o programie"""
@@ -903,7 +1482,17 @@ class EnhancedEarthSimulator:
             "animation_enabled": self.animation_enabled,
             "effects_enabled": self.effects_enabled,
             "sound_enabled": self.sound_enabled,
-            "atmosphere_enabled": self.atmosphere_enabled
+            "atmosphere_enabled": self.atmosphere_enabled,
+            "time_scale": self.sim_clock.time_scale or self.paused_time_scale,
+            "max_fps": self.max_fps,
+            "screenshot_format": self.screenshot_format,
+            "camera_path": self.camera_path_file,
+            "solar": dict(self.solar_config, speed=self.solar_clock.speed),
+            "clouds": self.cloud_settings.to_config(),
+            "quality": dict(self.quality_config,
+                            adaptive=self.quality.adaptive,
+                            frame_budget_ms=self.quality.frame_budget_ms,
+                            level=self.quality.level.name)
         }
         
         if self.data_manager.save_config(config):
@@ -938,7 +1527,13 @@ class EnhancedEarthSimulator:
     
     def quit_program(self):
         """Zamyka program"""
-        self.save_state()  # Zapisz stan przed wyjściem
+        if not self.read_only:
+            self.save_state()  # Zapisz stan przed wyjściem
+        self.stop_simulation_thread()
+        self.stop_remote_control()
+        self.finish_screenshots()
+        self.finish_video()
+        self.finish_memory_profile()
         pygame.quit()
         sys.exit(0)
     
@@ -950,7 +1545,10 @@ class EnhancedEarthSimulator:
         # Czekaj na naciśnięcie klawisza
         waiting = True
         while waiting:
-            for event in pygame.event.get():
+            frame = self.poll_events()
+            if frame is None:
+                break
+            for event in frame.events:
                 if event.type == pygame.QUIT:
                     pygame.quit()
                     sys.exit(0)
@@ -959,7 +1557,11 @@ class EnhancedEarthSimulator:
                     break
             
             self.draw()
-            pygame.time.wait(16)  # ~60 FPS
+            if self.event_source.realtime:
+                pygame.time.wait(16)  # ~60 FPS
+        
+        # Czas spędzony w oknie komunikatu nie powinien nadrabiać symulacji
+        self.sim_clock.reset()
     
     def handle_top_menu_click(self, action: str):
         """Obsługuje kliknięcia w pasek menu u góry"""
@@ -991,18 +1593,22 @@ class EnhancedEarthSimulator:
         current_index = modes.index(self.view_mode)
         next_index = (current_index + 1) % len(modes)
         self.view_mode = modes[next_index]
-        
-        # Zastosuj tryb
-        if self.view_mode == ViewMode.WIREFRAME:
-            glPolygonMode(GL_FRONT_AND_BACK, GL_LINE)
-        elif self.view_mode == ViewMode.POINTS:
-            glPolygonMode(GL_FRONT_AND_BACK, GL_POINT)
-        else:
-            glPolygonMode(GL_FRONT_AND_BACK, GL_FILL)
+        self.apply_view_mode()
         
         self.show_message("🌍 Tryb Widoku", f"Zmieniono na: {self.view_mode.value}")
         logger.info(f"Zmieniono tryb widoku na: {self.view_mode.value}")
     
+    def apply_view_mode(self):
+        """Przygotowuje zasoby bieżącego trybu widoku (stan GL ustawia draw_earth)"""
+        # Światła miast ładowane w tle dopiero przy pierwszym użyciu trybu nocnego
+        if self.view_mode == ViewMode.NIGHT and not self.night_lights_requested:
+            self.night_lights_requested = True
+            script_dir = os.path.dirname(os.path.abspath(__file__))
+            if os.path.exists(os.path.join(script_dir, NIGHT_LIGHTS_FILE)):
+                self.texture_loader.request(NIGHT_LIGHTS, NIGHT_LIGHTS_FILE)
+            else:
+                logger.info(f"Brak {NIGHT_LIGHTS_FILE} - strona nocna bez świateł miast")
+    
     # 2. Funkcja animacji
     def toggle_animation(self):
         """Włącza/wyłącza animacje"""
@@ -1033,12 +1639,10 @@ class EnhancedEarthSimulator:
         """Włącza/wyłącza efekty wizualne"""
         self.effects_enabled = not self.effects_enabled
         
+        # Stan GL ustawia setup_2d_mode (przezroczystość interfejsu)
         if self.effects_enabled:
-            glEnable(GL_BLEND)
-            glEnable(GL_DEPTH_TEST)
             self.show_message("🎨 Efekty", "Efekty wizualne włączone!")
         else:
-            glDisable(GL_BLEND)
             self.show_message("🎨 Efekty", "Efekty wizualne wyłączone!")
         
         logger.info(f"Efekty: {'włączone' if self.effects_enabled else 'wyłączone'}")
@@ -1050,41 +1654,135 @@ class EnhancedEarthSimulator:
         
         if self.atmosphere_enabled:
             self.clouds_enabled = True
+            self.update_clouds()
             self.show_message("🌙 Atmosfera", "Symulacja atmosfery włączona!")
         else:
             self.clouds_enabled = False
+            if self.cloud_generator is not None:
+                self.cloud_generator.pause()
             self.show_message("🌙 Atmosfera", "Symulacja atmosfery wyłączona!")
         
         logger.info(f"Atmosfera: {'włączona' if self.atmosphere_enabled else 'wyłączona'}")
     
     # 6. Funkcja screenshot
     def take_screenshot(self):
-        """Robi zrzut ekranu"""
+        """Zleca zrzut ekranu najbliższej klatki (odczyt PBO, kodowanie w tle)"""
         try:
+            if self.screenshots is None:
+                self.screenshots = ScreenshotCapture()
             self.screenshot_counter += 1
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"screenshot_{timestamp}_{self.screenshot_counter}.png"
+            filename = f"screenshot_{timestamp}_{self.screenshot_counter}.{self.screenshot_format}"
             
-            # Zrób screenshot
-            pygame.image.save(self.screen, filename)
-            
-            self.show_message("📸 Screenshot", f"Zapisano jako: {filename}")
-            logger.info(f"Zrobiono screenshot: {filename}")
+            self.screenshots.request(filename)
+            self.show_message("📸 Screenshot", f"Zapisywanie jako: {filename}")
+            logger.info(f"Zlecono screenshot: {filename}")
             
         except Exception as e:
             self.show_message("❌ Błąd", f"Nie udało się zrobić screenshot: {e}")
             logger.error(f"Błąd screenshot: {e}")
     
+    def take_poster(self):
+        """Plakat bieżącego widoku w rozdzielczości POSTER_SCALE x okno (bez interfejsu)"""
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        filename = f"poster_{timestamp}.png"
+        width, height = self.display[0] * POSTER_SCALE, self.display[1] * POSTER_SCALE
+        try:
+            self.render_poster(filename, width, height)
+            self.show_message("🖼️ Plakat", f"Zapisano {width}x{height}: {filename}")
+        except Exception as e:
+            self.show_message("❌ Błąd", f"Nie udało się zapisać plakatu: {e}")
+            logger.error(f"Błąd plakatu: {e}")
+    
+    def render_poster(self, path: str, width: int, height: int,
+                      tile_size: int = DEFAULT_TILE_SIZE,
+                      segments: int = POSTER_SEGMENTS) -> PosterResult:
+        """Zapisuje bieżący widok globu w dowolnej rozdzielczości (poster.py)
+        
+        Obraz renderowany jest kafelkami do bufora poza ekranem i zapisywany
+        jako PNG pas po pasie. Siatka sfery jest gęstsza niż w oknie - przy
+        dużej rozdzielczości krawędzie wielokątów byłyby widoczne.
+        """
+        viewport_limit = [int(v) for v in glGetIntegerv(GL_MAX_VIEWPORT_DIMS)]
+        tile_size = max(1, min(tile_size, int(glGetIntegerv(GL_MAX_RENDERBUFFER_SIZE)),
+                               *viewport_limit))
+        target = RenderTarget(tile_size, tile_size)
+        projection = self.projection_matrix
+        
+        def render_tile(tile_projection: np.ndarray, tile_width: int, tile_height: int):
+            self.projection_matrix = tile_projection
+            target.bind()
+            glViewport(0, 0, tile_width, tile_height)
+            self.gl_state.begin_frame()
+            glClear(int(GL_COLOR_BUFFER_BIT) | int(GL_DEPTH_BUFFER_BIT))
+            self.draw_earth(segments)
+            self.gl_state.end_frame()
+            glPixelStorei(GL_PACK_ALIGNMENT, 1)
+            return glReadPixels(0, 0, tile_width, tile_height, GL_RGBA, GL_UNSIGNED_BYTE)
+        
+        try:
+            return render_tiled(path, (width, height), self.fov, self.near, self.far,
+                                render_tile, tile_size)
+        finally:
+            self.projection_matrix = projection
+            RenderTarget.unbind(self.display)
+            target.release()
+    
+    def process_screenshots(self):
+        """Odczyt bieżącej klatki dla zleconych zrzutów (przed wyświetleniem)"""
+        self.screenshots.capture(*self.display)
+        self.report_screenshots(self.screenshots.poll())
+    
+    def finish_screenshots(self):
+        """Zapisuje zrzuty czekające w buforach (przed zamknięciem)"""
+        if self.screenshots is not None:
+            self.report_screenshots(self.screenshots.finish(timeout=10.0))
+            self.screenshots.release()
+            self.screenshots = None
+    
+    def start_video(self, path: str, fps: int = 30, drop_frames: bool = False):
+        """Nagrywa każdą klatkę do sekwencji PNG (katalog) lub pliku .y4m
+        
+        Czas symulacji płynie o 1/fps na klatkę; bez okna renderowanie nie
+        czeka na zegar (szybciej niż w czasie rzeczywistym).
+        """
+        self.video = VideoRecorder(create_writer(path, fps), fps=fps, drop_frames=drop_frames)
+        self.event_source = FixedStepEventSource(self.event_source, self.video.frame_time)
+        # Czas klatki obejmuje kodowanie - jakość nagrania nie powinna od niego zależeć
+        self.quality.adaptive = False
+        if self.headless:
+            self.max_fps = 0
+        logger.info(f"Nagrywanie wideo do {path} ({fps} kl./s)")
+    
+    def finish_video(self):
+        """Kończy nagrywanie - zapisuje klatki w drodze i zamyka wyjście"""
+        if self.video is not None:
+            summary = self.video.close()
+            self.video = None
+            logger.info(f"Nagrywanie zakończone: {summary['frames_written']} klatek, "
+                        f"pominięte {summary['frames_dropped']}, błędy {summary['errors']}, "
+                        f"czekanie na koder {summary['encoder_wait_ms']:.0f}ms")
+    
+    @staticmethod
+    def report_screenshots(results):
+        for result in results:
+            if result.error:
+                logger.error(f"Błąd zapisu screenshot {result.path}: {result.error}")
+            else:
+                logger.info(f"Zapisano screenshot: {result.path}")
+    
     # 7. Funkcja dźwięku
     def toggle_sound(self):
         """Włącza/wyłącza dźwięk"""
         self.sound_enabled = not self.sound_enabled
         
         if self.sound_enabled:
-            pygame.mixer.unpause()
+            if self.ensure_mixer():
+                pygame.mixer.unpause()
             self.show_message("🎵 Dźwięk", "Dźwięk włączony!")
         else:
-            pygame.mixer.pause()
+            if pygame.mixer.get_init():
+                pygame.mixer.pause()
             self.show_message("🎵 Dźwięk", "Dźwięk wyłączony!")
         
         logger.info(f"Dźwięk: {'włączony' if self.sound_enabled else 'wyłączony'}")
@@ -1126,14 +1824,12 @@ class EnhancedEarthSimulator:
     # 10. Funkcja wyjścia
     def exit_program(self):
         """Zamyka program"""
-        self.save_state()  # Zapisz stan przed wyjściem
-        pygame.quit()
-        sys.exit(0)
+        self.quit_program()
     
     def update_animation(self):
-        """Aktualizuje animacje"""
+        """Aktualizuje animacje (jeden stały krok symulacji)"""
         if self.animation_enabled:
-            self.animation_time += 0.016  # ~60 FPS
+            self.animation_time += self.sim_clock.step
             
             if self.animation_type == AnimationType.ROTATION:
                 self.rotation_y += self.animation_speed * 0.5
@@ -1149,64 +1845,403 @@ class EnhancedEarthSimulator:
                 self.rotation_y += self.animation_speed * 0.4
                 zoom_factor = math.sin(self.animation_time * 0.2) * 3
                 self.distance = -5 + zoom_factor
-            
-            self.update_view_matrix()
-    
-    def draw_stats(self):
-        """Rysuje statystyki"""
-        if not self.stats_enabled:
+            elif self.animation_type == AnimationType.PATH and self.camera_path:
+                path_time = self.animation_time * self.animation_speed
+                self.apply_camera_sample(self.camera_path.sample(path_time))
+                # Niezapętlona ścieżka kończy animację na ostatniej klatce kluczowej
+                # (kamera wraca do użytkownika)
+                if self.camera_path.is_finished(path_time):
+                    self.animation_enabled = False
+                    logger.info("Ścieżka kamery zakończona")
+    
+    def apply_camera_sample(self, sample: CameraSample):
+        """Ustawia kamerę według próbki ścieżki"""
+        self.rotation_x = sample.rotation_x
+        self.rotation_y = sample.rotation_y
+        self.distance = sample.distance
+        
+        if abs(sample.fov - self.fov) > 1e-3:
+            self.fov = sample.fov
+            self.projection_dirty = True
+        
+        if (sample.layer and sample.layer != self.current_texture 
+                and sample.layer in self.textures):
+            if self.sim_thread is not None:
+                self.requested_layer = sample.layer
+            else:
+                self.set_texture(sample.layer)
+    
+    def change_time_scale(self, factor: float):
+        """Zmienia skalę czasu symulacji (w pauzie - skalę po wznowieniu)"""
+        paused = self.sim_clock.time_scale == 0
+        current = self.paused_time_scale if paused else self.sim_clock.time_scale
+        new_scale = min(max(current * factor, 0.125), 
+                        SimulationClock.MAX_TIME_SCALE)
+        if paused:
+            # Pauza trwa dalej - zmieniamy skalę, z którą symulacja zostanie wznowiona
+            self.paused_time_scale = new_scale
+            logger.info(f"Skala czasu po wznowieniu: {new_scale:.3f}x")
             return
+        self.sim_clock.set_time_scale(new_scale)
+        logger.info(f"Skala czasu symulacji: {self.sim_clock.time_scale:.3f}x")
+    
+    def toggle_pause(self):
+        """Wstrzymuje/wznawia symulację (renderowanie trwa dalej)"""
+        if self.sim_clock.time_scale > 0:
+            self.paused_time_scale = self.sim_clock.time_scale
+            self.sim_clock.set_time_scale(0.0)
+        else:
+            self.sim_clock.set_time_scale(self.paused_time_scale)
+        logger.info(f"Symulacja: {'wstrzymana' if self.sim_clock.time_scale == 0 else 'wznowiona'}")
+    
+    def step_simulation(self, frame_time: Optional[float] = None):
+        """Wykonuje zaległe stałe kroki symulacji i interpoluje kamerę"""
+        steps = self.sim_clock.advance(frame_time)
+        for _ in range(steps):
+            self.previous_camera = self.get_camera_state()
+            self.simulation_step()
         
-        # Oblicz FPS
+        if self.projection_dirty:
+            self.update_perspective()
+            self.projection_dirty = False
+        
+        current = self.get_camera_state()
+        self.update_view_matrix(self.previous_camera.lerp(current, self.sim_clock.alpha))
+    
+    def simulation_step(self):
+        """Jeden stały krok symulacji (wątek symulacji, pod jego blokadą)"""
+        self.update_rotation()
+        self.update_animation()
+    
+    def start_simulation_thread(self):
+        """Przenosi kroki symulacji do osobnego wątku (--sim-thread)"""
+        self.sim_thread = SimulationThread(self.sim_clock, self.simulation_step,
+                                           self.get_camera_state)
+        self.sim_thread.start()
+        logger.info("Symulacja w osobnym wątku")
+    
+    def stop_simulation_thread(self):
+        """Zatrzymuje wątek symulacji; dalsze kroki wykonuje pętla główna"""
+        if self.sim_thread is not None:
+            self.sim_thread.stop()
+            self.previous_camera = self.get_camera_state()
+            self.sim_thread = None
+    
+    def process_threaded_input(self, events: List) -> Optional[FrameInput]:
+        """Obsługuje wejście, gdy wątek symulacji nie wykonuje kroku
+        
+        Zdarzenia czekają do następnej klatki, jeśli blokada jest zajęta -
+        pętla renderowania nie czeka na symulację. Po MAX_DEFERRED_FRAMES
+        klatkach wejście czeka na blokadę, żeby nie zostało zagłodzone.
+        """
+        self.pending_events.extend(events)
+        sim_thread = self.sim_thread
+        if not sim_thread.lock.acquire(blocking=self.deferred_frames >= MAX_DEFERRED_FRAMES):
+            if self.pending_events:
+                self.deferred_frames += 1
+                INPUT_DEFERRED.inc()
+            return None
+        try:
+            events, self.pending_events = self.pending_events, []
+            self.deferred_frames = 0
+            frame_input = self.input_batcher.collect(events)
+            for event in frame_input.events:
+                self.handle_event(event)
+            self.apply_frame_input(frame_input)
+            self.process_remote_commands()
+            if self.requested_layer is not None:
+                if self.requested_layer != self.current_texture:
+                    self.set_texture(self.requested_layer)
+                self.requested_layer = None
+            # Zmiana bezpośrednia (wejście, reset, wczytanie stanu) - od razu w migawce
+            latest = sim_thread.latest()
+            if (self.get_camera_state() != latest.current
+                    or self.sim_clock.time_scale != latest.time_scale):
+                sim_thread.publish_current()
+        finally:
+            sim_thread.lock.release()
+        return frame_input
+    
+    def render_snapshot(self):
+        """Ustawia kamerę z ostatniej migawki wątku symulacji (bez blokady)"""
+        if self.sim_thread.error is not None:
+            logger.warning("Wątek symulacji zatrzymany po błędzie - kroki w pętli głównej")
+            self.stop_simulation_thread()
+            return
+        if self.projection_dirty:
+            self.projection_dirty = False
+            self.update_perspective()
+        self.update_view_matrix(self.sim_thread.camera())
+    
+    def start_remote_control(self, host: str, port: int, token: Optional[str] = None,
+                             telemetry_rate: float = 10.0):
+        """Uruchamia serwer zdalnego sterowania (OSError, gdy port zajęty)"""
+        self.remote = RemoteControlServer(host, port, token, telemetry_rate).start()
+        self.remote.publish(self.remote_state())
+    
+    def stop_remote_control(self):
+        """Zamyka serwer zdalnego sterowania i połączenia klientów"""
+        if self.remote is not None:
+            self.remote.stop()
+            self.remote = None
+    
+    def process_remote_commands(self):
+        """Stosuje polecenia zdalne na granicy klatki i odpowiada klientom"""
+        if self.remote is None:
+            return
+        for command in self.remote.drain():
+            try:
+                self.apply_remote_command(command.changes)
+                command.reply(ok=True, frame=len(self.frame_stats.frame_times_ms))
+            except ValueError as e:
+                command.reply(ok=False, error=str(e))
+    
+    def apply_remote_command(self, changes: Dict):
+        """Zmienia kamerę, warstwę, tryb widoku i animację (ValueError - bez zmian)"""
+        # Najpierw sprawdzenie całości - polecenie działa w całości albo wcale
+        layer = changes.get('layer')
+        if layer is not None and layer not in self.texture_files:
+            raise ValueError(f"nieznana warstwa: {layer} "
+                             f"(dostępne: {', '.join(self.texture_files)})")
+        view_mode = None
+        if 'view_mode' in changes:
+            view_mode = next((mode for mode in ViewMode
+                              if changes['view_mode'].lower() in (mode.name.lower(),
+                                                                  mode.value.lower())), None)
+            if view_mode is None:
+                raise ValueError(f"nieznany tryb widoku: {changes['view_mode']}")
+        animation = None
+        if changes.get('animation') is not None:
+            animation = AnimationType.__members__.get(changes['animation'].upper())
+            if animation is None:
+                raise ValueError(f"nieznana animacja: {changes['animation']}")
+            if animation == AnimationType.PATH and self.camera_path is None:
+                raise ValueError("brak wczytanej ścieżki kamery")
+        
+        if layer is not None and layer != self.current_texture:
+            self.set_texture(layer)
+        if view_mode is not None and view_mode != self.view_mode:
+            self.view_mode = view_mode
+            self.apply_view_mode()
+        if 'animation' in changes:
+            if animation is None:
+                self.animation_enabled = False
+            else:
+                if not self.animation_enabled or animation != self.animation_type:
+                    self.animation_time = 0
+                self.animation_type = animation
+                self.animation_enabled = True
+        if any(name in changes for name in ('rotation_x', 'rotation_y', 'distance')):
+            self.rotation_x = max(-85.0, min(85.0, changes.get('rotation_x', self.rotation_x)))
+            self.rotation_y = changes.get('rotation_y', self.rotation_y)
+            self.distance = max(self.min_zoom, min(self.max_zoom,
+                                                   changes.get('distance', self.distance)))
+            self.rotation_velocity = [0.0, 0.0]
+            self.update_view_matrix()
+    
+    def remote_state(self, frame_ms: float = 0.0) -> Dict:
+        """Stan dla telemetrii zdalnego sterowania (nowy słownik co klatkę)"""
+        return {
+            "type": "telemetry",
+            "frame": len(self.frame_stats.frame_times_ms),
+            "sim_time": self.sim_clock.sim_time,
+            "rotation_x": self.rotation_x,
+            "rotation_y": self.rotation_y,
+            "distance": self.distance,
+            "layer": self.current_texture,
+            "view_mode": self.view_mode.value,
+            "animation": self.animation_type.name.lower() if self.animation_enabled else None,
+            "fps": self.fps_counter,
+            "frame_ms": frame_ms,
+            "frame_p90_ms": self.quality.measured_frame_time(),
+            "quality": self.quality.level.name,
+        }
+    
+    def format_simulation_thread(self) -> str:
+        """Linia statystyk wątku symulacji"""
+        sim_thread = self.sim_thread
+        age_ms = (self.sim_clock.time_source() - sim_thread.latest().published_at) * 1000.0
+        return (f"Wątek symulacji: krok {sim_thread.last_step_ms:.2f}ms "
+                f"(max {sim_thread.max_step_ms:.2f}ms), migawka sprzed {age_ms:.0f}ms")
+    
+    def update_fps(self):
+        """Liczy FPS z ostatniej pełnej sekundy (także przy ukrytych statystykach)"""
         self.frame_count += 1
         current_time = time.time()
         if current_time - self.start_time >= 1.0:
             self.fps_counter = self.frame_count
             self.frame_count = 0
             self.start_time = current_time
-        
-        # Przygotuj tekst statystyk
+            FPS.set(self.fps_counter)
+    
+    def stats_lines(self) -> List[str]:
+        """Wiersze panelu statystyk"""
         stats_text = [
-            f"FPS: {self.fps_counter}",
+            f"FPS: {self.fps_counter}" + (" (bez limitu)" if self.max_fps == 0 else ""),
+            f"Czas symulacji: {self.sim_clock.sim_time:.1f}s x{self.sim_clock.time_scale:g}",
             f"Tryb: {self.view_mode.value}",
             f"Animacja: {'ON' if self.animation_enabled else 'OFF'}",
             f"Efekty: {'ON' if self.effects_enabled else 'OFF'}",
-            f"Atmosfera: {'ON' if self.atmosphere_enabled else 'OFF'}",
+            f"Atmosfera: {self.format_atmosphere_state()}",
             f"Pozycja: X={self.rotation_x:.1f}° Y={self.rotation_y:.1f}°",
-            f"Zoom: {abs(self.distance):.1f}"
+            f"Zoom: {abs(self.distance):.1f}",
+            f"Wejście: {self.input_batcher.latency.average_ms:.1f}ms "
+            f"(max {self.input_batcher.latency.max_ms:.1f}ms, "
+            f"{self.input_batcher.latency.events_per_frame:.1f} ruchów/klatkę)",
+            f"Kursor: {self.format_cursor_location()}",
+            f"Jakość: {self.quality.level.name}{' (auto)' if self.quality.adaptive else ''} "
+            f"p90={self.quality.measured_frame_time():.1f}ms"
         ]
+        if self.clouds_enabled and self.cloud_generator is not None:
+            stats_text.insert(-1, f"Chmury: generowanie {self.cloud_generator.last_generation_ms:.0f}ms "
+                                  f"(w tle), przesył {self.cloud_upload_ms:.2f}ms")
+        if self.picked_location is not None:
+            stats_text.insert(-1, f"Wskazano: {self.picked_location.format()}")
+        if self.debug:
+            issued, avoided = self.gl_state.last_frame
+            stats_text.insert(-1, f"Stan GL: {issued} zmian, {avoided} pominiętych wywołań/klatkę")
+        if self.video is not None:
+            stats_text.insert(-1, f"Nagrywanie: {self.video.written} klatek, "
+                                  f"pominięte {self.video.dropped}")
+        for line in self.memory.format_lines():
+            stats_text.insert(-1, line)
+        if self.sim_thread is not None:
+            stats_text.insert(-1, self.format_simulation_thread())
+        if self.remote is not None:
+            stats_text.insert(-1, f"Sterowanie: {self.remote.address[0]}:{self.remote.address[1]}, "
+                                  f"{self.remote.clients} klientów, "
+                                  f"{self.remote.subscribers} z telemetrią")
+        if self.view_mode == ViewMode.NIGHT:
+            sun_time = self.solar_clock.time_at(self.sim_clock.sim_time)
+            latitude, longitude = subsolar_point(sun_time)
+            stats_text.insert(-1, f"Słońce: {GeoPoint(latitude, longitude, (0, 0, 0)).format()} "
+                                  f"({sun_time:%Y-%m-%d %H:%M} UTC)")
+        
+        # Minimalny poziom nakładek - tylko FPS i jakość
+        if self.quality.level.overlay_detail == 0:
+            stats_text = [stats_text[0], stats_text[-1]]
+        return stats_text
+    
+    def draw_stats(self):
+        """Rysuje statystyki w prawym górnym rogu (tryb 2D, przed present)
         
-        # Rysuj statystyki w prawym górnym rogu
-        y_offset = 50
-        for i, text in enumerate(stats_text):
-            text_surface = self.small_font.render(text, True, self.colors.TEXT_ACCENT)
-            text_rect = text_surface.get_rect()
-            text_rect.topright = (self.display[0] - 10, y_offset + i * 20)
-            
+        Wiersze odświeżane są co STATS_REFRESH_INTERVAL, a powierzchnia
+        rysowana i przesyłana ponownie tylko po zmianie tekstu.
+        """
+        if not self.stats_enabled:
+            return
+        
+        now = time.perf_counter()
+        if self.stats_text is None or now - self.stats_refreshed >= STATS_REFRESH_INTERVAL:
+            self.stats_refreshed = now
+            stats_text = self.stats_lines()
+            if stats_text != self.stats_text:
+                self.stats_text = stats_text
+                self.upload_stats(stats_text)
+        
+        x = self.display[0] - 5 - self.stats_overlay.width
+        self.draw_overlay(self.stats_overlay, x, 47)
+    
+    def upload_stats(self, stats_text: List[str]):
+        """Rysuje wiersze statystyk (wyrównane do prawej, z tłem) i przesyła teksturę"""
+        rendered = [self.small_font.render(text, True, self.colors.TEXT_ACCENT)
+                    for text in stats_text]
+        width = max(text_surface.get_width() for text_surface in rendered) + 10
+        height = (len(rendered) - 1) * 20 + rendered[-1].get_height() + 6
+        surface = pygame.Surface((width, height), pygame.SRCALPHA)
+        for i, text_surface in enumerate(rendered):
+            text_rect = text_surface.get_rect(topright=(width - 5, 3 + i * 20))
             # Tło dla tekstu
-            bg_rect = text_rect.inflate(10, 5)
-            pygame.draw.rect(self.screen, (0, 0, 0, 150), bg_rect)
-            self.screen.blit(text_surface, text_rect)
+            surface.fill((0, 0, 0, 150), text_rect.inflate(10, 5))
+            surface.blit(text_surface, text_rect)
+        self.stats_overlay.upload(self.gl_state, pygame.image.tostring(surface, 'RGBA', True),
+                                  width, height)
     
-    def draw_atmosphere(self):
-        """Rysuje efekty atmosfery"""
+    def format_atmosphere_state(self) -> str:
         if not self.atmosphere_enabled:
+            return "OFF"
+        shell = self.atmosphere_shell
+        if shell is not None and shell.failed:
+            return "ON (bez rozpraszania)"
+        if shell is None or not shell.ready:
+            return "ON (liczenie tablic)"
+        return "ON"
+    
+    def format_cursor_location(self) -> str:
+        """Współrzędne geograficzne pod kursorem (bez odczytu z GPU)"""
+        pos = self.input_batcher.mouse_pos
+        point = self.pick_at(*pos) if pos is not None else None
+        return point.format() if point is not None else "-"
+    
+    def update_clouds(self):
+        """Przekazuje nową klatkę pola chmur z wątku tła do tekstury (PBO)"""
+        if not self.clouds_enabled:
+            return
+        if self.cloud_generator is None:
+            self.cloud_generator = CloudGenerator(CloudField(self.cloud_settings))
+        generator = self.cloud_generator
+        generator.set_time(self.sim_clock.sim_time)
+        if not generator.running:
+            generator.start()
+        
+        frame = generator.poll()
+        if frame is None:
+            return
+        start = time.perf_counter()
+        if self.cloud_texture is None:
+            self.cloud_texture = StreamingTexture(self.cloud_settings.width,
+                                                  self.cloud_settings.height)
+        self.cloud_texture.update(frame)
+        self.cloud_upload_ms = (time.perf_counter() - start) * 1000.0
+    
+    def draw_clouds(self, mesh: MeshBuffer, mvp: np.ndarray, sun: Optional[np.ndarray]):
+        """Powłoka chmur - siatka globu powiększona o CLOUD_SHELL_SCALE
+        
+        Siatka jest już podłączona przez draw_earth. W trybie nocnym chmury
+        oświetlane są jak powierzchnia. Tylne ściany powłoki i tak zasłania
+        glob - odrzucenie ich przed rasteryzacją połowi koszt wypełniania.
+        """
+        program = self.shaders.use(self.shaders.program(
+            "clouds", ("VIEW_NIGHT",) if sun is not None else ()))
+        program.set_matrix("u_mvp", mvp)
+        program.set_float("u_scale", CLOUD_SHELL_SCALE)
+        program.set_int("u_texture", 0)
+        if sun is not None:
+            self.set_solar_uniforms(program, sun)
+        
+        state = self.gl_state
+        state.bind_texture(self.cloud_texture.texture)
+        state.enable(GL_CULL_FACE)
+        state.cull_face(GL_BACK)
+        state.enable(GL_BLEND)
+        state.blend_func(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
+        state.depth_mask(False)
+        state.polygon_mode(self.polygon_mode())
+        mesh.draw()
+    
+    def draw_atmosphere(self, mesh: MeshBuffer, mvp: np.ndarray, camera: np.ndarray,
+                        sun: Optional[np.ndarray]):
+        """Powłoka atmosfery (shader z tablicami pojedynczego rozpraszania)
+        
+        W trybie nocnym oświetla ją prawdziwe Słońce (zachody na terminatorze),
+        w pozostałych trybach - jak równomiernie oświetlony glob - światło
+        pada od strony kamery.
+        """
+        if self.atmosphere_shell is None:
+            self.atmosphere_shell = AtmosphereShell(self.shaders,
+                                                    cache_dir=create_config_directory())
+        shell = self.atmosphere_shell
+        if not shell.prepare():
             return
         
-        # Symulacja chmur (proste kółka)
-        if self.clouds_enabled:
-            for i in range(5):
-                cloud_x = (math.sin(time.time() * 0.1 + i) * 100) + self.display[0] // 2
-                cloud_y = 50 + i * 30
-                cloud_size = 20 + i * 5
-                
-                pygame.draw.circle(self.screen, (255, 255, 255, 100), 
-                                 (int(cloud_x), cloud_y), cloud_size)
+        if sun is None:
+            sun = camera / np.linalg.norm(camera)
+        shell.draw(mesh, mvp, GLOBE_RADIUS, camera, sun)
     
     def handle_mouse(self, event):
         """Obsługuje zdarzenia myszy"""
         if event.type == pygame.MOUSEBUTTONDOWN:
-            current_time = pygame.time.get_ticks()
+            current_time = self.event_time_ms
             
             # Sprawdź kliknięcie w pasek menu
             if event.pos[1] < 40:  # Pasek menu
@@ -1220,54 +2255,85 @@ class EnhancedEarthSimulator:
                     self.reset_view()
                     self.auto_rotate = True
                 self.last_click_time = current_time
-                self.last_pos = pygame.mouse.get_pos()
+                self.last_pos = event.pos
+                self.last_drag_delta = (0.0, 0.0)
                 self.rotation_velocity = [0.0, 0.0]
             
-            elif event.button in (4, 5):  # Kółko myszy
-                try:
-                    zoom_factor = 1 if event.button == 4 else -1
-                    mouse_x, mouse_y = pygame.mouse.get_pos()
-                    self.zoom_at_cursor(mouse_x, mouse_y, zoom_factor)
-                except Exception as e:
-                    logger.error(f"Błąd obsługi zoom: {e}")
+            elif event.button == 3:  # Prawy przycisk - współrzędne punktu
+                self.query_location(event.pos)
         
         elif event.type == pygame.MOUSEBUTTONUP:
             if event.button == 1:
                 if self.last_pos is not None:
-                    current_pos = pygame.mouse.get_pos()
-                    dx = (current_pos[0] - self.last_pos[0]) * self.mouse_sensitivity
-                    dy = (current_pos[1] - self.last_pos[1]) * self.mouse_sensitivity
+                    # Pęd z ostatniego przesunięcia przeciągania
+                    dx = self.last_drag_delta[0] * self.mouse_sensitivity
+                    dy = self.last_drag_delta[1] * self.mouse_sensitivity
                     self.rotation_velocity = [float(dy * 0.1), float(dx * 0.1)]
+                    self.drag_released = True
                 self.last_pos = None
+    
+    def apply_frame_input(self, frame: FrameInput):
+        """Stosuje zsumowany ruch myszy i kółka - jedna zmiana kamery na klatkę"""
+        dragging = self.last_pos is not None or self.drag_released
+        self.drag_released = False
         
-        elif event.type == pygame.MOUSEMOTION and self.last_pos is not None:
-            x, y = pygame.mouse.get_pos()
-            
+        changed = False
+        if dragging and (frame.drag_dx or frame.drag_dy):
             rotation_speed = self.get_zoom_factor()
-            dx = (x - self.last_pos[0]) * self.mouse_sensitivity * rotation_speed
-            dy = (y - self.last_pos[1]) * self.mouse_sensitivity * rotation_speed
+            dx = frame.drag_dx * self.mouse_sensitivity * rotation_speed
+            dy = frame.drag_dy * self.mouse_sensitivity * rotation_speed
             
             self.rotation_y += dx
             self.rotation_x = max(-85, min(85, self.rotation_x + dy))
-            
-            self.update_view_matrix()
-            self.last_pos = (x, y)
+            self.last_drag_delta = (frame.drag_dx, frame.drag_dy)
+            if frame.mouse_pos is not None and self.last_pos is not None:
+                self.last_pos = frame.mouse_pos
+            changed = True
+        
+        if frame.wheel:
+            try:
+                mouse_x, mouse_y = frame.mouse_pos or (0, 0)
+                self.zoom_at_cursor(mouse_x, mouse_y, frame.wheel)
+                changed = True
+            except Exception as e:
+                logger.error(f"Błąd obsługi zoom: {e}")
+        
+        if changed:
+            # Bezpośrednia zmiana - bez interpolacji; macierz zbuduje step_simulation
+            self.previous_camera = self.get_camera_state()
     
     def zoom_at_cursor(self, x: int, y: int, zoom_factor: int):
-        """Przybliża/oddala widok w punkcie kursora"""
+        """Przybliża/oddala widok w punkcie kursora
+        
+        Punkt globu pod kursorem pozostaje pod kursorem - obroty kamery
+        dobierane są analitycznie (picking.py), bez odczytu bufora głębi.
+        """
         try:
+            point = self.pick_at(x, y)
             zoom_amount = zoom_factor * self.zoom_sensitivity
-            new_distance = self.distance + zoom_amount
+            self.distance = max(self.min_zoom, min(self.max_zoom, self.distance + zoom_amount))
             
-            if self.min_zoom <= new_distance <= self.max_zoom:
-                self.distance = new_distance
-                self.update_view_matrix()
+            if point is not None:
+                state = camera_keeping_point(point.position, x, y, self.display,
+                                             self.projection_matrix, self.get_camera_state())
+                self.rotation_x, self.rotation_y = state.rotation_x, state.rotation_y
                 
         except Exception as e:
             logger.error(f"Błąd zoom: {e}")
     
+    def pick_at(self, x: int, y: int) -> Optional[GeoPoint]:
+        """Zwraca punkt globu widoczny pod kursorem (None = poza globem)"""
+        return pick(x, y, self.display, self.projection_matrix, self.render_camera)
+    
+    def query_location(self, pos: Tuple[int, int]):
+        """Zapytanie o miejsce kliknięte prawym przyciskiem"""
+        point = self.pick_at(*pos)
+        self.picked_location = point
+        if point is not None:
+            logger.info(f"Wskazany punkt: {point.format()}")
+    
     def update_rotation(self):
-        """Aktualizuje rotację"""
+        """Aktualizuje rotację (jeden stały krok symulacji)"""
         if self.last_pos is not None:
             self.auto_rotate = False
         elif self.auto_rotate:
@@ -1283,8 +2349,6 @@ class EnhancedEarthSimulator:
         
         # Ograniczenie rotacji pionowej
         self.rotation_x = max(-85, min(85, self.rotation_x))
-        
-        self.update_view_matrix()
     
     def get_zoom_factor(self) -> float:
         """Oblicza współczynnik prędkości rotacji na podstawie zoom"""
@@ -1293,50 +2357,121 @@ class EnhancedEarthSimulator:
         zoom_factor = current_zoom / zoom_range
         return max(0.05, 0.2 * zoom_factor)
     
-    def run(self):
+    def handle_event(self, event):
+        """Obsługuje pojedyncze zdarzenie dyskretne (klawisz, kliknięcie, wyjście)"""
+        if event.type == pygame.QUIT:
+            self.quit_program()
+        
+        if event.type == pygame.KEYDOWN:
+            if event.key == pygame.K_ESCAPE:
+                self.quit_program()
+            elif event.key == pygame.K_m:
+                self.show_menu = not self.show_menu
+                self.current_section = None
+                self.update_menu_surface()
+            elif event.key == pygame.K_l:
+                self.cycle_texture()
+            elif event.key == pygame.K_r:
+                self.reset_view()
+            elif event.key == pygame.K_v:
+                self.toggle_view_mode()
+            elif event.key == pygame.K_a:
+                self.toggle_animation()
+            elif event.key == pygame.K_s:
+                self.toggle_stats()
+            elif event.key == pygame.K_e:
+                self.toggle_effects()
+            elif event.key == pygame.K_t and event.mod & pygame.KMOD_SHIFT:
+                self.take_poster()
+            elif event.key == pygame.K_t:
+                self.take_screenshot()
+            elif event.key == pygame.K_LEFTBRACKET:
+                self.change_time_scale(0.5)
+            elif event.key == pygame.K_RIGHTBRACKET:
+                self.change_time_scale(2.0)
+            elif event.key == pygame.K_p:
+                self.toggle_pause()
+        
+        if self.handle_menu(event):
+            return
+        
+        self.handle_mouse(event)
+    
+    def poll_events(self) -> Optional[PolledFrame]:
+        """Pobiera zdarzenia klatki ze źródła (None = koniec odtwarzania)"""
+        frame = self.event_source.poll()
+        if frame is None:
+            self.running = False
+            return None
+        self.event_time_ms = frame.timestamp * 1000.0
+        return frame
+    
+    def run(self) -> FrameStats:
         """Główna pętla programu"""
         try:
             clock = pygame.time.Clock()
             logger.info("Rozpoczęto symulację")
             
-            while True:
-                for event in pygame.event.get():
-                    if event.type == pygame.QUIT:
-                        self.quit_program()
-                    
-                    if event.type == pygame.KEYDOWN:
-                        if event.key == pygame.K_ESCAPE:
-                            self.quit_program()
-                        elif event.key == pygame.K_m:
-                            self.show_menu = not self.show_menu
-                            self.current_section = None
-                            self.update_menu_surface()
-                        elif event.key == pygame.K_l:
-                            self.cycle_texture()
-                        elif event.key == pygame.K_r:
-                            self.reset_view()
-                        elif event.key == pygame.K_v:
-                            self.toggle_view_mode()
-                        elif event.key == pygame.K_a:
-                            self.toggle_animation()
-                        elif event.key == pygame.K_s:
-                            self.toggle_stats()
-                        elif event.key == pygame.K_e:
-                            self.toggle_effects()
-                        elif event.key == pygame.K_t:
-                            self.take_screenshot()
-                    
-                    if self.handle_menu(event):
-                        continue
-                    
-                    self.handle_mouse(event)
+            self.running = True
+            self.memory.start()
+            while self.running:
+                frame_start = time.perf_counter()
+                self.memory.frame_begin()
                 
-                self.update_rotation()
-                self.update_animation()
+                polled = self.poll_events()
+                if polled is None:
+                    break
+                
+                if self.sim_thread is not None:
+                    # Wejście tylko przy wolnej blokadzie, kamera z migawki
+                    frame_input = self.process_threaded_input(polled.events)
+                    self.render_snapshot()
+                else:
+                    # Cała kolejka zdarzeń -> jedna paczka wejścia na klatkę
+                    frame_input = self.input_batcher.collect(polled.events)
+                    for event in frame_input.events:
+                        self.handle_event(event)
+                    self.apply_frame_input(frame_input)
+                    self.process_remote_commands()
+                    self.step_simulation(polled.frame_time)
+                
+                self.update_clouds()
+                self.update_fps()
                 self.draw()
-                self.draw_stats()
-                self.draw_atmosphere()
-                clock.tick(60)
+                if frame_input is not None:
+                    self.input_batcher.frame_presented(frame_input)
+                
+                if startup.mark_first_frame(frame_start):
+                    logger.info(startup.format_line())
+                    if self.startup_report:
+                        print(startup.format_report())
+                    self.start_texture_loading()
+                self.process_texture_uploads()
+                
+                # Czas pracy klatki (bez oczekiwania w clock.tick i na vsync) steruje jakością
+                frame_ms = (time.perf_counter() - frame_start) * 1000.0
+                self.frame_stats.record(frame_ms)
+                FRAME_TIME.observe(frame_ms - self.swap_ms)
+                FRAMES.inc()
+                if self.remote is not None:
+                    self.remote.publish(self.remote_state(frame_ms))
+                new_level = self.quality.record_frame(frame_ms, self.swap_ms)
+                if new_level is not None:
+                    QUALITY_CHANGES.inc()
+                    self.apply_quality_level(new_level)
+                
+                if self.frame_limit and len(self.frame_stats.frame_times_ms) >= self.frame_limit:
+                    self.running = False
+                
+                self.memory.frame_end()
+                clock.tick(self.max_fps)
+            
+            self.stop_simulation_thread()
+            self.stop_remote_control()
+            self.finish_screenshots()
+            self.finish_video()
+            self.finish_memory_profile()
+            return self.frame_stats
                 
         except Exception as e:
             logger.error(f"Błąd krytyczny: {e}")
@@ -1347,12 +2482,10 @@ def check_dependencies():
     """Sprawdza wymagane zależności"""
     required_modules = ['pygame', 'OpenGL', 'numpy', 'PIL']
     
+    # find_spec nie wykonuje modułu - bez ponownego kosztu importu
     for module in required_modules:
-        try:
-            __import__(module)
-        except ImportError as e:
+        if importlib.util.find_spec(module) is None:
             print(f"❌ Błąd: Brak modułu {module}")
-            print(f"Szczegóły: {e}")
             print("🔧 Zainstaluj zależności: pip install pygame PyOpenGL numpy Pillow")
             return False
     
@@ -1360,30 +2493,145 @@ def check_dependencies():
     return True
 
 def check_texture_files():
-    """Sprawdza pliki tekstur"""
+    """Sprawdza pliki tekstur (nagłówki, kompletność i skróty z manifestu)
+    
+    Wyniki są zapamiętywane w katalogu konfiguracyjnym - przy kolejnym
+    starcie niezmienione pliki nie są ponownie czytane.
+    """
+    from asset_validator import AssetValidator, load_expected_hashes
     required_files = ['earth_texture.jpg', 'earth_political.jpg', 'earth_detailed.jpg']
     script_dir = os.path.dirname(os.path.abspath(__file__))
     
+    files = list(required_files)
+    if os.path.exists(os.path.join(script_dir, NIGHT_LIGHTS_FILE)):
+        files.append(NIGHT_LIGHTS_FILE)
+    validator = AssetValidator(get_config_path("asset_cache.json"),
+                               load_expected_hashes(os.path.join(script_dir, 'maps_manifest.json')))
+    reports = validator.validate_all([os.path.join(script_dir, file) for file in files],
+                                     aspect=2.0)
+    
     missing_files = []
-    for file in required_files:
-        file_path = os.path.join(script_dir, file)
-        if not os.path.exists(file_path):
+    invalid_files = []
+    for file, report in zip(files, reports):
+        for warning in report.warnings:
+            logger.warning(f"Tekstura {file}: {warning}")
+        if not os.path.exists(report.path):
             missing_files.append(file)
+        elif not report.ok:
+            invalid_files.append(file)
+            print(f"❌ Uszkodzony plik tekstury {file}: {report.error}")
     
     if missing_files:
         print(f"❌ Brakujące pliki tekstur: {', '.join(missing_files)}")
         print("📁 Upewnij się, że pliki tekstur są w katalogu programu")
+    if invalid_files:
+        print("🔧 Pobierz je ponownie: python download_maps.py --verify")
+    if missing_files or invalid_files:
         return False
     
     print("✅ Wszystkie pliki tekstur są dostępne")
     return True
 
+def parse_arguments(argv=None) -> argparse.Namespace:
+    """Parsuje argumenty wiersza poleceń"""
+    parser = argparse.ArgumentParser(description="Earth Simulator Enhanced v2.0")
+    parser.add_argument('--headless', action='store_true',
+                        help="renderowanie bez okna (EGL)")
+    parser.add_argument('--record', metavar='PLIK',
+                        help="nagraj zdarzenia sesji do pliku binarnego")
+    parser.add_argument('--replay', metavar='PLIK',
+                        help="odtwórz nagraną sesję i wypisz statystyki klatek")
+    parser.add_argument('--fast', action='store_true',
+                        help="odtwarzaj najszybciej jak się da (bez czekania)")
+    parser.add_argument('--stats-json', metavar='PLIK',
+                        help="zapisz statystyki klatek jako JSON")
+    parser.add_argument('--frames', type=int, default=0, metavar='N',
+                        help="zakończ po N klatkach (testy, pomiar czasu startu)")
+    parser.add_argument('--startup-report', action='store_true',
+                        help="wypisz rozkład czasu startu (importy i fazy) po pierwszej klatce")
+    parser.add_argument('--video', metavar='ŚCIEŻKA',
+                        help="nagraj każdą klatkę: plik .y4m albo katalog sekwencji PNG")
+    parser.add_argument('--video-fps', type=int, default=30, metavar='N',
+                        help="klatki na sekundę nagrania (krok czasu symulacji 1/N s)")
+    parser.add_argument('--drop-frames', action='store_true',
+                        help="pomijaj klatki, gdy koder nie nadąża (zamiast czekać)")
+    parser.add_argument('--poster', metavar='PLIK',
+                        help="zapisz widok startowy jako plakat PNG (kafelki) i zakończ")
+    parser.add_argument('--poster-size', type=parse_size, default=(16384, 16384),
+                        metavar='SZERxWYS', help="rozmiar plakatu (domyślnie 16384x16384)")
+    parser.add_argument('--memory-json', metavar='PLIK',
+                        help="zapisz profil pamięci (RSS, GPU, podsystemy) jako JSON przy wyjściu")
+    parser.add_argument('--tracemalloc', action='store_true',
+                        help="śledź alokacje Pythona na klatkę (wolniej; wyniki w statystykach "
+                             "i --memory-json)")
+    parser.add_argument('--metrics', metavar='CEL',
+                        help="eksportuj metryki okresowo: plik albo tcp://host:port, udp://host:port")
+    parser.add_argument('--metrics-format', choices=METRICS_FORMATS, default='jsonl',
+                        help="format eksportu metryk: linie JSON albo tekst Prometheus")
+    parser.add_argument('--metrics-interval', type=float, default=10.0, metavar='S',
+                        help="odstęp eksportu metryk w sekundach (domyślnie 10)")
+    parser.add_argument('--sim-thread', action='store_true',
+                        help="wykonuj kroki symulacji w osobnym wątku (renderowanie nie czeka "
+                             "na symulację; nie dotyczy --record i --replay)")
+    parser.add_argument('--remote', type=parse_address, nargs='?', metavar='[HOST:]PORT',
+                        const=('127.0.0.1', REMOTE_PORT),
+                        help=f"serwer zdalnego sterowania i telemetrii (TCP, linie JSON); "
+                             f"domyślnie 127.0.0.1:{REMOTE_PORT}, 0.0.0.0:PORT - cała sieć")
+    parser.add_argument('--remote-token', metavar='TOKEN',
+                        help="token wymagany od klientów zdalnego sterowania (polecenie auth)")
+    parser.add_argument('--telemetry-hz', type=float, default=10.0, metavar='HZ',
+                        help="domyślna częstotliwość telemetrii (domyślnie 10 Hz)")
+    parser.add_argument('--animation', choices=[a.name.lower() for a in AnimationType],
+                        help="włącz animację kamery (np. orbit, flyby)")
+    parser.add_argument('--debug', action='store_true',
+                        help="pełne sprawdzanie błędów PyOpenGL i liczniki diagnostyczne "
+                             "w statystykach (np. pominięte wywołania GL)")
+    return parser.parse_args(argv)
+
+def run_replay(args: argparse.Namespace) -> Dict:
+    """Odtwarza nagraną sesję jako powtarzalny benchmark"""
+    recording = read_recording(args.replay)
+    print(f"▶️ Odtwarzanie {args.replay}: {len(recording.frames)} klatek "
+          f"({'najszybciej' if args.fast else 'czas rzeczywisty'}, "
+          f"{'headless' if args.headless else 'okno'})")
+    
+    simulator = EnhancedEarthSimulator(headless=args.headless, config=recording.config,
+                                       read_only=True, debug=args.debug)
+    # Stały poziom jakości - wyniki muszą być porównywalne między przebiegami
+    simulator.quality.adaptive = False
+    simulator.max_fps = 0
+    simulator.frame_limit = args.frames
+    simulator.event_source = ReplayEventSource(recording, realtime=not args.fast)
+    simulator.memory_json = args.memory_json
+    if args.tracemalloc:
+        simulator.memory.trace_allocations()
+    
+    try:
+        simulator.run()
+    except SystemExit:
+        pass
+    
+    summary = simulator.frame_stats.summary()
+    summary["final_camera"] = {
+        "rotation_x": simulator.rotation_x,
+        "rotation_y": simulator.rotation_y,
+        "distance": simulator.distance
+    }
+    print(f"📊 {simulator.frame_stats.format()}")
+    if args.stats_json:
+        with open(args.stats_json, 'w', encoding='utf-8') as f:
+            json.dump(summary, f, indent=2)
+        print(f"💾 Statystyki zapisane do {args.stats_json}")
+    return summary
+
 def main():
     """Główna funkcja programu"""
     print("🌟 Earth Simulator Enhanced v2.0")
     print("👨‍💻 Autor: Adrian Lesniak")
     print("=" * 50)
     
+    args = parse_arguments()
+    
     # Sprawdź zależności
     if not check_dependencies():
         sys.exit(1)
@@ -1392,10 +2640,62 @@ def main():
     if not check_texture_files():
         sys.exit(1)
     
+    if args.metrics:
+        try:
+            exporter = MetricsExporter(metrics, args.metrics, args.metrics_format,
+                                       args.metrics_interval).start()
+        except ValueError as e:
+            print(f"❌ {e}")
+            sys.exit(1)
+        # Ostatni eksport także przy wyjściu przez sys.exit (quit_program)
+        atexit.register(exporter.stop)
+    
     try:
+        if args.replay:
+            run_replay(args)
+            return
+        
         # Uruchom symulator
-        simulator = EnhancedEarthSimulator()
-        simulator.run()
+        with startup.phase("symulator"):
+            simulator = EnhancedEarthSimulator(headless=args.headless, read_only=args.frames > 0,
+                                               debug=args.debug)
+        if args.poster:
+            # Plakat widoku startowego z pełnymi teksturami, bez pętli głównej
+            simulator.finish_texture_loading()
+            result = simulator.render_poster(args.poster, *args.poster_size)
+            print(f"🖼️ Plakat {result.width}x{result.height} zapisany do {result.path} "
+                  f"({result.tiles} kafelków, {result.seconds:.1f}s)")
+            return
+        simulator.frame_limit = args.frames
+        simulator.startup_report = args.startup_report
+        simulator.memory_json = args.memory_json
+        if args.tracemalloc:
+            simulator.memory.trace_allocations()
+        if args.animation:
+            simulator.animation_type = AnimationType[args.animation.upper()]
+            simulator.animation_enabled = True
+        if args.video:
+            simulator.start_video(args.video, args.video_fps, args.drop_frames)
+        if args.record:
+            recorder = EventRecorder(args.record, simulator.display, simulator.startup_config)
+            simulator.event_source = RecordingEventSource(LiveEventSource(), recorder)
+            logger.info(f"Nagrywanie sesji do {args.record}")
+        if args.remote:
+            if args.remote[0] not in ('127.0.0.1', 'localhost', '::1') and not args.remote_token:
+                logger.warning("Zdalne sterowanie dostępne w sieci bez tokenu (--remote-token)")
+            simulator.start_remote_control(*args.remote, token=args.remote_token,
+                                           telemetry_rate=args.telemetry_hz)
+        if args.sim_thread:
+            if args.record:
+                # Nagranie odtwarzane jest krokami zależnymi od czasów klatek
+                logger.warning("--sim-thread pominięte podczas nagrywania sesji")
+            else:
+                simulator.start_simulation_thread()
+        try:
+            simulator.run()
+        finally:
+            if args.record:
+                simulator.event_source.close()
         
     except Exception as e:
         logger.error(f"Błąd fatalny: {e}")
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tryb pracy PyOpenGL (sprawdzanie błędów, przyspieszenie) dla Earth Simulator Enhanced
+Autor: Adrian Lesniak
+
+PyOpenGL domyślnie po każdym wywołaniu wykonuje glGetError, sprawdza rozmiary
+tablic i owija funkcje logowaniem błędów. Flagi odczytywane są przy tworzeniu
+wrapperów funkcji, czyli przy pierwszym imporcie OpenGL.GL - dlatego
+configure_pyopengl() musi zostać wywołane wcześniej (jak
+headless.configure_headless_platform).
+
+Tryb szybki (domyślny) wyłącza te sprawdzenia; tryb debug (--debug) zostawia
+pełne sprawdzanie - błąd GL zgłaszany jest wyjątkiem w miejscu wywołania.
+Moduł OpenGL_accelerate (pakiet PyOpenGL-accelerate, opcjonalny) używany
+jest automatycznie, jeśli jest zainstalowany w zgodnej wersji.
+"""
+
+import logging
+import os
+import sys
+from dataclasses import dataclass
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class PyOpenGLMode:
+    """Ustawiony tryb PyOpenGL"""
+    error_checking: bool
+    accelerate: bool
+
+    def describe(self) -> str:
+        mode = "debug (pełne sprawdzanie błędów)" if self.error_checking else "szybki"
+        return f"{mode}, OpenGL_accelerate: {'tak' if self.accelerate else 'brak'}"
+
+
+_active: Optional[PyOpenGLMode] = None
+
+
+def configure_pyopengl(debug: bool = False) -> PyOpenGLMode:
+    """Ustawia flagi PyOpenGL przed pierwszym importem OpenGL.GL
+
+    Pierwsze wywołanie wygrywa (np. benchmark konfiguruje tryb przed importem
+    symulatora); po imporcie OpenGL.GL flagi nie mają już wpływu.
+    """
+    global _active
+    if _active is not None:
+        return _active
+    if 'OpenGL.GL' in sys.modules:
+        logger.warning("OpenGL.GL został już zaimportowany - tryb PyOpenGL bez zmian")
+        _active = active_mode()
+        return _active
+
+    import OpenGL
+    checking = bool(debug)
+    OpenGL.ERROR_CHECKING = checking
+    OpenGL.ERROR_LOGGING = checking
+    OpenGL.ARRAY_SIZE_CHECKING = checking
+    OpenGL.USE_ACCELERATE = True
+    if not checking and os.environ.get('PYOPENGL_PLATFORM') == 'egl':
+        _define_egl_error_checker()
+    _active = active_mode()
+    return _active
+
+
+def _define_egl_error_checker():
+    """Obejście PyOpenGL 3.1: bez sprawdzania błędów moduł OpenGL.raw.EGL._errors
+    nie definiuje _error_checker, a funkcje EGL (tryb headless) się do niego odwołują"""
+    from OpenGL.raw.EGL import _errors
+    if not hasattr(_errors, '_error_checker'):
+        _errors._error_checker = None
+
+
+def active_mode() -> PyOpenGLMode:
+    """Bieżący tryb PyOpenGL (odczytany z flag modułu OpenGL)"""
+    if _active is not None:
+        return _active
+    import OpenGL
+    from OpenGL import acceleratesupport
+    return PyOpenGLMode(error_checking=bool(OpenGL.ERROR_CHECKING),
+                        accelerate=bool(acceleratesupport.ACCELERATE_AVAILABLE))
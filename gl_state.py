@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Śledzenie stanu OpenGL dla Earth Simulator Enhanced
+Autor: Adrian Lesniak
+
+Każde wywołanie PyOpenGL to kilka mikrosekund narzutu Pythona. GLState
+pamięta ostatnio ustawiony stan (flagi glEnable, funkcję mieszania, tryb
+wielokątów, maskę głębi, odrzucanie ścian, tekstury i program) i pomija
+wywołania, które niczego by nie zmieniły. Przebiegi renderowania deklarują
+więc pełny potrzebny stan zamiast glPushAttrib/glPopAttrib.
+
+Stan zmieniany poza GLState (np. glBindTexture przy przesyłaniu tekstur)
+nie jest widoczny - dlatego powiązania tekstur zapominane są na początku
+każdej klatki (begin_frame), a invalidate zapomina cały stan.
+W trybie debug zliczane są wywołania wykonane i pominięte w klatce.
+"""
+
+from typing import Dict, Optional, Tuple
+
+from OpenGL.GL import *
+
+
+class GLState:
+    """Pamięć podręczna stanu OpenGL pomijająca zbędne wywołania"""
+
+    def __init__(self, debug: bool = False):
+        self.debug = debug
+        self.issued = 0           # wywołania w bieżącej klatce (tylko debug)
+        self.avoided = 0          # pominięte wywołania w bieżącej klatce (tylko debug)
+        self.last_frame: Tuple[int, int] = (0, 0)
+        self.invalidate()
+
+    def invalidate(self):
+        """Zapomina cały stan (np. po zmianie kontekstu lub kodzie spoza GLState)"""
+        self.enabled: Dict[int, bool] = {}
+        self.blend: Optional[Tuple[int, int]] = None
+        self.polygon: Optional[int] = None
+        self.depth_write: Optional[bool] = None
+        self.cull: Optional[int] = None
+        self.unit: Optional[int] = None
+        self.textures: Dict[Tuple[int, int], int] = {}
+        self.program: Optional[int] = None
+
+    def begin_frame(self):
+        """Początek klatki - tekstury mogły zostać podpięte przy przesyłaniu"""
+        self.textures.clear()
+        self.issued = self.avoided = 0
+
+    def end_frame(self):
+        """Koniec klatki - zapamiętuje liczniki (wykonane, pominięte)"""
+        self.last_frame = (self.issued, self.avoided)
+
+    def _changed(self, current, wanted) -> bool:
+        if current == wanted:
+            if self.debug:
+                self.avoided += 1
+            return False
+        if self.debug:
+            self.issued += 1
+        return True
+
+    def set_enabled(self, capability, enabled: bool):
+        """glEnable/glDisable tylko przy zmianie flagi"""
+        key = int(capability)
+        if self._changed(self.enabled.get(key), enabled):
+            self.enabled[key] = enabled
+            if enabled:
+                glEnable(capability)
+            else:
+                glDisable(capability)
+
+    def enable(self, capability):
+        self.set_enabled(capability, True)
+
+    def disable(self, capability):
+        self.set_enabled(capability, False)
+
+    def blend_func(self, source, destination):
+        wanted = (int(source), int(destination))
+        if self._changed(self.blend, wanted):
+            self.blend = wanted
+            glBlendFunc(source, destination)
+
+    def polygon_mode(self, mode):
+        """Tryb rysowania wielokątów (obie strony)"""
+        if self._changed(self.polygon, int(mode)):
+            self.polygon = int(mode)
+            glPolygonMode(GL_FRONT_AND_BACK, mode)
+
+    def depth_mask(self, write: bool):
+        if self._changed(self.depth_write, write):
+            self.depth_write = write
+            glDepthMask(GL_TRUE if write else GL_FALSE)
+
+    def cull_face(self, face):
+        if self._changed(self.cull, int(face)):
+            self.cull = int(face)
+            glCullFace(face)
+
+    def bind_texture(self, texture: Optional[int], unit: int = 0, target=GL_TEXTURE_2D):
+        """Podpina teksturę (None/0 = brak) do jednostki tekstur unit"""
+        key = (unit, int(target))
+        texture = int(texture or 0)
+        if self._changed(self.textures.get(key), texture):
+            self.active_texture(unit)
+            self.textures[key] = texture
+            glBindTexture(target, texture)
+
+    def active_texture(self, unit: int):
+        """glActiveTexture - jednostka, na którą działają glTexImage2D i glTexParameter"""
+        if self._changed(self.unit, unit):
+            self.unit = unit
+            glActiveTexture(GL_TEXTURE0 + unit)
+
+    def use_program(self, program: Optional[int]):
+        """glUseProgram (None/0 = brak programu)"""
+        program = int(program or 0)
+        if self._changed(self.program, program):
+            self.program = program
+            glUseProgram(program)
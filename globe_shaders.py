@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Źródła GLSL warstw globu dla Earth Simulator Enhanced
+Autor: Adrian Lesniak
+
+Programy:
+  - globe    - powierzchnia; warianty trybu widoku przez #define
+               (VIEW_NIGHT - oświetlenie Słońcem i światła miast w jednym
+               przebiegu, VIEW_WIREFRAME / VIEW_POINTS - cieniowanie od strony
+               kamery, żeby siatka zachowała kształt bryły),
+  - clouds   - powłoka chmur (ta sama siatka przeskalowana u_scale),
+  - overlay  - prostokąty interfejsu w pikselach ekranu.
+
+Oświetlenie trybu nocnego liczone jest na fragment z parametrami
+solar.SolarShading.
+"""
+
+from typing import Dict, Tuple
+
+GLOBE_VERTEX = """
+#version 120
+attribute vec3 a_position;
+attribute vec2 a_texcoord;
+uniform mat4 u_mvp;
+uniform float u_scale;
+varying vec2 v_texcoord;
+varying vec3 v_normal;
+
+void main() {
+    v_texcoord = a_texcoord;
+    v_normal = a_position;      // sfera o środku w zerze
+    gl_Position = u_mvp * vec4(a_position * u_scale, 1.0);
+}
+"""
+
+# Wspólna funkcja oświetlenia dzień/noc (parametry z SolarShading)
+SOLAR_SHADING = """
+uniform vec3 u_sun;
+uniform float u_twilight;
+uniform float u_ambient;
+
+float daylight(vec3 normal) {
+    return smoothstep(-u_twilight, u_twilight, dot(normalize(normal), u_sun));
+}
+
+float sun_shade(vec3 normal) {
+    float cos_zenith = dot(normalize(normal), u_sun);
+    float diffuse = clamp(cos_zenith, 0.0, 1.0);
+    return u_ambient + (1.0 - u_ambient) * daylight(normal) * (0.35 + 0.65 * diffuse);
+}
+"""
+
+GLOBE_FRAGMENT = """
+#version 120
+uniform sampler2D u_texture;
+varying vec2 v_texcoord;
+varying vec3 v_normal;
+#ifdef VIEW_NIGHT
+uniform sampler2D u_night_lights;
+uniform float u_night_strength;     // 0 = brak tekstury świateł miast
+""" + SOLAR_SHADING + """
+#endif
+#if defined(VIEW_WIREFRAME) || defined(VIEW_POINTS)
+uniform vec3 u_eye;                 // kierunek do kamery w układzie modelu
+#endif
+
+void main() {
+    vec4 color = texture2D(u_texture, v_texcoord);
+#ifdef VIEW_NIGHT
+    color.rgb *= sun_shade(v_normal);
+    color.rgb += texture2D(u_night_lights, v_texcoord).rgb
+                 * (1.0 - daylight(v_normal)) * u_night_strength;
+#endif
+#if defined(VIEW_WIREFRAME) || defined(VIEW_POINTS)
+    color.rgb *= 0.45 + 0.55 * max(dot(normalize(v_normal), u_eye), 0.0);
+#endif
+    gl_FragColor = color;
+}
+"""
+
+CLOUDS_FRAGMENT = """
+#version 120
+uniform sampler2D u_texture;
+varying vec2 v_texcoord;
+varying vec3 v_normal;
+#ifdef VIEW_NIGHT
+""" + SOLAR_SHADING + """
+#endif
+
+void main() {
+    vec4 color = texture2D(u_texture, v_texcoord);
+#ifdef VIEW_NIGHT
+    color.rgb *= sun_shade(v_normal);
+#endif
+    gl_FragColor = color;
+}
+"""
+
+OVERLAY_VERTEX = """
+#version 120
+attribute vec2 a_position;          // narożnik prostokąta jednostkowego
+uniform mat4 u_projection;          // piksele, początek w lewym górnym rogu
+uniform vec4 u_rect;                // x, y, szerokość, wysokość
+varying vec2 v_texcoord;
+
+void main() {
+    // Tekstury interfejsu mają wiersze od dołu (jak bufor OpenGL)
+    v_texcoord = vec2(a_position.x, 1.0 - a_position.y);
+    gl_Position = u_projection * vec4(u_rect.xy + a_position * u_rect.zw, 0.0, 1.0);
+}
+"""
+
+OVERLAY_FRAGMENT = """
+#version 120
+uniform sampler2D u_texture;
+varying vec2 v_texcoord;
+
+void main() {
+    gl_FragColor = texture2D(u_texture, v_texcoord);
+}
+"""
+
+PROGRAMS: Dict[str, Tuple[str, str]] = {
+    "globe": (GLOBE_VERTEX, GLOBE_FRAGMENT),
+    "clouds": (GLOBE_VERTEX, CLOUDS_FRAGMENT),
+    "overlay": (OVERLAY_VERTEX, OVERLAY_FRAGMENT),
+}
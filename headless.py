@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Renderowanie bez okna (EGL) dla Earth Simulator Enhanced
+Autor: Adrian Lesniak
+
+Tryb headless wymaga wybrania platformy PyOpenGL *przed* pierwszym importem
+OpenGL.GL, dlatego configure_headless_platform() musi zostać wywołane na
+samym początku programu (robi to earth_simulator_enhanced.py dla --headless).
+"""
+
+import os
+import sys
+import ctypes
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def configure_headless_platform():
+    """Ustawia zmienne środowiskowe dla renderowania EGL bez okna"""
+    if 'OpenGL.GL' in sys.modules and os.environ.get('PYOPENGL_PLATFORM') != 'egl':
+        logger.warning("OpenGL został już zaimportowany - tryb headless może nie działać")
+    os.environ['PYOPENGL_PLATFORM'] = 'egl'
+    os.environ.setdefault('EGL_PLATFORM', 'surfaceless')
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+
+def is_headless_platform() -> bool:
+    """Sprawdza czy wybrano platformę EGL"""
+    return os.environ.get('PYOPENGL_PLATFORM') == 'egl'
+
+
+class HeadlessContext:
+    """Kontekst OpenGL z powierzchnią pbuffer (bez okna i serwera X)"""
+
+    def __init__(self, width: int, height: int):
+        from OpenGL import EGL
+
+        self.EGL = EGL
+        self.width = width
+        self.height = height
+
+        self.display = EGL.eglGetDisplay(EGL.EGL_DEFAULT_DISPLAY)
+        major, minor = EGL.EGLint(), EGL.EGLint()
+        if not EGL.eglInitialize(self.display, ctypes.pointer(major), ctypes.pointer(minor)):
+            raise RuntimeError("Nie udało się zainicjalizować EGL")
+
+        config_attribs = (EGL.EGLint * 13)(
+            EGL.EGL_SURFACE_TYPE, EGL.EGL_PBUFFER_BIT,
+            EGL.EGL_RED_SIZE, 8, EGL.EGL_GREEN_SIZE, 8, EGL.EGL_BLUE_SIZE, 8,
+            EGL.EGL_DEPTH_SIZE, 24,
+            EGL.EGL_RENDERABLE_TYPE, EGL.EGL_OPENGL_BIT,
+            EGL.EGL_NONE)
+        config = EGL.EGLConfig()
+        count = EGL.EGLint()
+        if not EGL.eglChooseConfig(self.display, config_attribs, ctypes.pointer(config),
+                                   1, ctypes.pointer(count)) or count.value == 0:
+            raise RuntimeError("Brak konfiguracji EGL z obsługą OpenGL")
+
+        surface_attribs = (EGL.EGLint * 5)(EGL.EGL_WIDTH, width, EGL.EGL_HEIGHT, height,
+                                           EGL.EGL_NONE)
+        self.surface = EGL.eglCreatePbufferSurface(self.display, config, surface_attribs)
+        EGL.eglBindAPI(EGL.EGL_OPENGL_API)
+        self.context = EGL.eglCreateContext(self.display, config, EGL.EGL_NO_CONTEXT, None)
+        if not EGL.eglMakeCurrent(self.display, self.surface, self.surface, self.context):
+            raise RuntimeError("Nie udało się aktywować kontekstu EGL")
+
+        logger.info(f"Kontekst headless EGL {width}x{height} utworzony "
+                    f"(EGL {major.value}.{minor.value})")
+
+    def release(self):
+        """Zwalnia kontekst i powierzchnię"""
+        EGL = self.EGL
+        EGL.eglMakeCurrent(self.display, EGL.EGL_NO_SURFACE, EGL.EGL_NO_SURFACE, EGL.EGL_NO_CONTEXT)
+        EGL.eglDestroyContext(self.display, self.context)
+        EGL.eglDestroySurface(self.display, self.surface)
+        EGL.eglTerminate(self.display)
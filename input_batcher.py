@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Łączenie zdarzeń wejścia w paczki na klatkę dla Earth Simulator Enhanced
+Autor: Adrian Lesniak
+
+Myszy o wysokiej częstotliwości raportowania generują setki zdarzeń
+MOUSEMOTION na sekundę. Zamiast przebudowywać kamerę przy każdym z nich,
+zdarzenia z całej kolejki są sumowane, a kamera aktualizowana raz na klatkę.
+"""
+
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import List, Optional, Set, Tuple
+
+import pygame
+
+# Przyciski kółka myszy w zdarzeniach MOUSEBUTTONDOWN/UP
+WHEEL_UP = 4
+WHEEL_DOWN = 5
+
+
+@dataclass
+class FrameInput:
+    """Wejście zebrane z jednej klatki"""
+    poll_time: float
+    events: List = field(default_factory=list)  # zdarzenia dyskretne, w kolejności
+    drag_dx: float = 0.0
+    drag_dy: float = 0.0
+    wheel: int = 0
+    mouse_pos: Optional[Tuple[int, int]] = None
+    held_keys: Set[int] = field(default_factory=set)
+    motion_events: int = 0
+
+    @property
+    def has_camera_input(self) -> bool:
+        return bool(self.drag_dx or self.drag_dy or self.wheel)
+
+
+class InputLatencyStats:
+    """Statystyki opóźnienia od odczytu wejścia do wyświetlenia klatki"""
+
+    def __init__(self, window: int = 120):
+        self.samples = deque(maxlen=window)
+        self.coalesced = deque(maxlen=window)
+
+    def record(self, latency_ms: float, motion_events: int):
+        self.samples.append(latency_ms)
+        self.coalesced.append(motion_events)
+
+    @property
+    def average_ms(self) -> float:
+        return sum(self.samples) / len(self.samples) if self.samples else 0.0
+
+    @property
+    def max_ms(self) -> float:
+        return max(self.samples) if self.samples else 0.0
+
+    @property
+    def events_per_frame(self) -> float:
+        return sum(self.coalesced) / len(self.coalesced) if self.coalesced else 0.0
+
+
+class InputBatcher:
+    """Zbiera zdarzenia z kolejki i sumuje ruch myszy, kółko i stan klawiszy"""
+
+    def __init__(self):
+        self.held_keys: Set[int] = set()
+        self.mouse_pos: Optional[Tuple[int, int]] = None
+        self.latency = InputLatencyStats()
+
+    def collect(self, events) -> FrameInput:
+        """Przetwarza wszystkie zdarzenia klatki w jedną paczkę"""
+        frame = FrameInput(poll_time=time.perf_counter())
+
+        for event in events:
+            if event.type == pygame.MOUSEMOTION:
+                frame.motion_events += 1
+                self.mouse_pos = event.pos
+                # Przeciąganie lewym przyciskiem - sumujemy przesunięcia
+                if event.buttons and event.buttons[0]:
+                    frame.drag_dx += event.rel[0]
+                    frame.drag_dy += event.rel[1]
+                continue
+
+            if event.type in (pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP):
+                self.mouse_pos = event.pos
+                if event.button in (WHEEL_UP, WHEEL_DOWN):
+                    if event.type == pygame.MOUSEBUTTONDOWN:
+                        frame.wheel += 1 if event.button == WHEEL_UP else -1
+                    continue
+
+            if event.type == pygame.MOUSEWHEEL:
+                # Duplikat przycisków 4/5 - zliczany wyżej
+                continue
+
+            if event.type == pygame.KEYDOWN:
+                self.held_keys.add(event.key)
+            elif event.type == pygame.KEYUP:
+                self.held_keys.discard(event.key)
+
+            frame.events.append(event)
+
+        frame.mouse_pos = self.mouse_pos
+        frame.held_keys = set(self.held_keys)
+        return frame
+
+    def frame_presented(self, frame: FrameInput):
+        """Rejestruje wyświetlenie klatki, która zawierała wejście"""
+        if frame.has_camera_input or frame.events:
+            latency_ms = (time.perf_counter() - frame.poll_time) * 1000.0
+            self.latency.record(latency_ms, frame.motion_events)
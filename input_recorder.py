@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Nagrywanie i odtwarzanie sesji wejścia dla Earth Simulator Enhanced
+Autor: Adrian Lesniak
+
+Format pliku (little-endian):
+  nagłówek: MAGIC, wersja (H), szerokość/wysokość okna (HH),
+            długość konfiguracji (I) + konfiguracja JSON skompresowana zlib
+  klatka:   numer (I), znacznik czasu [s] (d), czas klatki [s] (d), liczba zdarzeń (H)
+  zdarzenie: kod (B) + dane zależne od typu
+
+Każda klatka zapisuje czas od poprzedniej, więc odtworzenie podaje zegarowi
+symulacji dokładnie te same kroki - przebieg jest deterministyczny.
+"""
+
+import io
+import json
+import math
+import struct
+import time
+import zlib
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import pygame
+
+MAGIC = b'ESIMREC'
+VERSION = 1
+
+HEADER = struct.Struct('<HHHI')
+FRAME = struct.Struct('<IddH')
+EVENT_CODE = struct.Struct('<B')
+MOTION = struct.Struct('<hhhhB')
+BUTTON = struct.Struct('<hhB')
+KEY = struct.Struct('<iHB')
+WHEEL = struct.Struct('<hh')
+
+# Własne kody zdarzeń - niezależne od numeracji w danej wersji pygame
+CODE_QUIT = 1
+CODE_KEYDOWN = 2
+CODE_KEYUP = 3
+CODE_MOTION = 4
+CODE_BUTTONDOWN = 5
+CODE_BUTTONUP = 6
+CODE_WHEEL = 7
+
+
+@dataclass
+class PolledFrame:
+    """Zdarzenia jednej klatki wraz z czasem"""
+    events: List
+    frame_time: float
+    timestamp: float
+
+
+@dataclass
+class Recording:
+    """Wczytane nagranie sesji"""
+    display: Tuple[int, int]
+    config: Dict
+    frames: List[PolledFrame] = field(default_factory=list)
+
+
+def encode_event(event) -> Optional[bytes]:
+    """Koduje zdarzenie pygame; zwraca None dla nieobsługiwanych typów"""
+    if event.type == pygame.QUIT:
+        return EVENT_CODE.pack(CODE_QUIT)
+    if event.type == pygame.MOUSEMOTION:
+        buttons = sum(1 << i for i, pressed in enumerate(event.buttons[:8]) if pressed)
+        return EVENT_CODE.pack(CODE_MOTION) + MOTION.pack(
+            event.pos[0], event.pos[1], event.rel[0], event.rel[1], buttons)
+    if event.type in (pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP):
+        code = CODE_BUTTONDOWN if event.type == pygame.MOUSEBUTTONDOWN else CODE_BUTTONUP
+        return EVENT_CODE.pack(code) + BUTTON.pack(event.pos[0], event.pos[1], event.button)
+    if event.type in (pygame.KEYDOWN, pygame.KEYUP):
+        code = CODE_KEYDOWN if event.type == pygame.KEYDOWN else CODE_KEYUP
+        text = getattr(event, 'unicode', '').encode('utf-8')[:255]
+        return EVENT_CODE.pack(code) + KEY.pack(event.key, event.mod & 0xFFFF, len(text)) + text
+    if event.type == pygame.MOUSEWHEEL:
+        return EVENT_CODE.pack(CODE_WHEEL) + WHEEL.pack(event.x, event.y)
+    return None
+
+
+def decode_event(stream: io.BufferedIOBase):
+    """Odczytuje jedno zdarzenie ze strumienia"""
+    code, = EVENT_CODE.unpack(stream.read(EVENT_CODE.size))
+    if code == CODE_QUIT:
+        return pygame.event.Event(pygame.QUIT)
+    if code == CODE_MOTION:
+        x, y, rx, ry, buttons = MOTION.unpack(stream.read(MOTION.size))
+        return pygame.event.Event(pygame.MOUSEMOTION, pos=(x, y), rel=(rx, ry),
+                                  buttons=tuple(bool(buttons & (1 << i)) for i in range(3)))
+    if code in (CODE_BUTTONDOWN, CODE_BUTTONUP):
+        x, y, button = BUTTON.unpack(stream.read(BUTTON.size))
+        event_type = pygame.MOUSEBUTTONDOWN if code == CODE_BUTTONDOWN else pygame.MOUSEBUTTONUP
+        return pygame.event.Event(event_type, pos=(x, y), button=button)
+    if code in (CODE_KEYDOWN, CODE_KEYUP):
+        key, mod, length = KEY.unpack(stream.read(KEY.size))
+        text = stream.read(length).decode('utf-8', errors='replace')
+        event_type = pygame.KEYDOWN if code == CODE_KEYDOWN else pygame.KEYUP
+        return pygame.event.Event(event_type, key=key, mod=mod, unicode=text)
+    if code == CODE_WHEEL:
+        x, y = WHEEL.unpack(stream.read(WHEEL.size))
+        return pygame.event.Event(pygame.MOUSEWHEEL, x=x, y=y)
+    raise ValueError(f"Nieznany kod zdarzenia w nagraniu: {code}")
+
+
+class EventRecorder:
+    """Zapisuje strumień zdarzeń do zwartego pliku binarnego"""
+
+    def __init__(self, filename: str, display: Tuple[int, int], config: Dict):
+        self.filename = filename
+        self.file = open(filename, 'wb')
+        self.frame_index = 0
+
+        config_blob = zlib.compress(json.dumps(config, ensure_ascii=False).encode('utf-8'))
+        self.file.write(MAGIC)
+        self.file.write(HEADER.pack(VERSION, display[0], display[1], len(config_blob)))
+        self.file.write(config_blob)
+
+    def record_frame(self, frame: PolledFrame):
+        """Zapisuje jedną klatkę zdarzeń"""
+        encoded = [data for data in map(encode_event, frame.events) if data is not None]
+        self.file.write(FRAME.pack(self.frame_index, frame.timestamp, frame.frame_time, len(encoded)))
+        for data in encoded:
+            self.file.write(data)
+        self.frame_index += 1
+
+    def close(self):
+        if not self.file.closed:
+            self.file.close()
+
+
+def read_recording(filename: str) -> Recording:
+    """Wczytuje nagranie sesji"""
+    with open(filename, 'rb') as f:
+        stream = io.BufferedReader(io.BytesIO(f.read()))
+
+    if stream.read(len(MAGIC)) != MAGIC:
+        raise ValueError(f"{filename} nie jest nagraniem sesji symulatora")
+    version, width, height, config_length = HEADER.unpack(stream.read(HEADER.size))
+    if version != VERSION:
+        raise ValueError(f"Nieobsługiwana wersja nagrania: {version}")
+    config = json.loads(zlib.decompress(stream.read(config_length)).decode('utf-8'))
+
+    recording = Recording(display=(width, height), config=config)
+    while True:
+        header = stream.read(FRAME.size)
+        if len(header) < FRAME.size:
+            break
+        _, timestamp, frame_time, count = FRAME.unpack(header)
+        events = [decode_event(stream) for _ in range(count)]
+        recording.frames.append(PolledFrame(events, frame_time, timestamp))
+    return recording
+
+
+class LiveEventSource:
+    """Zdarzenia z kolejki pygame i czas rzeczywisty"""
+
+    realtime = True
+
+    def __init__(self):
+        self.start_time = time.perf_counter()
+        self.last_time = self.start_time
+
+    def poll(self) -> Optional[PolledFrame]:
+        now = time.perf_counter()
+        frame = PolledFrame(pygame.event.get(), now - self.last_time, now - self.start_time)
+        self.last_time = now
+        return frame
+
+
+class RecordingEventSource:
+    """Przekazuje zdarzenia dalej i jednocześnie je nagrywa"""
+
+    def __init__(self, source, recorder: EventRecorder):
+        self.source = source
+        self.recorder = recorder
+
+    @property
+    def realtime(self) -> bool:
+        return self.source.realtime
+
+    def poll(self) -> Optional[PolledFrame]:
+        frame = self.source.poll()
+        if frame is not None:
+            self.recorder.record_frame(frame)
+        return frame
+
+    def close(self):
+        self.recorder.close()
+
+
+class FixedStepEventSource:
+    """Zdarzenia ze źródła, ale stały czas klatki (nagrywanie wideo)
+
+    Czas symulacji płynie o frame_time na klatkę niezależnie od zegara, więc
+    nagrany film ma równe tempo nawet przy renderowaniu wolniejszym lub
+    szybszym niż czas rzeczywisty.
+    """
+
+    def __init__(self, source, frame_time: float):
+        self.source = source
+        self.frame_time = frame_time
+        self.frames = 0
+
+    @property
+    def realtime(self) -> bool:
+        return self.source.realtime
+
+    def poll(self) -> Optional[PolledFrame]:
+        frame = self.source.poll()
+        if frame is None:
+            return None
+        self.frames += 1
+        return PolledFrame(frame.events, self.frame_time, self.frames * self.frame_time)
+
+
+class ReplayEventSource:
+    """Odtwarza nagrane klatki - w czasie rzeczywistym lub najszybciej jak się da"""
+
+    def __init__(self, recording: Recording, realtime: bool = True):
+        self.frames: Iterator[PolledFrame] = iter(recording.frames)
+        self.total_frames = len(recording.frames)
+        self.realtime = realtime
+        self.start_time = None
+
+    def poll(self) -> Optional[PolledFrame]:
+        frame = next(self.frames, None)
+        if frame is None:
+            return None
+        if self.realtime:
+            if self.start_time is None:
+                self.start_time = time.perf_counter() - frame.timestamp
+            delay = self.start_time + frame.timestamp - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+        return frame
+
+
+class FrameStats:
+    """Statystyki czasów klatek"""
+
+    def __init__(self):
+        self.frame_times_ms: List[float] = []
+        self.started = time.perf_counter()
+
+    def record(self, frame_ms: float):
+        self.frame_times_ms.append(frame_ms)
+
+    def summary(self) -> Dict[str, float]:
+        """Zwraca podsumowanie: średnia, percentyle, FPS"""
+        times = sorted(self.frame_times_ms)
+        if not times:
+            return {"frames": 0}
+
+        def percentile(p: float) -> float:
+            index = min(len(times) - 1, max(0, int(math.ceil(p * len(times))) - 1))
+            return times[index]
+
+        mean = sum(times) / len(times)
+        wall = time.perf_counter() - self.started
+        return {
+            "frames": len(times),
+            "mean_ms": mean,
+            "p50_ms": percentile(0.50),
+            "p95_ms": percentile(0.95),
+            "p99_ms": percentile(0.99),
+            "max_ms": times[-1],
+            "min_ms": times[0],
+            "mean_fps": 1000.0 / mean if mean > 0 else 0.0,
+            "wall_time_s": wall,
+        }
+
+    def format(self) -> str:
+        """Czytelny raport tekstowy"""
+        s = self.summary()
+        if not s.get("frames"):
+            return "Brak klatek"
+        return (f"Klatki: {s['frames']}  średnio {s['mean_ms']:.2f}ms ({s['mean_fps']:.1f} FPS)  "
+                f"p50 {s['p50_ms']:.2f}ms  p95 {s['p95_ms']:.2f}ms  p99 {s['p99_ms']:.2f}ms  "
+                f"max {s['max_ms']:.2f}ms  czas {s['wall_time_s']:.1f}s")
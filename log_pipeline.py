@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Nieblokujące logowanie dla Earth Simulator Enhanced
+Autor: Adrian Lesniak
+
+Wątek renderowania tylko wkłada rekordy do kolejki (QueueHandler); zapis do
+pliku i na konsolę wykonuje wątek tła (QueueListener). Dzięki temu opóźnienia
+dysku nie pojawiają się jako przycięcia klatek. Plik logów jest rotowany,
+a powtarzające się błędy z tego samego miejsca w kodzie są ograniczane.
+
+Rotacji jednego pliku nie może wykonywać kilka procesów naraz - procesy
+robocze (batch_render) ustawiają pustą zmienną EARTH_SIMULATOR_LOG i logują
+tylko na konsolę.
+"""
+
+import atexit
+import logging
+import logging.handlers
+import os
+import queue
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+LOG_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+
+# Zastępuje nazwę pliku logów; pusta wartość wyłącza zapis do pliku
+LOG_FILE_ENV = 'EARTH_SIMULATOR_LOG'
+
+
+class RateLimitFilter(logging.Filter):
+    """Przepuszcza najwyżej `burst` rekordów z jednego miejsca w kodzie na `interval` sekund
+
+    Miejsce identyfikuje plik i numer linii wywołania - komunikaty budowane
+    f-stringami (np. "Błąd zoom: {e}") różnią się treścią, ale nie źródłem.
+    Rekordy poniżej `level` nie są ograniczane. Liczba pominiętych powtórzeń
+    dopisywana jest do pierwszego przepuszczonego rekordu po przerwie.
+    Filtr działa w wątku wywołującym logger (renderowanie, wątek symulacji,
+    serwer sterowania, wątki tła) - okna zmieniane są pod blokadą.
+    """
+
+    def __init__(self, burst: int = 5, interval: float = 10.0, level: int = logging.WARNING,
+                 clock=time.monotonic):
+        super().__init__()
+        self.burst = burst
+        self.interval = interval
+        self.level = level
+        self.clock = clock
+        # źródło -> (początek okna, liczba w oknie, pominięte)
+        self.windows: Dict[Tuple[str, int], Tuple[float, int, int]] = {}
+        self.suppressed_total = 0
+        self.lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno < self.level:
+            return True
+
+        key = (record.pathname, record.lineno)
+        with self.lock:
+            now = self.clock()
+            start, count, suppressed = self.windows.get(key, (now, 0, 0))
+            if now - start >= self.interval:
+                start, count = now, 0
+
+            if count >= self.burst:
+                self.windows[key] = (start, count, suppressed + 1)
+                self.suppressed_total += 1
+                return False
+            self.windows[key] = (start, count + 1, 0)
+
+        if suppressed:
+            record.msg = f"{record.getMessage()} (pominięto {suppressed} powtórzeń)"
+            record.args = None
+        return True
+
+
+class LogPipeline:
+    """Kolejka logów z wątkiem zapisującym"""
+
+    def __init__(self, filename: Optional[str] = 'earth_simulator.log', level: int = logging.INFO,
+                 max_bytes: int = 1024 * 1024, backup_count: int = 3, console: bool = True,
+                 rate_limit: Optional[RateLimitFilter] = None):
+        self.queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+        self.rate_limit = rate_limit or RateLimitFilter()
+
+        formatter = logging.Formatter(LOG_FORMAT)
+        handlers = []
+        if filename:
+            # delay=True - plik otwierany przy pierwszym rekordzie, w wątku tła
+            file_handler = logging.handlers.RotatingFileHandler(
+                filename, maxBytes=max_bytes, backupCount=backup_count,
+                encoding='utf-8', delay=True)
+            handlers.append(file_handler)
+        if console:
+            handlers.append(logging.StreamHandler())
+        for handler in handlers:
+            handler.setFormatter(formatter)
+
+        self.handler = logging.handlers.QueueHandler(self.queue)
+        self.handler.addFilter(self.rate_limit)
+        self.listener = logging.handlers.QueueListener(self.queue, *handlers,
+                                                       respect_handler_level=True)
+        self.level = level
+        self.started = False
+
+    def install(self, logger: Optional[logging.Logger] = None) -> "LogPipeline":
+        """Podłącza kolejkę do loggera (domyślnie głównego) i uruchamia wątek zapisu"""
+        logger = logger or logging.getLogger()
+        # Zastępuje handlery z wcześniejszego basicConfig (np. compatibility_fix)
+        for handler in list(logger.handlers):
+            logger.removeHandler(handler)
+        logger.addHandler(self.handler)
+        logger.setLevel(self.level)
+        self.listener.start()
+        self.started = True
+        atexit.register(self.stop)
+        return self
+
+    def stop(self):
+        """Opróżnia kolejkę i zatrzymuje wątek zapisu"""
+        if self.started:
+            self.started = False
+            self.listener.stop()
+            for handler in self.listener.handlers:
+                handler.close()
+
+
+def log_filename(default: Optional[str]) -> Optional[str]:
+    """Plik logów z uwzględnieniem EARTH_SIMULATOR_LOG (None - bez pliku)"""
+    return os.environ.get(LOG_FILE_ENV, default) or None
+
+
+def setup_logging(filename: Optional[str] = 'earth_simulator.log', **kwargs) -> LogPipeline:
+    """Konfiguruje nieblokujące logowanie dla całego programu"""
+    return LogPipeline(log_filename(filename), **kwargs).install()
@@ -0,0 +1,330 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Profilowanie pamięci dla Earth Simulator Enhanced
+Autor: Adrian Lesniak
+
+Trzy niezależne części o małym narzucie:
+- MemoryAccounting - bajty zajęte przez podsystemy (tekstury, siatki,
+  nakładki, bufory odczytu, kolejki). Podsystem rejestruje funkcję zwracającą
+  swój rozmiar; funkcje wywoływane są w wątku głównym co kilkadziesiąt klatek,
+  więc nie wymagają blokad w kodzie renderowania.
+- MemorySampler - wątek tła próbkujący RSS procesu i ostatnią sumę pamięci GPU
+  (historia i szczyt bez wywołań w pętli głównej).
+- AllocationTracker - opcjonalny tracemalloc: szczyt alokacji w obrębie
+  klatki (pamięć przydzielona i zwolniona w tej samej klatce) oraz różnice
+  migawek co interval klatek - linie kodu, w których pamięć rośnie z klatki
+  na klatkę. tracemalloc spowalnia program kilkukrotnie, dlatego jest
+  włączany tylko na żądanie (--tracemalloc).
+"""
+
+import collections
+import json
+import logging
+import os
+import threading
+import time
+import tracemalloc
+from dataclasses import dataclass
+from typing import Callable, Deque, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Co ile klatek odświeżać rozliczenie podsystemów
+ACCOUNTING_INTERVAL = 30
+SAMPLE_INTERVAL = 0.5
+HISTORY_SIZE = 600
+
+
+def read_rss() -> Optional[int]:
+    """Bieżący RSS procesu w bajtach (psutil, /proc albo None)"""
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss
+    except ImportError:
+        pass
+    except Exception as e:
+        logger.debug(f"psutil: {e}")
+    try:
+        with open('/proc/self/statm', 'r') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def format_bytes(size: float) -> str:
+    """Rozmiar w czytelnej postaci (B, KB, MB, GB)"""
+    for unit in ("B", "KB", "MB"):
+        if abs(size) < 1024:
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.2f} GB"
+
+
+@dataclass
+class _Source:
+    function: Callable[[], int]
+    gpu: bool
+    bytes: int = 0
+
+
+class MemoryAccounting:
+    """Rozmiary podsystemów liczone przez zarejestrowane funkcje"""
+
+    def __init__(self):
+        self.sources: Dict[str, _Source] = {}
+        self.lock = threading.Lock()
+        self.gpu_bytes = 0
+        self.cpu_bytes = 0
+
+    def register(self, subsystem: str, function: Callable[[], int], gpu: bool = True):
+        """Rejestruje podsystem; function() zwraca zajęte bajty"""
+        with self.lock:
+            self.sources[subsystem] = _Source(function, gpu)
+
+    def refresh(self):
+        """Odczytuje rozmiary wszystkich podsystemów (wątek główny)"""
+        values = {}
+        for name, source in list(self.sources.items()):
+            try:
+                values[name] = max(0, int(source.function()))
+            except Exception as e:
+                logger.debug(f"Rozliczenie pamięci {name}: {e}")
+                values[name] = source.bytes
+        with self.lock:
+            for name, value in values.items():
+                self.sources[name].bytes = value
+            self.gpu_bytes = sum(s.bytes for s in self.sources.values() if s.gpu)
+            self.cpu_bytes = sum(s.bytes for s in self.sources.values() if not s.gpu)
+
+    def breakdown(self) -> Dict[str, Dict]:
+        """{podsystem: {"bytes": n, "gpu": bool}}"""
+        with self.lock:
+            return {name: {"bytes": s.bytes, "gpu": s.gpu} for name, s in self.sources.items()}
+
+
+class MemorySampler:
+    """Wątek tła próbkujący RSS i pamięć GPU z rozliczenia"""
+
+    def __init__(self, accounting: MemoryAccounting, interval: float = SAMPLE_INTERVAL,
+                 history: int = HISTORY_SIZE, read: Callable[[], Optional[int]] = read_rss):
+        self.accounting = accounting
+        self.interval = interval
+        self.read = read
+        self.samples: Deque[Tuple[float, Optional[int], int]] = collections.deque(maxlen=history)
+        self.peak_rss = 0
+        self.peak_gpu = 0
+        self.start_time = time.perf_counter()
+        self.stop_event = threading.Event()
+        self.thread: Optional[threading.Thread] = None
+
+    def start(self):
+        if self.thread is None:
+            self.stop_event.clear()
+            self.thread = threading.Thread(target=self._run, name="memory-sampler", daemon=True)
+            self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join(timeout=2.0)
+            self.thread = None
+
+    def sample(self) -> Tuple[float, Optional[int], int]:
+        """Pobiera jedną próbkę (wywoływane przez wątek; także bezpośrednio)"""
+        rss = self.read()
+        gpu = self.accounting.gpu_bytes
+        sample = (time.perf_counter() - self.start_time, rss, gpu)
+        self.samples.append(sample)
+        if rss is not None:
+            self.peak_rss = max(self.peak_rss, rss)
+        self.peak_gpu = max(self.peak_gpu, gpu)
+        return sample
+
+    @property
+    def latest(self) -> Optional[Tuple[float, Optional[int], int]]:
+        return self.samples[-1] if self.samples else None
+
+    def _run(self):
+        while not self.stop_event.is_set():
+            try:
+                self.sample()
+            except Exception as e:
+                logger.warning(f"Błąd próbkowania pamięci: {e}")
+            self.stop_event.wait(self.interval)
+
+
+class AllocationTracker:
+    """Alokacje Pythona na klatkę (tracemalloc)"""
+
+    def __init__(self, interval_frames: int = 120, top: int = 10, depth: int = 1):
+        self.interval_frames = max(1, int(interval_frames))
+        self.top = top
+        self.depth = depth
+        self.enabled = False
+        self.owns_tracing = False
+        self.frames = 0
+        self.frame_base = 0
+        self.transient_last = 0
+        self.transient_max = 0
+        self.transient_total = 0
+        self.snapshot: Optional[tracemalloc.Snapshot] = None
+        self.snapshot_frame = 0
+        self.snapshot_ms = 0.0
+        self.growth: List[Dict] = []
+
+    def start(self):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.depth)
+            self.owns_tracing = True
+        self.enabled = True
+        self.snapshot = self._take_snapshot()
+        self.snapshot_frame = self.frames
+
+    def stop(self):
+        if self.owns_tracing and tracemalloc.is_tracing():
+            tracemalloc.stop()
+        self.enabled = False
+        self.owns_tracing = False
+        self.snapshot = None
+
+    def frame_begin(self):
+        if not self.enabled:
+            return
+        tracemalloc.reset_peak()
+        self.frame_base = tracemalloc.get_traced_memory()[0]
+
+    def frame_end(self):
+        if not self.enabled:
+            return
+        peak = tracemalloc.get_traced_memory()[1]
+        self.transient_last = peak - self.frame_base
+        self.transient_max = max(self.transient_max, self.transient_last)
+        self.transient_total += self.transient_last
+        self.frames += 1
+        if self.frames - self.snapshot_frame >= self.interval_frames:
+            self.compare()
+
+    def compare(self):
+        """Różnica migawek od poprzedniej - przyrost na klatkę według linii kodu"""
+        start = time.perf_counter()
+        snapshot = self._take_snapshot()
+        frames = max(1, self.frames - self.snapshot_frame)
+        if self.snapshot is not None:
+            stats = snapshot.compare_to(self.snapshot, 'lineno')
+            stats.sort(key=lambda s: abs(s.size_diff), reverse=True)
+            self.growth = [{
+                "location": f"{s.traceback[0].filename}:{s.traceback[0].lineno}",
+                "bytes_per_frame": s.size_diff / frames,
+                "blocks_per_frame": s.count_diff / frames,
+                "bytes": s.size
+            } for s in stats[:self.top] if s.size_diff]
+        self.snapshot = snapshot
+        self.snapshot_frame = self.frames
+        self.snapshot_ms = (time.perf_counter() - start) * 1000.0
+
+    @staticmethod
+    def _take_snapshot() -> tracemalloc.Snapshot:
+        return tracemalloc.take_snapshot().filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+            tracemalloc.Filter(False, "<unknown>"),
+        ])
+
+    def summary(self) -> Dict:
+        return {
+            "frames": self.frames,
+            "transient_bytes_last": self.transient_last,
+            "transient_bytes_max": self.transient_max,
+            "transient_bytes_mean": self.transient_total / max(1, self.frames),
+            "traced_bytes": tracemalloc.get_traced_memory()[0] if self.enabled else 0,
+            "snapshot_ms": self.snapshot_ms,
+            "growth": self.growth
+        }
+
+
+class MemoryProfiler:
+    """Rozliczenie podsystemów, próbkowanie w tle i (opcjonalnie) tracemalloc"""
+
+    def __init__(self, sample_interval: float = SAMPLE_INTERVAL,
+                 accounting_interval: int = ACCOUNTING_INTERVAL):
+        self.accounting = MemoryAccounting()
+        self.sampler = MemorySampler(self.accounting, sample_interval)
+        self.allocations: Optional[AllocationTracker] = None
+        self.accounting_interval = max(1, int(accounting_interval))
+        self.frame = 0
+
+    def register(self, subsystem: str, function: Callable[[], int], gpu: bool = True):
+        self.accounting.register(subsystem, function, gpu)
+
+    def trace_allocations(self, snapshot_interval: int = 120):
+        """Włącza śledzenie alokacji (tracemalloc) od najbliższego start()"""
+        self.allocations = AllocationTracker(snapshot_interval)
+
+    def start(self):
+        self.accounting.refresh()
+        self.sampler.start()
+        if self.allocations is not None and not self.allocations.enabled:
+            self.allocations.start()
+
+    def stop(self):
+        self.sampler.stop()
+        if self.allocations is not None:
+            self.allocations.stop()
+
+    def frame_begin(self):
+        if self.allocations is not None:
+            self.allocations.frame_begin()
+
+    def frame_end(self):
+        """Wywoływane raz na klatkę w wątku głównym"""
+        self.frame += 1
+        if self.frame % self.accounting_interval == 0:
+            self.accounting.refresh()
+        if self.allocations is not None:
+            self.allocations.frame_end()
+
+    def summary(self) -> Dict:
+        """Stan pamięci do eksportu (JSON)"""
+        latest = self.sampler.latest
+        summary = {
+            "rss_bytes": latest[1] if latest else read_rss(),
+            "peak_rss_bytes": self.sampler.peak_rss,
+            "gpu_bytes": self.accounting.gpu_bytes,
+            "peak_gpu_bytes": self.sampler.peak_gpu,
+            "cpu_accounted_bytes": self.accounting.cpu_bytes,
+            "subsystems": self.accounting.breakdown(),
+            "samples": [{"time": round(t, 3), "rss_bytes": rss, "gpu_bytes": gpu}
+                        for t, rss, gpu in list(self.sampler.samples)]
+        }
+        if self.allocations is not None:
+            summary["allocations"] = self.allocations.summary()
+        return summary
+
+    def format_lines(self) -> List[str]:
+        """Wiersze do panelu statystyk"""
+        latest = self.sampler.latest
+        rss = latest[1] if latest else None
+        lines = [f"Pamięć: RSS {format_bytes(rss) if rss else '?'} "
+                 f"(szczyt {format_bytes(self.sampler.peak_rss)}), "
+                 f"GPU ~{format_bytes(self.accounting.gpu_bytes)}"]
+        parts = [f"{name} {format_bytes(entry['bytes'])}{'' if entry['gpu'] else ' (RAM)'}"
+                 for name, entry in self.accounting.breakdown().items() if entry["bytes"]]
+        if parts:
+            lines.append("  " + ", ".join(parts))
+        if self.allocations is not None and self.allocations.frames:
+            allocations = self.allocations
+            growth = sum(g["bytes_per_frame"] for g in allocations.growth)
+            lines.append(f"Alokacje/klatkę: {format_bytes(allocations.transient_last)} "
+                         f"(max {format_bytes(allocations.transient_max)}), "
+                         f"przyrost {format_bytes(growth)}")
+        return lines
+
+    def export_json(self, path: str):
+        """Zapisuje podsumowanie do pliku JSON"""
+        self.accounting.refresh()
+        self.sampler.sample()
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.summary(), f, indent=2)
+        logger.info(f"Profil pamięci zapisany do {path}")
@@ -0,0 +1,412 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Rejestr metryk wydajności dla Earth Simulator Enhanced
+Autor: Adrian Lesniak
+
+Liczniki, wskaźniki (gauge) i histogramy w jednym rejestrze procesu
+(metrics), eksportowane okresowo przez wątek tła jako linie JSON albo tekst
+w formacie Prometheus - do pliku lub gniazda (tcp://, udp://).
+
+Zapis w gorącej ścieżce (pętla główna, wątki tła) to jedno deque.append -
+operacja atomowa w CPython, bez blokad. Wartości sumowane są dopiero przy
+odczycie (eksport, podsumowanie) pod blokadą, której zapisujący nie
+dotykają; przy długim braku odczytu kolejkę opróżnia co jakiś czas sam
+zapisujący.
+
+Histogramy są logarytmiczno-liniowe (jak HdrHistogram): każda potęga
+dwójki dzielona jest na HISTOGRAM_SUB_BUCKETS przedziałów, więc błąd
+względny percentyli nie przekracza ~1.6% w całym zakresie wartości
+(od mikrosekund do minut) przy stałej, małej liczbie kubełków.
+"""
+
+import collections
+import json
+import logging
+import math
+import os
+import socket
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Callable, Deque, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+logger = logging.getLogger(__name__)
+
+HISTOGRAM_SUB_BUCKETS = 32
+# Zapisujący opróżnia kolejkę sam, gdy nikt jej nie czyta
+DRAIN_THRESHOLD = 4096
+QUANTILES = (0.5, 0.9, 0.99)
+FORMATS = ("jsonl", "prometheus")
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help_text: str = "", labels: Labels = ()):
+        self.name = name
+        self.help = help_text
+        self.labels = labels
+        self.pending: Deque[float] = collections.deque()
+        self.lock = threading.Lock()
+
+    def _record(self, value: float):
+        self.pending.append(value)
+        if len(self.pending) > DRAIN_THRESHOLD:
+            self.drain()
+
+    def drain(self):
+        """Przenosi zapisane wartości do agregatu (pod blokadą odczytu)"""
+        with self.lock:
+            pending = self.pending
+            while pending:
+                try:
+                    self._aggregate(pending.popleft())
+                except IndexError:
+                    break
+
+    def _aggregate(self, value: float):
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """Licznik rosnący (zdarzenia, bajty)"""
+    kind = "counter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.total = 0.0
+
+    def inc(self, amount: float = 1.0):
+        self._record(amount)
+
+    def _aggregate(self, value: float):
+        self.total += value
+
+    @property
+    def value(self) -> float:
+        self.drain()
+        return self.total
+
+
+class Gauge(_Metric):
+    """Wartość chwilowa - ustawiana albo odczytywana z funkcji przy eksporcie
+
+    Funkcja wywoływana jest w wątku eksportu - może tylko czytać stan.
+    """
+    kind = "gauge"
+
+    def __init__(self, *args, function: Optional[Callable[[], float]] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.current = 0.0
+        self.function = function
+
+    def set(self, value: float):
+        self.current = value              # przypisanie jest atomowe
+
+    def drain(self):
+        pass
+
+    @property
+    def value(self) -> float:
+        if self.function is not None:
+            try:
+                return float(self.function())
+            except Exception as e:
+                logger.debug(f"Metryka {self.name}: {e}")
+                return math.nan
+        return self.current
+
+
+class Histogram(_Metric):
+    """Histogram logarytmiczno-liniowy (czasy w ms, rozmiary)"""
+    kind = "histogram"
+
+    def __init__(self, *args, sub_buckets: int = HISTOGRAM_SUB_BUCKETS, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.sub_buckets = sub_buckets
+        self.buckets: Dict[int, int] = {}
+        self.count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def observe(self, value: float):
+        self._record(value)
+
+    def time(self) -> "Timer":
+        """with histogram.time(): ... - zapisuje czas bloku w ms"""
+        return Timer(self)
+
+    def _bucket(self, value: float) -> int:
+        if value <= 0:
+            return -(1 << 30)              # zero i wartości ujemne - wspólny kubełek
+        mantissa, exponent = math.frexp(value)   # mantissa w [0.5, 1)
+        return exponent * self.sub_buckets + int((mantissa - 0.5) * 2 * self.sub_buckets)
+
+    def _bucket_value(self, bucket: int) -> float:
+        if bucket == -(1 << 30):
+            return 0.0
+        exponent, sub = divmod(bucket, self.sub_buckets)
+        return math.ldexp(0.5 + (sub + 0.5) / (2 * self.sub_buckets), exponent)
+
+    def _aggregate(self, value: float):
+        bucket = self._bucket(value)
+        self.buckets[bucket] = self.buckets.get(bucket, 0) + 1
+        self.count += 1
+        self.sum += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def quantile(self, q: float) -> float:
+        """Percentyl (środek kubełka, ograniczony do min/max)"""
+        self.drain()
+        with self.lock:
+            if not self.count:
+                return math.nan
+            rank = max(1, math.ceil(q * self.count))
+            seen = 0
+            for bucket in sorted(self.buckets):
+                seen += self.buckets[bucket]
+                if seen >= rank:
+                    return min(self.max, max(self.min, self._bucket_value(bucket)))
+            return self.max
+
+    def snapshot(self) -> Dict[str, float]:
+        """Liczba, suma, min/max i percentyle"""
+        self.drain()
+        result = {"count": self.count, "sum": self.sum,
+                  "min": self.min if self.count else math.nan,
+                  "max": self.max if self.count else math.nan}
+        for q in QUANTILES:
+            result[f"p{q * 100:g}"] = self.quantile(q)
+        return result
+
+
+class Timer:
+    """Mierzy czas bloku with i zapisuje go w histogramie [ms]"""
+
+    __slots__ = ("histogram", "start")
+
+    def __init__(self, histogram: Histogram):
+        self.histogram = histogram
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe((time.perf_counter() - self.start) * 1000.0)
+        return False
+
+
+class MetricsRegistry:
+    """Metryki procesu; ta sama nazwa i etykiety zwracają ten sam obiekt"""
+
+    def __init__(self):
+        self.metrics: Dict[Tuple[str, Labels], _Metric] = {}
+        self.lock = threading.Lock()
+
+    def _get(self, cls, name: str, help_text: str, labels: Optional[Dict[str, str]],
+             **kwargs) -> _Metric:
+        key = (name, tuple(sorted((labels or {}).items())))
+        with self.lock:
+            metric = self.metrics.get(key)
+            if metric is None:
+                metric = self.metrics[key] = cls(name, help_text, key[1], **kwargs)
+            elif not isinstance(metric, cls):
+                raise ValueError(f"Metryka {name} jest już typu {metric.kind}")
+            return metric
+
+    def counter(self, name: str, help_text: str = "",
+                labels: Optional[Dict[str, str]] = None) -> Counter:
+        return self._get(Counter, name, help_text, labels)
+
+    def gauge(self, name: str, help_text: str = "", labels: Optional[Dict[str, str]] = None,
+              function: Optional[Callable[[], float]] = None) -> Gauge:
+        gauge = self._get(Gauge, name, help_text, labels)
+        if function is not None:
+            gauge.function = function
+        return gauge
+
+    def histogram(self, name: str, help_text: str = "",
+                  labels: Optional[Dict[str, str]] = None) -> Histogram:
+        return self._get(Histogram, name, help_text, labels)
+
+    def collect(self) -> List[_Metric]:
+        with self.lock:
+            return sorted(self.metrics.values(), key=lambda m: (m.name, m.labels))
+
+    def to_json(self, labels: Optional[Dict[str, str]] = None) -> Dict:
+        """Stan wszystkich metryk jako słownik (jedna linia eksportu JSON)"""
+        record = {"timestamp": datetime.now(timezone.utc).isoformat(timespec='milliseconds'),
+                  "labels": labels or {}, "counters": {}, "gauges": {}, "histograms": {}}
+        groups = {"counter": "counters", "gauge": "gauges", "histogram": "histograms"}
+        for metric in self.collect():
+            value = metric.snapshot() if isinstance(metric, Histogram) else metric.value
+            record[groups[metric.kind]][_series_name(metric.name, metric.labels)] = value
+        return record
+
+    def to_prometheus(self, labels: Optional[Dict[str, str]] = None) -> str:
+        """Format tekstowy Prometheus; histogramy jako summary z percentylami"""
+        common = tuple(sorted((labels or {}).items()))
+        lines = []
+        described = set()
+        for metric in self.collect():
+            kind = "summary" if isinstance(metric, Histogram) else metric.kind
+            if metric.name not in described:
+                described.add(metric.name)
+                if metric.help:
+                    lines.append(f"# HELP {metric.name} {_escape(metric.help)}")
+                lines.append(f"# TYPE {metric.name} {kind}")
+            series = common + metric.labels
+            if isinstance(metric, Histogram):
+                snapshot = metric.snapshot()
+                for q in QUANTILES:
+                    lines.append(f"{metric.name}{_format_labels(series + (('quantile', f'{q:g}'),))} "
+                                 f"{_format_value(snapshot[f'p{q * 100:g}'])}")
+                lines.append(f"{metric.name}_sum{_format_labels(series)} "
+                             f"{_format_value(snapshot['sum'])}")
+                lines.append(f"{metric.name}_count{_format_labels(series)} {snapshot['count']}")
+            else:
+                lines.append(f"{metric.name}{_format_labels(series)} {_format_value(metric.value)}")
+        return "\n".join(lines) + "\n"
+
+
+def _series_name(name: str, labels: Labels) -> str:
+    return name + _format_labels(labels)
+
+
+def _format_labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels) + "}"
+
+
+def _escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_value(value: float) -> str:
+    if math.isnan(value):
+        return "NaN"
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class MetricsExporter:
+    """Wątek tła zapisujący metryki co interval sekund
+
+    target: ścieżka pliku, tcp://host:port albo udp://host:port.
+    jsonl dopisuje linię do pliku; prometheus nadpisuje plik atomowo (do
+    odczytu np. przez textfile collector node_exportera). Przez gniazdo
+    wysyłany jest cały blok tekstu na raz; zerwane połączenie TCP jest
+    odnawiane przy kolejnym eksporcie.
+    """
+
+    def __init__(self, registry: MetricsRegistry, target: str, fmt: str = "jsonl",
+                 interval: float = 10.0, labels: Optional[Dict[str, str]] = None):
+        if fmt not in FORMATS:
+            raise ValueError(f"Nieznany format metryk: {fmt} (dostępne: {', '.join(FORMATS)})")
+        self.registry = registry
+        self.target = target
+        self.format = fmt
+        self.interval = max(0.1, float(interval))
+        self.labels = labels if labels is not None else {"host": socket.gethostname()}
+        self.exports = 0
+        self.errors = 0
+        self.socket: Optional[socket.socket] = None
+        parsed = urlparse(target)
+        self.scheme = parsed.scheme if parsed.scheme in ("tcp", "udp") else "file"
+        if self.scheme != "file":
+            if not parsed.hostname or not parsed.port:
+                raise ValueError(f"Adres metryk musi mieć postać {self.scheme}://host:port")
+            self.address = (parsed.hostname, parsed.port)
+        self.stop_event = threading.Event()
+        self.thread: Optional[threading.Thread] = None
+
+    def start(self) -> "MetricsExporter":
+        if self.thread is None:
+            self.stop_event.clear()
+            self.thread = threading.Thread(target=self._run, name="metrics-exporter", daemon=True)
+            self.thread.start()
+        return self
+
+    def stop(self):
+        """Zatrzymuje wątek i wykonuje ostatni eksport"""
+        if self.thread is not None:
+            self.stop_event.set()
+            self.thread.join(timeout=5.0)
+            self.thread = None
+            self.export()
+        if self.socket is not None:
+            self.socket.close()
+            self.socket = None
+
+    def _run(self):
+        while not self.stop_event.wait(self.interval):
+            self.export()
+
+    def render(self) -> str:
+        if self.format == "prometheus":
+            return self.registry.to_prometheus(self.labels)
+        # NaN (pusty histogram) jako null - poprawny JSON
+        return json.dumps(_replace_nan(self.registry.to_json(self.labels)), ensure_ascii=False,
+                          allow_nan=False, separators=(',', ':')) + "\n"
+
+    def export(self) -> bool:
+        """Jeden eksport; błędy są logowane, nie przerywają programu"""
+        try:
+            payload = self.render()
+            if self.scheme == "file":
+                self._write_file(payload)
+            else:
+                self._send(payload.encode('utf-8'))
+            self.exports += 1
+            return True
+        except (OSError, ValueError) as e:
+            self.errors += 1
+            logger.warning(f"Błąd eksportu metryk do {self.target}: {e}")
+            return False
+
+    def _write_file(self, payload: str):
+        if self.format == "jsonl":
+            with open(self.target, 'a', encoding='utf-8') as f:
+                f.write(payload)
+            return
+        temp_path = self.target + ".tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            f.write(payload)
+        os.replace(temp_path, self.target)
+
+    def _send(self, data: bytes):
+        if self.scheme == "udp":
+            if self.socket is None:
+                self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            self.socket.sendto(data, self.address)
+            return
+        try:
+            if self.socket is None:
+                self.socket = socket.create_connection(self.address, timeout=self.interval)
+            self.socket.sendall(data)
+        except OSError:
+            if self.socket is not None:
+                self.socket.close()
+                self.socket = None
+            raise
+
+
+def _replace_nan(value):
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    if isinstance(value, dict):
+        return {k: _replace_nan(v) for k, v in value.items()}
+    return value
+
+
+# Wspólny rejestr procesu
+metrics = MetricsRegistry()
@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Wskazywanie punktów na globie bez odczytu z GPU dla Earth Simulator Enhanced
+Autor: Adrian Lesniak
+
+Kursor jest odrzutowywany (unproject) macierzami kamery liczonymi na CPU
+(camera_math), a promień przecinany analitycznie ze sferą. Nie ma wywołań
+glReadPixels ani opróżniania potoku - koszt to kilka operacji na macierzach 4x4.
+
+Uwaga: draw_earth obraca glob drugi raz o kąty kamery, więc macierz modelu
+globu to T * Rx * Ry * Rx * Ry (globe_model_matrix).
+"""
+
+import math
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+import numpy as np
+
+from camera_math import rotation_x_matrix, rotation_y_matrix, view_matrix
+from simulation_clock import CameraState
+
+# Promień sfery rysowanej przez draw_earth
+GLOBE_RADIUS = 2.0
+
+
+@dataclass(frozen=True)
+class GeoPoint:
+    """Punkt na globie"""
+    latitude: float
+    longitude: float
+    position: Tuple[float, float, float]  # współrzędne modelu sfery
+
+    def format(self) -> str:
+        """Np. "52.23°N 21.01°E" """
+        ns = 'N' if self.latitude >= 0 else 'S'
+        ew = 'E' if self.longitude >= 0 else 'W'
+        return f"{abs(self.latitude):.2f}°{ns} {abs(self.longitude):.2f}°{ew}"
+
+
+def globe_model_matrix(camera: CameraState) -> np.ndarray:
+    """Macierz modelu-widoku globu (układ wierszowy), zgodna z draw_earth"""
+    return (view_matrix(camera.distance, camera.rotation_x, camera.rotation_y) @
+            rotation_x_matrix(camera.rotation_x) @ rotation_y_matrix(camera.rotation_y))
+
+
+def to_geographic(point) -> Tuple[float, float]:
+    """Współrzędne modelu -> (szerokość, długość) w stopniach
+
+    Odpowiada mapowaniu tekstury w create_sphere: u = 1 - lon/2π, więc
+    długość geograficzna = 180° - atan2(z, x).
+    """
+    x, y, z = point
+    radius = math.sqrt(x * x + y * y + z * z)
+    latitude = math.degrees(math.asin(max(-1.0, min(1.0, y / radius))))
+    longitude = 180.0 - math.degrees(math.atan2(z, x))
+    longitude = (longitude + 180.0) % 360.0 - 180.0
+    return latitude, longitude
+
+
+def from_geographic(latitude: float, longitude: float,
+                    radius: float = GLOBE_RADIUS) -> np.ndarray:
+    """(szerokość, długość) w stopniach -> współrzędne modelu"""
+    lat = math.radians(latitude)
+    lon = math.radians(180.0 - longitude)
+    return np.array([radius * math.cos(lat) * math.cos(lon),
+                     radius * math.sin(lat),
+                     radius * math.cos(lat) * math.sin(lon)])
+
+
+def cursor_ray(x: float, y: float, viewport: Tuple[int, int], projection: np.ndarray,
+               model: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Promień pod kursorem w układzie modelu: (początek, kierunek jednostkowy)"""
+    ndc_x = 2.0 * x / viewport[0] - 1.0
+    ndc_y = 1.0 - 2.0 * y / viewport[1]
+    inverse = np.linalg.inv(projection @ model)
+
+    near = inverse @ np.array([ndc_x, ndc_y, -1.0, 1.0])
+    far = inverse @ np.array([ndc_x, ndc_y, 1.0, 1.0])
+    near = near[:3] / near[3]
+    far = far[:3] / far[3]
+
+    direction = far - near
+    return near, direction / np.linalg.norm(direction)
+
+
+def intersect_sphere(origin: np.ndarray, direction: np.ndarray,
+                     radius: float = GLOBE_RADIUS) -> Optional[np.ndarray]:
+    """Najbliższe przecięcie promienia ze sferą o środku w zerze (None = chybienie)"""
+    b = float(np.dot(origin, direction))
+    c = float(np.dot(origin, origin)) - radius * radius
+    discriminant = b * b - c
+    if discriminant < 0.0:
+        return None
+    root = math.sqrt(discriminant)
+    t = -b - root
+    if t < 0.0:
+        t = -b + root  # początek promienia wewnątrz sfery
+        if t < 0.0:
+            return None
+    return origin + t * direction
+
+
+def pick(x: float, y: float, viewport: Tuple[int, int], projection: np.ndarray,
+         camera: CameraState, radius: float = GLOBE_RADIUS) -> Optional[GeoPoint]:
+    """Zwraca punkt globu pod kursorem lub None, jeśli kursor jest poza globem"""
+    origin, direction = cursor_ray(x, y, viewport, projection, globe_model_matrix(camera))
+    hit = intersect_sphere(origin, direction, radius)
+    if hit is None:
+        return None
+    latitude, longitude = to_geographic(hit)
+    return GeoPoint(latitude, longitude, (float(hit[0]), float(hit[1]), float(hit[2])))
+
+
+def project(point, viewport: Tuple[int, int], projection: np.ndarray,
+            camera: CameraState) -> Optional[Tuple[float, float]]:
+    """Pozycja punktu modelu na ekranie (None = za kamerą)"""
+    clip = projection @ globe_model_matrix(camera) @ np.array([point[0], point[1], point[2], 1.0])
+    if clip[3] <= 1e-9:
+        return None
+    return ((clip[0] / clip[3] + 1.0) * 0.5 * viewport[0],
+            (1.0 - clip[1] / clip[3]) * 0.5 * viewport[1])
+
+
+def camera_keeping_point(point, x: float, y: float, viewport: Tuple[int, int],
+                         projection: np.ndarray, camera: CameraState,
+                         max_tilt: float = 85.0, iterations: int = 8) -> CameraState:
+    """Dobiera obroty kamery tak, aby punkt modelu pozostał pod kursorem (x, y)
+
+    Odległość kamery jest zachowana. Obroty są złożone (podwójny obrót globu),
+    więc układ rozwiązywany jest numerycznie tłumioną metodą Gaussa-Newtona
+    z jakobianem z różnic skończonych. Przy rotation_y = 180° pochylenie
+    znosi się w podwójnym obrocie (jakobian osobliwy) - zwracany jest wtedy
+    najlepszy osiągnięty stan, nigdy gorszy od wejściowego.
+    """
+    target = np.array([x, y])
+    delta = 1e-3
+    damping = 1e-2
+
+    def error_of(rx: float, ry: float):
+        screen = project(point, viewport, projection, CameraState(rx, ry, camera.distance))
+        return None if screen is None else target - np.array(screen)
+
+    rx, ry = camera.rotation_x, camera.rotation_y
+    error = error_of(rx, ry)
+    if error is None:
+        return camera
+    best = (float(np.hypot(*error)), rx, ry)
+
+    for _ in range(iterations):
+        if best[0] < 0.25:
+            break
+        moved_x = error_of(rx + delta, ry)
+        moved_y = error_of(rx, ry + delta)
+        if moved_x is None or moved_y is None:
+            break
+        # Pochodne pozycji ekranowej = -(pochodne błędu)
+        jacobian = np.column_stack([(error - moved_x) / delta, (error - moved_y) / delta])
+        normal = jacobian.T @ jacobian
+        regularization = (damping * np.trace(normal) + 1e-9) * np.identity(2)
+        step = np.linalg.solve(normal + regularization, jacobian.T @ error)
+        # Ograniczenie kroku - rozwiązanie w pobliżu bieżącego widoku
+        step = np.clip(step, -30.0, 30.0)
+        rx = max(-max_tilt, min(max_tilt, rx + float(step[0])))
+        ry += float(step[1])
+
+        error = error_of(rx, ry)
+        if error is None:
+            break
+        distance = float(np.hypot(*error))
+        if distance < best[0]:
+            best = (distance, rx, ry)
+
+    return CameraState(best[1], best[2], camera.distance)
+
+
+def _tilt_equation(tilt, direction: np.ndarray, sign: float):
+    """Równanie na pochylenie kamery (radiany) dla camera_centered_on
+
+    Zwraca (reszta, sin obrotu, cos obrotu) - obrót wyznaczony jest
+    jednoznacznie przez pochylenie i gałąź rozwiązania (sign = ±1).
+    """
+    x, y, z = direction
+    cos_tilt, sin_tilt = np.cos(tilt), np.sin(tilt)
+    norm = np.hypot(x, z + cos_tilt)
+    sin_turn, cos_turn = -sign * x / norm, sign * (z + cos_tilt) / norm
+    turned_z = -sin_turn * x + cos_turn * z
+    return cos_tilt * y - sin_tilt * turned_z - sin_tilt, sin_turn, cos_turn
+
+
+def camera_centered_on(latitude: float, longitude: float, distance: float,
+                       max_tilt: float = 85.0, samples: int = 341) -> CameraState:
+    """Obroty kamery, przy których punkt (szerokość, długość) jest w środku widoku
+
+    Środek widoku leży na osi +z, więc szukamy (Rx(a)·Ry(b))²·p = ẑ. Oznaczając
+    q = Rx(a)·Ry(b)·p mamy też q = Ry(-b)·Rx(-a)·ẑ; porównanie składowych
+    wyznacza b przez a, a pozostaje jedno równanie na pochylenie a. Jego
+    pierwiastki szukane są na siatce [-max_tilt, max_tilt] i zawężane
+    bisekcją; z rozwiązań wybierane jest najmniejsze pochylenie.
+    """
+    direction = from_geographic(latitude, longitude, 1.0)
+    grid = np.radians(np.linspace(-max_tilt, max_tilt, samples))
+    best: Optional[Tuple[float, float]] = None
+    for sign in (1.0, -1.0):
+        values = _tilt_equation(grid, direction, sign)[0]
+        for i in np.flatnonzero(np.signbit(values[:-1]) != np.signbit(values[1:])):
+            low, high, low_value = float(grid[i]), float(grid[i + 1]), float(values[i])
+            for _ in range(60):
+                middle = 0.5 * (low + high)
+                value = _tilt_equation(middle, direction, sign)[0]
+                if np.signbit(value) == np.signbit(low_value):
+                    low, low_value = middle, value
+                else:
+                    high = middle
+            tilt = 0.5 * (low + high)
+            _, sin_turn, cos_turn = _tilt_equation(tilt, direction, sign)
+            rx, ry = math.degrees(tilt), math.degrees(math.atan2(sin_turn, cos_turn))
+            rotation = (rotation_x_matrix(rx) @ rotation_y_matrix(ry))[:3, :3]
+            # Zmiana znaku na siatce może być biegunem równania, a nie pierwiastkiem
+            if np.linalg.norm(rotation @ (rotation @ direction) - (0.0, 0.0, 1.0)) > 1e-6:
+                continue
+            if best is None or abs(rx) < abs(best[0]):
+                best = (rx, ry)
+    if best is None:
+        raise ValueError(f"Nie można wycentrować widoku na {latitude:.2f}, {longitude:.2f}")
+    return CameraState(best[0], best[1], distance)
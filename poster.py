@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Zrzuty w wysokiej rozdzielczości (plakat z kafelków) dla Earth Simulator Enhanced
+Autor: Adrian Lesniak
+
+Obraz większy niż okno (np. 16384x16384) dzielony jest na siatkę kafelków.
+Każdy kafelek to wycinek ostrosłupa widzenia kamery - rzut niesymetryczny
+(frustum_matrix) wyznaczony z fov, near i far okna - renderowany do bufora
+poza ekranem. Kafelki jednego pasa (wiersza siatki) składane są w pamięci
+i dopisywane do pliku PNG wiersz po wierszu, więc w pamięci jest najwyżej
+jeden pas, a nie cały obraz.
+"""
+
+import logging
+import math
+import struct
+import time
+import zlib
+from dataclasses import dataclass
+from typing import Callable, Tuple
+
+import numpy as np
+
+from camera_math import frustum_matrix
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TILE_SIZE = 1024
+# Wynik IDAT zapisywany porcjami tej wielkości
+CHUNK_SIZE = 1 << 20
+
+
+class PngStreamWriter:
+    """Plik PNG (RGB, 8 bitów) zapisywany wiersz po wierszu, od góry"""
+
+    def __init__(self, path: str, width: int, height: int, compress_level: int = 6):
+        self.path = path
+        self.width = width
+        self.height = height
+        self.rows_written = 0
+        self.compressor = zlib.compressobj(compress_level)
+        self.pending = []
+        self.pending_size = 0
+        self.file = open(path, 'wb')
+        self.file.write(b"\x89PNG\r\n\x1a\n")
+        self._chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))
+
+    def _chunk(self, kind: bytes, data: bytes):
+        self.file.write(struct.pack(">I", len(data)))
+        self.file.write(kind)
+        self.file.write(data)
+        self.file.write(struct.pack(">I", zlib.crc32(data, zlib.crc32(kind))))
+
+    def _emit(self, data: bytes):
+        if data:
+            self.pending.append(data)
+            self.pending_size += len(data)
+        if self.pending_size >= CHUNK_SIZE:
+            self._flush_pending()
+
+    def _flush_pending(self):
+        if self.pending:
+            self._chunk(b"IDAT", b"".join(self.pending))
+            self.pending = []
+            self.pending_size = 0
+
+    def write_rows(self, rows: np.ndarray):
+        """Dopisuje wiersze (tablica wysokość x szerokość x 3, uint8)"""
+        count = rows.shape[0]
+        if rows.shape[1:] != (self.width, 3) or self.rows_written + count > self.height:
+            raise ValueError("Wiersze nie pasują do rozmiaru obrazu")
+        # Każdy wiersz PNG poprzedza bajt filtra (0 = bez filtra)
+        filtered = np.zeros((count, self.width * 3 + 1), dtype=np.uint8)
+        filtered[:, 1:] = rows.reshape(count, -1)
+        self._emit(self.compressor.compress(filtered.tobytes()))
+        self.rows_written += count
+
+    def abort(self):
+        """Zamyka niedokończony plik (np. po błędzie renderowania)"""
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+    def close(self):
+        """Kończy strumień (wymaga zapisania wszystkich wierszy)"""
+        if self.file is None:
+            return
+        try:
+            if self.rows_written != self.height:
+                raise ValueError(f"Zapisano {self.rows_written} z {self.height} wierszy")
+            self._emit(self.compressor.flush())
+            self._flush_pending()
+            self._chunk(b"IEND", b"")
+        finally:
+            self.file.close()
+            self.file = None
+
+
+def tile_projection(fov: float, aspect: float, near: float, far: float,
+                    x0: int, y0: int, x1: int, y1: int,
+                    width: int, height: int) -> np.ndarray:
+    """Rzut wycinka [x0, x1) x [y0, y1) obrazu width x height (y od góry)
+
+    Złożone kafelki dają dokładnie obraz perspective_matrix(fov, aspect, ...).
+    """
+    top = near * math.tan(math.radians(fov) / 2.0)
+    right = top * aspect
+    return frustum_matrix(-right + 2.0 * right * x0 / width,
+                          -right + 2.0 * right * x1 / width,
+                          top - 2.0 * top * y1 / height,
+                          top - 2.0 * top * y0 / height,
+                          near, far)
+
+
+@dataclass
+class PosterResult:
+    """Podsumowanie zapisanego plakatu"""
+    path: str
+    width: int
+    height: int
+    tiles: int
+    seconds: float
+
+
+def render_tiled(path: str, size: Tuple[int, int], fov: float, near: float, far: float,
+                 render_tile: Callable[[np.ndarray, int, int], bytes],
+                 tile_size: int = DEFAULT_TILE_SIZE, compress_level: int = 6) -> PosterResult:
+    """Renderuje obraz kafelkami i zapisuje go strumieniowo jako PNG
+
+    render_tile(projection, width, height) rysuje scenę z podaną macierzą
+    rzutowania (układ wierszowy) w obszarze width x height i zwraca piksele
+    RGBA (wiersze od dołu, jak glReadPixels). Proporcje obrazu wyznaczają
+    aspect - pionowy kąt widzenia fov jest zachowany.
+    """
+    width, height = size
+    if not path.lower().endswith(".png"):
+        raise ValueError(f"Plakat zapisywany jest jako PNG: {path}")
+    aspect = width / height
+    start = time.perf_counter()
+    tiles = 0
+    writer = PngStreamWriter(path, width, height, compress_level)
+    try:
+        for y0 in range(0, height, tile_size):
+            y1 = min(height, y0 + tile_size)
+            band = np.empty((y1 - y0, width, 3), dtype=np.uint8)
+            for x0 in range(0, width, tile_size):
+                x1 = min(width, x0 + tile_size)
+                projection = tile_projection(fov, aspect, near, far, x0, y0, x1, y1,
+                                             width, height)
+                pixels = render_tile(projection, x1 - x0, y1 - y0)
+                tile = np.frombuffer(pixels, dtype=np.uint8).reshape(y1 - y0, x1 - x0, 4)
+                band[:, x0:x1] = tile[::-1, :, :3]
+                tiles += 1
+            writer.write_rows(band)
+    except Exception:
+        writer.abort()
+        raise
+    writer.close()
+    result = PosterResult(path, width, height, tiles, time.perf_counter() - start)
+    logger.info(f"Plakat {width}x{height} zapisany do {path} "
+                f"({tiles} kafelków, {result.seconds:.1f}s)")
+    return result
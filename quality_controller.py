@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Adaptacyjna kontrola jakości renderowania dla Earth Simulator Enhanced
+Autor: Adrian Lesniak
+
+Kontroler obserwuje czasy ostatnich klatek i przełącza poziomy jakości tak,
+aby zmieścić się w budżecie czasu klatki. Histereza (osobne progi obniżania
+i podnoszenia, cierpliwość i czas wstrzymania po zmianie) zapobiega oscylacjom.
+"""
+
+from collections import deque
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+
+@dataclass(frozen=True)
+class QualityLevel:
+    """Zestaw ustawień jakości"""
+    name: str
+    sphere_segments: int
+    mip_bias: float
+    overlay_detail: int  # 0 = minimalny, 1 = bez dekoracji, 2 = pełny
+    msaa_samples: int
+    render_scale: float
+
+
+# Poziomy od najtańszego do najdroższego
+DEFAULT_LEVELS = [
+    QualityLevel("Minimal", 16, 1.5, 0, 0, 0.5),
+    QualityLevel("Low", 24, 1.0, 1, 0, 0.75),
+    QualityLevel("Medium", 32, 0.5, 1, 0, 1.0),
+    QualityLevel("High", 48, 0.0, 2, 2, 1.0),
+    QualityLevel("Ultra", 96, 0.0, 2, 4, 1.0),
+]
+
+
+class QualityController:
+    """Regulator jakości ze sprzężeniem zwrotnym od czasu klatki"""
+
+    def __init__(self, frame_budget_ms: float = 16.7, levels: Optional[List[QualityLevel]] = None,
+                 start_level: Optional[str] = None, window: int = 60, percentile: float = 0.9,
+                 downgrade_ratio: float = 1.05, upgrade_ratio: float = 0.7,
+                 upgrade_patience: int = 3, cooldown_frames: int = 90,
+                 adaptive: bool = True):
+        self.levels = list(levels or DEFAULT_LEVELS)
+        self.frame_budget_ms = frame_budget_ms
+        self.window = window
+        self.percentile = percentile
+        self.downgrade_ratio = downgrade_ratio
+        self.upgrade_ratio = upgrade_ratio
+        self.upgrade_patience = upgrade_patience
+        self.cooldown_frames = cooldown_frames
+        self.adaptive = adaptive
+
+        self.frame_times = deque(maxlen=window)
+        self.index = self.find_level(start_level) if start_level else len(self.levels) // 2
+        self.cooldown = cooldown_frames
+        self.headroom_streak = 0
+        self.changes = 0
+
+    @classmethod
+    def from_config(cls, config: Dict) -> "QualityController":
+        """Tworzy kontroler z sekcji "quality" konfiguracji"""
+        return cls(frame_budget_ms=float(config.get("frame_budget_ms", 16.7)),
+                   start_level=config.get("level"),
+                   adaptive=bool(config.get("adaptive", True)))
+
+    def find_level(self, name: str) -> int:
+        """Zwraca indeks poziomu o podanej nazwie (bez względu na wielkość liter)"""
+        for i, level in enumerate(self.levels):
+            if level.name.lower() == str(name).lower():
+                return i
+        return len(self.levels) // 2
+
+    @property
+    def level(self) -> QualityLevel:
+        return self.levels[self.index]
+
+    def set_level(self, index: int) -> QualityLevel:
+        """Ustawia poziom ręcznie i zeruje historię pomiarów"""
+        self.index = max(0, min(len(self.levels) - 1, index))
+        self.frame_times.clear()
+        self.cooldown = self.cooldown_frames
+        self.headroom_streak = 0
+        self.changes += 1
+        return self.level
+
+    def measured_frame_time(self) -> float:
+        """Zwraca percentyl czasu klatki z okna pomiarowego [ms]"""
+        if not self.frame_times:
+            return 0.0
+        ordered = sorted(self.frame_times)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * self.percentile))]
+
+    def record_frame(self, frame_ms: float, wait_ms: float = 0.0) -> Optional[QualityLevel]:
+        """Rejestruje czas klatki; zwraca nowy poziom, jeśli nastąpiła zmiana
+        
+        wait_ms - czas oczekiwania na synchronizację pionową (flip), który nie
+        jest pracą klatki; przy vsync 60 Hz każda klatka trwałaby ~16.7ms
+        i jakość spadałaby mimo zapasu.
+        """
+        frame_ms = max(0.0, frame_ms - wait_ms)
+        if self.cooldown > 0:
+            # Klatki tuż po zmianie nie są miarodajne (kompilacja, upload tekstur)
+            self.cooldown -= 1
+            return None
+        self.frame_times.append(frame_ms)
+        if not self.adaptive:
+            return None
+        if len(self.frame_times) < self.window:
+            return None
+
+        measured = self.measured_frame_time()
+        if measured > self.frame_budget_ms * self.downgrade_ratio:
+            self.headroom_streak = 0
+            if self.index > 0:
+                return self.set_level(self.index - 1)
+            return None
+
+        if measured < self.frame_budget_ms * self.upgrade_ratio:
+            self.headroom_streak += 1
+            # Ocena co pełne okno - wymagamy kilku kolejnych okien z zapasem
+            self.frame_times.clear()
+            if self.headroom_streak >= self.upgrade_patience and self.index < len(self.levels) - 1:
+                return self.set_level(self.index + 1)
+        else:
+            self.headroom_streak = 0
+        return None
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Asynchroniczny odczyt klatek przez pierścień buforów PBO dla Earth Simulator Enhanced
+Autor: Adrian Lesniak
+
+glReadPixels z aktywnym buforem GL_PIXEL_PACK_BUFFER tylko zleca kopię
+bufora klatki - nie czeka na zakończenie renderowania. Bufor mapowany jest
+dopiero kilka klatek później (latency), gdy GPU dawno skończyło pracę;
+w wątku renderowania zostaje zlecenie odczytu i jedna kopia pamięci.
+
+Bufory tworzą pierścień - kilka odczytów może czekać naraz; gdy wszystkie są
+zajęte, najstarszy odczytywany jest natychmiast (z oczekiwaniem, licznik
+stalls). Odczytane klatki zwracane są w kolejności zlecenia. Używane przez
+zrzuty ekranu (screenshot.py) i nagrywanie wideo (video_recorder.py).
+"""
+
+import ctypes
+import logging
+from dataclasses import dataclass
+from typing import Any, List, Optional
+
+from OpenGL.GL import *
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ReadbackFrame:
+    """Odczytana klatka RGBA (wiersze od dołu, jak w OpenGL)"""
+    tag: Any
+    width: int
+    height: int
+    pixels: Optional[bytes]
+    error: Optional[str] = None
+
+
+@dataclass
+class _PendingRead:
+    tag: Any
+    width: int
+    height: int
+    frame: int
+
+
+class ReadbackRing:
+    """Pierścień buforów PBO odczytywanych z opóźnieniem kilku klatek"""
+
+    def __init__(self, ring_size: int = 3, latency: int = 2):
+        self.latency = max(1, int(latency))
+        self.buffers = [int(b) for b in glGenBuffers(max(1, int(ring_size)))]
+        self.sizes = [0] * len(self.buffers)
+        self.slots: List[Optional[_PendingRead]] = [None] * len(self.buffers)
+        self.completed: List[ReadbackFrame] = []
+        self.frame = 0
+        self.stalls = 0                   # odczyty wymuszone zapełnieniem pierścienia
+
+    @property
+    def nbytes(self) -> int:
+        """Pamięć GPU zajęta przez bufory pierścienia"""
+        return sum(self.sizes)
+
+    @property
+    def pending(self) -> int:
+        """Liczba odczytów czekających w buforach"""
+        return sum(1 for slot in self.slots if slot is not None)
+
+    def read(self, width: int, height: int, tag: Any = None):
+        """Zleca odczyt bieżącej zawartości domyślnego framebuffera"""
+        index = self._free_slot()
+        size = width * height * 4
+        glBindFramebuffer(GL_FRAMEBUFFER, 0)
+        glPixelStorei(GL_PACK_ALIGNMENT, 1)
+        glBindBuffer(GL_PIXEL_PACK_BUFFER, self.buffers[index])
+        if self.sizes[index] != size:
+            glBufferData(GL_PIXEL_PACK_BUFFER, size, None, GL_STREAM_READ)
+            self.sizes[index] = size
+        # Z aktywnym PBO ostatni argument to przesunięcie w buforze
+        glReadPixels(0, 0, width, height, GL_RGBA, GL_UNSIGNED_BYTE, ctypes.c_void_p(0))
+        glBindBuffer(GL_PIXEL_PACK_BUFFER, 0)
+        self.slots[index] = _PendingRead(tag, width, height, self.frame)
+
+    def poll(self) -> List[ReadbackFrame]:
+        """Wywoływane raz na klatkę - zwraca odczyty starsze niż latency klatek"""
+        self.frame += 1
+        self._collect_where(lambda pending: self.frame - pending.frame >= self.latency)
+        return self._take_completed()
+
+    def flush(self) -> List[ReadbackFrame]:
+        """Odczytuje wszystkie bufory natychmiast (np. przed zamknięciem)"""
+        self._collect_where(lambda pending: True)
+        return self._take_completed()
+
+    def _take_completed(self) -> List[ReadbackFrame]:
+        completed, self.completed = self.completed, []
+        return completed
+
+    def _collect_where(self, condition):
+        ready = [index for index, pending in enumerate(self.slots)
+                 if pending is not None and condition(pending)]
+        for index in sorted(ready, key=lambda i: self.slots[i].frame):
+            self._collect(index)
+
+    def _free_slot(self) -> int:
+        """Wolny bufor pierścienia (przy braku - odczyt najstarszego)"""
+        for index, pending in enumerate(self.slots):
+            if pending is None:
+                return index
+        oldest = min(range(len(self.slots)), key=lambda i: self.slots[i].frame)
+        self.stalls += 1
+        self._collect(oldest)
+        return oldest
+
+    def _collect(self, index: int):
+        """Kopiuje zawartość bufora do pamięci"""
+        pending = self.slots[index]
+        self.slots[index] = None
+        size = pending.width * pending.height * 4
+        pixels, error = None, None
+        glBindBuffer(GL_PIXEL_PACK_BUFFER, self.buffers[index])
+        try:
+            address = glMapBufferRange(GL_PIXEL_PACK_BUFFER, 0, size, GL_MAP_READ_BIT)
+            if not address:
+                raise RuntimeError("nie udało się zmapować bufora PBO")
+            try:
+                pixels = ctypes.string_at(address, size)
+            finally:
+                glUnmapBuffer(GL_PIXEL_PACK_BUFFER)
+        except Exception as e:
+            logger.error(f"Błąd odczytu klatki z bufora PBO: {e}")
+            error = str(e)
+        finally:
+            glBindBuffer(GL_PIXEL_PACK_BUFFER, 0)
+        self.completed.append(ReadbackFrame(pending.tag, pending.width, pending.height,
+                                            pixels, error))
+
+    def release(self):
+        """Zwalnia bufory (nieodczytane klatki są porzucane)"""
+        try:
+            if self.buffers:
+                glDeleteBuffers(len(self.buffers), self.buffers)
+        except Exception as e:
+            logger.warning(f"Błąd zwalniania buforów odczytu: {e}")
+        self.buffers = []
+        self.slots = []
+        self.completed = []
@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Zdalne sterowanie i telemetria dla Earth Simulator Enhanced
+Autor: Adrian Lesniak
+
+Serwer asyncio (TCP, jedna linia JSON na wiadomość) działa we własnym
+wątku - pętla renderowania nie czeka na sieć. Polecenia są sprawdzane
+w wątku serwera i trafiają do kolejki; symulator stosuje je na granicy
+klatki (drain) i dopiero wtedy odpowiada klientowi numerem klatki.
+Telemetrię symulator publikuje co klatkę jako nowy słownik (przypisanie
+referencji), a każdy subskrybent dostaje najnowszy stan we własnym tempie -
+wolny klient traci stany pośrednie i nie spowalnia pozostałych.
+
+Protokół:
+  {"id": 1, "cmd": "set", "rotation_y": 90, "distance": -4, "layer": "Political"}
+  {"id": 2, "cmd": "get"}
+  {"id": 3, "cmd": "subscribe", "rate": 10}     (Hz; 0 wyłącza telemetrię)
+  {"id": 4, "cmd": "auth", "token": "..."}      (gdy serwer ma token)
+Odpowiedź: {"id": 1, "ok": true, "frame": 1234} albo {"id": 1, "ok": false, "error": "..."}
+Telemetria: {"type": "telemetry", "frame": ..., "rotation_x": ..., ...}
+"""
+
+import asyncio
+import hmac
+import json
+import logging
+import math
+import threading
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PORT = 8766
+MAX_TELEMETRY_RATE = 60.0
+# Czas oczekiwania na granicę klatki (np. okno komunikatu wstrzymuje pętlę)
+COMMAND_TIMEOUT = 5.0
+MAX_PENDING_COMMANDS = 256
+MAX_LINE = 64 * 1024
+
+CAMERA_FIELDS = ("rotation_x", "rotation_y", "distance")
+TEXT_FIELDS = ("layer", "view_mode", "animation")
+
+
+def parse_command(message: Dict[str, Any]) -> Dict[str, Any]:
+    """Sprawdza zmiany polecenia "set" (typy; znaczenie ocenia symulator)"""
+    changes = {}
+    for name in CAMERA_FIELDS:
+        if name in message:
+            value = message[name]
+            if isinstance(value, bool) or not isinstance(value, (int, float)) \
+                    or not math.isfinite(value):
+                raise ValueError(f"{name}: oczekiwano liczby")
+            changes[name] = float(value)
+    for name in TEXT_FIELDS:
+        if name in message:
+            value = message[name]
+            # animation: null/false wyłącza animację
+            if name == "animation" and value in (None, False):
+                changes[name] = None
+            elif isinstance(value, str) and value:
+                changes[name] = value
+            else:
+                raise ValueError(f"{name}: oczekiwano nazwy")
+    if not changes:
+        raise ValueError("brak zmian (pola: " + ", ".join(CAMERA_FIELDS + TEXT_FIELDS) + ")")
+    return changes
+
+
+@dataclass
+class RemoteCommand:
+    """Polecenie czekające na granicę klatki"""
+    changes: Dict[str, Any]
+    future: asyncio.Future
+    loop: asyncio.AbstractEventLoop
+
+    @property
+    def cancelled(self) -> bool:
+        return self.future.cancelled()
+
+    def reply(self, **result):
+        """Odpowiedź z wątku symulatora (przekazywana do pętli asyncio)"""
+        self.loop.call_soon_threadsafe(self._resolve, result)
+
+    def _resolve(self, result: Dict[str, Any]):
+        if not self.future.done():
+            self.future.set_result(result)
+
+
+class RemoteControlServer:
+    """Serwer poleceń kamery i telemetrii w wątku z pętlą asyncio"""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = DEFAULT_PORT,
+                 token: Optional[str] = None, telemetry_rate: float = 10.0):
+        self.host = host
+        self.port = port
+        self.token = token
+        self.telemetry_rate = min(MAX_TELEMETRY_RATE, max(0.0, telemetry_rate))
+        self.commands: deque = deque()
+        self.state: Dict[str, Any] = {"type": "telemetry"}
+        self.address: Optional[Tuple[str, int]] = None
+        self.clients = 0
+        self.subscribers = 0
+        self.connections: Dict[asyncio.Task, asyncio.StreamWriter] = {}
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.thread: Optional[threading.Thread] = None
+        self.ready = threading.Event()
+        self.stopping: Optional[asyncio.Event] = None
+        self.error: Optional[BaseException] = None
+
+    # --- wątek symulatora -------------------------------------------------
+
+    def start(self) -> "RemoteControlServer":
+        """Uruchamia serwer; zgłasza OSError, gdy nie można zająć portu"""
+        self.thread = threading.Thread(target=self._run, name="remote-control", daemon=True)
+        self.thread.start()
+        self.ready.wait()
+        if self.error is not None:
+            self.thread = None
+            raise OSError(f"Nie można uruchomić serwera sterowania "
+                          f"{self.host}:{self.port}: {self.error}")
+        logger.info(f"Zdalne sterowanie na {self.address[0]}:{self.address[1]}")
+        return self
+
+    def stop(self, timeout: float = 2.0):
+        if self.thread is None:
+            return
+        self.loop.call_soon_threadsafe(self.stopping.set)
+        self.thread.join(timeout)
+        self.thread = None
+
+    def drain(self) -> List[RemoteCommand]:
+        """Polecenia do zastosowania w tej klatce (bez porzuconych przez klienta)"""
+        commands = []
+        while self.commands:
+            command = self.commands.popleft()
+            if not command.cancelled:
+                commands.append(command)
+        return commands
+
+    def publish(self, state: Dict[str, Any]):
+        """Nowy stan dla telemetrii - słownik nie może być później zmieniany"""
+        self.state = state
+
+    # --- wątek serwera ----------------------------------------------------
+
+    def _run(self):
+        try:
+            asyncio.run(self._serve())
+        except Exception as e:
+            self.error = e
+            logger.error(f"Błąd serwera sterowania: {e}")
+        finally:
+            self.ready.set()
+
+    async def _serve(self):
+        self.loop = asyncio.get_running_loop()
+        self.stopping = asyncio.Event()
+        server = await asyncio.start_server(self._handle_client, self.host, self.port,
+                                            limit=MAX_LINE)
+        self.address = server.sockets[0].getsockname()[:2]
+        self.ready.set()
+        async with server:
+            await self.stopping.wait()
+        # Zamknięcie połączeń kończy obsługę klientów (koniec strumienia)
+        for writer in self.connections.values():
+            writer.close()
+        if self.connections:
+            await asyncio.wait(list(self.connections), timeout=1.0)
+
+    async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        peer = writer.get_extra_info("peername")
+        logger.info(f"Klient sterowania połączony: {peer}")
+        self.clients += 1
+        self.connections[asyncio.current_task()] = writer
+        send_lock = asyncio.Lock()
+        telemetry: Optional[asyncio.Task] = None
+        authorized = self.token is None
+
+        async def send(message: Dict[str, Any]):
+            async with send_lock:
+                writer.write(json.dumps(message).encode("utf-8") + b"\n")
+                await writer.drain()
+
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    await send({"ok": False, "error": "za długa wiadomość"})
+                    break
+                if not line:
+                    break
+                try:
+                    message = json.loads(line)
+                    if not isinstance(message, dict):
+                        raise ValueError("oczekiwano obiektu JSON")
+                except ValueError as e:
+                    await send({"ok": False, "error": f"niepoprawny JSON: {e}"})
+                    continue
+
+                reply = {"id": message["id"]} if "id" in message else {}
+                cmd = message.get("cmd")
+                if cmd == "auth":
+                    authorized = (self.token is None or
+                                  hmac.compare_digest(str(message.get("token", "")).encode("utf-8"),
+                                                      self.token.encode("utf-8")))
+                    reply.update(ok=authorized)
+                    if not authorized:
+                        reply["error"] = "niepoprawny token"
+                elif not authorized:
+                    reply.update(ok=False, error="wymagane uwierzytelnienie (auth)")
+                elif cmd == "set":
+                    reply.update(await self._submit(message))
+                elif cmd == "get":
+                    reply.update(ok=True, state=self.state)
+                elif cmd == "subscribe":
+                    if telemetry is not None:
+                        telemetry.cancel()
+                        telemetry = None
+                        self.subscribers -= 1
+                    rate = message.get("rate", self.telemetry_rate)
+                    if not isinstance(rate, (int, float)) or not rate >= 0:
+                        reply.update(ok=False, error="rate: oczekiwano liczby Hz >= 0")
+                    else:
+                        rate = min(float(rate), MAX_TELEMETRY_RATE)
+                        if rate > 0:
+                            telemetry = asyncio.create_task(self._telemetry(send, rate))
+                            self.subscribers += 1
+                        reply.update(ok=True, rate=rate)
+                else:
+                    reply.update(ok=False, error=f"nieznane polecenie: {cmd}")
+                await send(reply)
+        except ConnectionError:
+            pass
+        finally:
+            if telemetry is not None:
+                telemetry.cancel()
+                self.subscribers -= 1
+            self.clients -= 1
+            self.connections.pop(asyncio.current_task(), None)
+            writer.close()
+            logger.info(f"Klient sterowania rozłączony: {peer}")
+
+    async def _submit(self, message: Dict[str, Any]) -> Dict[str, Any]:
+        """Kolejkuje polecenie "set" i czeka na jego zastosowanie w klatce"""
+        try:
+            changes = parse_command(message)
+        except ValueError as e:
+            return {"ok": False, "error": str(e)}
+        if len(self.commands) >= MAX_PENDING_COMMANDS:
+            return {"ok": False, "error": "kolejka poleceń pełna"}
+        command = RemoteCommand(changes, self.loop.create_future(), self.loop)
+        self.commands.append(command)
+        try:
+            return await asyncio.wait_for(command.future, COMMAND_TIMEOUT)
+        except asyncio.TimeoutError:
+            return {"ok": False, "error": "symulator nie przetworzył polecenia"}
+
+    async def _telemetry(self, send, rate: float):
+        """Wysyła najnowszy stan z zadaną częstotliwością (tylko nowy)"""
+        interval = 1.0 / rate
+        last = None
+        try:
+            while True:
+                state = self.state
+                if state is not last:
+                    await send(state)
+                    last = state
+                await asyncio.sleep(interval)
+        except ConnectionError:
+            pass
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Bufor renderowania poza ekranem (FBO) dla Earth Simulator Enhanced
+Autor: Adrian Lesniak
+"""
+
+import logging
+from typing import Tuple
+
+from OpenGL.GL import *
+
+logger = logging.getLogger(__name__)
+
+
+class RenderTarget:
+    """Framebuffer z teksturą koloru i buforem głębi"""
+
+    def __init__(self, width: int, height: int):
+        self.width = 0
+        self.height = 0
+        self.fbo = None
+        self.color_texture = None
+        self.depth_buffer = None
+        self.resize(width, height)
+
+    @property
+    def size(self) -> Tuple[int, int]:
+        return self.width, self.height
+
+    @property
+    def nbytes(self) -> int:
+        """Pamięć GPU: kolor RGBA8 i głębia (24 bity, zwykle 4 B na piksel)"""
+        return self.width * self.height * 8 if self.fbo is not None else 0
+
+    def resize(self, width: int, height: int):
+        """Tworzy (lub odtwarza) bufory o podanym rozmiarze"""
+        width, height = max(1, int(width)), max(1, int(height))
+        if (width, height) == (self.width, self.height) and self.fbo is not None:
+            return
+        self.release()
+        self.width, self.height = width, height
+
+        self.color_texture = glGenTextures(1)
+        glBindTexture(GL_TEXTURE_2D, self.color_texture)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_LINEAR)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_LINEAR)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_S, GL_CLAMP_TO_EDGE)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_T, GL_CLAMP_TO_EDGE)
+        glTexImage2D(GL_TEXTURE_2D, 0, GL_RGBA8, width, height, 0,
+                     GL_RGBA, GL_UNSIGNED_BYTE, None)
+        glBindTexture(GL_TEXTURE_2D, 0)
+
+        self.depth_buffer = glGenRenderbuffers(1)
+        glBindRenderbuffer(GL_RENDERBUFFER, self.depth_buffer)
+        glRenderbufferStorage(GL_RENDERBUFFER, GL_DEPTH_COMPONENT24, width, height)
+        glBindRenderbuffer(GL_RENDERBUFFER, 0)
+
+        self.fbo = glGenFramebuffers(1)
+        glBindFramebuffer(GL_FRAMEBUFFER, self.fbo)
+        glFramebufferTexture2D(GL_FRAMEBUFFER, GL_COLOR_ATTACHMENT0,
+                               GL_TEXTURE_2D, self.color_texture, 0)
+        glFramebufferRenderbuffer(GL_FRAMEBUFFER, GL_DEPTH_ATTACHMENT,
+                                  GL_RENDERBUFFER, self.depth_buffer)
+        status = glCheckFramebufferStatus(GL_FRAMEBUFFER)
+        glBindFramebuffer(GL_FRAMEBUFFER, 0)
+
+        if status != GL_FRAMEBUFFER_COMPLETE:
+            self.release()
+            raise RuntimeError(f"Niekompletny framebuffer: 0x{int(status):x}")
+
+    def bind(self):
+        """Kieruje renderowanie do bufora"""
+        glBindFramebuffer(GL_FRAMEBUFFER, self.fbo)
+        glViewport(0, 0, self.width, self.height)
+
+    @staticmethod
+    def unbind(viewport: Tuple[int, int]):
+        """Przywraca domyślny framebuffer i viewport"""
+        glBindFramebuffer(GL_FRAMEBUFFER, 0)
+        glViewport(0, 0, viewport[0], viewport[1])
+
+    def release(self):
+        """Zwalnia zasoby GPU"""
+        try:
+            if self.fbo is not None:
+                glDeleteFramebuffers(1, [self.fbo])
+            if self.depth_buffer is not None:
+                glDeleteRenderbuffers(1, [self.depth_buffer])
+            if self.color_texture is not None:
+                glDeleteTextures([self.color_texture])
+        except Exception as e:
+            logger.warning(f"Błąd zwalniania bufora renderowania: {e}")
+        self.fbo = None
+        self.depth_buffer = None
+        self.color_texture = None
+        self.width = self.height = 0
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Asynchroniczne zrzuty ekranu (PBO + kodowanie w tle) dla Earth Simulator Enhanced
+Autor: Adrian Lesniak
+
+Klatka odczytywana jest przez pierścień buforów PBO (readback.ReadbackRing)
+kilka klatek po zleceniu, a skopiowane bajty trafiają do puli wątków (lub
+procesów), która odwraca wiersze i koduje PNG/WebP. W wątku renderowania
+zostaje zlecenie odczytu i jedna kopia pamięci.
+"""
+
+import logging
+import os
+import time
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from PIL import Image
+
+from metrics import metrics
+from readback import ReadbackFrame, ReadbackRing
+
+logger = logging.getLogger(__name__)
+
+FORMATS = {".png": "PNG", ".webp": "WEBP"}
+
+LATENCY = metrics.histogram("earth_screenshot_latency_ms",
+                            "Czas od zlecenia zrzutu do zapisania pliku [ms]")
+SAVED = metrics.counter("earth_screenshots_total", "Zapisane zrzuty ekranu",
+                        labels={"result": "ok"})
+FAILED = metrics.counter("earth_screenshots_total", "Zapisane zrzuty ekranu",
+                         labels={"result": "error"})
+
+
+def encode_image(path: str, width: int, height: int, pixels: bytes,
+                 compress_level: int = 6) -> str:
+    """Odwraca wiersze (OpenGL zaczyna od dołu) i zapisuje obraz RGBA jako RGB
+
+    Funkcja modułu - może zostać wysłana do puli procesów.
+    """
+    image_format = FORMATS.get(os.path.splitext(path)[1].lower())
+    if image_format is None:
+        raise ValueError(f"Nieobsługiwany format zrzutu: {path}")
+    image = Image.frombytes("RGBA", (width, height), pixels, "raw", "RGBA", 0, -1)
+    options = {"compress_level": compress_level} if image_format == "PNG" else {"quality": 90}
+    image.convert("RGB").save(path, image_format, **options)
+    return path
+
+
+@dataclass
+class CaptureResult:
+    """Zakończone zapisywanie zrzutu (error = None przy powodzeniu)"""
+    path: str
+    error: Optional[str] = None
+
+
+class ScreenshotCapture:
+    """Zrzuty ekranu: odczyt przez pierścień PBO i kodowanie obrazów w tle"""
+
+    def __init__(self, ring_size: int = 3, latency: int = 2,
+                 executor: Optional[Executor] = None):
+        self.ring = ReadbackRing(ring_size, latency)
+        self.requests: List[str] = []
+        self.encoding: List[Tuple[str, Future]] = []
+        self.requested_at: Dict[str, float] = {}   # ścieżka -> czas zlecenia (metryki)
+        self.own_executor = executor is None
+        self.executor = executor or ThreadPoolExecutor(max_workers=1,
+                                                       thread_name_prefix="screenshot")
+
+    @property
+    def stalls(self) -> int:
+        return self.ring.stalls
+
+    @property
+    def busy(self) -> bool:
+        """Czy są zrzuty zlecone, w buforach lub w trakcie kodowania"""
+        return bool(self.requests or self.encoding or self.ring.pending)
+
+    def request(self, path: str):
+        """Zleca zrzut najbliższej wyrenderowanej klatki do pliku path"""
+        if os.path.splitext(path)[1].lower() not in FORMATS:
+            raise ValueError(f"Nieobsługiwany format zrzutu: {path}")
+        self.requests.append(path)
+        self.requested_at[path] = time.perf_counter()
+
+    def capture(self, width: int, height: int):
+        """Wywoływane raz na klatkę po narysowaniu, przed wyświetleniem
+
+        Przekazuje do kodowania bufory z poprzednich klatek i zleca odczyt
+        bieżącej klatki dla oczekujących żądań.
+        """
+        self._encode(self.ring.poll())
+        while self.requests:
+            self.ring.read(width, height, tag=self.requests.pop(0))
+
+    def _encode(self, frames: List[ReadbackFrame]):
+        for frame in frames:
+            if frame.pixels is None:
+                future: Future = Future()
+                future.set_exception(RuntimeError(frame.error))
+            else:
+                future = self.executor.submit(encode_image, frame.tag, frame.width,
+                                              frame.height, frame.pixels)
+            self.encoding.append((frame.tag, future))
+
+    def poll(self) -> List[CaptureResult]:
+        """Zwraca zrzuty, których zapisywanie zakończyło się od ostatniego wywołania"""
+        results, still_encoding = [], []
+        for path, future in self.encoding:
+            if not future.done():
+                still_encoding.append((path, future))
+                continue
+            error = future.exception()
+            results.append(CaptureResult(path, str(error) if error else None))
+            (FAILED if error else SAVED).inc()
+            requested = self.requested_at.pop(path, None)
+            if requested is not None:
+                LATENCY.observe((time.perf_counter() - requested) * 1000.0)
+        self.encoding = still_encoding
+        return results
+
+    def finish(self, timeout: Optional[float] = None) -> List[CaptureResult]:
+        """Odczytuje wszystkie bufory i czeka na zakończenie kodowania"""
+        self._encode(self.ring.flush())
+        for _, future in self.encoding:
+            try:
+                future.result(timeout=timeout)
+            except Exception:
+                pass  # błąd zgłaszany przez poll
+        return self.poll()
+
+    def release(self):
+        """Zwalnia bufory (zlecone, nieodczytane zrzuty są porzucane)"""
+        self.ring.release()
+        self.requests = []
+        self.requested_at.clear()
+        if self.own_executor:
+            self.executor.shutdown(wait=True)
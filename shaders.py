@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Programy GLSL i bufory geometrii dla Earth Simulator Enhanced
+Autor: Adrian Lesniak
+
+ShaderManager kompiluje programy leniwie i trzyma je w pamięci podręcznej
+według nazwy i zestawu `#define` (warianty, np. dla trybów widoku).
+Program pamięta lokalizacje i ostatnie wartości uniformów, a menedżer aktywuje
+programy przez GLState, więc powtórzone ustawienia nie generują wywołań GL. Siatki trzymane są
+w buforach VBO - bez konwersji tablic NumPy przez PyOpenGL w każdej klatce.
+"""
+
+import logging
+from typing import Dict, Iterable, Optional, Tuple
+
+import numpy as np
+from OpenGL.GL import *
+
+from gl_state import GLState
+
+logger = logging.getLogger(__name__)
+
+# Stałe lokalizacje atrybutów wierzchołków (wiązane przed linkowaniem)
+POSITION = 0
+TEXCOORD = 1
+ATTRIBUTES = {"a_position": POSITION, "a_texcoord": TEXCOORD}
+
+
+def compile_shader(source: str, shader_type) -> int:
+    """Kompiluje pojedynczy shader (RuntimeError z logiem kompilatora)"""
+    shader = glCreateShader(shader_type)
+    glShaderSource(shader, source)
+    glCompileShader(shader)
+    if not glGetShaderiv(shader, GL_COMPILE_STATUS):
+        log = glGetShaderInfoLog(shader)
+        glDeleteShader(shader)
+        if isinstance(log, bytes):
+            log = log.decode('utf-8', 'replace')
+        raise RuntimeError(f"Błąd kompilacji shadera: {log.strip()}")
+    return shader
+
+
+def with_defines(source: str, defines: Iterable[str]) -> str:
+    """Wstawia linie #define zaraz po dyrektywie #version"""
+    lines = [f"#define {define}" for define in defines]
+    if not lines:
+        return source
+    head, separator, body = source.lstrip().partition("\n")
+    if not head.startswith("#version"):
+        return "\n".join(lines) + "\n" + source
+    return head + separator + "\n".join(lines) + "\n" + body
+
+
+class ShaderProgram:
+    """Zlinkowany program GLSL z pamięcią uniformów"""
+
+    def __init__(self, vertex_source: str, fragment_source: str, name: str = "program"):
+        self.name = name
+        self.locations: Dict[str, int] = {}
+        self.values: Dict[str, object] = {}
+        vertex = compile_shader(vertex_source, GL_VERTEX_SHADER)
+        try:
+            fragment = compile_shader(fragment_source, GL_FRAGMENT_SHADER)
+        except RuntimeError:
+            glDeleteShader(vertex)
+            raise
+
+        self.program = glCreateProgram()
+        glAttachShader(self.program, vertex)
+        glAttachShader(self.program, fragment)
+        for attribute, location in ATTRIBUTES.items():
+            glBindAttribLocation(self.program, location, attribute)
+        glLinkProgram(self.program)
+        # Shadery dołączone do programu są zwalniane razem z nim
+        glDeleteShader(vertex)
+        glDeleteShader(fragment)
+        if not glGetProgramiv(self.program, GL_LINK_STATUS):
+            log = glGetProgramInfoLog(self.program)
+            glDeleteProgram(self.program)
+            self.program = None
+            if isinstance(log, bytes):
+                log = log.decode('utf-8', 'replace')
+            raise RuntimeError(f"Błąd linkowania programu {name}: {log.strip()}")
+
+    def location(self, name: str) -> int:
+        """Lokalizacja uniformu (-1 = nieużywany, zoptymalizowany przez kompilator)"""
+        location = self.locations.get(name)
+        if location is None:
+            location = glGetUniformLocation(self.program, name)
+            self.locations[name] = location
+        return location
+
+    def _changed(self, name: str, value) -> bool:
+        if self.location(name) < 0 or self.values.get(name) == value:
+            return False
+        self.values[name] = value
+        return True
+
+    # Settery wymagają aktywnego programu (ShaderManager.use)
+    def set_float(self, name: str, *values: float):
+        """Ustawia uniform float/vec2/vec3/vec4 (pomija niezmienione wartości)"""
+        values = tuple(float(v) for v in values)
+        if self._changed(name, values):
+            setter = (glUniform1f, glUniform2f, glUniform3f, glUniform4f)[len(values) - 1]
+            setter(self.locations[name], *values)
+
+    def set_int(self, name: str, value: int):
+        """Ustawia uniform int/sampler"""
+        if self._changed(name, int(value)):
+            glUniform1i(self.locations[name], int(value))
+
+    def set_matrix(self, name: str, matrix: np.ndarray):
+        """Ustawia mat4 (macierz w układzie kolumnowym, np. camera_math.to_gl)"""
+        matrix = np.ascontiguousarray(matrix, dtype=np.float32)
+        if self._changed(name, matrix.tobytes()):
+            glUniformMatrix4fv(self.locations[name], 1, GL_FALSE, matrix)
+
+    def release(self):
+        """Zwalnia program"""
+        try:
+            if self.program is not None:
+                glDeleteProgram(self.program)
+        except Exception as e:
+            logger.warning(f"Błąd zwalniania programu {self.name}: {e}")
+        self.program = None
+        self.locations.clear()
+        self.values.clear()
+
+
+class ShaderManager:
+    """Rejestr źródeł GLSL i pamięć podręczna skompilowanych wariantów"""
+
+    def __init__(self, sources: Optional[Dict[str, Tuple[str, str]]] = None,
+                 state: Optional[GLState] = None):
+        self.sources: Dict[str, Tuple[str, str]] = dict(sources or {})
+        self.state = state if state is not None else GLState()
+        self.programs: Dict[Tuple[str, Tuple[str, ...]], ShaderProgram] = {}
+        self.current: Optional[ShaderProgram] = None
+
+    def register(self, name: str, vertex_source: str, fragment_source: str):
+        """Dodaje źródła programu (warianty kompilowane przy pierwszym użyciu)"""
+        self.sources[name] = (vertex_source, fragment_source)
+
+    def program(self, name: str, defines: Iterable[str] = ()) -> ShaderProgram:
+        """Zwraca (kompilując przy pierwszym użyciu) wariant programu"""
+        key = (name, tuple(sorted(defines)))
+        program = self.programs.get(key)
+        if program is None:
+            vertex, fragment = self.sources[name]
+            label = name + "".join(f"+{define}" for define in key[1])
+            program = ShaderProgram(with_defines(vertex, key[1]),
+                                    with_defines(fragment, key[1]), label)
+            self.programs[key] = program
+            logger.info(f"Skompilowano program {label}")
+        return program
+
+    def use(self, program: Optional[ShaderProgram]) -> Optional[ShaderProgram]:
+        """Aktywuje program (None = brak programu); pomija powtórne aktywacje"""
+        self.state.use_program(program.program if program is not None else None)
+        self.current = program
+        return program
+
+    def release(self):
+        """Zwalnia wszystkie programy"""
+        self.use(None)
+        for program in self.programs.values():
+            program.release()
+        self.programs.clear()
+
+
+class MeshBuffer:
+    """Siatka (pozycje, współrzędne tekstury, indeksy) w buforach GPU"""
+
+    def __init__(self, vertices: np.ndarray, texture_coords: np.ndarray, indices: np.ndarray):
+        self.count = int(indices.size)
+        self.buffers = [int(b) for b in glGenBuffers(3)]
+        self.nbytes = 0                   # rozmiar buforów GPU (profil pamięci)
+        arrays = [(GL_ARRAY_BUFFER, vertices), (GL_ARRAY_BUFFER, texture_coords),
+                  (GL_ELEMENT_ARRAY_BUFFER, indices)]
+        for buffer, (target, array) in zip(self.buffers, arrays):
+            array = np.ascontiguousarray(array)
+            self.nbytes += array.nbytes
+            glBindBuffer(target, buffer)
+            glBufferData(target, array.nbytes, array, GL_STATIC_DRAW)
+            glBindBuffer(target, 0)
+
+    def bind(self):
+        """Podłącza atrybuty a_position i a_texcoord oraz bufor indeksów"""
+        glBindBuffer(GL_ARRAY_BUFFER, self.buffers[0])
+        glVertexAttribPointer(POSITION, 3, GL_FLOAT, GL_FALSE, 0, None)
+        glBindBuffer(GL_ARRAY_BUFFER, self.buffers[1])
+        glVertexAttribPointer(TEXCOORD, 2, GL_FLOAT, GL_FALSE, 0, None)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+        glEnableVertexAttribArray(POSITION)
+        glEnableVertexAttribArray(TEXCOORD)
+        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, self.buffers[2])
+
+    def draw(self):
+        glDrawElements(GL_TRIANGLES, self.count, GL_UNSIGNED_INT, None)
+
+    @staticmethod
+    def unbind():
+        glDisableVertexAttribArray(TEXCOORD)
+        glDisableVertexAttribArray(POSITION)
+        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, 0)
+
+    def release(self):
+        """Zwalnia bufory"""
+        try:
+            if self.buffers:
+                glDeleteBuffers(len(self.buffers), self.buffers)
+        except Exception as e:
+            logger.warning(f"Błąd zwalniania buforów siatki: {e}")
+        self.buffers = []
+
+
+class ScreenQuad:
+    """Prostokąt z teksturą w pikselach ekranu (program z uniformem u_rect)"""
+
+    def __init__(self):
+        corners = np.array([0, 0, 1, 0, 1, 1, 0, 1], dtype=np.float32)
+        self.buffer = int(glGenBuffers(1))
+        glBindBuffer(GL_ARRAY_BUFFER, self.buffer)
+        glBufferData(GL_ARRAY_BUFFER, corners.nbytes, corners, GL_STATIC_DRAW)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+
+    def draw(self, program: ShaderProgram, x: float, y: float, width: float, height: float):
+        """Rysuje prostokąt (x, y) - lewy górny róg; program i tekstura muszą być aktywne"""
+        program.set_float("u_rect", x, y, width, height)
+        glBindBuffer(GL_ARRAY_BUFFER, self.buffer)
+        glVertexAttribPointer(POSITION, 2, GL_FLOAT, GL_FALSE, 0, None)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+        glEnableVertexAttribArray(POSITION)
+        glDrawArrays(GL_TRIANGLE_FAN, 0, 4)
+        glDisableVertexAttribArray(POSITION)
+
+    def release(self):
+        try:
+            if self.buffer:
+                glDeleteBuffers(1, [self.buffer])
+        except Exception as e:
+            logger.warning(f"Błąd zwalniania bufora prostokąta: {e}")
+        self.buffer = None
+
+
+class OverlayTexture:
+    """Tekstura RGBA nakładki interfejsu (menu, nagłówek, statystyki)
+
+    Zawartość rysowana jest przez pygame na powierzchni poza ekranem i
+    przesyłana tylko po zmianie; zmiana rozmiaru tworzy teksturę od nowa.
+    Wiersze od dołu (pygame.image.tostring(..., True)) - jak oczekuje program "overlay".
+    """
+
+    def __init__(self):
+        self.texture = None
+        self.width = 0
+        self.height = 0
+
+    @property
+    def nbytes(self) -> int:
+        return self.width * self.height * 4 if self.texture is not None else 0
+
+    def upload(self, state: GLState, pixels: bytes, width: int, height: int):
+        """Przesyła piksele RGBA (tworzy teksturę przy pierwszym użyciu lub nowym rozmiarze)"""
+        # Tekstura mogła zostać podpięta wcześniej, a aktywna jest inna jednostka
+        state.active_texture(0)
+        if self.texture is None:
+            self.texture = int(glGenTextures(1))
+            state.bind_texture(self.texture)
+            glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_NEAREST)
+            glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_NEAREST)
+            glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_S, GL_CLAMP_TO_EDGE)
+            glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_T, GL_CLAMP_TO_EDGE)
+        else:
+            state.bind_texture(self.texture)
+        if (width, height) != (self.width, self.height):
+            glTexImage2D(GL_TEXTURE_2D, 0, GL_RGBA8, width, height, 0,
+                         GL_RGBA, GL_UNSIGNED_BYTE, pixels)
+            self.width, self.height = width, height
+        else:
+            glTexSubImage2D(GL_TEXTURE_2D, 0, 0, 0, width, height,
+                            GL_RGBA, GL_UNSIGNED_BYTE, pixels)
+
+    def draw(self, program: ShaderProgram, quad: ScreenQuad, state: GLState, x: float, y: float):
+        """Rysuje nakładkę w pikselach ekranu (program "overlay" musi być aktywny)"""
+        state.bind_texture(self.texture)
+        quad.draw(program, x, y, self.width, self.height)
+
+    def release(self):
+        try:
+            if self.texture:
+                glDeleteTextures([self.texture])
+        except Exception as e:
+            logger.warning(f"Błąd zwalniania tekstury nakładki: {e}")
+        self.texture = None
+        self.width = self.height = 0
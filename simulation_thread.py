@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Symulacja w osobnym wątku dla Earth Simulator Enhanced
+Autor: Adrian Lesniak
+
+Wątek symulacji wykonuje stałe kroki (SimulationClock) we własnym rytmie
+i po każdej porcji kroków publikuje niezmienną migawkę stanu
+(SimulationSnapshot) w potrójnym buforze. Wątek renderowania tylko czyta
+ostatnią migawkę - bez blokad - i interpoluje kamerę między dwoma ostatnimi
+krokami według czasu, który upłynął od publikacji. Krok dłuższy niż klatka
+nie zatrzymuje renderowania: kamera zatrzymuje się na ostatnim stanie
+(alpha = 1), a obraz, menu i nakładki są rysowane dalej.
+
+Stan symulacji (atrybuty symulatora) zmienia wątek symulacji pod blokadą
+`lock`; wątek główny obsługuje wejście tylko wtedy, gdy zdobędzie ją bez
+czekania (acquire(blocking=False)) - w przeciwnym razie zdarzenia czekają
+do następnej klatki.
+"""
+
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Generic, List, Optional, TypeVar
+
+from metrics import metrics
+from simulation_clock import CameraState, SimulationClock
+
+logger = logging.getLogger(__name__)
+
+STEP_TIME = metrics.histogram("earth_simulation_step_ms",
+                              "Porcja kroków symulacji w wątku symulacji [ms]")
+
+T = TypeVar("T")
+
+
+@dataclass(frozen=True)
+class SimulationSnapshot:
+    """Niezmienny stan po porcji kroków: kamera przed i po ostatnim kroku"""
+    previous: CameraState
+    current: CameraState
+    sim_time: float
+    step_count: int
+    alpha: float                      # reszta akumulatora w chwili publikacji (w krokach)
+    published_at: float               # czas zegara symulacji (time_source)
+    time_scale: float
+    step: float
+
+    def camera_at(self, now: float) -> CameraState:
+        """Kamera interpolowana na chwilę now (bez wybiegania poza ostatni krok)"""
+        alpha = self.alpha + (now - self.published_at) * self.time_scale / self.step
+        return self.previous.lerp(self.current, min(1.0, max(0.0, alpha)))
+
+
+class TripleBuffer(Generic[T]):
+    """Wymiana najnowszej wartości między wątkami bez blokad
+
+    Pisarz wpisuje wartość do kolejnego z trzech gniazd i dopiero potem
+    publikuje jego indeks (przypisanie atrybutu jest atomowe). Czytelnik
+    odczytuje indeks i gniazdo - w najgorszym razie dostaje wartość nowszą,
+    nigdy częściowo zapisaną. Wartości muszą być niezmienne; w danej chwili
+    może pisać tylko jeden wątek (tu: posiadacz blokady symulacji).
+    """
+
+    def __init__(self, initial: T):
+        self.slots: List[T] = [initial, initial, initial]
+        self.index = 0
+        self.published = 0
+
+    def publish(self, value: T):
+        index = (self.index + 1) % 3
+        self.slots[index] = value
+        self.index = index
+        self.published += 1
+
+    def latest(self) -> T:
+        return self.slots[self.index]
+
+
+class SimulationThread:
+    """Wątek wykonujący stałe kroki symulacji i publikujący migawki
+
+    step() wykonuje jeden krok na stanie właściciela, capture() zwraca
+    niezmienny stan kamery. Oba wywoływane są pod blokadą lock.
+    """
+
+    def __init__(self, clock: SimulationClock, step: Callable[[], None],
+                 capture: Callable[[], CameraState]):
+        self.clock = clock
+        self.step = step
+        self.capture = capture
+        self.lock = threading.Lock()
+        self.buffer: TripleBuffer[SimulationSnapshot] = TripleBuffer(self._snapshot(capture()))
+        self.stop_event = threading.Event()
+        self.thread: Optional[threading.Thread] = None
+        self.last_step_ms = 0.0
+        self.max_step_ms = 0.0
+        self.error: Optional[BaseException] = None
+
+    def _snapshot(self, previous: CameraState, current: Optional[CameraState] = None,
+                  alpha: float = 0.0) -> SimulationSnapshot:
+        clock = self.clock
+        return SimulationSnapshot(previous, current or previous, clock.sim_time,
+                                  clock.step_count, alpha, clock.time_source(),
+                                  clock.time_scale, clock.step)
+
+    @property
+    def running(self) -> bool:
+        return self.thread is not None and self.thread.is_alive()
+
+    def start(self):
+        if self.thread is None:
+            self.stop_event.clear()
+            self.clock.reset()
+            self.thread = threading.Thread(target=self._run, name="simulation", daemon=True)
+            self.thread.start()
+
+    def stop(self, timeout: float = 2.0):
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join(timeout)
+            self.thread = None
+
+    def latest(self) -> SimulationSnapshot:
+        """Ostatnia migawka (wątek renderowania, bez blokad)"""
+        return self.buffer.latest()
+
+    def camera(self) -> CameraState:
+        """Kamera do narysowania teraz - interpolowana z ostatniej migawki"""
+        return self.buffer.latest().camera_at(self.clock.time_source())
+
+    def publish_current(self):
+        """Publikuje stan zmieniony bezpośrednio (wejście) - wywoływać pod lock"""
+        self.buffer.publish(self._snapshot(self.capture()))
+
+    def _run(self):
+        clock = self.clock
+        while not self.stop_event.is_set():
+            # Blokada z limitem - zatrzymanie działa także przy zajętym wątku głównym
+            if not self.lock.acquire(timeout=0.1):
+                continue
+            try:
+                start = time.perf_counter()
+                steps = clock.advance()
+                if steps:
+                    for _ in range(steps):
+                        previous = self.capture()
+                        self.step()
+                    self.buffer.publish(self._snapshot(previous, self.capture(), clock.alpha))
+            except Exception as e:
+                self.error = e
+                logger.error(f"Błąd wątku symulacji: {e}")
+                return
+            finally:
+                self.lock.release()
+            if steps:
+                self.last_step_ms = (time.perf_counter() - start) * 1000.0
+                self.max_step_ms = max(self.max_step_ms, self.last_step_ms)
+                STEP_TIME.observe(self.last_step_ms)
+            # Do granicy następnego kroku (przy pauzie - co krok, by zauważyć wznowienie)
+            remaining = (1.0 - clock.alpha) * clock.step
+            self.stop_event.wait(remaining / clock.time_scale if clock.time_scale > 0
+                                 else clock.step)
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Model Słońca i oświetlenie dzień/noc dla Earth Simulator Enhanced
+Autor: Adrian Lesniak
+
+Punkt podsłoneczny liczony jest przybliżonym algorytmem astronomicznym
+(dokładność ok. 0.01°, wystarczająca do rysowania terminatora). Symulator
+liczy oświetlenie na fragment w shaderze (globe_shaders.SOLAR_SHADING) z
+parametrami SolarShading.
+"""
+
+import math
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Tuple
+
+import numpy as np
+
+from picking import from_geographic
+
+J2000 = datetime(2000, 1, 1, 12, 0, 0, tzinfo=timezone.utc)
+
+
+def subsolar_point(when: datetime) -> Tuple[float, float]:
+    """Punkt podsłoneczny (szerokość, długość) w stopniach dla czasu UTC"""
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    n = (when - J2000).total_seconds() / 86400.0
+
+    mean_longitude = 280.460 + 0.9856474 * n
+    mean_anomaly = math.radians(357.528 + 0.9856003 * n)
+    ecliptic_longitude = math.radians(mean_longitude + 1.915 * math.sin(mean_anomaly)
+                                      + 0.020 * math.sin(2 * mean_anomaly))
+    obliquity = math.radians(23.439 - 0.0000004 * n)
+
+    declination = math.asin(math.sin(obliquity) * math.sin(ecliptic_longitude))
+    right_ascension = math.degrees(math.atan2(math.cos(obliquity) * math.sin(ecliptic_longitude),
+                                              math.cos(ecliptic_longitude)))
+    sidereal_time = 280.46061837 + 360.98564736629 * n
+
+    longitude = (right_ascension - sidereal_time + 180.0) % 360.0 - 180.0
+    return math.degrees(declination), longitude
+
+
+def sun_direction(when: datetime) -> np.ndarray:
+    """Jednostkowy wektor do Słońca w układzie modelu globu"""
+    latitude, longitude = subsolar_point(when)
+    return from_geographic(latitude, longitude, radius=1.0)
+
+
+@dataclass
+class SolarShading:
+    """Parametry oświetlenia dzień/noc dla shadera (globe_shaders.SOLAR_SHADING)
+
+    twilight: połowa szerokości pasa zmierzchu w cosinusie kąta zenitalnego
+    (0.1 ≈ ±6°), ambient: jasność strony nocnej bez świateł miast.
+    """
+    twilight: float = 0.1
+    ambient: float = 0.06
+
+
+class SolarClock:
+    """Czas UTC Słońca wyprowadzony z czasu symulacji
+
+    speed to liczba sekund czasu słonecznego na sekundę symulacji
+    (1.0 = rzeczywisty ruch terminatora).
+    """
+
+    def __init__(self, epoch: Optional[datetime] = None, speed: float = 1.0):
+        self.epoch = epoch or datetime.now(timezone.utc)
+        self.speed = speed
+
+    @classmethod
+    def from_config(cls, config: dict) -> "SolarClock":
+        """Tworzy zegar z sekcji "solar" konfiguracji ("time": ISO 8601 lub null)"""
+        epoch = None
+        if config.get("time"):
+            epoch = datetime.fromisoformat(str(config["time"]).replace("Z", "+00:00"))
+            if epoch.tzinfo is None:
+                epoch = epoch.replace(tzinfo=timezone.utc)
+        return cls(epoch, float(config.get("speed", 1.0)))
+
+    def time_at(self, sim_time: float) -> datetime:
+        return self.epoch + timedelta(seconds=sim_time * self.speed)
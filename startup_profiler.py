@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Pomiar czasu startu dla Earth Simulator Enhanced
+Autor: Adrian Lesniak
+
+Profiler rejestruje czasy importów ciężkich modułów (w stylu -X importtime:
+czas własny i skumulowany) oraz kolejnych faz inicjalizacji, aż do
+wyświetlenia pierwszej klatki. Moduł powinien być importowany jako pierwszy,
+żeby punkt zerowy obejmował wszystkie późniejsze importy.
+"""
+
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional
+
+# Budżet czasu do pierwszej klatki (ciepła pamięć podręczna dysku)
+FIRST_FRAME_BUDGET_MS = 300.0
+
+
+@dataclass
+class StartupPhase:
+    """Zmierzona faza startu"""
+    name: str
+    start_ms: float
+    duration_ms: float
+    kind: str = "phase"  # "import" lub "phase"
+    depth: int = 0
+    children_ms: float = 0.0
+
+    @property
+    def self_ms(self) -> float:
+        return self.duration_ms - self.children_ms
+
+
+@dataclass
+class StartupProfiler:
+    """Zbiera czasy importów i faz inicjalizacji"""
+    origin: float = field(default_factory=time.perf_counter)
+    budget_ms: float = FIRST_FRAME_BUDGET_MS
+    phases: List[StartupPhase] = field(default_factory=list)
+    first_frame_ms: Optional[float] = None
+
+    def __post_init__(self):
+        self._stack: List[StartupPhase] = []
+
+    def elapsed_ms(self) -> float:
+        """Czas od punktu zerowego [ms]"""
+        return (time.perf_counter() - self.origin) * 1000.0
+
+    @contextmanager
+    def phase(self, name: str, kind: str = "phase") -> Iterator[StartupPhase]:
+        """Mierzy fazę; fazy zagnieżdżone odejmowane są od czasu własnego rodzica"""
+        entry = StartupPhase(name, self.elapsed_ms(), 0.0, kind, depth=len(self._stack))
+        self.phases.append(entry)
+        self._stack.append(entry)
+        try:
+            yield entry
+        finally:
+            self._stack.pop()
+            entry.duration_ms = self.elapsed_ms() - entry.start_ms
+            if self._stack:
+                self._stack[-1].children_ms += entry.duration_ms
+
+    def importing(self, name: str):
+        """Mierzy import modułu (with startup.importing("pygame"): import pygame)"""
+        return self.phase(name, kind="import")
+
+    def mark_first_frame(self, frame_start: Optional[float] = None) -> bool:
+        """Zapisuje czas pierwszej klatki; zwraca True tylko przy pierwszym wywołaniu
+
+        frame_start (time.perf_counter) dodaje fazę samego rysowania klatki.
+        """
+        if self.first_frame_ms is not None:
+            return False
+        self.first_frame_ms = self.elapsed_ms()
+        if frame_start is not None:
+            start_ms = (frame_start - self.origin) * 1000.0
+            self.phases.append(StartupPhase("pierwsza klatka", start_ms,
+                                            self.first_frame_ms - start_ms))
+        return True
+
+    def total_ms(self, kind: str) -> float:
+        """Suma czasów faz najwyższego poziomu danego rodzaju"""
+        return sum(p.duration_ms for p in self.phases if p.kind == kind and p.depth == 0)
+
+    def summary(self) -> Dict[str, float]:
+        """Podsumowanie do logów i JSON"""
+        result = {
+            "imports_ms": self.total_ms("import"),
+            "init_ms": self.total_ms("phase"),
+            "phases": {p.name: round(p.duration_ms, 2) for p in self.phases},
+        }
+        if self.first_frame_ms is not None:
+            result["first_frame_ms"] = self.first_frame_ms
+            result["within_budget"] = self.first_frame_ms <= self.budget_ms
+        return result
+
+    def format_line(self) -> str:
+        """Jednoliniowe podsumowanie"""
+        first = (f"{self.first_frame_ms:.0f}ms" if self.first_frame_ms is not None
+                 else "brak")
+        return (f"Start: pierwsza klatka {first} (budżet {self.budget_ms:.0f}ms), "
+                f"importy {self.total_ms('import'):.0f}ms, "
+                f"inicjalizacja {self.total_ms('phase'):.0f}ms")
+
+    def format_report(self) -> str:
+        """Tabela w stylu -X importtime: czas własny | skumulowany | nazwa"""
+        lines = ["Czas startu [ms]:   własny | skumulowany | faza"]
+        for p in self.phases:
+            label = ("import " if p.kind == "import" else "") + p.name
+            lines.append(f"  {p.start_ms:8.1f}  {p.self_ms:9.1f} | {p.duration_ms:11.1f} | "
+                         f"{'  ' * p.depth}{label}")
+        lines.append(self.format_line())
+        if self.first_frame_ms is not None and self.first_frame_ms > self.budget_ms:
+            lines.append(f"⚠️ Przekroczono budżet pierwszej klatki o "
+                         f"{self.first_frame_ms - self.budget_ms:.0f}ms")
+        return "\n".join(lines)
+
+
+# Wspólny profiler procesu - punkt zerowy przy pierwszym imporcie modułu
+startup = StartupProfiler()
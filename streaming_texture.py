@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tekstura aktualizowana przez podwójne bufory PBO dla Earth Simulator Enhanced
+Autor: Adrian Lesniak
+
+Dane kopiowane są do zmapowanego bufora GL_PIXEL_UNPACK_BUFFER, a
+glTexSubImage2D z aktywnym PBO tylko zleca transfer - sterownik wykonuje go
+asynchronicznie, równolegle z dalszym renderowaniem. Bufory używane są
+naprzemiennie (i osierocane przed zapisem), więc zapis kolejnej aktualizacji
+nigdy nie czeka na zakończenie transferu poprzedniej.
+"""
+
+import ctypes
+import logging
+from typing import Tuple
+
+import numpy as np
+from OpenGL.GL import *
+
+logger = logging.getLogger(__name__)
+
+
+class StreamingTexture:
+    """Tekstura RGBA8 z dwoma buforami PBO do strumieniowania danych"""
+
+    def __init__(self, width: int, height: int, wrap_s=GL_REPEAT):
+        self.width = int(width)
+        self.height = int(height)
+        self.size = self.width * self.height * 4
+        self.uploads = 0
+        self.index = 0
+
+        self.texture = glGenTextures(1)
+        glBindTexture(GL_TEXTURE_2D, self.texture)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_LINEAR)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_LINEAR)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_S, wrap_s)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_T, GL_CLAMP_TO_EDGE)
+        glTexImage2D(GL_TEXTURE_2D, 0, GL_RGBA8, self.width, self.height, 0,
+                     GL_RGBA, GL_UNSIGNED_BYTE, None)
+        glBindTexture(GL_TEXTURE_2D, 0)
+
+        self.buffers = [int(b) for b in glGenBuffers(2)]
+        for buffer in self.buffers:
+            glBindBuffer(GL_PIXEL_UNPACK_BUFFER, buffer)
+            glBufferData(GL_PIXEL_UNPACK_BUFFER, self.size, None, GL_STREAM_DRAW)
+        glBindBuffer(GL_PIXEL_UNPACK_BUFFER, 0)
+
+    @property
+    def nbytes(self) -> int:
+        """Pamięć GPU: tekstura i dwa bufory PBO"""
+        return self.size * (1 + len(self.buffers)) if self.texture is not None else 0
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return self.width, self.height
+
+    def update(self, pixels: np.ndarray):
+        """Strumieniuje nową zawartość (height x width x 4, uint8) do tekstury"""
+        pixels = np.ascontiguousarray(pixels, dtype=np.uint8)
+        if pixels.nbytes != self.size:
+            raise ValueError(f"Zły rozmiar danych tekstury: {pixels.nbytes} != {self.size}")
+
+        buffer = self.buffers[self.index]
+        self.index = 1 - self.index
+
+        glBindBuffer(GL_PIXEL_UNPACK_BUFFER, buffer)
+        # Osierocenie - sterownik daje nową pamięć, jeśli stara jest jeszcze w transferze
+        glBufferData(GL_PIXEL_UNPACK_BUFFER, self.size, None, GL_STREAM_DRAW)
+        address = glMapBuffer(GL_PIXEL_UNPACK_BUFFER, GL_WRITE_ONLY)
+        if address:
+            ctypes.memmove(address, pixels.ctypes.data, self.size)
+            glUnmapBuffer(GL_PIXEL_UNPACK_BUFFER)
+        else:
+            glBufferSubData(GL_PIXEL_UNPACK_BUFFER, 0, self.size, pixels)
+
+        # Z aktywnym PBO ostatni argument to przesunięcie w buforze
+        glBindTexture(GL_TEXTURE_2D, self.texture)
+        glTexSubImage2D(GL_TEXTURE_2D, 0, 0, 0, self.width, self.height,
+                        GL_RGBA, GL_UNSIGNED_BYTE, ctypes.c_void_p(0))
+        glBindTexture(GL_TEXTURE_2D, 0)
+        glBindBuffer(GL_PIXEL_UNPACK_BUFFER, 0)
+        self.uploads += 1
+
+    def release(self):
+        """Zwalnia zasoby GPU"""
+        try:
+            if self.buffers:
+                glDeleteBuffers(len(self.buffers), self.buffers)
+            if self.texture is not None:
+                glDeleteTextures([self.texture])
+        except Exception as e:
+            logger.warning(f"Błąd zwalniania tekstury strumieniowej: {e}")
+        self.buffers = []
+        self.texture = None
@@ -134,30 +134,1308 @@ def test_utils():
         print(f"❌ Błąd testowania funkcji pomocniczych: {e}")
         return False
 
+def test_simulation_clock():
+    """Testuje zegar symulacji ze stałym krokiem"""
+    print("\n⏱️ Testowanie zegara symulacji...")
+    
+    from simulation_clock import SimulationClock, CameraState
+    
+    # Ta sama sekunda czasu rzeczywistego przy 30, 60 i 240 FPS
+    for fps in (30, 60, 240):
+        clock = SimulationClock(step=1.0 / 60.0)
+        steps = sum(clock.advance(1.0 / fps) for _ in range(fps))
+        assert abs(steps - 60) <= 1, f"{fps} FPS: {steps} kroków"
+        print(f"✅ {fps} FPS -> {steps} kroków symulacji")
+    
+    # Skala czasu i pauza
+    clock = SimulationClock(step=0.025, time_scale=2.0)
+    assert clock.advance(0.05) == 4
+    clock.set_time_scale(0.0)
+    assert clock.advance(0.05) == 0
+    
+    # Długa klatka jest przycinana, a reszta daje współczynnik interpolacji
+    clock = SimulationClock(step=0.1, max_frame_time=0.25, max_steps=8)
+    assert clock.advance(10.0) == 2
+    assert abs(clock.alpha - 0.5) < 1e-9
+    
+    mid = CameraState(0, 0, -5).lerp(CameraState(10, 20, -3), 0.5)
+    assert mid == CameraState(5, 10, -4)
+    print("✅ Skala czasu, przycinanie i interpolacja kamery - OK")
+    
+    # Klawisze [ ] w pauzie zmieniają skalę po wznowieniu, pauza trwa dalej
+    from types import SimpleNamespace
+    from earth_simulator_enhanced import EnhancedEarthSimulator
+    simulator = SimpleNamespace(sim_clock=SimulationClock(time_scale=2.0), paused_time_scale=1.0)
+    EnhancedEarthSimulator.toggle_pause(simulator)
+    EnhancedEarthSimulator.change_time_scale(simulator, 2.0)
+    assert simulator.sim_clock.time_scale == 0.0 and simulator.paused_time_scale == 4.0
+    EnhancedEarthSimulator.change_time_scale(simulator, 0.5)
+    EnhancedEarthSimulator.change_time_scale(simulator, 0.5)
+    assert simulator.sim_clock.time_scale == 0.0 and simulator.paused_time_scale == 1.0
+    EnhancedEarthSimulator.toggle_pause(simulator)
+    assert simulator.sim_clock.time_scale == 1.0
+    print("✅ Zmiana skali czasu w pauzie - OK")
+    return True
+
+def test_camera_path():
+    """Testuje ścieżki kamery ze splajnami"""
+    print("\n🎬 Testowanie ścieżek kamery...")
+    
+    from camera_path import CameraPath
+    
+    path = CameraPath.from_dict({
+        "duration": 4.0,
+        "constant_speed": False,
+        "keyframes": [
+            {"rotation_x": 0, "rotation_y": 180, "distance": -5, "layer": "Default", "time": 0},
+            {"rotation_x": 20, "rotation_y": 220, "distance": -4, "time": 2},
+            {"rotation_x": 0, "rotation_y": 260, "distance": -6, "layer": "Political", "time": 4}
+        ]
+    })
+    
+    # Splajn przechodzi przez klatki kluczowe
+    middle = path.sample(2.0)
+    assert abs(middle.rotation_x - 20) < 1e-6 and abs(middle.distance + 4) < 1e-6
+    assert path.sample(1.0).layer == "Default"
+    assert path.sample(4.0).layer == "Political"
+    print("✅ Catmull-Rom i warstwy - OK")
+    
+    # Koniec niezapętlonej ścieżki wyłącza animację w symulatorze
+    from types import SimpleNamespace
+    from earth_simulator_enhanced import AnimationType, EnhancedEarthSimulator
+    applied = []
+    simulator = SimpleNamespace(animation_enabled=True, animation_time=3.5, animation_speed=1.0,
+                                animation_type=AnimationType.PATH, camera_path=path,
+                                sim_clock=SimpleNamespace(step=0.25),
+                                apply_camera_sample=applied.append)
+    EnhancedEarthSimulator.update_animation(simulator)
+    assert simulator.animation_enabled
+    EnhancedEarthSimulator.update_animation(simulator)
+    assert not simulator.animation_enabled and abs(applied[-1].rotation_y - 260) < 1e-6
+    print("✅ Koniec ścieżki kończy animację - OK")
+    
+    # Stała prędkość: równe odstępy czasu dają równe odcinki drogi
+    import numpy as np
+    from camera_path import camera_positions
+    from dataclasses import replace
+    untimed = [replace(keyframe, time=None) for keyframe in path.keyframes]
+    uniform = CameraPath(untimed, duration=4.0, constant_speed=True)
+    times = np.linspace(0.0, 4.0, 41)
+    values = np.array([[s.rotation_x, s.rotation_y, s.distance, s.fov]
+                       for s in map(uniform.sample, times)])
+    steps = np.linalg.norm(np.diff(camera_positions(values), axis=0), axis=1)
+    assert steps.max() / steps.mean() < 1.05
+    print("✅ Reparametryzacja długością łuku - OK")
+    
+    # Jawny czas klatki jest zachowany; stała prędkość w obrębie odcinka
+    timed = CameraPath.from_dict({
+        "duration": 4.0, "constant_speed": True,
+        "keyframes": [{"rotation_y": 180}, {"rotation_y": 200, "time": 3.0},
+                      {"rotation_y": 300}]
+    })
+    assert abs(timed.sample(3.0).rotation_y - 200.0) < 1e-6
+    assert abs(timed.knot_times[1] - 3.0) < 1e-9
+    values = np.array([[s.rotation_x, s.rotation_y, s.distance, s.fov]
+                       for s in map(timed.sample, np.linspace(0.0, 3.0, 31))])
+    steps = np.linalg.norm(np.diff(camera_positions(values), axis=0), axis=1)
+    assert steps.max() / steps.mean() < 1.05
+    print("✅ Jawne czasy klatek przy stałej prędkości - OK")
+    
+    # SLERP przez kwaterniony i zapętlenie z ciągłą rotacją Y
+    looped = CameraPath.from_dict({
+        "duration": 3.0, "loop": True, "interpolation": "slerp",
+        "keyframes": [{"rotation_y": 0}, {"rotation_y": 120}, {"rotation_y": 240}]
+    })
+    assert abs(looped.sample(3.0).rotation_y - 360.0) < 1e-6
+    assert abs(looped.sample(3.01).rotation_y - looped.sample(2.99).rotation_y) < 5
+    print("✅ SLERP i pętla - OK")
+    return True
+
+def test_quality_controller():
+    """Testuje adaptacyjny regulator jakości"""
+    print("\n🎚️ Testowanie regulatora jakości...")
+    
+    from quality_controller import QualityController
+    
+    controller = QualityController(frame_budget_ms=16.7, start_level="High",
+                                   window=10, cooldown_frames=5, upgrade_patience=2)
+    
+    # Za wolne klatki -> obniżenie jakości (po czasie wstrzymania)
+    changes = [controller.record_frame(30.0) for _ in range(15)]
+    assert controller.level.name == "Medium", controller.level.name
+    assert sum(1 for c in changes if c) == 1
+    print("✅ Obniżanie jakości - OK")
+    
+    # Klatki tuż pod budżetem nie powodują oscylacji
+    for _ in range(100):
+        assert controller.record_frame(15.0) is None
+    
+    # Duży zapas przez kilka okien -> podniesienie jakości
+    for _ in range(30):
+        controller.record_frame(5.0)
+    assert controller.level.name == "High", controller.level.name
+    print("✅ Histereza i podnoszenie jakości - OK")
+    
+    # Vsync 60 Hz: flip czeka stałe 16.7ms - liczy się tylko praca klatki
+    controller = QualityController(frame_budget_ms=16.7, start_level="Medium",
+                                   window=10, cooldown_frames=0, upgrade_patience=2)
+    start = controller.index
+    for i in range(100):
+        controller.record_frame(8.0 + (i % 3) * 0.5 + 16.7, wait_ms=16.7)
+        assert controller.index >= start, controller.level.name
+    print("✅ Oczekiwanie na vsync nie obniża jakości - OK")
+    return True
+
+def test_input_batcher():
+    """Testuje łączenie zdarzeń wejścia w paczki"""
+    print("\n🖱️ Testowanie łączenia zdarzeń wejścia...")
+    
+    import pygame
+    from input_batcher import InputBatcher
+    
+    batcher = InputBatcher()
+    events = [pygame.event.Event(pygame.MOUSEMOTION, pos=(10, 10), rel=(5, 0), buttons=(0, 0, 0)),
+              pygame.event.Event(pygame.MOUSEBUTTONDOWN, pos=(10, 10), button=1),
+              pygame.event.Event(pygame.KEYDOWN, key=pygame.K_a, mod=0, unicode='a')]
+    events += [pygame.event.Event(pygame.MOUSEMOTION, pos=(10 + i, 12), rel=(1, 2), buttons=(1, 0, 0))
+               for i in range(500)]
+    events += [pygame.event.Event(pygame.MOUSEBUTTONDOWN, pos=(500, 12), button=4),
+               pygame.event.Event(pygame.MOUSEBUTTONUP, pos=(500, 12), button=4),
+               pygame.event.Event(pygame.MOUSEBUTTONDOWN, pos=(500, 12), button=5),
+               pygame.event.Event(pygame.MOUSEBUTTONDOWN, pos=(500, 12), button=5)]
+    
+    frame = batcher.collect(events)
+    assert (frame.drag_dx, frame.drag_dy) == (500, 1000)
+    assert frame.wheel == -1
+    assert frame.motion_events == 501
+    assert [e.type for e in frame.events] == [pygame.MOUSEBUTTONDOWN, pygame.KEYDOWN]
+    assert pygame.K_a in frame.held_keys and frame.mouse_pos == (500, 12)
+    
+    frame = batcher.collect([pygame.event.Event(pygame.KEYUP, key=pygame.K_a, mod=0)])
+    assert not frame.held_keys
+    batcher.frame_presented(frame)
+    assert batcher.latency.average_ms >= 0.0
+    print("✅ 506 zdarzeń -> 1 zmiana kamery - OK")
+    return True
+
+def test_input_recorder():
+    """Testuje nagrywanie i odczyt sesji wejścia"""
+    print("\n⏺️ Testowanie nagrywania sesji...")
+    
+    import tempfile
+    import pygame
+    from input_recorder import EventRecorder, PolledFrame, ReplayEventSource, read_recording
+    
+    events = [pygame.event.Event(pygame.MOUSEBUTTONDOWN, pos=(100, 200), button=1),
+              pygame.event.Event(pygame.MOUSEMOTION, pos=(105, 198), rel=(5, -2), buttons=(1, 0, 0)),
+              pygame.event.Event(pygame.KEYDOWN, key=pygame.K_l, mod=0, unicode='l'),
+              pygame.event.Event(pygame.VIDEOEXPOSE)]  # nieobsługiwane - pomijane
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        filename = os.path.join(tmp, "session.esrec")
+        recorder = EventRecorder(filename, (1280, 720), {"texture": "Default"})
+        recorder.record_frame(PolledFrame(events, 0.016, 0.016))
+        recorder.record_frame(PolledFrame([], 0.020, 0.036))
+        recorder.close()
+        
+        recording = read_recording(filename)
+    
+    assert recording.display == (1280, 720) and recording.config == {"texture": "Default"}
+    assert len(recording.frames) == 2
+    first = recording.frames[0]
+    assert [e.type for e in first.events] == [pygame.MOUSEBUTTONDOWN, pygame.MOUSEMOTION, pygame.KEYDOWN]
+    assert first.events[1].rel == (5, -2) and first.events[1].buttons[0]
+    assert first.events[2].unicode == 'l' and recording.frames[1].frame_time == 0.020
+    
+    source = ReplayEventSource(recording, realtime=False)
+    assert source.poll() is not None and source.poll() is not None and source.poll() is None
+    print("✅ Zapis, odczyt i odtwarzanie klatek - OK")
+    return True
+
+def test_startup_profiler():
+    """Testuje pomiar faz startu i szybki podgląd tekstury"""
+    print("\n🚀 Testowanie profilera startu...")
+    
+    from startup_profiler import StartupProfiler
+    from texture_loader import TextureLoader, decode_image
+    
+    profiler = StartupProfiler(budget_ms=1000.0)
+    with profiler.importing("json"):
+        import json
+    with profiler.phase("symulator"):
+        with profiler.phase("tekstury"):
+            time.sleep(0.01)
+    outer, inner = profiler.phases[1], profiler.phases[2]
+    assert inner.depth == 1 and inner.duration_ms >= 10.0
+    assert abs(outer.self_ms - (outer.duration_ms - inner.duration_ms)) < 1e-6
+    assert profiler.mark_first_frame() and not profiler.mark_first_frame()
+    assert profiler.summary()["within_budget"]
+    assert "import json" in profiler.format_report()
+    print("✅ Fazy zagnieżdżone i pierwsza klatka - OK")
+    
+    width, height, data = decode_image("earth_political.jpg", max_size=1024)
+    assert max(width, height) <= 1024 and len(data) == width * height * 4
+    
+    loader = TextureLoader(lambda filename: decode_image(filename, max_size=256))
+    loader.request("Political", "earth_political.jpg")
+    loader.request("Political", "earth_political.jpg")  # duplikat - pomijany
+    decoded = loader.poll(timeout=10.0)
+    assert decoded is not None and decoded.name == "Political" and not loader.busy
+    loader.close()
+    print(f"✅ Podgląd {width}x{height} i dekodowanie w tle - OK")
+    return True
+
+def test_log_pipeline():
+    """Testuje kolejkę logów i ograniczanie powtórzeń"""
+    print("\n📝 Testowanie logowania w tle...")
+    
+    import logging
+    import tempfile
+    from log_pipeline import LOG_FILE_ENV, LogPipeline, RateLimitFilter, log_filename
+    
+    now = [0.0]
+    rate_limit = RateLimitFilter(burst=2, interval=10.0, clock=lambda: now[0])
+    
+    def record(lineno: int, level: int = logging.ERROR) -> logging.LogRecord:
+        return logging.LogRecord("test", level, "sim.py", lineno, "Błąd zoom: %s", ("x",), None)
+    
+    assert [rate_limit.filter(record(1)) for _ in range(4)] == [True, True, False, False]
+    assert rate_limit.filter(record(2)) and rate_limit.filter(record(1, logging.INFO))
+    now[0] = 11.0
+    resumed = record(1)
+    assert rate_limit.filter(resumed) and "pominięto 2 powtórzeń" in resumed.getMessage()
+    print("✅ Limit powtórzeń z jednego miejsca - OK")
+    
+    # Logowanie z kilku wątków naraz - limit i licznik pominiętych bez zgubionych zmian
+    import threading
+    shared = RateLimitFilter(burst=5, interval=60.0, clock=lambda: 0.0)
+    passed = []
+    
+    def log_from_thread():
+        passed.append(sum(shared.filter(record(7)) for _ in range(2000)))
+    
+    threads = [threading.Thread(target=log_from_thread) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sum(passed) == 5 and shared.suppressed_total == 4 * 2000 - 5
+    assert shared.windows[("sim.py", 7)][2] == shared.suppressed_total
+    print("✅ Filtr współdzielony przez wątki - OK")
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        filename = os.path.join(tmp, "test.log")
+        test_logger = logging.getLogger("test_log_pipeline")
+        test_logger.propagate = False
+        pipeline = LogPipeline(filename, console=False, max_bytes=2048, backup_count=1)
+        pipeline.install(test_logger)
+        for i in range(50):
+            test_logger.info(f"Klatka {i:03d} " + "x" * 40)
+        pipeline.stop()
+        
+        with open(filename, encoding='utf-8') as f:
+            content = f.read()
+        assert "Klatka 049" in content and os.path.exists(filename + ".1")
+        assert os.path.getsize(filename) <= 2048
+    print("✅ Zapis w wątku tła i rotacja pliku - OK")
+    
+    # Procesy robocze (batch_render) nie dzielą pliku logów
+    previous = os.environ.pop(LOG_FILE_ENV, None)
+    try:
+        assert log_filename("earth_simulator.log") == "earth_simulator.log"
+        os.environ[LOG_FILE_ENV] = ""
+        assert log_filename("earth_simulator.log") is None
+        os.environ[LOG_FILE_ENV] = "worker.log"
+        assert log_filename("earth_simulator.log") == "worker.log"
+    finally:
+        os.environ.pop(LOG_FILE_ENV, None)
+        if previous is not None:
+            os.environ[LOG_FILE_ENV] = previous
+    print("✅ Plik logów z EARTH_SIMULATOR_LOG - OK")
+    return True
+
+def test_picking():
+    """Testuje wskazywanie punktów globu kursorem (bez GPU)"""
+    print("\n🎯 Testowanie wskazywania punktów...")
+    
+    import numpy as np
+    from camera_math import perspective_matrix
+    from picking import (from_geographic, to_geographic, pick, project, camera_keeping_point,
+                         camera_centered_on)
+    from simulation_clock import CameraState
+    
+    for lat, lon in [(52.23, 21.01), (-33.9, 151.2), (0.0, -179.5), (89.0, 0.0)]:
+        back = to_geographic(from_geographic(lat, lon))
+        assert abs(back[0] - lat) < 1e-9 and abs(back[1] - lon) < 1e-9
+    print("✅ Przeliczanie współrzędnych geograficznych - OK")
+    
+    viewport = (1280, 720)
+    projection = perspective_matrix(45, 1280 / 720, 0.1, 50.0)
+    center = pick(640, 360, viewport, projection, CameraState(0, 0, -5))
+    assert abs(center.latitude) < 1e-6 and abs(center.longitude - 90.0) < 1e-6
+    assert pick(5, 5, viewport, projection, CameraState(0, 0, -5)) is None
+    
+    camera = CameraState(-40, 33, -7)
+    point = pick(700, 300, viewport, projection, camera)
+    screen = project(point.position, viewport, projection, camera)
+    assert abs(screen[0] - 700) < 1e-6 and abs(screen[1] - 300) < 1e-6
+    print(f"✅ Promień kursora i przecięcie ze sferą ({point.format()}) - OK")
+    
+    zoomed = camera_keeping_point(point.position, 700, 300, viewport, projection,
+                                  CameraState(camera.rotation_x, camera.rotation_y, -6))
+    screen = project(point.position, viewport, projection, zoomed)
+    assert np.hypot(screen[0] - 700, screen[1] - 300) < 1.0 and zoomed.distance == -6
+    print("✅ Punkt pod kursorem po przybliżeniu - OK")
+
+    for lat, lon in [(52.23, 21.01), (-33.9, 151.2), (0.0, 0.0), (-89.0, 45.0)]:
+        centered = camera_centered_on(lat, lon, -4)
+        hit = pick(640, 360, viewport, projection, centered)
+        assert abs(hit.latitude - lat) < 1e-6 and centered.distance == -4
+        assert abs((hit.longitude - lon + 180) % 360 - 180) < 1e-6
+        assert abs(centered.rotation_x) <= 85
+    print("✅ Kamera wycentrowana na punkcie - OK")
+    return True
+
+def test_solar():
+    """Testuje punkt podsłoneczny i oświetlenie dzień/noc"""
+    print("\n☀️ Testowanie modelu Słońca...")
+    
+    import numpy as np
+    from datetime import datetime, timezone
+    from types import SimpleNamespace
+    from earth_simulator_enhanced import EnhancedEarthSimulator
+    from globe_shaders import SOLAR_SHADING
+    from solar import SolarClock, SolarShading, subsolar_point, sun_direction
+    
+    equinox = subsolar_point(datetime(2024, 3, 20, 12, 0, tzinfo=timezone.utc))
+    solstice = subsolar_point(datetime(2024, 6, 20, 12, 0, tzinfo=timezone.utc))
+    november = subsolar_point(datetime(2024, 11, 3, 12, 0, tzinfo=timezone.utc))
+    assert abs(equinox[0]) < 0.5 and abs(solstice[0] - 23.44) < 0.1
+    # Równanie czasu: na początku listopada Słońce wyprzedza południe o ~16 minut
+    assert abs(november[1] - (-4.1)) < 0.3
+    print("✅ Punkt podsłoneczny (równonoc, przesilenie, równanie czasu) - OK")
+    
+    # Uniformy ustawiane przy rysowaniu globu i chmur w trybie nocnym
+    uniforms = {}
+    program = SimpleNamespace(set_float=lambda name, *values: uniforms.update({name: values}))
+    simulator = SimpleNamespace(solar_shading=SolarShading(twilight=0.1, ambient=0.05))
+    sun = sun_direction(datetime(2024, 6, 20, 12, 0, tzinfo=timezone.utc))
+    EnhancedEarthSimulator.set_solar_uniforms(simulator, program, sun)
+    assert uniforms["u_twilight"] == (0.1,) and uniforms["u_ambient"] == (0.05,)
+    assert np.allclose(uniforms["u_sun"], sun)
+    # Każdy ustawiany uniform jest zadeklarowany we wspólnej funkcji shadera
+    assert all(f"uniform {'vec3' if name == 'u_sun' else 'float'} {name};" in SOLAR_SHADING
+               for name in uniforms)
+    print("✅ Uniformy oświetlenia dzień/noc - OK")
+    
+    clock = SolarClock.from_config({"time": "2024-06-20T12:00:00Z", "speed": 60.0})
+    assert clock.time_at(60.0) == datetime(2024, 6, 20, 13, 0, tzinfo=timezone.utc)
+    assert abs(np.linalg.norm(sun_direction(clock.time_at(0.0))) - 1.0) < 1e-9
+    print("✅ Zegar Słońca z konfiguracji - OK")
+    return True
+
+def test_clouds():
+    """Testuje pole chmur i generator w wątku tła"""
+    print("\n☁️ Testowanie warstwy chmur...")
+    
+    import time
+    import numpy as np
+    from clouds import CloudSettings, CloudField, CloudGenerator
+    
+    settings = CloudSettings.from_config({"resolution": [128, 64], "octaves": 4,
+                                          "coverage": 0.5, "update_hz": 50})
+    assert settings.to_config()["resolution"] == [128, 64]
+    field = CloudField(settings)
+    frame = field.render(0.0)
+    assert frame.shape == (64, 128, 4) and frame.dtype == np.uint8
+    assert np.array_equal(frame, CloudField(settings).render(0.0))  # stałe ziarno
+    
+    density = field.density(0.0)
+    assert 0.0 <= density.min() and density.max() <= 1.0
+    # Zawinięcie w długości: szew nie odstaje od sąsiednich kolumn
+    seam = np.abs(density[:, 0] - density[:, -1]).mean()
+    assert seam < 2.0 * np.abs(np.diff(density, axis=1)).mean()
+    
+    # Pasy wierszy składają się w tę samą klatkę co całość
+    banded = np.empty_like(frame)
+    for row in range(0, 64, 24):
+        field.render_rows(0.0, banded, row, min(64, row + 24))
+    assert np.array_equal(banded, frame)
+    assert not np.array_equal(field.render(30.0), frame)
+    
+    coverage = lambda c: (CloudField(CloudSettings(width=128, height=64, coverage=c))
+                          .render(0.0)[..., 3] > 0).mean()
+    assert coverage(0.2) < coverage(0.5) < coverage(0.8)
+    print("✅ Szum fraktalny, zawijanie i pokrycie - OK")
+    
+    generator = CloudGenerator(field)
+    generator.set_time(12.0)
+    generator.start()
+    try:
+        deadline = time.time() + 5.0
+        latest = None
+        while latest is None and time.time() < deadline:
+            latest = generator.poll()
+            time.sleep(0.01)
+        assert latest is not None and np.array_equal(latest, field.render(12.0))
+        assert generator.poll() is None or generator.frames_generated > 1
+        generator.pause()
+    finally:
+        generator.stop()
+    print("✅ Generator chmur w wątku tła - OK")
+    return True
+
+def test_atmosphere():
+    """Testuje tablice rozpraszania atmosferycznego i ich pamięć podręczną"""
+    print("\n🌅 Testowanie tablic atmosfery...")
+    
+    import os
+    import tempfile
+    import numpy as np
+    from atmosphere import (AtmosphereParameters, build_tables, build_transmittance,
+                            load_or_build_tables)
+    
+    params = AtmosphereParameters()
+    transmittance = build_transmittance(params)
+    zenith = transmittance[0, -1]
+    # Pionowo w górę z poziomu morza: ziemska głębokość optyczna (niebieski tłumiony najmocniej)
+    assert abs(zenith[0] - np.exp(-(5.802e-3 * 8.0 + 4.44e-3 * 1.2))) < 0.01
+    assert zenith[2] < zenith[1] < zenith[0]
+    assert transmittance[0, 0].max() == 0.0  # promień w planetę
+    print("✅ Transmitancja - OK")
+    
+    tables = build_tables(params, size=(16, 9, 5), steps=24)
+    assert tables.rayleigh.shape == (16, 9, 5, 4) and tables.mie.shape == (16, 9, 5, 3)
+    noon, night = tables.rayleigh[0, -1, 0, :3], tables.rayleigh[0, 0, -1, :3]
+    assert noon[2] > noon[1] > noon[0] > 0.0  # niebieskie niebo
+    assert night.max() < 1e-6                 # cień planety
+    assert 0.0 < tables.rayleigh[..., 3].min() and tables.rayleigh[..., 3].max() <= 1.0
+    print("✅ Pojedyncze rozpraszanie - OK")
+    
+    with tempfile.TemporaryDirectory() as cache_dir:
+        first = load_or_build_tables(params, cache_dir)
+        files = os.listdir(cache_dir)
+        assert len(files) == 1 and params.cache_key() in files[0]
+        second = load_or_build_tables(params, cache_dir)
+        assert np.array_equal(first.rayleigh, second.rayleigh)
+        assert AtmosphereParameters(top_radius=1.08).cache_key() != params.cache_key()
+    print("✅ Pamięć podręczna tablic - OK")
+    return True
+
+def test_shaders():
+    """Testuje składanie wariantów programów GLSL (bez GPU)"""
+    print("\n🖌️ Testowanie programów shaderów...")
+    
+    import numpy as np
+    from camera_math import orthographic_matrix
+    from globe_shaders import PROGRAMS
+    from shaders import ATTRIBUTES, with_defines
+    
+    source = PROGRAMS["globe"][1]
+    variant = with_defines(source, ["VIEW_NIGHT", "FOO 2"])
+    lines = variant.splitlines()
+    assert lines[0] == "#version 120"
+    assert lines[1:3] == ["#define VIEW_NIGHT", "#define FOO 2"]
+    assert with_defines(source, []) == source
+    assert with_defines("void main() {}", ["A"]).startswith("#define A\n")
+    print("✅ Wstawianie #define po #version - OK")
+    
+    for name, (vertex, fragment) in PROGRAMS.items():
+        assert vertex.lstrip().startswith("#version") and fragment.lstrip().startswith("#version")
+        # Każdy atrybut musi mieć stałą lokalizację wiązaną przed linkowaniem
+        declared = {line.split()[2].rstrip(";") for line in vertex.splitlines()
+                    if line.startswith("attribute ")}
+        assert "a_position" in declared and declared <= set(ATTRIBUTES), name
+    print("✅ Źródła programów i atrybuty - OK")
+    
+    ortho = orthographic_matrix(0, 1280, 720, 0, -1, 1)
+    top_left = ortho @ np.array([0, 0, 0, 1])
+    bottom_right = ortho @ np.array([1280, 720, 0, 1])
+    assert np.allclose(top_left[:2], (-1, 1)) and np.allclose(bottom_right[:2], (1, -1))
+    print("✅ Rzut interfejsu w pikselach - OK")
+    return True
+
+def test_gl_state():
+    """Testuje pomijanie zbędnych zmian stanu GL (wywołania GL zapisywane zamiast wykonywane)"""
+    print("\n🧮 Testowanie pamięci stanu GL...")
+    
+    import gl_state
+    from OpenGL.GL import GL_BLEND, GL_DEPTH_TEST, GL_LINE, GL_ONE, GL_SRC_ALPHA
+    
+    calls = []
+    names = ["glEnable", "glDisable", "glBlendFunc", "glPolygonMode", "glDepthMask",
+             "glCullFace", "glActiveTexture", "glBindTexture", "glUseProgram"]
+    originals = {name: getattr(gl_state, name) for name in names}
+    for name in names:
+        setattr(gl_state, name, lambda *args, name=name: calls.append(name))
+    try:
+        state = gl_state.GLState(debug=True)
+        state.begin_frame()
+        for _ in range(3):
+            state.enable(GL_BLEND)
+            state.blend_func(GL_ONE, GL_SRC_ALPHA)
+            state.polygon_mode(GL_LINE)
+            state.use_program(7)
+            state.bind_texture(5)
+        state.disable(GL_DEPTH_TEST)
+        state.bind_texture(6, 1)
+        state.end_frame()
+        assert calls.count("glEnable") == 1 and calls.count("glBlendFunc") == 1
+        assert calls.count("glUseProgram") == 1 and calls.count("glDisable") == 1
+        assert calls.count("glBindTexture") == 2 and calls.count("glActiveTexture") == 2
+        issued, avoided = state.last_frame
+        assert issued == len(calls) and avoided == 10
+        print(f"✅ Zbędne wywołania pominięte ({avoided} z {issued + avoided}) - OK")
+        
+        # Tekstury mogły zostać podpięte poza GLState (przesyłanie) - nowa klatka je zapomina
+        state.begin_frame()
+        state.bind_texture(5)
+        state.enable(GL_BLEND)
+        assert calls[-1] == "glBindTexture" and state.avoided == 1
+        print("✅ Powiązania tekstur zapominane co klatkę - OK")
+        
+        # Przesyłanie tekstury wymaga jednostki 0, choć ostatnio aktywna była inna
+        state.bind_texture(6, 1)
+        state.bind_texture(5)
+        assert calls[-1] == "glBindTexture" and state.unit == 1
+        state.active_texture(0)
+        assert calls[-1] == "glActiveTexture" and state.unit == 0
+        issued = len(calls)
+        state.active_texture(0)
+        assert len(calls) == issued
+        print("✅ Jednostka tekstury przed przesłaniem - OK")
+    finally:
+        for name, function in originals.items():
+            setattr(gl_state, name, function)
+    return True
+
+def test_gl_config():
+    """Testuje tryb PyOpenGL (flagi ustawiane przed importem OpenGL.GL)"""
+    print("\n🐍 Testowanie trybu PyOpenGL...")
+    
+    import gl_config
+    
+    # Świeży proces - flagi działają tylko przed pierwszym importem OpenGL.GL
+    script = ("import gl_config; mode = gl_config.configure_pyopengl({debug}); "
+              "from OpenGL import GL, _configflags; "
+              "print(mode.error_checking, _configflags.ERROR_CHECKING, "
+              "_configflags.ARRAY_SIZE_CHECKING)")
+    for debug in (False, True):
+        result = subprocess.run([sys.executable, "-c", script.format(debug=debug)],
+                                cwd=os.path.dirname(os.path.abspath(__file__)),
+                                capture_output=True, text=True, timeout=60)
+        assert result.returncode == 0, result.stderr
+        assert result.stdout.split() == [str(debug)] * 3, result.stdout
+    print("✅ Tryb szybki wyłącza, a debug zostawia sprawdzanie błędów - OK")
+    
+    # Po imporcie OpenGL.GL konfiguracja zwraca tryb, który faktycznie obowiązuje
+    import OpenGL.GL
+    mode = gl_config.configure_pyopengl(debug=True)
+    assert mode == gl_config.active_mode() and mode.describe()
+    print(f"✅ Bieżący tryb: {mode.describe()} - OK")
+    return True
+
+def test_screenshot_encoding():
+    """Testuje kodowanie zrzutów ekranu (wiersze z bufora OpenGL od dołu)"""
+    print("\n📸 Testowanie kodowania zrzutów ekranu...")
+    
+    import tempfile
+    from PIL import Image
+    from screenshot import encode_image
+    
+    # 16x16 RGBA: dolna połowa czerwona, górna niebieska (kolejność glReadPixels)
+    pixels = bytes([255, 0, 0, 255] * 128 + [0, 0, 255, 255] * 128)
+    with tempfile.TemporaryDirectory() as directory:
+        for extension in ("png", "webp"):
+            path = os.path.join(directory, f"shot.{extension}")
+            encode_image(path, 16, 16, pixels)
+            with Image.open(path) as image:
+                assert image.mode == "RGB" and image.size == (16, 16)
+                top, bottom = image.getpixel((8, 2)), image.getpixel((8, 13))
+            assert top[2] > 200 and top[0] < 50, top
+            assert bottom[0] > 200 and bottom[2] < 50, bottom
+            print(f"✅ Zapis {extension.upper()} z odwróconymi wierszami - OK")
+        
+        try:
+            encode_image(os.path.join(directory, "shot.bmp"), 16, 16, pixels)
+            assert False, "Nieobsługiwany format powinien zgłosić błąd"
+        except ValueError:
+            print("✅ Nieobsługiwany format odrzucony - OK")
+    return True
+
+def test_video_recording():
+    """Testuje zapis klatek nagrania (Y4M) i stały krok czasu przy nagrywaniu"""
+    print("\n🎬 Testowanie nagrywania wideo...")
+    
+    import tempfile
+    from input_recorder import FixedStepEventSource, PolledFrame
+    from video_recorder import Y4MWriter, rgba_to_yuv420
+    
+    # 4x2 RGBA: dolny wiersz biały, górny czarny (kolejność glReadPixels)
+    pixels = bytes([255] * 16 + [0, 0, 0, 255] * 4)
+    planes = rgba_to_yuv420(4, 2, pixels)
+    assert len(planes) == 4 * 2 + 2 * 2 * 1
+    assert list(planes[:4]) == [0] * 4 and list(planes[4:8]) == [255] * 4
+    assert all(abs(value - 128) <= 1 for value in planes[8:])
+    print("✅ Konwersja RGBA -> YUV 4:2:0 z odwróceniem wierszy - OK")
+    
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "video.y4m")
+        writer = Y4MWriter(path, 30)
+        for index in range(3):
+            writer.write(index, 4, 2, planes)
+        writer.close()
+        with open(path, 'rb') as f:
+            data = f.read()
+        header, _, body = data.partition(b"\n")
+        assert header.startswith(b"YUV4MPEG2 W4 H2 F30:1") and b"C420jpeg" in header
+        assert body == (b"FRAME\n" + planes) * 3
+    print("✅ Strumień Y4M (nagłówek i klatki) - OK")
+    
+    class Source:
+        realtime = True
+        
+        def poll(self):
+            return PolledFrame([], 0.25, 1.0)
+    
+    source = FixedStepEventSource(Source(), 1.0 / 30)
+    frames = [source.poll() for _ in range(3)]
+    assert all(frame.frame_time == 1.0 / 30 for frame in frames)
+    assert abs(frames[-1].timestamp - 0.1) < 1e-9
+    print("✅ Stały krok czasu nagrania niezależny od zegara - OK")
+    return True
+
+def test_poster():
+    """Testuje rzuty kafelków plakatu i strumieniowy zapis PNG"""
+    print("\n🖼️ Testowanie plakatu z kafelków...")
+
+    import tempfile
+    import numpy as np
+    from PIL import Image
+    from camera_math import perspective_matrix
+    from poster import PngStreamWriter, render_tiled, tile_projection
+
+    # Punkt sceny trafia w ten sam piksel w pełnym rzucie i w rzucie kafelka
+    width, height = 1000, 600
+    full = perspective_matrix(45, width / height, 0.1, 50.0)
+    tile = tile_projection(45, width / height, 0.1, 50.0, 250, 100, 500, 400, width, height)
+    point = np.array([0.7, 0.4, -4.0, 1.0])
+
+    def to_pixel(matrix, x0, y0, w, h):
+        clip = matrix @ point
+        return (x0 + (clip[0] / clip[3] + 1) * 0.5 * w, y0 + (1 - clip[1] / clip[3]) * 0.5 * h)
+
+    assert np.allclose(to_pixel(full, 0, 0, width, height), to_pixel(tile, 250, 100, 250, 300))
+    print("✅ Rzut niesymetryczny kafelka - OK")
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "poster.png")
+        writer = PngStreamWriter(path, 5, 4)
+        rows = np.arange(4 * 5 * 3, dtype=np.uint8).reshape(4, 5, 3)
+        writer.write_rows(rows[:3])
+        writer.write_rows(rows[3:])
+        writer.close()
+        assert np.array_equal(np.asarray(Image.open(path)), rows)
+
+        # Kafelki 2x2 w kolorze zależnym od położenia (piksele RGBA od dołu)
+        def render_tile(projection, w, h):
+            shade = int(round(projection[0, 2] * 50 + 100))
+            return bytes([shade, 0, 0, 255]) * (w * h)
+
+        result = render_tiled(path, (7, 5), 45, 0.1, 50.0, render_tile, tile_size=4)
+        image = np.asarray(Image.open(path))
+        assert result.tiles == 4 and image.shape == (5, 7, 3)
+        assert image[0, 0, 0] == image[4, 0, 0] and image[0, 0, 0] < image[0, 6, 0]
+    print("✅ Strumieniowy zapis PNG pasami - OK")
+    return True
+
+def test_download_manager():
+    """Testuje pobieranie z wznawianiem, ponawianiem i weryfikacją (lokalny serwer HTTP)"""
+    print("\n⬇️ Testowanie menedżera pobierania...")
+
+    import hashlib
+    import tempfile
+    import threading
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    from download_manager import DownloadItem, DownloadManager
+
+    data = bytes(range(256)) * 400
+    requests_seen = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            requests_seen.append((self.path, self.headers.get('Range')))
+            if self.path == "/flaky" and sum(p == "/flaky" for p, _ in requests_seen) == 1:
+                self.send_error(503)
+                return
+            start = 0
+            ranged = self.headers.get('Range')
+            if ranged and self.path != "/norange":
+                start = int(ranged.split("=")[1].rstrip("-"))
+                self.send_response(206)
+                self.send_header('Content-Range', f"bytes {start}-{len(data) - 1}/{len(data)}")
+            else:
+                self.send_response(200)
+            self.send_header('Content-Length', str(len(data) - start))
+            self.end_headers()
+            body = data[start:]
+            if self.path == "/cut" and not ranged:
+                body = body[:len(body) // 2]   # zerwane połączenie
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    digest = hashlib.sha256(data).hexdigest()
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            manager = DownloadManager(directory, workers=3, chunk_size=4096, timeout=5,
+                                      retries=2, backoff=0.0)
+            items = [DownloadItem(name, f"{base}/{name}", digest, len(data))
+                     for name in ("a.jpg", "flaky", "cut")]
+            results = manager.download_all(items)
+            assert [r.status for r in results] == ["downloaded"] * 3
+            assert results[1].attempts == 2 and results[2].resumed
+            for name in ("a.jpg", "flaky", "cut"):
+                with open(os.path.join(directory, name), 'rb') as f:
+                    assert f.read() == data
+            assert not [n for n in os.listdir(directory) if n.endswith(".part")]
+            print("✅ Równoległe pobieranie, ponowienie po 503 i wznowienie po zerwaniu - OK")
+
+            # Wznowienie z pliku .part (Range) i serwer ignorujący zakresy
+            for name in ("resume.jpg", "norange"):
+                with open(os.path.join(directory, name + ".part"), 'wb') as f:
+                    f.write(data[:1000])
+                result = manager.download(DownloadItem(name, f"{base}/{name}", digest))
+                assert result.status == "downloaded"
+                assert result.bytes_received == (len(data) - 1000 if name == "resume.jpg"
+                                                 else len(data))
+            assert ("/resume.jpg", "bytes=1000-") in requests_seen
+            assert manager.download(items[0]).status == "skipped"
+
+            bad = manager.download(DownloadItem("bad.jpg", f"{base}/bad.jpg", "0" * 64))
+            assert bad.status == "failed" and "SHA-256" in bad.error
+            assert not any(n.startswith("bad.jpg") for n in os.listdir(directory))
+            missing = DownloadManager(directory, retries=0).download(
+                DownloadItem("x", "http://127.0.0.1:9/x"))
+            assert missing.status == "failed" and missing.attempts == 1
+        print("✅ Wznawianie (Range), weryfikacja SHA-256 i błędy - OK")
+    finally:
+        server.shutdown()
+        server.server_close()
+    return True
+
+def test_batch_views():
+    """Testuje wczytywanie listy widoków do renderowania wsadowego"""
+    print("\n🖼️ Testowanie listy widoków...")
+
+    import json
+    import tempfile
+    from batch_render import View, load_views
+    from utils import parse_size
+
+    with tempfile.TemporaryDirectory() as directory:
+        csv_path = os.path.join(directory, "views.csv")
+        with open(csv_path, 'w', encoding='utf-8') as f:
+            f.write("name,latitude,longitude,zoom,layer\n"
+                    "warszawa,52.23,21.01,2,Political\n"
+                    ",-33.9,190,,\n")
+        views = load_views(csv_path)
+        assert views[0] == View("warszawa", 52.23, 21.01, 2.0, "Political")
+        assert views[1].name == "view_00001" and views[1].layer == "Default"
+        assert abs(views[1].longitude - (-170.0)) < 1e-9
+        assert views[0].distance == -2.5 and View("a", 0, 0, 0.1).distance == -15.0
+        print("✅ CSV z nagłówkiem i wartości domyślne - OK")
+
+        json_path = os.path.join(directory, "views.json")
+        for content, valid in [({"views": [{"name": "a", "latitude": 1, "longitude": 2}]}, True),
+                               ([{"name": "a", "latitude": 95, "longitude": 0}], False),
+                               ([{"name": "../a", "latitude": 0, "longitude": 0}], False),
+                               ([{"name": "a", "latitude": 0, "longitude": 0}] * 2, False)]:
+            with open(json_path, 'w', encoding='utf-8') as f:
+                json.dump(content, f)
+            try:
+                load_views(json_path)
+                assert valid
+            except ValueError:
+                assert not valid
+    assert parse_size("640x360") == (640, 360)
+    for text in ("640", "0x10", "axb"):
+        try:
+            parse_size(text)
+            assert False, text
+        except ValueError:
+            pass
+    print("✅ JSON i walidacja widoków - OK")
+    return True
+
+def test_asset_validator():
+    """Testuje weryfikację nagłówków tekstur i pamięć podręczną wyników"""
+    print("\n🧾 Testowanie weryfikacji tekstur...")
+
+    import tempfile
+    from PIL import Image
+    from asset_validator import (AssetValidator, AssetError, ImageHeader, file_sha256,
+                                 read_image_header)
+    from utils import is_valid_image_file
+
+    with tempfile.TemporaryDirectory() as directory:
+        jpeg = os.path.join(directory, "map.jpg")
+        png = os.path.join(directory, "map.png")
+        Image.new('RGB', (64, 32), (10, 20, 30)).save(jpeg, quality=90)
+        Image.new('RGB', (30, 20)).save(png)
+        assert read_image_header(jpeg) == ImageHeader("JPEG", 64, 32)
+        assert read_image_header(png) == ImageHeader("PNG", 30, 20)
+        with open(jpeg, 'rb') as f:
+            data = f.read()
+        truncated = os.path.join(directory, "cut.jpg")
+        garbage = os.path.join(directory, "text.jpg")
+        with open(truncated, 'wb') as f:
+            f.write(data[:len(data) // 2])
+        with open(garbage, 'wb') as f:
+            f.write(b"<html>404</html>")
+        for path in (truncated, garbage):
+            try:
+                read_image_header(path)
+                assert False, path
+            except AssetError:
+                pass
+        assert is_valid_image_file(jpeg) and not is_valid_image_file(truncated)
+        print("✅ Nagłówki JPEG/PNG i pliki ucięte - OK")
+
+        # Stare mtime - pliki świeżo zapisane nie trafiają do pamięci podręcznej
+        old = time.time() - 60
+        for path in (jpeg, png, truncated):
+            os.utime(path, (old, old))
+        cache_path = os.path.join(directory, "cache.json")
+        expected = {"map.jpg": file_sha256(jpeg), "map.png": "0" * 64}
+        reports = AssetValidator(cache_path, expected).validate_all(
+            [jpeg, png, truncated, os.path.join(directory, "none.jpg")], aspect=2.0)
+        assert [r.ok for r in reports] == [True, True, False, False]
+        assert not any(r.cached for r in reports)
+        assert reports[0].warnings == [] and len(reports[1].warnings) == 2
+
+        validator = AssetValidator(cache_path, expected)
+        again = validator.validate_all([jpeg, png, truncated])
+        assert all(r.cached for r in again) and again[0].sha256 == reports[0].sha256
+        assert not again[2].ok and again[2].error == reports[2].error
+
+        # Zmieniony plik (rozmiar i mtime) jest sprawdzany od nowa
+        with open(jpeg, 'ab') as f:
+            f.write(b"\0")
+        os.utime(jpeg, (old + 1, old + 1))
+        changed = AssetValidator(cache_path, expected).validate(jpeg)
+        assert not changed.cached and changed.ok and changed.warnings
+        fresh = os.path.join(directory, "fresh.png")
+        Image.new('RGB', (2, 1)).save(fresh)
+        validator.validate(fresh)
+        assert os.path.abspath(fresh) not in validator.cache
+        print("✅ Pamięć podręczna (ścieżka, rozmiar, mtime) - OK")
+    return True
+
+def test_memory_profiler():
+    """Testuje rozliczenie pamięci podsystemów, próbkowanie i śledzenie alokacji"""
+    print("\n🧠 Testowanie profilu pamięci...")
+
+    import json
+    import tempfile
+    from memory_profiler import MemoryProfiler, MemorySampler, format_bytes, read_rss
+
+    assert read_rss() > 0
+    assert format_bytes(512) == "512 B" and format_bytes(3 * 1024 * 1024) == "3.0 MB"
+
+    textures = {1: 4096, 2: 1024}
+    profiler = MemoryProfiler(sample_interval=0.01, accounting_interval=2)
+    profiler.register("tekstury", lambda: sum(textures.values()))
+    profiler.register("kolejka", lambda: 100, gpu=False)
+    profiler.register("błędny", lambda: 1 // 0)
+    profiler.start()
+    assert profiler.accounting.gpu_bytes == 5120 and profiler.accounting.cpu_bytes == 100
+    deadline = time.time() + 2.0
+    while not profiler.sampler.samples and time.time() < deadline:
+        time.sleep(0.01)
+    textures.pop(1)
+    profiler.frame_end()
+    assert profiler.accounting.gpu_bytes == 5120   # odświeżanie co 2 klatki
+    profiler.frame_end()
+    assert profiler.accounting.gpu_bytes == 1024
+    while len(profiler.sampler.samples) < 3 and time.time() < deadline + 2.0:
+        time.sleep(0.01)
+    profiler.stop()
+    assert len(profiler.sampler.samples) >= 3 and profiler.sampler.peak_gpu == 5120
+    assert profiler.sampler.thread is None
+    print("✅ Podsystemy i próbkowanie w tle - OK")
+
+    # Stałe odczyty - szczyt i historia bez wątku
+    sampler = MemorySampler(profiler.accounting, read=lambda: 1000)
+    sampler.sample()
+    assert sampler.latest[1:] == (1000, 1024) and sampler.peak_rss == 1000
+
+    leak = []
+    profiler = MemoryProfiler(accounting_interval=1)
+    profiler.trace_allocations(snapshot_interval=5)
+    profiler.start()
+    try:
+        for _ in range(10):
+            profiler.frame_begin()
+            scratch = [bytearray(1000) for _ in range(50)]   # zwalniane w klatce
+            leak.append(bytearray(20000))                      # rośnie z klatki na klatkę
+            del scratch
+            profiler.frame_end()
+        allocations = profiler.allocations.summary()
+        assert allocations["frames"] == 10 and allocations["transient_bytes_max"] >= 50000
+        assert allocations["growth"][0]["bytes_per_frame"] >= 19000
+        assert "test_enhanced.py" in allocations["growth"][0]["location"]
+        assert any(line.startswith("Alokacje/klatkę") for line in profiler.format_lines())
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "memory.json")
+            profiler.export_json(path)
+            with open(path, 'r', encoding='utf-8') as f:
+                exported = json.load(f)
+        assert exported["rss_bytes"] > 0 and "allocations" in exported
+    finally:
+        profiler.stop()
+    import tracemalloc
+    assert not tracemalloc.is_tracing()
+    print("✅ Alokacje na klatkę (tracemalloc) i eksport JSON - OK")
+    return True
+
+def test_metrics():
+    """Testuje rejestr metryk (liczniki, histogramy) i okresowy eksport"""
+    print("\n📈 Testowanie metryk...")
+
+    import json
+    import random
+    import socket
+    import tempfile
+    import threading
+    from metrics import MetricsExporter, MetricsRegistry
+
+    registry = MetricsRegistry()
+    counter = registry.counter("test_events_total", "Zdarzenia")
+    assert registry.counter("test_events_total") is counter
+    try:
+        registry.histogram("test_events_total")
+        assert False
+    except ValueError:
+        pass
+
+    # Zapisy z wielu wątków bez blokad - suma musi być dokładna
+    def work():
+        for _ in range(20000):
+            counter.inc()
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert counter.value == 80000 and not counter.pending
+    print("✅ Liczniki z wielu wątków - OK")
+
+    histogram = registry.histogram("test_latency_ms", "Opóźnienie", labels={"stage": "a"})
+    rng = random.Random(7)
+    values = [rng.lognormvariate(1.0, 1.5) for _ in range(20000)]
+    for value in values:
+        histogram.observe(value)
+    values.sort()
+    for q in (0.5, 0.9, 0.99):
+        exact = values[int(q * len(values)) - 1]
+        assert abs(histogram.quantile(q) - exact) / exact < 0.02, q
+    snapshot = histogram.snapshot()
+    assert snapshot["count"] == 20000 and snapshot["min"] == values[0]
+    assert len(histogram.buckets) < 700
+    histogram.observe(0.0)
+    assert histogram.quantile(0.0) == 0.0
+    print("✅ Histogram logarytmiczno-liniowy (błąd percentyli < 2%) - OK")
+
+    registry.gauge("test_queue", "Kolejka", function=lambda: 3)
+    registry.gauge("test_empty", "Pusty").set(1.5)
+    registry.histogram("test_unused_ms")
+    text = registry.to_prometheus({"host": "a\"b"})
+    assert "# TYPE test_latency_ms summary" in text
+    assert 'test_latency_ms_count{host="a\\"b",stage="a"} 20001' in text
+    assert 'test_events_total{host="a\\"b"} 80000' in text
+    assert 'test_queue{host="a\\"b"} 3' in text and 'quantile="0.99"} NaN' in text
+    record = registry.to_json()
+    assert record["gauges"]["test_empty"] == 1.5
+    assert record["histograms"]['test_latency_ms{stage="a"}']["count"] == 20001
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "metrics.jsonl")
+        exporter = MetricsExporter(registry, path, interval=0.05, labels={"host": "test"})
+        exporter.start()
+        counter.inc(5)
+        time.sleep(0.3)
+        exporter.stop()
+        with open(path, 'r', encoding='utf-8') as f:
+            lines = [json.loads(line) for line in f]
+        assert len(lines) >= 2 and lines[-1]["counters"]["test_events_total"] == 80005
+        assert lines[-1]["histograms"]["test_unused_ms"]["p50"] is None
+
+        prom_path = os.path.join(directory, "metrics.prom")
+        exporter = MetricsExporter(registry, prom_path, "prometheus")
+        assert exporter.export() and not os.path.exists(prom_path + ".tmp")
+        with open(prom_path, 'r', encoding='utf-8') as f:
+            assert "test_events_total{host=" in f.read()
+    print("✅ Eksport do pliku (JSON, Prometheus) - OK")
+
+    server = socket.socket()
+    server.bind(("127.0.0.1", 0))
+    server.listen(1)
+    port = server.getsockname()[1]
+    try:
+        exporter = MetricsExporter(registry, f"tcp://127.0.0.1:{port}", labels={})
+        assert exporter.export()
+        connection, _ = server.accept()
+        connection.settimeout(5.0)
+        data = b""
+        while not data.endswith(b"\n"):
+            data += connection.recv(65536)
+        assert json.loads(data)["counters"]["test_events_total"] == 80005
+        connection.close()
+        exporter.stop()
+    finally:
+        server.close()
+    assert not MetricsExporter(registry, f"tcp://127.0.0.1:{port}").export()
+    for target, fmt in (("tcp://host", "jsonl"), ("plik", "xml")):
+        try:
+            MetricsExporter(registry, target, fmt)
+            assert False, target
+        except ValueError:
+            pass
+    print("✅ Eksport przez gniazdo TCP i błędy połączenia - OK")
+    return True
+
+def test_simulation_thread():
+    """Testuje wątek symulacji, potrójny bufor i interpolację migawek"""
+    print("\n🧵 Testowanie wątku symulacji...")
+
+    import time
+    from simulation_clock import CameraState, SimulationClock
+    from simulation_thread import SimulationSnapshot, SimulationThread, TripleBuffer
+
+    # Migawka: interpolacja według czasu od publikacji, bez wybiegania poza krok
+    snapshot = SimulationSnapshot(CameraState(0, 0, -5), CameraState(0, 10, -5),
+                                  sim_time=1.0, step_count=60, alpha=0.25,
+                                  published_at=100.0, time_scale=1.0, step=0.1)
+    assert snapshot.camera_at(100.0).rotation_y == 2.5
+    assert abs(snapshot.camera_at(100.05).rotation_y - 7.5) < 1e-9
+    assert snapshot.camera_at(105.0).rotation_y == 10
+    assert snapshot.camera_at(99.0).rotation_y == 0
+    print("✅ Interpolacja migawki (alpha w [0, 1]) - OK")
+
+    buffer = TripleBuffer(0)
+    for value in range(1, 5):
+        buffer.publish(value)
+        assert buffer.latest() == value
+    assert buffer.published == 4 and sorted(buffer.slots) == [2, 3, 4]
+    print("✅ Potrójny bufor - OK")
+
+    # Krok dłuższy niż klatka - odczyt migawki nie może na niego czekać
+    state = {"y": 0.0}
+    def slow_step():
+        time.sleep(0.03)
+        state["y"] += 1.0
+    sim_thread = SimulationThread(SimulationClock(step=0.01), slow_step,
+                                  lambda: CameraState(0.0, state["y"], -5.0))
+    sim_thread.start()
+    counts, longest = [], 0.0
+    deadline = time.perf_counter() + 0.5
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        latest = sim_thread.latest()
+        sim_thread.camera()
+        longest = max(longest, time.perf_counter() - start)
+        counts.append(latest.step_count)
+        time.sleep(0.002)
+    assert longest < 0.02, longest  # krok trwa 30ms
+    assert counts == sorted(counts) and counts[-1] > 0
+    print(f"✅ Odczyt migawki bez czekania na krok (max {longest * 1000:.2f}ms) - OK")
+
+    # Wejście pod blokadą - migawka bez interpolacji; zatrzymanie czeka na wątek
+    with sim_thread.lock:
+        state["y"] = 100.0
+        sim_thread.publish_current()
+    latest = sim_thread.latest()
+    assert latest.previous == latest.current or latest.current.rotation_y > 100.0
+    sim_thread.stop()
+    assert not sim_thread.running and sim_thread.error is None
+    assert sim_thread.max_step_ms >= 30.0
+    print("✅ Zmiana bezpośrednia i zatrzymanie wątku - OK")
+    return True
+
+
+def test_remote_control():
+    """Testuje serwer zdalnego sterowania (polecenia na granicy klatki, telemetria)"""
+    print("\n📡 Testowanie zdalnego sterowania...")
+
+    import json
+    import socket
+    import threading
+    import time
+    from remote_control import RemoteControlServer, parse_command
+    from utils import parse_address
+
+    assert parse_address("8766") == ("127.0.0.1", 8766)
+    assert parse_address("0.0.0.0:9000") == ("0.0.0.0", 9000)
+    assert parse_command({"rotation_y": 90, "animation": None}) == {"rotation_y": 90.0,
+                                                                   "animation": None}
+    for bad in ({"rotation_x": "1"}, {"distance": float("nan")}, {"layer": 3}, {"cmd": "set"}):
+        try:
+            parse_command(bad)
+            assert False, bad
+        except ValueError:
+            pass
+    print("✅ Parsowanie poleceń i adresu - OK")
+
+    server = RemoteControlServer("127.0.0.1", 0, token="sekret").start()
+    camera = {"rotation_y": 0.0, "frame": 0}
+    running = threading.Event()
+    running.set()
+
+    # Pętla "klatek": polecenia stosowane tylko tutaj, stan publikowany co klatkę
+    def frames():
+        while running.is_set():
+            for command in server.drain():
+                if command.changes.get("layer") == "Mars":
+                    command.reply(ok=False, error="nieznana warstwa")
+                    continue
+                camera["rotation_y"] = command.changes.get("rotation_y", camera["rotation_y"])
+                command.reply(ok=True, frame=camera["frame"])
+            camera["frame"] += 1
+            server.publish({"type": "telemetry", "frame": camera["frame"],
+                            "rotation_y": camera["rotation_y"]})
+            time.sleep(0.005)
+    loop_thread = threading.Thread(target=frames, daemon=True)
+    loop_thread.start()
+
+    client = socket.create_connection(server.address, timeout=5)
+    stream = client.makefile("rwb")
+    def request(message):
+        stream.write(json.dumps(message).encode("utf-8") + b"\n")
+        stream.flush()
+        while True:
+            reply = json.loads(stream.readline())
+            if reply.get("type") != "telemetry":
+                return reply
+
+    try:
+        assert request({"id": 1, "cmd": "get"}) == {"id": 1, "ok": False,
+                                                    "error": "wymagane uwierzytelnienie (auth)"}
+        assert not request({"cmd": "auth", "token": "zły"})["ok"]
+        assert request({"cmd": "auth", "token": "sekret"})["ok"]
+
+        reply = request({"id": 2, "cmd": "set", "rotation_y": 45})
+        assert reply["ok"] and reply["id"] == 2 and camera["rotation_y"] == 45.0
+        reply = request({"id": 3, "cmd": "set", "layer": "Mars"})
+        assert reply == {"id": 3, "ok": False, "error": "nieznana warstwa"}
+        assert not request({"cmd": "set", "rotation_y": "x"})["ok"]
+        assert not request({"cmd": "nieznane"})["ok"]
+        stream.write(b"{zepsute\n")
+        stream.flush()
+        assert "JSON" in json.loads(stream.readline())["error"]
+        assert request({"cmd": "get"})["state"]["rotation_y"] == 45.0
+        print("✅ Polecenia stosowane na granicy klatki - OK")
+
+        assert request({"cmd": "subscribe", "rate": 20})["rate"] == 20
+        assert server.subscribers == 1
+        start = time.perf_counter()
+        updates = [json.loads(stream.readline()) for _ in range(10)]
+        elapsed = time.perf_counter() - start
+        frames_seen = [update["frame"] for update in updates]
+        assert all(update["type"] == "telemetry" for update in updates)
+        assert frames_seen == sorted(set(frames_seen))
+        assert 0.3 < elapsed < 2.0, elapsed
+        assert request({"cmd": "subscribe", "rate": 0})["rate"] == 0
+        print(f"✅ Telemetria 20 Hz (10 stanów w {elapsed:.2f}s) - OK")
+    finally:
+        stream.close()
+        client.close()
+        running.clear()
+        loop_thread.join()
+        server.stop()
+    assert server.thread is None
+    print("✅ Zatrzymanie serwera - OK")
+    return True
+
+
+def test_benchmark_baseline():
+    """Testuje porównanie wyników benchmarku z linią bazową"""
+    print("\n⏱️ Testowanie progów regresji benchmarku...")
+    
+    from benchmark import compare_with_baseline, metric
+    
+    baseline = {
+        "tolerance": 0.2,
+        "tolerances": {"cold_start_ms": 0.5},
+        "metrics": {
+            "sphere_build_48_ms": metric(1.0, "ms"),
+            "render_48seg_1280x720_fps": metric(100.0, "fps", higher_is_better=True),
+            "cold_start_ms": metric(1000.0, "ms"),
+            "removed_metric_ms": metric(1.0, "ms"),
+        }
+    }
+    within = {"metrics": {
+        "sphere_build_48_ms": metric(1.15, "ms"),
+        "render_48seg_1280x720_fps": metric(85.0, "fps", higher_is_better=True),
+        "cold_start_ms": metric(1400.0, "ms"),
+    }}
+    assert compare_with_baseline(within, baseline) == []
+    print("✅ Wyniki w granicach tolerancji - OK")
+    
+    slower = {"metrics": {
+        "sphere_build_48_ms": metric(1.3, "ms"),
+        "render_48seg_1280x720_fps": metric(70.0, "fps", higher_is_better=True),
+        "cold_start_ms": metric(1600.0, "ms"),
+    }}
+    regressions = compare_with_baseline(slower, baseline)
+    assert len(regressions) == 3
+    assert regressions[1].startswith("render_48seg_1280x720_fps")
+    assert compare_with_baseline(within, baseline, tolerance=0.1) != []
+    print("✅ Wykrywanie regresji - OK")
+    
+    # Wymagana linia bazowa - jej brak kończy program błędem przed pomiarami
+    import io
+    import os
+    import tempfile
+    from contextlib import redirect_stdout
+    from benchmark import main as benchmark_main
+    with tempfile.TemporaryDirectory() as directory, redirect_stdout(io.StringIO()) as output:
+        missing = os.path.join(directory, "brak.json")
+        assert benchmark_main(["--require-baseline", "--baseline", missing]) == 1
+    assert "--update-baseline" in output.getvalue()
+    print("✅ Brak wymaganej linii bazowej - OK")
+    return True
+
 def run_quick_test():
     """Uruchamia szybki test programu"""
     print("🧪 Uruchamianie szybkiego testu...")
     
     try:
-        # Sprawdź czy program się uruchamia (bez GUI)
+        # Renderowanie bez okna - program musi sam zakończyć się po N klatkach
+        start = time.time()
         result = subprocess.run([
             sys.executable, 
-            "earth_simulator_enhanced.py"
+            "earth_simulator_enhanced.py",
+            "--headless", "--frames", "30"
         ], 
         capture_output=True, 
         text=True, 
-        timeout=10)
+        timeout=60)
         
         if result.returncode == 0:
-            print("✅ Program uruchamia się poprawnie")
+            print(f"✅ Program uruchamia się poprawnie ({time.time() - start:.1f}s)")
             return True
         else:
             print(f"❌ Błąd uruchamiania: {result.stderr}")
             return False
             
     except subprocess.TimeoutExpired:
-        print("✅ Program uruchamia się (timeout - normalne dla GUI)")
-        return True
+        print("❌ Program nie zakończył się w wyznaczonym czasie")
+        return False
     except Exception as e:
         print(f"❌ Błąd testu: {e}")
         return False
@@ -173,6 +1451,31 @@ def main():
         ("Pliki tekstur", test_texture_files),
         ("Funkcje pomocnicze", test_utils),
         ("Główny program", test_main_program),
+        ("Zegar symulacji", test_simulation_clock),
+        ("Ścieżki kamery", test_camera_path),
+        ("Regulator jakości", test_quality_controller),
+        ("Łączenie wejścia", test_input_batcher),
+        ("Nagrywanie sesji", test_input_recorder),
+        ("Profiler startu", test_startup_profiler),
+        ("Logowanie w tle", test_log_pipeline),
+        ("Wskazywanie punktów", test_picking),
+        ("Model Słońca", test_solar),
+        ("Warstwa chmur", test_clouds),
+        ("Tablice atmosfery", test_atmosphere),
+        ("Programy shaderów", test_shaders),
+        ("Stan GL", test_gl_state),
+        ("Tryb PyOpenGL", test_gl_config),
+        ("Zrzuty ekranu", test_screenshot_encoding),
+        ("Nagrywanie wideo", test_video_recording),
+        ("Plakat z kafelków", test_poster),
+        ("Pobieranie plików", test_download_manager),
+        ("Lista widoków", test_batch_views),
+        ("Weryfikacja tekstur", test_asset_validator),
+        ("Profil pamięci", test_memory_profiler),
+        ("Metryki", test_metrics),
+        ("Wątek symulacji", test_simulation_thread),
+        ("Zdalne sterowanie", test_remote_control),
+        ("Progi benchmarku", test_benchmark_baseline),
         ("Szybki test", run_quick_test)
     ]
     
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Ładowanie tekstur w tle dla Earth Simulator Enhanced
+Autor: Adrian Lesniak
+
+Dekodowanie dużych plików JPEG trwa setki milisekund, dlatego przy starcie
+ładowany jest tylko podgląd bieżącej warstwy (dekodowanie JPEG w zmniejszonej
+skali), a pełne tekstury dekodowane są w wątku tła. Wywołania OpenGL muszą
+pozostać w wątku głównym - wątek tła zwraca tylko surowe dane RGBA, które pętla
+główna przesyła do GPU po jednej na klatkę.
+"""
+
+import logging
+import math
+import os
+import queue
+import threading
+from dataclasses import dataclass
+from typing import Callable, Optional, Set, Tuple
+
+from PIL import Image
+
+from metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+DECODE_TIME = metrics.histogram("earth_texture_decode_ms", "Czas dekodowania tekstury w tle [ms]")
+DECODE_ERRORS = metrics.counter("earth_texture_decode_errors_total", "Błędy dekodowania tekstur")
+
+# Dłuższy bok podglądu wyświetlanego w pierwszej klatce
+PREVIEW_SIZE = 1024
+
+
+@dataclass
+class DecodedTexture:
+    """Zdekodowana tekstura gotowa do przesłania"""
+    name: str
+    filename: str
+    width: int
+    height: int
+    data: bytes
+
+
+def decode_image(image_path: str, max_size: Optional[int] = None) -> Tuple[int, int, bytes]:
+    """Dekoduje obraz do RGBA (odwrócony w pionie, jak oczekuje OpenGL)
+
+    max_size ogranicza dłuższy bok; dla JPEG używany jest tryb draft, który
+    dekoduje od razu w skali 1/2, 1/4 lub 1/8 - wielokrotnie szybciej niż
+    pełne dekodowanie i późniejsze skalowanie.
+    """
+    if not os.path.exists(image_path):
+        raise FileNotFoundError(f"Plik tekstury nie istnieje: {image_path}")
+
+    image = Image.open(image_path)
+    if max_size:
+        scale = max_size / max(image.size)
+        if scale < 1.0:
+            image.draft('RGB', (int(image.width * scale), int(image.height * scale)))
+            factor = math.floor(max(image.size) / max_size)
+            if factor > 1:
+                image = image.reduce(factor)
+    if image.mode != 'RGBA':
+        image = image.convert('RGBA')
+
+    return image.width, image.height, image.tobytes("raw", "RGBA", 0, -1)
+
+
+class TextureLoader:
+    """Kolejka dekodowania tekstur w wątku tła"""
+
+    def __init__(self, decode: Callable[[str], Tuple[int, int, bytes]]):
+        self.decode = decode
+        self.requests: "queue.Queue[Optional[Tuple[str, str]]]" = queue.Queue()
+        self.results: "queue.Queue[DecodedTexture]" = queue.Queue()
+        self.pending: Set[str] = set()
+        self.lock = threading.Lock()
+        self.thread = threading.Thread(target=self._worker, name="texture-decoder", daemon=True)
+        self.thread.start()
+
+    def request(self, name: str, filename: str):
+        """Zleca dekodowanie pełnej tekstury"""
+        with self.lock:
+            if name in self.pending:
+                return
+            self.pending.add(name)
+        self.requests.put((name, filename))
+
+    @property
+    def busy(self) -> bool:
+        """Czy są tekstury w trakcie dekodowania lub czekające na przesłanie"""
+        with self.lock:
+            return bool(self.pending)
+
+    @property
+    def queued_bytes(self) -> int:
+        """Dane zdekodowanych tekstur czekających na przesłanie do GPU"""
+        with self.results.mutex:
+            return sum(len(decoded.data) for decoded in self.results.queue)
+
+    def poll(self, timeout: Optional[float] = None) -> Optional[DecodedTexture]:
+        """Zwraca kolejną zdekodowaną teksturę (None = brak gotowych)"""
+        try:
+            decoded = self.results.get(block=timeout is not None, timeout=timeout)
+        except queue.Empty:
+            return None
+        with self.lock:
+            self.pending.discard(decoded.name)
+        return decoded
+
+    def close(self):
+        """Zatrzymuje wątek tła (zlecenia w kolejce są porzucane)"""
+        self.requests.put(None)
+
+    def _worker(self):
+        while True:
+            item = self.requests.get()
+            if item is None:
+                return
+            name, filename = item
+            try:
+                with DECODE_TIME.time():
+                    width, height, data = self.decode(filename)
+            except Exception as e:
+                DECODE_ERRORS.inc()
+                logger.error(f"Błąd dekodowania tekstury {filename}: {e}")
+                with self.lock:
+                    self.pending.discard(name)
+                continue
+            self.results.put(DecodedTexture(name, filename, width, height, data))
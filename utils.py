@@ -8,7 +8,7 @@ Autor: Adrian Lesniak
 import os
 import json
 import logging
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Tuple
 from datetime import datetime
 
 def create_config_directory():
@@ -69,6 +69,23 @@ def validate_resolution(width: int, height: int) -> bool:
     return (min_width <= width <= max_width and 
             min_height <= height <= max_height)
 
+def parse_size(text: str) -> Tuple[int, int]:
+    """Rozmiar obrazu "512x512" -> (512, 512)"""
+    parts = text.lower().split("x")
+    if len(parts) != 2 or not all(part.strip().isdigit() for part in parts):
+        raise ValueError(f"Nieprawidłowy rozmiar: {text} (np. 512x512)")
+    width, height = int(parts[0]), int(parts[1])
+    if width <= 0 or height <= 0:
+        raise ValueError(f"Nieprawidłowy rozmiar: {text}")
+    return width, height
+
+def parse_address(text: str, default_host: str = "127.0.0.1") -> Tuple[str, int]:
+    """Adres "8766" albo "0.0.0.0:8766" -> (host, port)"""
+    host, _, port = text.rpartition(":")
+    if not port.isdigit() or not 0 < int(port) < 65536:
+        raise ValueError(f"Nieprawidłowy adres: {text} (np. 8766 lub 0.0.0.0:8766)")
+    return host or default_host, int(port)
+
 def get_system_info() -> Dict[str, str]:
     """Zwraca informacje o systemie"""
     import platform
@@ -132,11 +149,10 @@ def get_file_size_mb(filepath: str) -> Optional[float]:
         return None
 
 def is_valid_image_file(filepath: str) -> bool:
-    """Sprawdza czy plik jest poprawnym obrazem"""
+    """Sprawdza czy plik jest poprawnym obrazem (nagłówek i koniec pliku, bez dekodowania)"""
     try:
-        from PIL import Image
-        with Image.open(filepath) as img:
-            img.verify()
+        from asset_validator import read_image_header
+        read_image_header(filepath)
         return True
     except Exception:
         return False
@@ -164,6 +180,11 @@ def log_performance_metrics(func):
     import time
     import functools
     
+    from metrics import metrics
+    histogram = metrics.histogram("earth_function_time_ms",
+                                  "Czas funkcji z log_performance_metrics [ms]",
+                                  labels={"function": func.__name__})
+    
     @functools.wraps(func)
     def wrapper(*args, **kwargs):
         start_time = time.time()
@@ -176,6 +197,7 @@ def log_performance_metrics(func):
             end_memory = get_memory_usage()
             
             execution_time = end_time - start_time
+            histogram.observe(execution_time * 1000.0)
             memory_diff = end_memory.get("rss", 0) - start_memory.get("rss", 0)
             
             logging.info(f"Funkcja {func.__name__}: "